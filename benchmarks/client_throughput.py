@@ -0,0 +1,311 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Benchmark (and regression check) for the throughput of a generated Python client, against a mock NXRM.
+
+`benchmarks/mock_server.py` is started in a process of its own (or `--url` is one already running), and each
+scenario is run by the client generated (and extended by `generate-extensions.py`) into the batch config's
+`outputDir`, with `--requests` requests spread over a worker thread per request in flight, at each `--concurrency`:
+
+    search       - `GET /v1/search`, page after page (following each `continuationToken`)
+    assets       - `GET /v1/assets`, likewise
+    components   - `GET /v1/components`, likewise
+    repositories - create, get, update and delete of raw hosted repositories, in turn
+
+reporting requests per second, median and p99 latency, and the peak memory (tracemalloc, measured on a separate run
+at the highest concurrency) of each.
+
+    python benchmarks/client_throughput.py --concurrency 1 --concurrency 8 --concurrency 32
+    python benchmarks/client_throughput.py --page-size 1000 --latency 0.01 --raw view
+    python benchmarks/client_throughput.py --validate                   # check the responses against the spec too
+    python benchmarks/client_throughput.py --save-baseline baseline.json
+    python benchmarks/client_throughput.py --baseline baseline.json --threshold 0.25
+"""
+import argparse
+import importlib
+import json
+import os
+import os.path
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Any, Callable, Iterator
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.import_time import client  # noqa: E402
+
+MOCK_SERVER = os.path.join(BENCHMARKS_DIR, 'mock_server.py')
+DEFAULT_CONCURRENCY = (1, 4, 16, 64)
+
+
+def _token(page: Any) -> str | None:
+    if isinstance(page, dict):
+        return page.get('continuationToken')
+    return page.continuation_token
+
+
+def _pages(call: Callable[..., Any], **kwargs: Any) -> Callable[[], Any]:
+    """A step requesting the next page of `call` - the first again once there are no more."""
+    token = None
+
+    def step() -> None:
+        nonlocal token
+        token = _token(call(continuation_token=token, **kwargs))
+
+    return step
+
+
+def search(package: ModuleType, api_client: Any, worker: int) -> Callable[[], Any]:
+    return _pages(package.SearchApi(api_client).list_search, repository='maven-releases')
+
+
+def assets(package: ModuleType, api_client: Any, worker: int) -> Callable[[], Any]:
+    return _pages(package.AssetsApi(api_client).list_assets, repository='maven-releases')
+
+
+def components(package: ModuleType, api_client: Any, worker: int) -> Callable[[], Any]:
+    return _pages(package.ComponentsApi(api_client).list_components, repository='maven-releases')
+
+
+def repositories(package: ModuleType, api_client: Any, worker: int) -> Callable[[], Any]:
+    api = package.RepositoryManagementApi(api_client)
+    name = f'benchmark-{worker}'
+    request = package.RawHostedRepositoryApiRequest(
+        name=name, online=True,
+        storage=package.HostedStorageAttributes(blob_store_name='default', strict_content_type_validation=True,
+                                                write_policy='allow_once'),
+    )
+    steps = [
+        lambda: api.create_raw_hosted_repository(request),
+        lambda: api.get_raw_hosted_repository(name),
+        lambda: api.update_raw_hosted_repository(name, request),
+        lambda: api.delete_repositories(name),
+    ]
+    number = -1
+
+    def step() -> None:
+        nonlocal number
+        number += 1
+        steps[number % len(steps)]()
+
+    return step
+
+
+SCENARIOS = {
+    'search': search,
+    'assets': assets,
+    'components': components,
+    'repositories': repositories,
+}
+
+
+@contextmanager
+def mock_server(page_size: int, pages: int, latency: float) -> Iterator[str]:
+    """The URL of a mock NXRM, in a process of its own so it does not compete with the client for the GIL."""
+    process = subprocess.Popen([sys.executable, MOCK_SERVER, '--port', '0', '--page-size', str(page_size),
+                                '--pages', str(pages), '--latency', str(latency)],
+                               stdout=subprocess.PIPE, text=True)
+    try:
+        line = process.stdout.readline()
+        if not line.startswith('Mocking'):
+            raise RuntimeError(f'{MOCK_SERVER} did not start')
+        yield line.split()[-1]
+    finally:
+        process.terminate()
+        process.wait()
+
+
+class Client:
+    """Makes `ApiClient`s of the generated package at `directory` - with what is to be benchmarked."""
+
+    def __init__(self, directory: str, package: str, url: str, raw: str | None, validate: bool) -> None:
+        sys.path.insert(0, directory)
+        self.package = importlib.import_module(package)
+        self.url = url
+        self.raw = raw
+        self.validate = validate
+        self.extensions = importlib.import_module(f'{package}.ext.client') if raw or validate else None
+        self.validation = importlib.import_module(f'{package}.ext.validation') if validate else None
+
+    def api_client(self, concurrency: int) -> Any:
+        configuration = self.package.Configuration(host=self.url, username='admin', password='admin123')
+        configuration.connection_pool_maxsize = concurrency
+        if self.extensions is None:
+            return self.package.ApiClient(configuration)
+        validator = self.validation.ResponseValidator(strict=True) if self.validation is not None else None
+        return self.extensions.NexusApiClient(configuration, raw=self.raw, validator=validator)
+
+
+def run(client: Client, scenario: Callable[..., Callable[[], Any]], concurrency: int, requests: int,
+        trace_memory: bool = False) -> dict[str, Any]:
+    """`requests` steps of `scenario` by `concurrency` workers: the throughput and latencies of those."""
+    api_client = client.api_client(concurrency)
+    steps = [scenario(client.package, api_client, worker) for worker in range(concurrency)]
+    per_worker = max(1, requests // concurrency)
+    # when every worker is ready
+    began: list[float] = []
+    start = threading.Barrier(concurrency, action=lambda: began.append(time.perf_counter()))
+
+    def work(step: Callable[[], Any]) -> list[float]:
+        # one request not counted, so each worker starts with its connection made
+        step()
+        start.wait()
+        latencies = []
+        for _ in range(per_worker):
+            started = time.perf_counter()
+            step()
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        with ThreadPoolExecutor(concurrency) as executor:
+            latencies = sorted(t for ts in executor.map(work, steps) for t in ts)
+            elapsed = time.perf_counter() - began[0]
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+        api_client.rest_client.pool_manager.clear()
+    return {
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed,
+        'p50': latencies[len(latencies) // 2],
+        'p99': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        'peak_memory': peak,
+    }
+
+
+def benchmark(client: Client, scenarios: list[str], concurrency: list[int], requests: int) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for name in scenarios:
+        results[name] = {str(c): run(client, SCENARIOS[name], c, requests) for c in concurrency}
+        results[name]['peak_memory'] = run(client, SCENARIOS[name], max(concurrency), requests, True)['peak_memory']
+    return results
+
+
+def print_results(results: dict[str, Any]) -> None:
+    print(f'  {"scenario":<14}{"workers":>8}{"req/s":>10}{"p50 ms":>10}{"p99 ms":>10}')
+    for name, levels in results.items():
+        for concurrency, result in levels.items():
+            if concurrency != 'peak_memory':
+                print(f'  {name:<14}{concurrency:>8}{result["rps"]:>10.0f}{result["p50"] * 1000:>10.2f}'
+                      f'{result["p99"] * 1000:>10.2f}')
+        print(f'  {name:<14}{"peak":>8}{levels["peak_memory"] / 2 ** 20:>9.1f} MiB')
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """Every scenario and concurrency with `threshold` fewer requests per second, or a p99 `threshold` slower,
+    than in `baseline`."""
+    regressions = []
+    for name, levels in results.items():
+        for concurrency, result in levels.items():
+            base = baseline['results'].get(name, {}).get(concurrency)
+            if concurrency == 'peak_memory' or not base:
+                continue
+            if result['rps'] < base['rps'] * (1 - threshold):
+                regressions.append(f'{name} x{concurrency}: {base["rps"]:.0f} -> {result["rps"]:.0f} req/s '
+                                   f'(-{(1 - result["rps"] / base["rps"]) * 100:.0f}%)')
+            if result['p99'] > base['p99'] * (1 + threshold):
+                regressions.append(f'{name} x{concurrency}: p99 {base["p99"] * 1000:.2f} ms -> '
+                                   f'{result["p99"] * 1000:.2f} ms (+{(result["p99"] / base["p99"] - 1) * 100:.0f}%)')
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the throughput of a generated Python client against a '
+                                                 'mock NXRM.')
+    parser.add_argument('language', metavar='LANGUAGE', nargs='?', default='python',
+                        help='Batch config of the client (default: %(default)s)')
+    parser.add_argument('--output-dir', metavar='DIR',
+                        help='Where the client was generated, if not the `outputDir` in its batch config')
+    parser.add_argument('--scenario', dest='scenarios', action='append', choices=list(SCENARIOS),
+                        help='A scenario to run - may be repeated (default: all)')
+    parser.add_argument('--concurrency', type=int, action='append', metavar='WORKERS',
+                        help='Requests in flight - may be repeated (default: '
+                             f'{", ".join(map(str, DEFAULT_CONCURRENCY))})')
+    parser.add_argument('--requests', type=int, default=2000,
+                        help='Requests per scenario and concurrency (default: %(default)s)')
+    parser.add_argument('--page-size', type=int, default=100,
+                        help='Items in each page of the mock\'s listings (default: %(default)s)')
+    parser.add_argument('--pages', type=int, default=10,
+                        help='Pages in each of the mock\'s listings (default: %(default)s)')
+    parser.add_argument('--latency', type=float, default=0.0, metavar='SECONDS',
+                        help='Time the mock waits before each response (default: %(default)s)')
+    parser.add_argument('--url', metavar='URL',
+                        help='A mock (or real) NXRM REST API to use, e.g. http://127.0.0.1:8081/service/rest, '
+                             'rather than starting one')
+    parser.add_argument('--raw', choices=('dict', 'view'),
+                        help='Decode responses as plain dicts or views rather than models (ext.client)')
+    parser.add_argument('--validate', action='store_true',
+                        help='Check every response against the spec (ext.validation), failing if any does not match')
+    parser.add_argument('--output', metavar='FILE', help='Write the results as JSON to FILE')
+    parser.add_argument('--save-baseline', metavar='FILE', help='Write the results as a baseline to FILE')
+    parser.add_argument('--baseline', metavar='FILE', help='Fail if slower than the baseline in FILE')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed slow-down against --baseline, as a fraction (default: %(default)s)')
+    args = parser.parse_args()
+
+    directory, package = client(args.language, args.output_dir)
+    if not os.path.isdir(os.path.join(directory, package)):
+        parser.error(f'no {package} in {directory} - generate the {args.language} client first')
+    if package.endswith('_async'):
+        parser.error('only the synchronous Python client can be benchmarked')
+    scenarios = args.scenarios or list(SCENARIOS)
+    concurrency = sorted(set(args.concurrency or DEFAULT_CONCURRENCY))
+
+    if args.url:
+        results = benchmark(Client(directory, package, args.url, args.raw, args.validate), scenarios, concurrency,
+                            args.requests)
+    else:
+        with mock_server(args.page_size, args.pages, args.latency) as url:
+            results = benchmark(Client(directory, package, url, args.raw, args.validate), scenarios, concurrency,
+                                args.requests)
+    print(f'{package} ({os.path.relpath(directory)}), {args.page_size} items a page, {args.latency * 1000:g} ms '
+          f'latency{", " + args.raw if args.raw else ""}{", validated" if args.validate else ""}:')
+    print_results(results)
+
+    settings = {'page_size': args.page_size, 'pages': args.pages, 'latency': args.latency, 'raw': args.raw,
+                'validate': args.validate, 'requests': args.requests}
+    document = {'python': sys.version.split()[0], 'package': package, **settings, 'results': results}
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(document, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        for setting, value in settings.items():
+            if baseline.get(setting) != value:
+                print(f'WARNING the baseline was run with {setting} {baseline.get(setting)}, not {value}')
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
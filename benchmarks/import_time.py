@@ -0,0 +1,141 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Benchmark (and regression check) for how long a generated Python client takes to import.
+
+Each scenario runs in a fresh interpreter - so nothing is already imported - against the client generated (and
+extended by `generate-extensions.py`) into the batch config's `outputDir`:
+
+    import      - `import nexus_api_client`
+    one-api     - what a script making one call imports (`ApiClient`, `Configuration` and one `...Api`)
+    everything  - `from nexus_api_client import *`, which is what every import cost before the package was lazy
+
+reporting the best wall time over `--repeat` runs.
+
+    python benchmarks/import_time.py                                # out/python
+    python benchmarks/import_time.py python-asyncio --budget 0.5    # fail if `import` takes longer than 0.5s
+    python benchmarks/import_time.py --save-baseline baseline.json
+    python benchmarks/import_time.py --baseline baseline.json --threshold 0.25
+"""
+import argparse
+import json
+import os
+import os.path
+import subprocess
+import sys
+from typing import Any
+
+import yaml
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCHMARKS_DIR)
+
+SCENARIOS = {
+    'import': 'import {package}',
+    'one-api': 'from {package} import ApiClient, Configuration, AssetsApi',
+    'everything': 'from {package} import *',
+}
+
+TIMER = '''
+import time
+started = time.perf_counter()
+{statement}
+print(time.perf_counter() - started)
+'''
+
+
+def client(language: str, output_dir: str | None) -> tuple[str, str]:
+    """(directory, package) of the client generated from `LANGUAGE.yaml`."""
+    with open(os.path.join(ROOT_DIR, f'{language}.yaml'), 'r') as f:
+        config = yaml.safe_load(f)
+    directory = output_dir or os.path.join(ROOT_DIR, config['outputDir'].replace('/local/', '', 1))
+    return os.path.abspath(directory), config['additionalProperties']['packageName']
+
+
+def time_import(directory: str, statement: str) -> float:
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [directory, os.environ.get('PYTHONPATH')])))
+    environment.pop('PYTHONDONTWRITEBYTECODE', None)
+    output = subprocess.run([sys.executable, '-c', TIMER.format(statement=statement)], env=environment, cwd=directory,
+                            check=True, capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def benchmark(directory: str, package: str, repeat: int) -> dict[str, float]:
+    # the first run of each writes its bytecode - it is not counted
+    results = {}
+    for scenario, statement in SCENARIOS.items():
+        statement = statement.format(package=package)
+        time_import(directory, statement)
+        results[scenario] = min(time_import(directory, statement) for _ in range(repeat))
+    return results
+
+
+def compare(results: dict[str, float], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """Every scenario that is more than `threshold` slower than in `baseline`."""
+    regressions = []
+    for scenario, seconds in results.items():
+        base_seconds = baseline['results'].get(scenario)
+        if base_seconds and seconds > base_seconds * (1 + threshold):
+            regressions.append(f'{scenario}: {base_seconds * 1000:.1f} ms -> {seconds * 1000:.1f} ms '
+                               f'(+{(seconds / base_seconds - 1) * 100:.0f}%)')
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark how long a generated Python client takes to import.')
+    parser.add_argument('language', metavar='LANGUAGE', nargs='?', default='python',
+                        help='Batch config of the client (default: %(default)s)')
+    parser.add_argument('--output-dir', metavar='DIR',
+                        help='Where the client was generated, if not the `outputDir` in its batch config')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per scenario - the best is kept (default: 5)')
+    parser.add_argument('--budget', type=float, metavar='SECONDS',
+                        help='Fail if the `import` scenario takes longer than SECONDS')
+    parser.add_argument('--output', metavar='FILE', help='Write the results as JSON to FILE')
+    parser.add_argument('--save-baseline', metavar='FILE', help='Write the results as a baseline to FILE')
+    parser.add_argument('--baseline', metavar='FILE', help='Fail if slower than the baseline in FILE')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed slow-down against --baseline, as a fraction (default: %(default)s)')
+    args = parser.parse_args()
+
+    directory, package = client(args.language, args.output_dir)
+    if not os.path.isdir(os.path.join(directory, package)):
+        parser.error(f'no {package} in {directory} - generate the {args.language} client first')
+
+    results = benchmark(directory, package, args.repeat)
+    print(f'{package} ({os.path.relpath(directory)}):')
+    for scenario, seconds in results.items():
+        print(f'   {seconds * 1000:9.1f} ms  {scenario}')
+
+    document = {'python': sys.version.split()[0], 'package': package, 'repeat': args.repeat, 'results': results}
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(document, f, indent=2)
+
+    failed = False
+    if args.budget is not None and results['import'] > args.budget:
+        print(f'OVER BUDGET import: {results["import"] * 1000:.1f} ms > {args.budget * 1000:.1f} ms')
+        failed = True
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,282 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""A local mock of NXRM, answering every operation of `spec/openapi.yaml` with a synthetic response valid against it.
+
+    python benchmarks/mock_server.py --port 8081                            # http://127.0.0.1:8081/service/rest
+    python benchmarks/mock_server.py --page-size 1000 --pages 20 --latency 0.02
+
+Each operation answers with its documented success status (the lowest 2xx, or 200 for one documented only as
+`default`) and a body synthesised once, at start-up, from that response's schema: every property is present, enums
+have their first value, strings and numbers meet their patterns, lengths and bounds, and arrays have one item.
+
+Operations the spec marks `x-paginated` answer with `--page-size` items a page, and a `continuationToken` leading to
+the next page until `--pages` have been served. Every response is held back by `--latency` seconds first. Requests
+are not checked, nor anything kept between them - creating a repository and getting it gives the same synthetic
+repository as any other.
+"""
+import argparse
+import json
+import os.path
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator, NamedTuple
+from urllib.parse import parse_qs, urlsplit
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+from nxrm_spec.diff import HTTP_METHODS  # noqa: E402
+from nxrm_spec.serialize import load_spec, output_path  # noqa: E402
+
+SCHEMA_REF_PREFIX = '#/components/schemas/'
+JSON_CONTENT_TYPE = 'application/json'
+# how far nested schemas are synthesised - deeper (recursive) ones are left out
+MAX_DEPTH = 8
+
+FORMAT_VALUES = {
+    'date-time': '2024-01-01T00:00:00.000+00:00',
+    'date': '2024-01-01',
+    'uuid': '00000000-0000-0000-0000-000000000000',
+    'uri': 'http://localhost:8081/repository/mock',
+    'url': 'http://localhost:8081/repository/mock',
+    'email': 'mock@example.com',
+    'byte': 'bW9jaw==',
+}
+
+
+class Synthesizer:
+    """Values valid against the schemas of a spec."""
+
+    def __init__(self, spec: dict[str, Any]) -> None:
+        self.schemas = spec.get('components', {}).get('schemas', {})
+
+    def value(self, schema: Any, name: str = 'value', depth: int = 0) -> Any:
+        if not isinstance(schema, dict) or depth > MAX_DEPTH:
+            return None
+        ref = schema.get('$ref')
+        if isinstance(ref, str) and ref.startswith(SCHEMA_REF_PREFIX):
+            return self.value(self.schemas.get(ref[len(SCHEMA_REF_PREFIX):]), name, depth + 1)
+        if 'allOf' in schema:
+            merged: dict[str, Any] = {}
+            for part in schema['allOf']:
+                part_value = self.value(part, name, depth + 1)
+                if isinstance(part_value, dict):
+                    merged.update(part_value)
+            return merged
+        for key in ('oneOf', 'anyOf'):
+            if schema.get(key):
+                return self.value(schema[key][0], name, depth + 1)
+        if schema.get('enum'):
+            return schema['enum'][0]
+        if 'example' in schema and not isinstance(schema['example'], (dict, list)):
+            return schema['example']
+
+        kind = schema.get('type', 'object' if 'properties' in schema else None)
+        if kind == 'object':
+            result = {k: self.value(s, k, depth + 1) for k, s in (schema.get('properties') or {}).items()}
+            additional = schema.get('additionalProperties')
+            if isinstance(additional, dict) and not result:
+                result[name] = self.value(additional, name, depth + 1)
+            return {k: v for k, v in result.items() if v is not None or k in schema.get('required', ())}
+        if kind == 'array':
+            item = self.value(schema.get('items'), name, depth + 1)
+            return [item] * max(1, schema.get('minItems', 1)) if item is not None else []
+        if kind == 'boolean':
+            return True
+        if kind in ('integer', 'number'):
+            return _number(schema)
+        if kind == 'string':
+            return _string(schema, name)
+        return None
+
+
+def _number(schema: dict[str, Any]) -> int | float:
+    value = 1 if schema.get('type') == 'integer' else 1.5
+    if 'minimum' in schema:
+        value = max(value, schema['minimum'] + (1 if schema.get('exclusiveMinimum') is True else 0))
+    if 'maximum' in schema:
+        value = min(value, schema['maximum'] - (1 if schema.get('exclusiveMaximum') is True else 0))
+    return value
+
+
+def _string(schema: dict[str, Any], name: str) -> str:
+    value = FORMAT_VALUES.get(schema.get('format'), re.sub(r'[^a-z0-9]', '', name.lower()) or 'value')
+    pattern = schema.get('pattern')
+    if pattern and not re.search(pattern, value):
+        # `A|B|C` - the patterns NXRM has for enums
+        alternatives = pattern.strip('^$()').split('|')
+        if re.search(pattern, alternatives[0]):
+            value = alternatives[0]
+    value = value.ljust(schema.get('minLength', 0), 'x')
+    return value[:schema['maxLength']] if 'maxLength' in schema else value
+
+
+class Route(NamedTuple):
+    method: str
+    pattern: re.Pattern
+    operation_id: str
+    status: int
+    content_type: str
+    # the whole body - or, for a paginated operation, the JSON of its items field
+    body: bytes
+    # `x-paginated`, if paginated
+    paginated: dict[str, str] | None
+
+
+def _response(operation: dict[str, Any]) -> tuple[int, dict[str, Any] | None]:
+    """The success status of `operation` and its response."""
+    responses = operation.get('responses') or {}
+    successes = sorted(s for s in responses if s.isdigit() and s.startswith('2'))
+    if successes:
+        return int(successes[0]), responses[successes[0]]
+    return 200, responses.get('default')
+
+
+def _path_pattern(path: str) -> re.Pattern:
+    return re.compile('^' + '[^/]+'.join(re.escape(p) for p in re.split(r'{[^}]+}', path)) + '$')
+
+
+class MockNexus:
+    """The responses of a mock NXRM, by method and path."""
+
+    def __init__(self, spec: dict[str, Any], page_size: int = 100, pages: int = 10, latency: float = 0.0) -> None:
+        self.page_size = page_size
+        self.pages = pages
+        self.latency = latency
+        self.base_path = urlsplit((spec.get('servers') or [{}])[0].get('url', '')).path.rstrip('/')
+        self.routes = list(self._routes(spec, Synthesizer(spec)))
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def _routes(self, spec: dict[str, Any], synthesizer: Synthesizer) -> Iterator[Route]:
+        # paths without parameters first, so `/v1/repositories/raw/hosted` is not taken for `/v1/repositories/{name}`
+        for path, path_item in sorted((spec.get('paths') or {}).items(), key=lambda p: (p[0].count('{'), p[0])):
+            for method in HTTP_METHODS:
+                operation = path_item.get(method)
+                if not isinstance(operation, dict):
+                    continue
+                status, response = _response(operation)
+                content = (response or {}).get('content') or {}
+                content_type = JSON_CONTENT_TYPE if JSON_CONTENT_TYPE in content else next(iter(content), '')
+                schema = content.get(content_type, {}).get('schema')
+                paginated = operation.get('x-paginated')
+                body = b''
+                if paginated:
+                    page_schema = synthesizer.schemas.get(schema.get('$ref', '')[len(SCHEMA_REF_PREFIX):], schema)
+                    item = synthesizer.value(page_schema['properties'][paginated['itemsField']].get('items'))
+                    body = json.dumps([item] * self.page_size).encode('utf-8')
+                elif content_type == JSON_CONTENT_TYPE and schema is not None:
+                    body = json.dumps(synthesizer.value(schema)).encode('utf-8')
+                elif content_type:
+                    body = b'mock'
+                yield Route(method.upper(), _path_pattern(self.base_path + path), operation.get('operationId', ''),
+                            status, content_type, body, paginated)
+
+    def route(self, method: str, path: str) -> Route | None:
+        for route in self.routes:
+            if route.method == method and route.pattern.match(path):
+                return route
+        return None
+
+    def respond(self, method: str, url: str) -> tuple[int, str, bytes]:
+        """(status, content type, body) of the response to a request."""
+        with self._lock:
+            self.requests += 1
+        parts = urlsplit(url)
+        route = self.route(method, parts.path)
+        if route is None:
+            return 404, '', b''
+        if route.paginated is None:
+            return route.status, route.content_type, route.body
+        token = parse_qs(parts.query).get(route.paginated['tokenParameter'], ['0'])[0]
+        page = int(token) + 1 if token.isdigit() else 1
+        next_token = json.dumps(str(page) if page < self.pages else None).encode('utf-8')
+        return route.status, route.content_type, b''.join((
+            b'{"', route.paginated['itemsField'].encode('utf-8'), b'":', route.body, b',"',
+            route.paginated['tokenField'].encode('utf-8'), b'":', next_token, b'}'
+        ))
+
+
+def serve(mock: MockNexus, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """A server (not yet serving) for `mock`."""
+
+    class Handler(BaseHTTPRequestHandler):
+        # keep connections open, as NXRM does, so clients reuse them from their pools
+        protocol_version = 'HTTP/1.1'
+        # headers and body are written separately - without this, a client waits out a delayed ACK for the body
+        disable_nagle_algorithm = True
+
+        def _respond(self) -> None:
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if mock.latency:
+                time.sleep(mock.latency)
+            status, content_type, body = mock.respond(self.command, self.path)
+            self.send_response(status)
+            if content_type:
+                self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = do_POST = do_PUT = do_DELETE = do_PATCH = do_HEAD = do_OPTIONS = _respond
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    class Server(ThreadingHTTPServer):
+        # room for a benchmark's every worker connecting at once
+        request_queue_size = 1024
+
+    return Server((host, port), Handler)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Serve a mock NXRM answering every operation of the spec with '
+                                                 'synthetic, schema-valid responses.')
+    parser.add_argument('--spec', metavar='FILE', default=output_path('yaml'),
+                        help='The spec to mock (default: %(default)s)')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=8081, help='Port to listen on - 0 for any free one '
+                                                               '(default: %(default)s)')
+    parser.add_argument('--page-size', type=int, default=100,
+                        help='Items in every page of a paginated operation (default: %(default)s)')
+    parser.add_argument('--pages', type=int, default=10,
+                        help='Pages of a paginated operation before it has no continuationToken (default: %(default)s)')
+    parser.add_argument('--latency', type=float, default=0.0, metavar='SECONDS',
+                        help='Time to wait before each response (default: %(default)s)')
+    args = parser.parse_args()
+
+    mock = MockNexus(load_spec(args.spec), args.page_size, args.pages, args.latency)
+    server = serve(mock, args.host, args.port)
+    # on a line of its own, and flushed, for whoever started this to read
+    print(f'Mocking {len(mock.routes)} operations at http://{args.host}:{server.server_address[1]}{mock.base_path}',
+          flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    print(f'Served {mock.requests} requests')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,315 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Benchmark (and regression check) for the `update-spec.py` pipeline.
+
+Each payload - a Swagger 2.0 document recorded from an NXRM server, or reconstructed from a version of our own
+`spec/openapi.yaml` - is served by a local stand-in for NXRM, which also stands in for converter.swagger.io by
+answering with a pre-converted fixture. The pipeline is then run phase by phase:
+
+    fetch -> convert (local) -> convert (remote stand-in) -> patch (each group) -> serialize (yaml, json, compact)
+
+reporting the best wall time over `--repeat` runs and the peak memory (tracemalloc, measured on a separate run) of
+each phase. Patches that fail on a payload are reported and fail the run.
+
+    python benchmarks/spec_pipeline.py                              # committed spec only
+    python benchmarks/spec_pipeline.py --git-rev v3.85.0 --git-rev HEAD~10
+    python benchmarks/spec_pipeline.py --record http://localhost:8081  # save a live server's payload
+    python benchmarks/spec_pipeline.py --save-baseline baseline.json
+    python benchmarks/spec_pipeline.py --baseline baseline.json --threshold 0.25
+"""
+import argparse
+import gzip
+import io
+import json
+import os
+import os.path
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Iterator
+
+import requests
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.swagger_fixture import reconstruct_swagger  # noqa: E402
+from nxrm_spec.convert import convert_swagger  # noqa: E402
+from nxrm_spec.patch_table import GENERATORS, PATCH_TABLE  # noqa: E402
+from nxrm_spec.patches import PatchEngine, PatchReport  # noqa: E402
+from nxrm_spec.serialize import FORMATS, load_spec, serialize  # noqa: E402
+
+PAYLOAD_DIR = os.path.join(BENCHMARKS_DIR, 'payloads')
+SPEC_PATH = '/service/rest/swagger.json'
+CONVERTER_PATH = '/api/convert'
+
+# Phases compared against a baseline - individual patch groups take well under a millisecond, too little to compare
+# reliably on their own, so they are compared as their total
+COMPARED_PHASES = ('fetch', 'convert', 'convert-remote', 'patch', 'serialize:yaml', 'serialize:json',
+                   'serialize:compact')
+
+
+class Payload:
+
+    def __init__(self, name: str, swagger: dict[str, Any]) -> None:
+        self.name = name
+        self.swagger = swagger
+        self.version = swagger.get('info', {}).get('version', '0.0.0')
+        self.body = json.dumps(swagger).encode('utf-8')
+        # The remote converter fixture - what converter.swagger.io would have answered
+        self.converted = json.dumps(convert_swagger(swagger)).encode('utf-8')
+
+
+def recorded_payloads(directory: str) -> Iterator[Payload]:
+    if not os.path.isdir(directory):
+        return
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name.endswith('.swagger.json.gz'):
+            with gzip.open(path, 'rt') as f:
+                yield Payload(name.removesuffix('.swagger.json.gz'), json.load(f))
+        elif name.endswith('.swagger.json'):
+            with open(path, 'r') as f:
+                yield Payload(name.removesuffix('.swagger.json'), json.load(f))
+
+
+def reconstructed_payload(git_rev: str | None = None) -> Payload:
+    if git_rev is None:
+        spec = load_spec(os.path.join(ROOT_DIR, 'spec', 'openapi.yaml'))
+    else:
+        import yaml
+        content = subprocess.run(['git', 'show', f'{git_rev}:spec/openapi.yaml'], cwd=ROOT_DIR, check=True,
+                                 capture_output=True, text=True).stdout
+        spec = yaml.load(content, Loader=getattr(yaml, 'CLoader', yaml.Loader))
+    return Payload(f'reconstructed@{git_rev or "working-tree"}', reconstruct_swagger(spec))
+
+
+def record(server_url: str, directory: str) -> str:
+    response = requests.get(f'{server_url}{SPEC_PATH}')
+    response.raise_for_status()
+    version = response.headers.get('Server', 'Nexus/unknown').split('/')[1].split(' ')[0]
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'{version}.swagger.json.gz')
+    with gzip.open(path, 'wt') as f:
+        json.dump(response.json(), f)
+    return path
+
+
+@contextmanager
+def stand_in_server(payload: Payload) -> Iterator[str]:
+    """A local stand-in for NXRM (serving the payload) and converter.swagger.io (serving the converted fixture)."""
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def _send(self, body: bytes, headers: dict[str, str] | None = None) -> None:
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            if self.path != SPEC_PATH:
+                self.send_error(404)
+                return
+            self._send(payload.body, {'Server': f'Nexus/{payload.version} (COMMUNITY)'})
+
+        def do_POST(self) -> None:
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if self.path != CONVERTER_PATH:
+                self.send_error(404)
+                return
+            self._send(payload.converted)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}'
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class Recorder:
+    """Collects wall time, and optionally the peak memory allocated on top of what was already held, per phase."""
+
+    def __init__(self, trace_memory: bool) -> None:
+        self.trace_memory = trace_memory
+        self.times: dict[str, float] = {}
+        self.peaks: dict[str, int] = {}
+
+    def run(self, phase: str, fn: Callable[[], Any]) -> Any:
+        held = 0
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            held = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        result = fn()
+        self.times[phase] = self.times.get(phase, 0.0) + time.perf_counter() - start
+        if self.trace_memory:
+            self.peaks[phase] = max(self.peaks.get(phase, 0), tracemalloc.get_traced_memory()[1] - held)
+        return result
+
+
+def run_pipeline(base_url: str, recorder: Recorder) -> PatchReport:
+    session = requests.Session()
+    swagger = recorder.run('fetch', lambda: session.get(f'{base_url}{SPEC_PATH}').json())
+    spec = recorder.run('convert', lambda: convert_swagger(swagger))
+    recorder.run('convert-remote', lambda: session.post(f'{base_url}{CONVERTER_PATH}', json=swagger).json())
+    spec['info'] = {'title': 'Sonatype Nexus Repository Manager', 'version': swagger['info'].get('version', '')}
+
+    engine = PatchEngine(spec, GENERATORS)
+    report = PatchReport()
+    patch_start = time.perf_counter()
+    for group in PATCH_TABLE:
+        recorder.run(f'patch:{group["description"]}', lambda: engine.apply_group(group, report))
+    recorder.times['patch'] = recorder.times.get('patch', 0.0) + time.perf_counter() - patch_start
+    if recorder.trace_memory:
+        recorder.peaks['patch'] = max(v for k, v in recorder.peaks.items() if k.startswith('patch:'))
+
+    for output_format in FORMATS:
+        recorder.run(f'serialize:{output_format}', lambda: serialize(spec, output_format))
+    return report
+
+
+def benchmark(payload: Payload, repeat: int) -> dict[str, Any]:
+    with stand_in_server(payload) as base_url:
+        best: dict[str, float] = {}
+        for _ in range(repeat):
+            recorder = Recorder(trace_memory=False)
+            report = run_pipeline(base_url, recorder)
+            for phase, seconds in recorder.times.items():
+                best[phase] = min(best.get(phase, seconds), seconds)
+
+        # Memory is measured on its own run - tracing slows everything down
+        recorder = Recorder(trace_memory=True)
+        tracemalloc.start()
+        try:
+            run_pipeline(base_url, recorder)
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'payload': payload.name,
+        'version': payload.version,
+        'size_bytes': len(payload.body),
+        'phases': {phase: {'seconds': best[phase], 'peak_bytes': recorder.peaks.get(phase)} for phase in best},
+        'total_seconds': sum(best[p] for p in best if not p.startswith('patch:')),
+        'patches': {'applied': len(report.applied), 'no-op': len(report.no_ops), 'failed': len(report.failed)},
+        'failed_patches': [r.to_dict() for r in report.failed],
+    }
+
+
+def print_result(result: dict[str, Any], verbose: bool) -> None:
+    print(f'{result["payload"]} (NXRM {result["version"]}, {result["size_bytes"] / 1024:.0f} KiB): '
+          f'{result["total_seconds"] * 1000:.1f} ms total, patches {result["patches"]}')
+    for phase, m in result['phases'].items():
+        if phase.startswith('patch:') and not verbose:
+            continue
+        peak = f'{m["peak_bytes"] / 1024 / 1024:8.2f} MiB' if m['peak_bytes'] is not None else ' ' * 12
+        print(f'   {m["seconds"] * 1000:9.2f} ms {peak}  {phase}')
+
+
+def compare(results: list[dict[str, Any]], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """Every compared phase (and total) that is more than `threshold` slower than in `baseline`."""
+    regressions = []
+    baseline_by_payload = {r['payload']: r for r in baseline['results']}
+    for result in results:
+        base = baseline_by_payload.get(result['payload'])
+        if base is None:
+            continue
+        pairs = [('total', result['total_seconds'], base['total_seconds'])]
+        pairs += [(p, result['phases'][p]['seconds'], base['phases'][p]['seconds'])
+                  for p in COMPARED_PHASES if p in result['phases'] and p in base['phases']]
+        for phase, seconds, base_seconds in pairs:
+            if base_seconds > 0 and seconds > base_seconds * (1 + threshold):
+                regressions.append(f'{result["payload"]} {phase}: {base_seconds * 1000:.2f} ms -> '
+                                   f'{seconds * 1000:.2f} ms (+{(seconds / base_seconds - 1) * 100:.0f}%)')
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the update-spec.py pipeline phase by phase.')
+    parser.add_argument('--payload-dir', default=PAYLOAD_DIR,
+                        help='Directory of recorded `<version>.swagger.json[.gz]` payloads (default: %(default)s)')
+    parser.add_argument('--git-rev', action='append', default=[], metavar='REV',
+                        help='Also benchmark a payload reconstructed from `spec/openapi.yaml` at REV (repeatable)')
+    parser.add_argument('--no-working-tree', action='store_true',
+                        help='Do not benchmark a payload reconstructed from the working tree `spec/openapi.yaml`')
+    parser.add_argument('--record', metavar='REPO_SERVER_URL',
+                        help='Save the Swagger 2.0 payload of a live server into --payload-dir, then exit')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per payload - the best is kept (default: 5)')
+    parser.add_argument('--verbose', action='store_true', help='Show timings of each patch group')
+    parser.add_argument('--output', metavar='FILE', help='Write the results as JSON to FILE')
+    parser.add_argument('--save-baseline', metavar='FILE', help='Write the results as a baseline to FILE')
+    parser.add_argument('--baseline', metavar='FILE', help='Fail if slower than the baseline in FILE')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed slow-down against --baseline, as a fraction (default: %(default)s)')
+    args = parser.parse_args()
+
+    if args.record:
+        print(f'Recorded {record(args.record, args.payload_dir)}')
+        return 0
+
+    payloads = list(recorded_payloads(args.payload_dir))
+    if not args.no_working_tree:
+        payloads.append(reconstructed_payload())
+    payloads.extend(reconstructed_payload(rev) for rev in args.git_rev)
+    if not payloads:
+        parser.error('no payloads to benchmark')
+
+    results = []
+    for payload in payloads:
+        # The patch engine reports progress on stdout - keep ours readable
+        with redirect_stdout(io.StringIO()):
+            result = benchmark(payload, args.repeat)
+        print_result(result, args.verbose)
+        results.append(result)
+
+    document = {'python': sys.version.split()[0], 'repeat': args.repeat, 'results': results}
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(document, f, indent=2)
+
+    failed = False
+    for result in results:
+        for failure in result['failed_patches']:
+            print(f'FAILED patch on {result["payload"]}: [{failure["group"]}] {failure["op"]} {failure["target"]}: '
+                  f'{failure["reason"]}')
+            failed = True
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Reconstruct an approximation of the Swagger 2.0 document NXRM served from one of our (patched) OpenAPI 3 specs.
+
+This lets the benchmarks exercise the pipeline against every NXRM version whose spec is in our git history, not just
+the payloads that were recorded from a live server. It is close enough to produce the same shape of work (and the
+same patch outcomes, bar the things our patches had already fixed) - it is not a byte-for-byte copy of what NXRM
+served.
+"""
+import copy
+from typing import Any
+
+OAS3_REF_PREFIX = '#/components/schemas/'
+SWAGGER_REF_PREFIX = '#/definitions/'
+PARAMETER_KEYS = ('name', 'in', 'description', 'required', 'allowEmptyValue', 'example')
+
+
+def _schema(node: Any) -> Any:
+    if isinstance(node, list):
+        return [_schema(n) for n in node]
+    if not isinstance(node, dict):
+        return node
+    result = {}
+    for key, value in node.items():
+        if key == '$ref' and isinstance(value, str):
+            result[key] = value.replace(OAS3_REF_PREFIX, SWAGGER_REF_PREFIX)
+        elif key == 'nullable':
+            result['x-nullable'] = value
+        elif key == 'properties' and isinstance(value, dict):
+            result[key] = {name: _schema(prop) for name, prop in value.items()}
+        else:
+            result[key] = _schema(value)
+    if result.get('type') == 'string' and result.get('format') == 'binary':
+        result['type'] = 'file'
+        del result['format']
+    return result
+
+
+def _parameters(operation: dict[str, Any]) -> list[dict[str, Any]]:
+    parameters = []
+    for parameter in operation.get('parameters', []):
+        p = {k: parameter[k] for k in PARAMETER_KEYS if k in parameter}
+        p.update(_schema(parameter.get('schema', {})))
+        if p.get('type') == 'array':
+            p['collectionFormat'] = 'multi'
+        parameters.append(p)
+    request_body = operation.get('requestBody')
+    if request_body and request_body.get('content'):
+        media_type, media = next(iter(request_body['content'].items()))
+        if media_type in ('multipart/form-data', 'application/x-www-form-urlencoded'):
+            for name, prop in media.get('schema', {}).get('properties', {}).items():
+                parameters.append({'name': name, 'in': 'formData', **_schema(prop)})
+        else:
+            body = {'name': 'body', 'in': 'body', 'schema': _schema(media.get('schema', {}))}
+            if 'description' in request_body:
+                body['description'] = request_body['description']
+            if request_body.get('required'):
+                body['required'] = True
+            parameters.append(body)
+    return parameters
+
+
+def reconstruct_swagger(spec: dict[str, Any]) -> dict[str, Any]:
+    swagger: dict[str, Any] = {
+        'swagger': '2.0',
+        'info': {'version': spec.get('info', {}).get('version', ''), 'title': 'Nexus Repository Manager REST API'},
+        'basePath': '/service/rest',
+        'tags': copy.deepcopy(spec.get('tags', [])),
+        'paths': {},
+        'definitions': {name: _schema(s) for name, s in spec.get('components', {}).get('schemas', {}).items()},
+    }
+    for path, path_item in spec.get('paths', {}).items():
+        swagger['paths'][path] = {}
+        for method, operation in path_item.items():
+            op = {k: copy.deepcopy(v) for k, v in operation.items()
+                  if k not in ('parameters', 'requestBody', 'responses')}
+            parameters = _parameters(operation)
+            if parameters:
+                op['parameters'] = parameters
+            if operation.get('requestBody', {}).get('content'):
+                op['consumes'] = list(operation['requestBody']['content'])
+            produces = set()
+            op['responses'] = {}
+            for code, response in operation.get('responses', {}).items():
+                r = {'description': response.get('description', '')}
+                if response.get('content'):
+                    produces.update(response['content'])
+                    r['schema'] = _schema(next(iter(response['content'].values())).get('schema', {}))
+                op['responses'][code] = r
+            if produces:
+                op['produces'] = sorted(produces)
+            swagger['paths'][path][method] = op
+    return swagger
@@ -0,0 +1,24 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Hand-written additions to the generated client, maintained in sonatype-nexus-community/nexus-repo-api-client.
+
+    client      - `NexusApiClient`, an `ApiClient` with a configurable connection pool and per-host limit, and `raw`
+                  responses
+    operations  - every operation in the spec, by operationId, and the generated method that calls it
+    pagination  - lazy, optionally prefetching `async for` over `continuationToken` paged operations
+    paginators  - a `paginate_...()` helper per paged operation (generated from the spec)
+    raw         - responses decoded to plain dicts, or to lazily validated `View`s, rather than models
+"""
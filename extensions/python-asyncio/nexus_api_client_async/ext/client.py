@@ -0,0 +1,85 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""An `ApiClient` whose connection pool can be sized as a whole and per host (and whose responses can be `raw`).
+
+    async with NexusApiClient(configuration, pool_size=1000, limit_per_host=200) as api_client:
+        assets = await asyncio.gather(*(AssetsApi(api_client).get_assets(i) for i in ids))
+
+Requests beyond either limit wait for a connection to be released, so thousands of coroutines can share one client
+without overwhelming NXRM.
+"""
+from typing import Dict, Optional
+
+import aiohttp
+
+from nexus_api_client_async.api_client import ApiClient
+from nexus_api_client_async.api_response import ApiResponse
+from nexus_api_client_async.configuration import Configuration
+from nexus_api_client_async.rest import RESTClientObject, RESTResponse
+
+from .raw import check_raw, decode, is_model_response
+
+
+class PooledRESTClientObject(RESTClientObject):
+
+    def __init__(self, configuration: Configuration, pool_size: Optional[int] = None, limit_per_host: int = 0,
+                 keepalive_timeout: Optional[float] = None) -> None:
+        super().__init__(configuration)
+        if pool_size is not None:
+            # 0 means no limit, as for aiohttp
+            self.maxsize = pool_size
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+
+    async def request(self, *args, **kwargs):
+        if self.pool_manager is None:
+            connector_args = {}
+            if self.keepalive_timeout is not None:
+                connector_args['keepalive_timeout'] = self.keepalive_timeout
+            self.pool_manager = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.maxsize, limit_per_host=self.limit_per_host,
+                                               ssl=self.ssl_context, **connector_args),
+                trust_env=True,
+            )
+        return await super().request(*args, **kwargs)
+
+
+class NexusApiClient(ApiClient):
+    """`ApiClient` with a connection pool of `pool_size` connections in total (default:
+    `configuration.connection_pool_maxsize`) and at most `limit_per_host` to any one host (default: no limit).
+
+    When `raw` is `'dict'` or `'view'`, responses are decoded as `raw.call_raw()` would rather than deserialized to
+    models - for every operation that returns one of the models. Errors are unaffected.
+    """
+
+    def __init__(self, configuration: Optional[Configuration] = None, header_name: Optional[str] = None,
+                 header_value: Optional[str] = None, cookie: Optional[str] = None, *, pool_size: Optional[int] = None,
+                 limit_per_host: int = 0, keepalive_timeout: Optional[float] = None,
+                 raw: Optional[str] = None) -> None:
+        super().__init__(configuration, header_name, header_value, cookie)
+        self.rest_client = PooledRESTClientObject(self.configuration, pool_size, limit_per_host, keepalive_timeout)
+        self.raw = check_raw(raw)
+
+    def response_deserialize(self, response_data: RESTResponse,
+                             response_types_map: Optional[Dict[str, Optional[str]]] = None) -> ApiResponse:
+        status = response_data.status
+        response_type = (response_types_map or {}).get(str(status))
+        if response_type is None and isinstance(status, int) and 100 <= status <= 599:
+            response_type = (response_types_map or {}).get(f'{str(status)[0]}XX')
+        if self.raw is None or not 200 <= status <= 299 or not is_model_response(response_type):
+            return super().response_deserialize(response_data, response_types_map)
+        return ApiResponse(status_code=status, data=decode(response_data.data, response_type, self.raw),
+                           headers=response_data.getheaders(), raw_data=response_data.data)
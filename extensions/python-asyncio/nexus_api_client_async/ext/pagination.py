@@ -0,0 +1,144 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Iterate over everything a `continuationToken` paged operation returns, a page at a time.
+
+    async for asset in paginate_list_assets(api_client, repository='maven-releases', prefetch=2):
+        ...
+
+With `prefetch` > 0 a task requests the next page(s) while the current one is being consumed, keeping up to `prefetch`
+pages buffered. Stopping early (`break`) leaves that task to be cancelled when the iterator is garbage collected - call
+`aclose()` on the iterator to cancel it straight away.
+"""
+import asyncio
+from collections.abc import Mapping
+from contextlib import suppress
+from functools import partial
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, Generic, Optional, TypeVar
+
+from .operations import Pagination, get_operation
+from .raw import call_raw, check_raw
+
+T = TypeVar('T')
+
+
+def _field(page: Any, attribute: str, key: str) -> Any:
+    if isinstance(page, Mapping):
+        return page.get(key)
+    return getattr(page, attribute, None)
+
+
+class _Done:
+    pass
+
+
+class _Failed:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class AsyncPaginator(Generic[T]):
+    """Lazily iterates (`async for`) the items of every page, following `continuationToken` until the server stops
+    returning one.
+
+    Nothing is requested until iteration starts; each iteration walks from the first page again. Errors from any page
+    are raised from the iteration, in page order.
+    """
+
+    def __init__(self, fetch: Callable[[Optional[str]], Awaitable[Any]], pagination: Pagination, prefetch: int = 0,
+                 continuation_token: Optional[str] = None) -> None:
+        if prefetch < 0:
+            raise ValueError('prefetch must be >= 0')
+        self._fetch = fetch
+        self._pagination = pagination
+        self.prefetch = prefetch
+        self.continuation_token = continuation_token
+
+    async def __aiter__(self) -> AsyncIterator[T]:
+        pages = self.pages()
+        try:
+            async for page in pages:
+                for item in self.items(page):
+                    yield item
+        finally:
+            await pages.aclose()
+
+    def items(self, page: Any) -> list:
+        return _field(page, self._pagination.items_attribute, self._pagination.items_key) or []
+
+    def next_token(self, page: Any) -> Optional[str]:
+        return _field(page, self._pagination.token_attribute, self._pagination.token_key) or None
+
+    def pages(self) -> AsyncGenerator[Any, None]:
+        """The pages themselves (models, or whatever the client deserializes responses to)."""
+        if self.prefetch:
+            return self._prefetched_pages()
+        return self._pages()
+
+    async def _pages(self) -> AsyncGenerator[Any, None]:
+        token = self.continuation_token
+        while True:
+            page = await self._fetch(token)
+            yield page
+            token = self.next_token(page)
+            if token is None:
+                return
+
+    async def _prefetched_pages(self) -> AsyncGenerator[Any, None]:
+        buffer: asyncio.Queue = asyncio.Queue(maxsize=self.prefetch)
+
+        async def produce() -> None:
+            try:
+                async for page in self._pages():
+                    await buffer.put(page)
+            except asyncio.CancelledError:
+                raise
+            except BaseException as e:
+                await buffer.put(_Failed(e))
+                return
+            await buffer.put(_Done())
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                item = await buffer.get()
+                if isinstance(item, _Done):
+                    return
+                if isinstance(item, _Failed):
+                    raise item.error
+                yield item
+        finally:
+            producer.cancel()
+            with suppress(asyncio.CancelledError):
+                await producer
+
+
+def paginate(operation_id: str, api_client: Any = None, *, prefetch: int = 0, raw: Optional[str] = None,
+             **kwargs: Any) -> AsyncPaginator:
+    """An `AsyncPaginator` over any paged operation, called with `kwargs` (including any `continuation_token` to
+    start from). With `raw`, pages are decoded by `raw.call_raw()` rather than deserialized to models."""
+    operation = get_operation(operation_id)
+    if operation.pagination is None:
+        raise ValueError(f'{operation_id} is not paged by continuationToken')
+    if raw is None:
+        method = operation.bind(api_client)
+    else:
+        method = partial(call_raw, operation_id, api_client, raw=check_raw(raw))
+    start = kwargs.pop(operation.pagination.token_param, None)
+
+    async def fetch(token: Optional[str]) -> Any:
+        return await method(**{operation.pagination.token_param: token}, **kwargs)
+
+    return AsyncPaginator(fetch, operation.pagination, prefetch=prefetch, continuation_token=start)
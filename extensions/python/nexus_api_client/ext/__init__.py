@@ -0,0 +1,36 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Hand-written additions to the generated client, maintained in sonatype-nexus-community/nexus-repo-api-client.
+
+    cache       - a TTL / LRU cache of read-mostly responses, revalidated by ETag, invalidated by changes
+    client      - `NexusApiClient`, an `ApiClient` whose responses can be `raw`, cached, instrumented and validated,
+                  and whose requests can be retried, limited and made over shared pools
+    download    - streaming, checksum-verified, resumable downloads of many assets
+    export      - every asset or component of repositories written to NDJSON or Parquet, a page at a time
+    instrumentation - per-operation timings, statuses, retries, bytes and pool waits, for hooks and histograms
+    limiter     - an AIMD limit on the requests in flight, raised while NXRM keeps up and cut when it does not
+    operations  - every operation in the spec, by operationId, and the generated method that calls it
+    otel        - a hook reporting requests to OpenTelemetry (needs opentelemetry-api)
+    pagination  - lazy, optionally prefetching iteration over `continuationToken` paged operations
+    paginators  - a `paginate_...()` helper per paged operation (generated from the spec)
+    pools       - connection pools shared, process-wide, by every client of the same NXRM and credentials
+    provision   - make repositories match a desired state, creating and updating only those that differ
+    raw         - responses decoded to plain dicts, or to lazily validated `View`s, rather than models
+    retry       - requests made again, after a jittered backoff or `Retry-After`, when NXRM is too busy for them
+    search      - one search split into shards (by repository, or prefix) searched concurrently, results merged
+    upload      - concurrent uploads of many components, streaming their files from disk
+    validation  - NXRM's responses (live, sampled, or recorded) checked against the spec
+"""
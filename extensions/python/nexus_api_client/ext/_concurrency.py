@@ -0,0 +1,47 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Iterator, Set, TypeVar
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+def bounded_map(function: Callable[[T], R], items: Iterable[T], workers: int, name: str) -> Iterator[R]:
+    """`function(item)` for every item, on up to `workers` threads, yielding results as they complete.
+
+    Only `workers` more items are taken from `items` than are in flight, so it can be a generator over any number of
+    them. Stopping early cancels everything not yet started.
+    """
+    if workers < 1:
+        raise ValueError('workers must be >= 1')
+    pending: Set[Future] = set()
+    remaining = iter(items)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'nexus-api-client-{name}') as executor:
+        try:
+            while True:
+                for item in remaining:
+                    pending.add(executor.submit(function, item))
+                    if len(pending) >= workers * 2:
+                        break
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,53 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""For requests made beneath the generated `rest.RESTClientObject` (to stream their bodies), done as it would."""
+from typing import Any, Callable, Optional
+
+import urllib3
+
+from nexus_api_client import rest
+from nexus_api_client.api_client import ApiClient
+from nexus_api_client.exceptions import ApiException
+
+from .operations import Operation
+from .retry import call_with_retries
+
+
+def urllib3_timeout(request_timeout: Any) -> Optional[urllib3.Timeout]:
+    """The urllib3 timeout for a `_request_timeout`."""
+    if isinstance(request_timeout, (int, float)):
+        return urllib3.Timeout(total=request_timeout)
+    if isinstance(request_timeout, tuple) and len(request_timeout) == 2:
+        return urllib3.Timeout(connect=request_timeout[0], read=request_timeout[1])
+    return None
+
+
+def raise_for_status(response: urllib3.BaseHTTPResponse) -> None:
+    """Raise the `ApiException` the generated client would for an unsuccessful response."""
+    if not 200 <= response.status <= 299:
+        body = response.data.decode('utf-8', errors='replace') if response.data else None
+        raise ApiException.from_response(http_resp=response, body=body, data=None)
+
+
+def send(api_client: ApiClient, method: str, operation: Optional[Operation],
+         request: Callable[[], urllib3.BaseHTTPResponse]) -> urllib3.BaseHTTPResponse:
+    """`request()` made under the `retry` policy and `limiter` of `api_client` (if a `client.NexusApiClient` with
+    them), as requests through its `call_api()` are."""
+    retry = getattr(api_client, 'retry', None)
+    limiter = getattr(api_client, 'limiter', None)
+    if retry is None and limiter is None:
+        return request()
+    return call_with_retries(lambda number: rest.RESTResponse(request()), method, operation, retry, limiter).response
@@ -0,0 +1,197 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Cache the responses of read-mostly operations (repositories, privileges, blob stores, LDAP servers, ...).
+
+    api_client = NexusApiClient(configuration, cache=ResponseCache())
+    RepositoryManagementApi(api_client).get_maven_hosted_repository('maven-releases')    # from NXRM
+    RepositoryManagementApi(api_client).get_maven_hosted_repository('maven-releases')    # from the cache
+
+A successful GET of an operation with a TTL - the `x-cacheable` one the spec gives it, unless `ttls` has another (by
+operationId, or an `fnmatch` pattern of them such as `get*Repository`) - is kept for that many seconds, up to
+`max_entries` responses (least recently used are evicted first). Once it expires, if NXRM sent an `ETag` or
+`Last-Modified` it is revalidated with `If-None-Match` / `If-Modified-Since` - a 304 keeps it for another TTL without
+sending it again.
+
+Any other request - a create, update or delete - drops every cached response of the operations in the resource
+families (the API classes the spec's tags gave them: `RepositoryManagementApi`, `SecurityManagementPrivilegesApi`,
+...) its `x-invalidates` names, whether it succeeds or not. Changes made by other clients are only seen once a TTL runs
+out.
+"""
+import io
+import threading
+import time
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Callable, Dict, Mapping, NamedTuple, Optional, Tuple
+
+import urllib3
+
+from nexus_api_client import rest
+
+from .operations import Operation
+
+# requests whose responses are kept - every other method changes something
+CACHEABLE_METHODS = ('GET', 'HEAD')
+# the request headers a response can depend on
+VARY_HEADERS = ('Accept', 'Authorization', 'Cookie')
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    # expired responses NXRM said (304) were still current
+    revalidations: int
+    evictions: int
+    invalidations: int
+
+
+class _Entry(NamedTuple):
+    family: str
+    status: int
+    reason: str
+    headers: urllib3.HTTPHeaderDict
+    data: bytes
+    expires: float
+
+    def response(self) -> rest.RESTResponse:
+        """A response as the generated client gets from NXRM - a fresh one, so that each caller can read it."""
+        return rest.RESTResponse(urllib3.HTTPResponse(
+            body=io.BytesIO(self.data), headers=self.headers, status=self.status, reason=self.reason,
+            preload_content=False, decode_content=False
+        ))
+
+
+class ResponseCache:
+    """Responses of the operations the spec says are cacheable, or in `ttls` (operationId or pattern -> seconds, 0 for
+    never; a `default_ttl`, if given, applies to every other GET), least recently used evicted first. Thread-safe - one
+    can be shared by several clients."""
+
+    def __init__(self, ttls: Optional[Mapping[str, float]] = None, *, default_ttl: Optional[float] = None,
+                 max_entries: int = 1024, clock: Callable[[], float] = time.monotonic) -> None:
+        if max_entries < 1:
+            raise ValueError('max_entries must be >= 1')
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: 'OrderedDict[Tuple, _Entry]' = OrderedDict()
+        self._ttl_cache: Dict[str, Optional[float]] = {}
+        # bumped by each invalidation (None: of everything), so a response requested before one is not kept after it
+        self._generations: Dict[Optional[str], int] = {}
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._revalidations = self._evictions = self._invalidations = 0
+
+    def ttl(self, operation: Optional[Operation]) -> Optional[float]:
+        """Seconds to keep `operation`'s responses for, or None not to."""
+        if operation is None:
+            return None
+        if operation.operation_id not in self._ttl_cache:
+            ttl = self.ttls.get(operation.operation_id)
+            if ttl is None:
+                ttl = next((t for pattern, t in self.ttls.items() if fnmatchcase(operation.operation_id, pattern)),
+                           operation.cache_ttl if operation.cache_ttl is not None else self.default_ttl)
+            self._ttl_cache[operation.operation_id] = ttl
+        return self._ttl_cache[operation.operation_id]
+
+    def request(self, operation: Optional[Operation], method: str, url: str, headers: Mapping[str, str],
+                send: Callable[[Mapping[str, str]], rest.RESTResponse]) -> rest.RESTResponse:
+        """The response to a request - from the cache if it can be, otherwise by `send(headers)`."""
+        if method.upper() not in CACHEABLE_METHODS:
+            try:
+                return send(headers)
+            finally:
+                if operation is None:
+                    self.invalidate()
+                else:
+                    self.invalidate(*(operation.invalidates or (operation.api_class,)))
+        ttl = self.ttl(operation)
+        if not ttl or ttl <= 0:
+            return send(headers)
+
+        key = (method.upper(), url, *(headers.get(h) for h in VARY_HEADERS))
+        family = operation.api_class
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if entry.expires > self._clock():
+                    self._hits += 1
+                    return entry.response()
+            generation = self._generation(family)
+
+        conditions = {}
+        if entry is not None and 'ETag' in entry.headers:
+            conditions['If-None-Match'] = entry.headers['ETag']
+        if entry is not None and 'Last-Modified' in entry.headers:
+            conditions['If-Modified-Since'] = entry.headers['Last-Modified']
+        response = send({**headers, **conditions} if conditions else headers)
+        response.read()
+        if response.status == 304 and conditions:
+            entry = entry._replace(expires=self._clock() + ttl)
+            self._store(key, entry, generation, revalidated=True)
+            return entry.response()
+        if 200 <= response.status <= 299:
+            entry = _Entry(family, response.status, response.reason, urllib3.HTTPHeaderDict(response.getheaders()),
+                           response.data, self._clock() + ttl)
+            self._store(key, entry, generation)
+        else:
+            with self._lock:
+                self._misses += 1
+        return response
+
+    def _generation(self, family: str) -> Tuple[int, int]:
+        return self._generations.get(None, 0), self._generations.get(family, 0)
+
+    def _store(self, key: Tuple, entry: _Entry, generation: Tuple[int, int], revalidated: bool = False) -> None:
+        with self._lock:
+            if revalidated:
+                self._revalidations += 1
+            else:
+                self._misses += 1
+            if self._generation(entry.family) != generation:
+                # invalidated while it was being requested
+                self._entries.pop(key, None)
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, *families: str) -> None:
+        """Drop the responses of every operation in `families` (API class names) - or, with none, all of them."""
+        with self._lock:
+            if not families:
+                self._generations[None] = self._generations.get(None, 0) + 1
+                self._invalidations += len(self._entries)
+                self._entries.clear()
+                return
+            for family in families:
+                self._generations[family] = self._generations.get(family, 0) + 1
+            stale = [key for key, entry in self._entries.items() if entry.family in families]
+            for key in stale:
+                del self._entries[key]
+            self._invalidations += len(stale)
+
+    def clear(self) -> None:
+        self.invalidate()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._revalidations, self._evictions, self._invalidations)
+
+    def __len__(self) -> int:
+        return len(self._entries)
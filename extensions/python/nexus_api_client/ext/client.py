@@ -0,0 +1,132 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""An `ApiClient` with the extensions' options for every call made through it.
+
+    api_client = NexusApiClient(configuration, raw='view', cache=ResponseCache(), hooks=[HistogramCollector()],
+                                retry=RetryPolicy(), limiter=AdaptiveLimiter(), validator=ResponseValidator(0.01),
+                                pools=SHARED_POOLS)
+    page = AssetsApi(api_client).list_assets(repository='maven-releases')    # a `View` of a PageAssetXO
+
+A client can be shared by any number of threads - making a request changes nothing on the client, urllib3's pools are
+thread-safe, and the cache, hooks, limiters and validators here lock whatever they share. What must not happen while
+requests are in flight is changing the client itself (`set_default_header()`, `user_agent`, `add_hook()`, ...).
+"""
+from typing import Dict, Iterable, List, Mapping, Optional
+from urllib.parse import urlsplit
+
+from nexus_api_client import rest
+from nexus_api_client.api_client import ApiClient
+from nexus_api_client.api_response import ApiResponse
+from nexus_api_client.configuration import Configuration
+
+from .cache import ResponseCache
+from .instrumentation import Hook, instrumented_call, time_pool_waits
+from .limiter import AdaptiveLimiter
+from .operations import Operation, find_operation
+from .pools import PoolRegistry
+from .raw import check_raw, decode, is_model_response
+from .retry import RetryPolicy, call_with_retries, leave_retries_to_policy
+from .validation import ResponseValidator
+
+
+class NexusApiClient(ApiClient):
+    """`ApiClient` whose responses, when `raw` is `'dict'` or `'view'`, are decoded as `raw.call_raw()` would rather
+    than deserialized to models - for every operation that returns one of the models. Errors are unaffected.
+
+    With a `cache` (see `cache`), the responses of read-mostly operations are reused until they expire or something
+    changes them through this client. Each of the `hooks` (see `instrumentation`) is told about every request made to
+    NXRM - not those answered from the cache. With a `retry` policy (see `retry`), requests NXRM is too busy for are
+    made again; with a `limiter` (see `limiter`), no more are in flight than it keeps up with. With a `validator` (see
+    `validation`), the responses NXRM sends are checked against the spec. With `pools` (see `pools`), connections are
+    those of every other client of the registry with the same NXRM, credentials and connection settings.
+    """
+
+    def __init__(self, configuration: Optional[Configuration] = None, header_name: Optional[str] = None,
+                 header_value: Optional[str] = None, cookie: Optional[str] = None, *,
+                 raw: Optional[str] = None, cache: Optional[ResponseCache] = None,
+                 hooks: Iterable[Hook] = (), retry: Optional[RetryPolicy] = None,
+                 limiter: Optional[AdaptiveLimiter] = None, validator: Optional[ResponseValidator] = None,
+                 pools: Optional[PoolRegistry] = None) -> None:
+        super().__init__(configuration, header_name, header_value, cookie)
+        self.raw = check_raw(raw)
+        self.cache = cache
+        self.retry = retry
+        self.pools = pools
+        if pools is not None:
+            # its pools already time their waits, and leave Retry-Afters to a policy if asked to
+            self.rest_client.pool_manager = pools.pool_manager(self.configuration, respect_retry_after=retry is None)
+        elif retry is not None:
+            leave_retries_to_policy(self.rest_client.pool_manager)
+        self.limiter = limiter
+        self.validator = validator
+        self.hooks: List[Hook] = []
+        for hook in hooks:
+            self.add_hook(hook)
+
+    def add_hook(self, hook: Hook) -> None:
+        if not self.hooks and self.pools is None:
+            time_pool_waits(self.rest_client.pool_manager)
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: Hook) -> None:
+        self.hooks.remove(hook)
+
+    def operation(self, method: str, url: str) -> Optional[Operation]:
+        """The operation a request made through this client is for."""
+        path = urlsplit(url).path
+        base_path = urlsplit(self.configuration.host).path.rstrip('/')
+        if base_path and path.startswith(base_path):
+            path = path[len(base_path):]
+        return find_operation(method, path)
+
+    def call_api(self, method: str, url: str, header_params: Optional[Mapping[str, str]] = None, body=None,
+                 post_params=None, _request_timeout=None) -> rest.RESTResponse:
+        if (self.cache is None and not self.hooks and self.retry is None and self.limiter is None
+                and self.validator is None):
+            return super().call_api(method, url, header_params, body, post_params, _request_timeout)
+        operation = self.operation(method, url)
+
+        def send(headers: Mapping[str, str]) -> rest.RESTResponse:
+            def attempt(number: int) -> rest.RESTResponse:
+                def call() -> rest.RESTResponse:
+                    return super(NexusApiClient, self).call_api(method, url, headers, body, post_params,
+                                                                _request_timeout)
+
+                if not self.hooks:
+                    return call()
+                return instrumented_call(self.hooks, operation.operation_id if operation is not None else None,
+                                         method, url, body, post_params, call, number)
+
+            if self.retry is None and self.limiter is None:
+                response = attempt(0)
+            else:
+                response = call_with_retries(attempt, method, operation, self.retry, self.limiter)
+            return response if self.validator is None else self.validator.wrap(operation, response)
+
+        if self.cache is None:
+            return send(header_params or {})
+        return self.cache.request(operation, method, url, header_params or {}, send)
+
+    def response_deserialize(self, response_data: rest.RESTResponse,
+                             response_types_map: Optional[Dict[str, Optional[str]]] = None) -> ApiResponse:
+        status = response_data.status
+        response_type = (response_types_map or {}).get(str(status))
+        if response_type is None and isinstance(status, int) and 100 <= status <= 599:
+            response_type = (response_types_map or {}).get(f'{str(status)[0]}XX')
+        if self.raw is None or not 200 <= status <= 299 or not is_model_response(response_type):
+            return super().response_deserialize(response_data, response_types_map)
+        return ApiResponse(status_code=status, data=decode(response_data.data, response_type, self.raw),
+                           headers=response_data.getheaders(), raw_data=response_data.data)
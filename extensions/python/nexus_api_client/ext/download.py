@@ -0,0 +1,242 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Download assets straight to disk (or any binary file-like sink), `chunk_size` bytes at a time.
+
+    for result in download_assets((AssetDownload(a, f'mirror/{a.path}') for a in paginate_list_search_assets(...)),
+                                  api_client, workers=8):
+        if not result.ok:
+            print(result.download.destination, result.error)
+
+The generated client holds a whole response in memory; here each chunk is written as it arrives and fed to a hash of
+the strongest checksum in the asset's `checksum` (sha512, sha256, sha1 or md5) - a mismatch is an error, and the file is
+not left behind. Downloads to a path go to `PATH.part` first and are renamed when complete and verified; if a
+`PATH.part` is already there, only the rest of the file is requested (`Range`).
+
+Through a `client.NexusApiClient`, downloads are under its `limiter` (until the response's headers arrive, as any
+other request is) and made again as its `retry` policy says.
+
+The client's credentials (and its cookie and default headers) are only sent with a `downloadUrl` of the NXRM it is
+configured for - the same scheme, host and port as its `host`. NXRM builds the URL from its base URL setting, which
+can point somewhere else (a CDN, a proxy in front of it); a download from there is made without them.
+"""
+import hashlib
+import os
+import time
+from collections.abc import Mapping
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+
+import urllib3
+
+from nexus_api_client.api_client import ApiClient
+
+from ._concurrency import bounded_map
+from ._http import raise_for_status, send, urllib3_timeout
+from .operations import get_operation
+
+SEARCH_AND_DOWNLOAD = 'listSearchAssetsDownload'
+# strongest first
+CHECKSUM_ALGORITHMS = ('sha512', 'sha256', 'sha1', 'md5')
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+PARTIAL_SUFFIX = '.part'
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+Destination = Union[str, 'os.PathLike[str]', BinaryIO]
+
+
+class ChecksumMismatch(Exception):
+
+    def __init__(self, algorithm: str, expected: str, actual: str) -> None:
+        super().__init__(f'{algorithm} of the downloaded content is {actual}, expected {expected}')
+        self.algorithm = algorithm
+        self.expected = expected
+        self.actual = actual
+
+
+class AssetDownload(NamedTuple):
+    """An asset (an `AssetXO`, or its JSON as a dict) and where to write it."""
+    asset: Any
+    destination: Destination
+
+
+class DownloadResult(NamedTuple):
+    download: AssetDownload
+    # HTTP status, if NXRM responded
+    status: Optional[int]
+    # bytes written - including any resumed from
+    size: int
+    resumed_from: int
+    elapsed: float
+    # the checksum that was verified, if the asset had one we know
+    algorithm: Optional[str] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _field(asset: Any, attribute: str, key: str) -> Any:
+    if isinstance(asset, Mapping):
+        return asset.get(key)
+    return getattr(asset, attribute, None)
+
+
+def expected_checksum(checksum: Optional[Mapping[str, Any]]) -> Optional[Tuple[str, str]]:
+    """The strongest `(algorithm, hex digest)` in an asset's `checksum`, if any."""
+    for algorithm in CHECKSUM_ALGORITHMS:
+        if checksum and checksum.get(algorithm):
+            return algorithm, str(checksum[algorithm]).lower()
+    return None
+
+
+class _Verifier:
+
+    def __init__(self, checksum: Optional[Mapping[str, Any]]) -> None:
+        expected = expected_checksum(checksum)
+        self.algorithm, self.expected = expected if expected else (None, None)
+        self._hash = hashlib.new(self.algorithm) if self.algorithm else None
+
+    def update(self, chunk: Any) -> None:
+        if self._hash is not None:
+            self._hash.update(chunk)
+
+    def verify(self) -> None:
+        if self._hash is not None and self._hash.hexdigest() != self.expected:
+            raise ChecksumMismatch(self.algorithm, self.expected, self._hash.hexdigest())
+
+
+def _copy(response: urllib3.BaseHTTPResponse, sink: BinaryIO, verifier: _Verifier, chunk_size: int) -> int:
+    written = 0
+    for chunk in response.stream(chunk_size):
+        verifier.update(chunk)
+        sink.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def _download(open_response: Callable[[Dict[str, str]], urllib3.BaseHTTPResponse], destination: Destination,
+              checksum: Optional[Mapping[str, Any]], chunk_size: int, resume: bool) -> Tuple[int, int, int, _Verifier]:
+    """(status, size, resumed from, verifier) - `open_response(headers)` makes the request."""
+    verifier = _Verifier(checksum)
+    if not isinstance(destination, (str, os.PathLike)):
+        response = open_response({})
+        try:
+            raise_for_status(response)
+            size = _copy(response, destination, verifier, chunk_size)
+        finally:
+            response.release_conn()
+        verifier.verify()
+        return response.status, size, 0, verifier
+
+    path = os.fspath(destination)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    partial = path + PARTIAL_SUFFIX
+    offset = os.path.getsize(partial) if resume and os.path.exists(partial) else 0
+    response = open_response({'Range': f'bytes={offset}-'} if offset else {})
+    try:
+        if offset and response.status == 416:
+            # nothing after what we have - it is not the file we were downloading, so start again
+            response.release_conn()
+            offset = 0
+            response = open_response({})
+        raise_for_status(response)
+        if response.status != 206:
+            offset = 0
+        with open(partial, 'r+b' if offset else 'wb') as f:
+            while f.tell() < offset:
+                verifier.update(f.read(min(chunk_size, offset - f.tell())))
+            size = offset + _copy(response, f, verifier, chunk_size)
+    finally:
+        response.release_conn()
+    try:
+        verifier.verify()
+    except ChecksumMismatch:
+        os.remove(partial)
+        raise
+    os.replace(partial, path)
+    return response.status, size, offset, verifier
+
+
+def _origin(url: str) -> Tuple[str, str, Optional[int]]:
+    parts = urllib3.util.parse_url(url)
+    scheme = (parts.scheme or '').lower()
+    return scheme, (parts.host or '').lower(), parts.port or DEFAULT_PORTS.get(scheme)
+
+
+def same_origin(url: str, host: str) -> bool:
+    """Whether `url` has the scheme, host and port (the scheme's default, if not given) of `host`."""
+    origin = _origin(url)
+    return bool(origin[1]) and origin == _origin(host)
+
+
+def download_asset(download: AssetDownload, api_client: Optional[ApiClient] = None,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE, resume: bool = True,
+                   _request_timeout: Any = None) -> DownloadResult:
+    """Download one asset from its `downloadUrl`. Failures are returned, not raised."""
+    api_client = api_client or ApiClient.get_default()
+    started = time.monotonic()
+    url = _field(download.asset, 'download_url', 'downloadUrl')
+    authenticate = same_origin(url, api_client.configuration.host)
+
+    def open_response(headers: Dict[str, str]) -> urllib3.BaseHTTPResponse:
+        if authenticate:
+            _, _, headers, _, _ = api_client.param_serialize(
+                method='GET', resource_path='', header_params=headers,
+                auth_settings=list(api_client.configuration.auth_settings())
+            )
+        else:
+            headers = {'User-Agent': api_client.user_agent, **headers}
+        return send(api_client, 'GET', None, lambda: api_client.rest_client.pool_manager.request(
+            'GET', url, headers=headers, timeout=urllib3_timeout(_request_timeout), preload_content=False
+        ))
+
+    return _result(download, started, lambda: _download(
+        open_response, download.destination, _field(download.asset, 'checksum', 'checksum'), chunk_size, resume
+    ))
+
+
+def _result(download: AssetDownload, started: float,
+            run: Callable[[], Tuple[int, int, int, _Verifier]]) -> DownloadResult:
+    try:
+        status, size, resumed_from, verifier = run()
+        return DownloadResult(download, status, size, resumed_from, time.monotonic() - started, verifier.algorithm)
+    except Exception as e:
+        return DownloadResult(download, getattr(e, 'status', None), 0, 0, time.monotonic() - started, error=e)
+
+
+def download_assets(downloads: Iterable[AssetDownload], api_client: Optional[ApiClient] = None, *, workers: int = 4,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE, resume: bool = True,
+                    _request_timeout: Any = None) -> Iterator[DownloadResult]:
+    """Download every asset in `downloads`, up to `workers` at a time, yielding a result for each as it completes."""
+    api_client = api_client or ApiClient.get_default()
+    return bounded_map(lambda download: download_asset(download, api_client, chunk_size, resume, _request_timeout),
+                       downloads, workers, 'download')
+
+
+def download_search_asset(destination: Destination, api_client: Optional[ApiClient] = None, *,
+                          checksum: Optional[Mapping[str, str]] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                          resume: bool = True, _request_timeout: Any = None, **search: Any) -> DownloadResult:
+    """Download the one asset matching `search` (the arguments of `SearchApi.list_search_assets_download`) through
+    GET /v1/search/assets/download, verifying it against `checksum` if given."""
+    api = get_operation(SEARCH_AND_DOWNLOAD).api(api_client)
+    method = getattr(api, f'{get_operation(SEARCH_AND_DOWNLOAD).method_name}_without_preload_content')
+    download = AssetDownload({'checksum': checksum}, destination)
+
+    def open_response(headers: Dict[str, str]) -> urllib3.BaseHTTPResponse:
+        return method(_headers=headers or None, _request_timeout=_request_timeout, **search)
+
+    return _result(download, time.monotonic(), lambda: _download(open_response, destination, checksum, chunk_size,
+                                                                 resume))
@@ -0,0 +1,245 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Export every asset (or component) of repositories to NDJSON or Parquet files, a page at a time.
+
+    for result in export_assets(['maven-releases', 'npm-proxy'], 'inventory/{repository}.ndjson.gz', api_client,
+                                workers=2):
+        print(result.repository, result.records, result.error)
+
+Pages are requested as plain dicts (`raw='dict'`, so no models are built), with `prefetch` pages requested ahead, and
+each record is flattened to `columns` and written as it arrives - an export holds a page or two, and for Parquet a row
+group, in memory however large the repository. A column is a dotted path into the record's JSON (`checksum.sha1`);
+through a list it gives a list (`assets.path`, the path of each of a component's assets).
+
+Each repository is written to `destination` with `{repository}` replaced by its name, via `PATH.part` - renamed only
+once the export is complete, so a failed export never leaves a file that looks whole. Up to `workers` repositories are
+exported at a time. NDJSON (`.ndjson`, or `.ndjson.gz` to gzip it) needs nothing more; Parquet (`.parquet`) needs
+`pyarrow` (which is not a dependency of this client).
+"""
+import gzip
+import json
+import operator
+import os
+import time
+from functools import partial
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence
+
+from nexus_api_client.api_client import ApiClient
+
+from ._concurrency import bounded_map
+from .pagination import paginate
+from .raw import dumps
+
+PARTIAL_SUFFIX = '.part'
+FORMATS = ('ndjson', 'parquet')
+DEFAULT_PREFETCH = 2
+DEFAULT_ROW_GROUP_SIZE = 100_000
+
+ASSET_COLUMNS = (
+    'id', 'repository', 'format', 'path', 'contentType', 'fileSize', 'checksum.md5', 'checksum.sha1',
+    'checksum.sha256', 'checksum.sha512', 'blobStoreName', 'blobCreated', 'blobUpdated', 'lastModified',
+    'lastDownloaded', 'uploader', 'uploaderIp', 'downloadUrl',
+)
+COMPONENT_COLUMNS = (
+    'id', 'repository', 'format', 'group', 'name', 'version', 'tags', 'assets.id', 'assets.path',
+)
+# the Parquet types of the columns that are not strings - any other value in a string column is written as JSON
+PARQUET_TYPES = {
+    'fileSize': 'int64',
+    'tags': 'list<string>',
+    'assets.id': 'list<string>',
+    'assets.path': 'list<string>',
+}
+
+
+class ExportResult(NamedTuple):
+    repository: str
+    # where it was written (not written, if there is an error)
+    path: str
+    records: int
+    elapsed: float
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _value(record: Any, keys: Sequence[str]) -> Any:
+    for i, key in enumerate(keys):
+        if isinstance(record, list):
+            return [_value(item, keys[i:]) for item in record]
+        if not isinstance(record, dict):
+            return None
+        record = record.get(key)
+    return record
+
+
+def column_getter(column: str) -> Callable[[Dict[str, Any]], Any]:
+    """A function giving the value of `column` - a dotted path - in the JSON of a record."""
+    keys = column.split('.')
+    if len(keys) == 1:
+        # most columns: just a key
+        return operator.methodcaller('get', column)
+    return partial(_value, keys=keys)
+
+
+def flatten(record: Dict[str, Any], columns: Sequence[str]) -> Dict[str, Any]:
+    """The values of `columns` in the JSON of a record."""
+    return {column: column_getter(column)(record) for column in columns}
+
+
+class NdjsonWriter:
+    """Writes records as a JSON object a line - gzipped, if `compress`."""
+
+    def __init__(self, path: str, columns: Sequence[str], compress: bool = False) -> None:
+        self.columns = list(columns)
+        self.getters = [column_getter(c) for c in self.columns]
+        self._file: IO[bytes] = gzip.open(path, 'wb') if compress else open(path, 'wb')
+
+    def write(self, records: Iterable[Dict[str, Any]]) -> int:
+        lines = [dumps({c: get(r) for c, get in zip(self.columns, self.getters)}) for r in records]
+        if lines:
+            self._file.write(b'\n'.join(lines) + b'\n')
+        return len(lines)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetWriter:
+    """Writes records as Parquet, in row groups of `row_group_size`."""
+
+    def __init__(self, path: str, columns: Sequence[str], types: Optional[Mapping[str, str]] = None,
+                 row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError('exporting to Parquet needs pyarrow: pip install pyarrow') from e
+        types = PARQUET_TYPES if types is None else types
+        self.columns = list(columns)
+        self.getters = [column_getter(c) for c in self.columns]
+        self._types = [types.get(c, 'string') for c in self.columns]
+        arrow_types = {'string': pyarrow.string(), 'int64': pyarrow.int64(),
+                       'list<string>': pyarrow.list_(pyarrow.string())}
+        self._schema = pyarrow.schema([(c, arrow_types[t]) for c, t in zip(self.columns, self._types)])
+        self._pyarrow = pyarrow
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+        self.row_group_size = row_group_size
+        self._rows: List[List[Any]] = [[] for _ in self.columns]
+        self._buffered = 0
+
+    @staticmethod
+    def _convert(value: Any, kind: str) -> Any:
+        if value is None or kind == 'int64':
+            return value
+        if kind == 'list<string>':
+            return [v if isinstance(v, str) or v is None else json.dumps(v) for v in value] \
+                if isinstance(value, list) else None
+        return value if isinstance(value, str) else json.dumps(value)
+
+    def write(self, records: Iterable[Dict[str, Any]]) -> int:
+        written = 0
+        for record in records:
+            for rows, get, kind in zip(self._rows, self.getters, self._types):
+                rows.append(self._convert(get(record), kind))
+            written += 1
+            self._buffered += 1
+            if self._buffered >= self.row_group_size:
+                self._flush()
+        return written
+
+    def _flush(self) -> None:
+        if self._buffered:
+            self._writer.write_table(self._pyarrow.Table.from_arrays(
+                [self._pyarrow.array(rows, type=field.type) for rows, field in zip(self._rows, self._schema)],
+                schema=self._schema
+            ))
+            self._rows = [[] for _ in self.columns]
+            self._buffered = 0
+
+    def close(self) -> None:
+        try:
+            self._flush()
+        finally:
+            self._writer.close()
+
+
+def format_of(path: str) -> str:
+    """The format a path's extension says: `parquet` for `.parquet`, otherwise `ndjson`."""
+    return 'parquet' if path.endswith('.parquet') else 'ndjson'
+
+
+def export_repository(operation_id: str, repository: str, path: str, api_client: Optional[ApiClient] = None, *,
+                      columns: Sequence[str], format: Optional[str] = None, prefetch: int = DEFAULT_PREFETCH,
+                      row_group_size: int = DEFAULT_ROW_GROUP_SIZE, **kwargs: Any) -> ExportResult:
+    """Export every item of a paged operation (`listAssets`, `listComponents`, `listSearch`, ...) for one repository
+    to `path`. Failures are returned, not raised."""
+    started = time.monotonic()
+    format = format or format_of(path)
+    if format not in FORMATS:
+        raise ValueError(f'format must be one of {", ".join(FORMATS)}, not {format!r}')
+    records = 0
+    part_path = path + PARTIAL_SUFFIX
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        writer = ParquetWriter(part_path, columns, row_group_size=row_group_size) if format == 'parquet' \
+            else NdjsonWriter(part_path, columns, compress=path.endswith('.gz'))
+        try:
+            paginator = paginate(operation_id, api_client, prefetch=prefetch, raw='dict', repository=repository,
+                                 **kwargs)
+            for page in paginator.pages():
+                records += writer.write(paginator.items(page))
+        finally:
+            writer.close()
+        os.replace(part_path, path)
+        return ExportResult(repository, path, records, time.monotonic() - started)
+    except Exception as e:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        return ExportResult(repository, path, records, time.monotonic() - started, e)
+
+
+def export_repositories(operation_id: str, repositories: Iterable[str], destination: str,
+                        api_client: Optional[ApiClient] = None, *, columns: Sequence[str], workers: int = 1,
+                        **kwargs: Any) -> Iterator[ExportResult]:
+    """`export_repository()` for each of `repositories`, up to `workers` at a time, to `destination` with
+    `{repository}` replaced by its name - yielding a result for each as it completes."""
+    repositories = list(repositories)
+    if '{repository}' not in destination and len(repositories) > 1:
+        raise ValueError('destination must have a {repository} placeholder to export more than one repository')
+    api_client = api_client or ApiClient.get_default()
+    return bounded_map(
+        lambda r: export_repository(operation_id, r, destination.replace('{repository}', r), api_client,
+                                    columns=columns, **kwargs),
+        repositories, workers, 'export'
+    )
+
+
+def export_assets(repositories: Iterable[str], destination: str, api_client: Optional[ApiClient] = None, *,
+                  columns: Sequence[str] = ASSET_COLUMNS, workers: int = 1, **kwargs: Any) -> Iterator[ExportResult]:
+    """Export every asset of each of `repositories` (`GET /v1/assets`) - see `export_repositories()`."""
+    return export_repositories('listAssets', repositories, destination, api_client, columns=columns,
+                               workers=workers, **kwargs)
+
+
+def export_components(repositories: Iterable[str], destination: str, api_client: Optional[ApiClient] = None, *,
+                      columns: Sequence[str] = COMPONENT_COLUMNS, workers: int = 1,
+                      **kwargs: Any) -> Iterator[ExportResult]:
+    """Export every component of each of `repositories` (`GET /v1/components`) - see `export_repositories()`."""
+    return export_repositories('listComponents', repositories, destination, api_client, columns=columns,
+                               workers=workers, **kwargs)
@@ -0,0 +1,263 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""What each request to NXRM cost, by operationId - for hooks registered on `ext.client.NexusApiClient`.
+
+    metrics = HistogramCollector()
+    api_client = NexusApiClient(configuration, hooks=[metrics])
+    ...
+    for operation_id, stats in sorted(metrics.snapshot().items()):
+        print(operation_id, stats.count, stats.percentile(0.95), stats.bytes_received)
+
+A hook is any callable taking a `RequestEvent`; it is called (on the thread that made the request) once the response
+body has been read - or, if it never is, once the response is done with. With no hooks a client does nothing more
+than the generated one.
+"""
+import bisect
+import json
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+
+from nexus_api_client import rest
+
+# seconds - upper bounds of the histogram buckets (the last is everything slower)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class RequestEvent(NamedTuple):
+    # None if the request did not match an operation in the spec
+    operation_id: Optional[str]
+    method: str
+    url: str
+    # HTTP status, if NXRM responded
+    status: Optional[int]
+    # wall clock (time.time()) when the request was made
+    started: float
+    # seconds until the response's headers arrived, and until its body had been read
+    headers_elapsed: float
+    elapsed: float
+    # seconds waiting for a connection from the pool
+    pool_wait: float
+    # requests made again after the first (by urllib3, for connection errors and redirects, or by the client)
+    retries: int
+    bytes_sent: int
+    # None if the body was never read, and NXRM did not say how long it was
+    bytes_received: Optional[int]
+    error: Optional[BaseException] = None
+
+
+Hook = Callable[[RequestEvent], Any]
+
+_pool_waits = threading.local()
+
+
+def _timed_get_conn(get_conn: Callable) -> Callable:
+    def _get_conn(self, timeout: Optional[float] = None):
+        started = time.perf_counter()
+        try:
+            return get_conn(self, timeout)
+        finally:
+            _pool_waits.seconds = getattr(_pool_waits, 'seconds', 0.0) + time.perf_counter() - started
+
+    return _get_conn
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    _get_conn = _timed_get_conn(HTTPConnectionPool._get_conn)
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    _get_conn = _timed_get_conn(HTTPSConnectionPool._get_conn)
+
+
+def time_pool_waits(pool_manager: Any) -> None:
+    """Have the pools `pool_manager` creates from now on time how long each request waits for a connection."""
+    pool_manager.pool_classes_by_scheme = {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
+
+
+def _pool_wait() -> float:
+    seconds = getattr(_pool_waits, 'seconds', 0.0)
+    _pool_waits.seconds = 0.0
+    return seconds
+
+
+def request_size(body: Any, post_params: Any = None) -> int:
+    """Bytes in a request body, as the generated `rest.RESTClientObject` would send it (near enough, for forms)."""
+    if body is None:
+        size = 0
+    elif isinstance(body, (bytes, bytearray)):
+        size = len(body)
+    elif isinstance(body, str):
+        size = len(body.encode('utf-8'))
+    elif isinstance(body, (Mapping, list, tuple, bool, int, float)):
+        size = len(json.dumps(body).encode('utf-8'))
+    else:
+        size = len(body) if hasattr(body, '__len__') else 0
+    for _, value in post_params or ():
+        value = value[1] if isinstance(value, tuple) else value
+        size += len(value) if isinstance(value, (bytes, bytearray, str)) else 0
+    return size
+
+
+class InstrumentedResponse(rest.RESTResponse):
+    """A `rest.RESTResponse` that reports its `RequestEvent` once its body is read (or it is closed unread)."""
+
+    def __init__(self, resp: Any, event: RequestEvent, started: float, hooks: Sequence[Hook]) -> None:
+        super().__init__(resp)
+        self._event: Optional[RequestEvent] = event
+        self._started = started
+        self._hooks = hooks
+
+    def _report(self, bytes_received: Optional[int]) -> None:
+        event, self._event = self._event, None
+        if event is not None:
+            emit(self._hooks, event._replace(elapsed=time.perf_counter() - self._started,
+                                             bytes_received=bytes_received))
+
+    def read(self):
+        if self.data is None:
+            self.data = self.response.data
+            self._report(len(self.data))
+        return self.data
+
+    def close(self) -> None:
+        # e.g. by garbage collection, when a `..._without_preload_content` caller has the urllib3 response itself
+        if getattr(self, '_event', None) is not None:
+            length = self.getheader('Content-Length')
+            self._report(int(length) if length and length.isdigit() else None)
+        super().close()
+
+
+def emit(hooks: Sequence[Hook], event: RequestEvent) -> None:
+    for hook in hooks:
+        hook(event)
+
+
+def instrumented_call(hooks: Sequence[Hook], operation_id: Optional[str], method: str, url: str, body: Any,
+                      post_params: Any, call: Callable[[], rest.RESTResponse], retries: int = 0) -> rest.RESTResponse:
+    """`call()` - the request, made again by the client `retries` times so far - reported to `hooks`."""
+    started_at = time.time()
+    started = time.perf_counter()
+    _pool_wait()
+    try:
+        response = call()
+    except Exception as e:
+        elapsed = time.perf_counter() - started
+        emit(hooks, RequestEvent(operation_id, method, url, getattr(e, 'status', None), started_at, elapsed, elapsed,
+                                 _pool_wait(), retries, request_size(body, post_params), None, e))
+        raise
+    headers_elapsed = time.perf_counter() - started
+    urllib3_retries = getattr(response.response, 'retries', None)
+    if urllib3_retries is not None:
+        retries += len(urllib3_retries.history)
+    event = RequestEvent(operation_id, method, url, response.status, started_at, headers_elapsed, headers_elapsed,
+                         _pool_wait(), retries, request_size(body, post_params), None)
+    return InstrumentedResponse(response.response, event, started, hooks)
+
+
+class OperationStats:
+    """Everything a `HistogramCollector` has seen of one operation."""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        # requests per bucket of `elapsed` - the last is for those slower than every bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.errors = 0
+        self.statuses: Dict[int, int] = {}
+        self.total_elapsed = 0.0
+        self.max_elapsed = 0.0
+        self.total_headers_elapsed = 0.0
+        self.total_pool_wait = 0.0
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def add(self, event: RequestEvent) -> None:
+        self.counts[bisect.bisect_left(self.buckets, event.elapsed)] += 1
+        self.count += 1
+        if event.error is not None or event.status is None or event.status >= 400:
+            self.errors += 1
+        if event.status is not None:
+            self.statuses[event.status] = self.statuses.get(event.status, 0) + 1
+        self.total_elapsed += event.elapsed
+        self.max_elapsed = max(self.max_elapsed, event.elapsed)
+        self.total_headers_elapsed += event.headers_elapsed
+        self.total_pool_wait += event.pool_wait
+        self.retries += event.retries
+        self.bytes_sent += event.bytes_sent
+        self.bytes_received += event.bytes_received or 0
+
+    @property
+    def mean(self) -> float:
+        return self.total_elapsed / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """An estimate of the `q` (0-1) quantile of `elapsed`: the upper bound of the bucket it falls in."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max_elapsed
+
+    def copy(self) -> 'OperationStats':
+        stats = OperationStats(self.buckets)
+        stats.__dict__.update({k: (v.copy() if isinstance(v, (list, dict)) else v) for k, v in self.__dict__.items()})
+        return stats
+
+
+class HistogramCollector:
+    """A hook keeping, per operationId, a histogram of request times and totals of everything else in the events."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._stats: Dict[Optional[str], OperationStats] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: RequestEvent) -> None:
+        with self._lock:
+            stats = self._stats.get(event.operation_id)
+            if stats is None:
+                stats = self._stats[event.operation_id] = OperationStats(self.buckets)
+            stats.add(event)
+
+    def snapshot(self) -> Dict[Optional[str], OperationStats]:
+        """A copy of the stats so far, by operationId (None for requests that matched no operation)."""
+        with self._lock:
+            return {operation_id: stats.copy() for operation_id, stats in self._stats.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def summary(self) -> List[str]:
+        """One line per operation, slowest (in total) first."""
+        rows: List[Tuple[float, str]] = []
+        for operation_id, stats in self.snapshot().items():
+            rows.append((stats.total_elapsed, f'{operation_id or "(unknown)"}: {stats.count} requests, '
+                                              f'{stats.errors} failed, mean {stats.mean * 1000:.1f} ms, '
+                                              f'p95 <= {stats.percentile(0.95) * 1000:.0f} ms, '
+                                              f'{stats.retries} retries, {stats.bytes_sent} B sent, '
+                                              f'{stats.bytes_received} B received, '
+                                              f'{stats.total_pool_wait * 1000:.1f} ms waiting for a connection'))
+        return [row for _, row in sorted(rows, reverse=True)]
@@ -0,0 +1,120 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Limit how many requests are in flight to as many as NXRM keeps up with - found, and followed, as it changes.
+
+    limiter = AdaptiveLimiter(initial=8, max_limit=128)
+    api_client = NexusApiClient(configuration, retry=RetryPolicy(), limiter=limiter)
+    for result in upload_components(uploads, api_client, workers=128):    # at most limiter.limit at once
+        ...
+
+The limit is AIMD (additive increase, multiplicative decrease), as TCP's congestion window is: every request that
+comes back in good time, while the limit is being used, raises it by 1/limit (so by about one a round trip); a request
+that NXRM turns away (429, 503), that times out, or that takes more than `latency_tolerance` times the usual for its
+operation cuts it by `decrease` - once for everything in flight at the time, not once per request.
+
+The usual latency of an operation is the lowest it has recently been: it falls as soon as a request is faster, and
+rises only slowly (by `smoothing` of the difference per request), so a server getting slower shows up as latency
+above it. A permit is held until the response's headers arrive - for an upload (`upload.upload_components()`), until
+the whole file has been sent; a download (`download.download_assets()`) streams its body after giving it back.
+"""
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+
+# statuses with which NXRM (or whatever is in front of it) says it has too much to do
+OVERLOAD_STATUSES = frozenset({429, 503})
+
+
+class Permit(NamedTuple):
+    # the limiter's generation when it was acquired - a decrease only applies once to what was in flight at the time
+    generation: int
+    started: float
+    # whether the limit was at least half used, i.e. whether it was what limited concurrency
+    saturated: bool
+
+
+class LimiterStats(NamedTuple):
+    limit: float
+    in_flight: int
+    increases: int
+    decreases: int
+    # seconds spent waiting for a permit, in total
+    waited: float
+
+
+class AdaptiveLimiter:
+    """An AIMD concurrency limit between `min_limit` and `max_limit`, starting at `initial`. Thread-safe - share one
+    between every client (and thread) that calls the same NXRM."""
+
+    def __init__(self, initial: float = 8, *, min_limit: float = 1, max_limit: float = 256, decrease: float = 0.7,
+                 latency_tolerance: float = 2.0, smoothing: float = 0.05) -> None:
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError('Need 1 <= min_limit <= initial <= max_limit')
+        if not 0 < decrease < 1:
+            raise ValueError('decrease must be between 0 and 1')
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._generation = 0
+        self._baselines: Dict[Optional[str], float] = {}
+        self._increases = self._decreases = 0
+        self._waited = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> float:
+        return self._limit
+
+    def acquire(self, timeout: Optional[float] = None) -> Permit:
+        """Wait until fewer than `limit` requests are in flight (raises `TimeoutError` after `timeout` seconds)."""
+        started = time.monotonic()
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._in_flight < int(self._limit), timeout):
+                raise TimeoutError(f'No request permit within {timeout}s ({self._in_flight} in flight)')
+            self._in_flight += 1
+            now = time.monotonic()
+            self._waited += now - started
+            return Permit(self._generation, now, self._in_flight * 2 >= self._limit)
+
+    def release(self, permit: Permit, key: Optional[str] = None, overloaded: bool = False) -> None:
+        """The request `permit` was acquired for (for `key`, e.g. its operationId) is done - `overloaded` if NXRM
+        turned it away or it timed out."""
+        latency = time.monotonic() - permit.started
+        with self._condition:
+            self._in_flight -= 1
+            baseline = self._baselines.get(key)
+            slow = baseline is not None and latency > baseline * self.latency_tolerance
+            if not overloaded:
+                self._baselines[key] = latency if baseline is None else min(
+                    latency, baseline + (latency - baseline) * self.smoothing
+                )
+            if overloaded or slow:
+                if permit.generation == self._generation:
+                    self._generation += 1
+                    self._limit = max(self.min_limit, self._limit * self.decrease)
+                    self._decreases += 1
+            elif permit.saturated and self._limit < self.max_limit:
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+                self._increases += 1
+            self._condition.notify_all()
+
+    def stats(self) -> LimiterStats:
+        with self._condition:
+            return LimiterStats(self._limit, self._in_flight, self._increases, self._decreases, self._waited)
@@ -0,0 +1,90 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""The operations in the spec, keyed by operationId, and where the generated client put each of them."""
+import importlib
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Pattern, Tuple
+
+
+class Pagination(NamedTuple):
+    """How an operation pages its results through a `continuationToken`."""
+    # keyword argument of the generated method that takes the token
+    token_param: str
+    # the token and the items in a page, as model attributes and as JSON keys
+    token_attribute: str
+    token_key: str
+    items_attribute: str
+    items_key: str
+
+
+class Operation(NamedTuple):
+    operation_id: str
+    method: str
+    path: str
+    api_module: str
+    api_class: str
+    method_name: str
+    pagination: Optional[Pagination] = None
+    # the fields of a multipart/form-data request body, and which of them are files
+    form_fields: Tuple[str, ...] = ()
+    file_fields: Tuple[str, ...] = ()
+    # as the generated client names it (e.g. `List[RepositoryXO]`), if the response is one of the models
+    response_type: Optional[str] = None
+    # from the spec's `x-idempotent`, `x-cacheable` and `x-invalidates`: whether making the request again is safe,
+    # seconds its responses can be reused for, and the API classes whose cached responses it makes stale
+    idempotent: bool = False
+    cache_ttl: Optional[float] = None
+    invalidates: Tuple[str, ...] = ()
+
+    def api(self, api_client: Any = None) -> Any:
+        """An instance of the generated `...Api` class for this operation."""
+        return getattr(importlib.import_module(self.api_module), self.api_class)(api_client)
+
+    def bind(self, api_client: Any = None) -> Callable[..., Any]:
+        """The generated method for this operation, bound to an `...Api` using `api_client` (or the default)."""
+        return getattr(self.api(api_client), self.method_name)
+
+
+def get_operation(operation_id: str) -> Operation:
+    from ._operations import OPERATIONS
+
+    try:
+        return OPERATIONS[operation_id]
+    except KeyError:
+        raise KeyError(f'No operation {operation_id!r} in this client') from None
+
+
+@lru_cache(maxsize=None)
+def _routes() -> Dict[str, List[Tuple[Pattern, Operation]]]:
+    from ._operations import OPERATIONS
+
+    routes: Dict[str, List[Tuple[Pattern, Operation]]] = {}
+    for operation in OPERATIONS.values():
+        pattern = re.compile(re.sub(r'\\\{[^}]*\\\}', '[^/]+', re.escape(operation.path)))
+        routes.setdefault(operation.method, []).append((pattern, operation))
+    # the most literal path wins - /v1/repositories/maven/hosted/{name} over /v1/repositories/{name}/...
+    for candidates in routes.values():
+        candidates.sort(key=lambda route: -len(re.sub(r'\{[^}]*\}', '', route[1].path)))
+    return routes
+
+
+def find_operation(method: str, path: str) -> Optional[Operation]:
+    """The operation a request is for, from its method and its path below the client's host (e.g. `/v1/assets/a1`)."""
+    for pattern, operation in _routes().get(method.upper(), []):
+        if pattern.fullmatch(path):
+            return operation
+    return None
@@ -0,0 +1,89 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Report requests to OpenTelemetry - a span and metrics for each, attributed with its operationId.
+
+    api_client = NexusApiClient(configuration, hooks=[OpenTelemetryHook()])
+
+Needs `opentelemetry-api` (which is not a dependency of this client); spans and metrics go wherever the application
+has configured the OpenTelemetry SDK to send them.
+"""
+from typing import Any, Dict
+
+from .instrumentation import RequestEvent
+
+INSTRUMENTATION_NAME = 'nexus_api_client'
+
+
+class OpenTelemetryHook:
+    """A hook recording a CLIENT span per request and these metrics, using the global providers unless given others:
+
+        nexus.client.request.duration       histogram, seconds
+        nexus.client.connection.wait        histogram, seconds waiting for a pooled connection
+        nexus.client.request.retries        counter
+        nexus.client.request.body.size      counter, bytes sent
+        nexus.client.response.body.size     counter, bytes received
+    """
+
+    def __init__(self, tracer_provider: Any = None, meter_provider: Any = None, spans: bool = True) -> None:
+        try:
+            from opentelemetry import metrics, trace
+        except ImportError as e:
+            raise ImportError('OpenTelemetryHook needs opentelemetry-api: pip install opentelemetry-api') from e
+        self._trace = trace
+        self._tracer = trace.get_tracer(INSTRUMENTATION_NAME, tracer_provider=tracer_provider) if spans else None
+        meter = metrics.get_meter(INSTRUMENTATION_NAME, meter_provider=meter_provider)
+        self._duration = meter.create_histogram('nexus.client.request.duration', unit='s',
+                                                description='Time until the response body had been read')
+        self._pool_wait = meter.create_histogram('nexus.client.connection.wait', unit='s',
+                                                 description='Time waiting for a connection from the pool')
+        self._retries = meter.create_counter('nexus.client.request.retries', description='Requests made again')
+        self._sent = meter.create_counter('nexus.client.request.body.size', unit='By', description='Bytes sent')
+        self._received = meter.create_counter('nexus.client.response.body.size', unit='By',
+                                              description='Bytes received')
+
+    @staticmethod
+    def attributes(event: RequestEvent) -> Dict[str, Any]:
+        attributes: Dict[str, Any] = {'nexus.operation_id': event.operation_id or '',
+                                      'http.request.method': event.method}
+        if event.status is not None:
+            attributes['http.response.status_code'] = event.status
+        if event.error is not None:
+            attributes['error.type'] = type(event.error).__qualname__
+        elif event.status is not None and event.status >= 400:
+            attributes['error.type'] = str(event.status)
+        return attributes
+
+    def __call__(self, event: RequestEvent) -> None:
+        attributes = self.attributes(event)
+        self._duration.record(event.elapsed, attributes)
+        self._pool_wait.record(event.pool_wait, attributes)
+        if event.retries:
+            self._retries.add(event.retries, attributes)
+        self._sent.add(event.bytes_sent, attributes)
+        if event.bytes_received:
+            self._received.add(event.bytes_received, attributes)
+        if self._tracer is not None:
+            self._span(event, attributes)
+
+    def _span(self, event: RequestEvent, attributes: Dict[str, Any]) -> None:
+        start = int(event.started * 1e9)
+        span = self._tracer.start_span(event.operation_id or event.method, kind=self._trace.SpanKind.CLIENT,
+                                       attributes=dict(attributes, **{'url.full': event.url}), start_time=start)
+        if event.error is not None:
+            span.record_exception(event.error)
+        if 'error.type' in attributes:
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        span.end(end_time=start + int(event.elapsed * 1e9))
@@ -0,0 +1,155 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Iterate over everything a `continuationToken` paged operation returns, a page at a time.
+
+    for asset in paginate_list_assets(repository='maven-releases', prefetch=2):
+        ...
+
+With `prefetch` > 0 a background thread requests the next page(s) while the current one is being consumed, keeping up
+to `prefetch` pages buffered - so walking a large repository costs roughly max(request, processing) per page, rather
+than request + processing.
+"""
+import threading
+from collections.abc import Mapping
+from functools import partial
+from queue import Empty, Full, Queue
+from typing import Any, Callable, Generic, Iterator, Optional, TypeVar
+
+from .operations import Pagination, get_operation
+from .raw import call_raw, check_raw
+
+T = TypeVar('T')
+
+# how often a blocked producer/consumer checks whether the other side has gone away
+_POLL_INTERVAL = 0.1
+
+
+def _field(page: Any, attribute: str, key: str) -> Any:
+    if isinstance(page, Mapping):
+        return page.get(key)
+    return getattr(page, attribute, None)
+
+
+class _Done:
+    pass
+
+
+class _Failed:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class Paginator(Generic[T]):
+    """Lazily iterates the items of every page, following `continuationToken` until the server stops returning one.
+
+    Nothing is requested until iteration starts; each `iter()` walks from the first page again. Errors from any page
+    are raised from the iteration, in page order.
+    """
+
+    def __init__(self, fetch: Callable[[Optional[str]], Any], pagination: Pagination, prefetch: int = 0,
+                 continuation_token: Optional[str] = None) -> None:
+        if prefetch < 0:
+            raise ValueError('prefetch must be >= 0')
+        self._fetch = fetch
+        self._pagination = pagination
+        self.prefetch = prefetch
+        self.continuation_token = continuation_token
+
+    def __iter__(self) -> Iterator[T]:
+        for page in self.pages():
+            yield from self.items(page)
+
+    def items(self, page: Any) -> list:
+        return _field(page, self._pagination.items_attribute, self._pagination.items_key) or []
+
+    def next_token(self, page: Any) -> Optional[str]:
+        return _field(page, self._pagination.token_attribute, self._pagination.token_key) or None
+
+    def pages(self) -> Iterator[Any]:
+        """The pages themselves (models, or whatever the client deserializes responses to)."""
+        if self.prefetch:
+            return self._prefetched_pages()
+        return self._pages()
+
+    def _pages(self) -> Iterator[Any]:
+        token = self.continuation_token
+        while True:
+            page = self._fetch(token)
+            yield page
+            token = self.next_token(page)
+            if token is None:
+                return
+
+    def _prefetched_pages(self) -> Iterator[Any]:
+        buffer: Queue = Queue(maxsize=self.prefetch)
+        stopped = threading.Event()
+
+        def put(item: Any) -> bool:
+            while not stopped.is_set():
+                try:
+                    buffer.put(item, timeout=_POLL_INTERVAL)
+                    return True
+                except Full:
+                    pass
+            return False
+
+        def produce() -> None:
+            try:
+                for page in self._pages():
+                    if not put(page):
+                        return
+            except BaseException as e:
+                put(_Failed(e))
+                return
+            put(_Done())
+
+        producer = threading.Thread(target=produce, name='nexus-api-client-paginator', daemon=True)
+        producer.start()
+        try:
+            while True:
+                try:
+                    item = buffer.get(timeout=_POLL_INTERVAL)
+                except Empty:
+                    if not producer.is_alive() and buffer.empty():
+                        return
+                    continue
+                if isinstance(item, _Done):
+                    return
+                if isinstance(item, _Failed):
+                    raise item.error
+                yield item
+        finally:
+            # stops the producer after its current request, if the consumer finished early (break, error, close())
+            stopped.set()
+
+
+def paginate(operation_id: str, api_client: Any = None, *, prefetch: int = 0, raw: Optional[str] = None,
+             **kwargs: Any) -> Paginator:
+    """A `Paginator` over any paged operation, called with `kwargs` (including any `continuation_token` to start
+    from). With `raw`, pages are decoded by `raw.call_raw()` rather than deserialized to models."""
+    operation = get_operation(operation_id)
+    if operation.pagination is None:
+        raise ValueError(f'{operation_id} is not paged by continuationToken')
+    if raw is None:
+        method = operation.bind(api_client)
+    else:
+        method = partial(call_raw, operation_id, api_client, raw=check_raw(raw))
+    start = kwargs.pop(operation.pagination.token_param, None)
+
+    def fetch(token: Optional[str]) -> Any:
+        return method(**{operation.pagination.token_param: token}, **kwargs)
+
+    return Paginator(fetch, operation.pagination, prefetch=prefetch, continuation_token=start)
@@ -0,0 +1,230 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Connection pools shared by every `ApiClient` of a process talking to the same NXRM as the same user.
+
+    api_client = NexusApiClient(configuration, pools=SHARED_POOLS)     # or share_pools(ApiClient(configuration))
+    ...
+    for stats in SHARED_POOLS.stats():
+        print(stats.host, stats.in_use, stats.maxsize, stats.saturated)
+
+Each `ApiClient` otherwise has pools of its own, so a client made per request (or per request handler) opens - and
+for HTTPS, handshakes - a connection of its own each time. A `PoolRegistry` keeps one urllib3 `PoolManager` per NXRM
+URL, credentials and connection settings (TLS, proxy, socket options, retries) and hands it to every client with
+those, so their connections are reused; it is safe to use from any number of threads, as the pools are.
+
+The pools are `maxsize` connections per host (the `Configuration`'s `connection_pool_maxsize`, if not given) - when
+they are all in use a request waits for one if `block`, and otherwise makes a connection of its own, closed once
+used. Connections are kept open between requests, with TCP keep-alives every `keep_alive_idle` seconds (where the
+platform allows) unless `keep_alive` is False. `stats()` tells how full each pool is, and how often a request found
+it saturated - every connection in use - and how long requests waited for one.
+"""
+import hashlib
+import socket
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+import urllib3
+from urllib3.connection import HTTPConnection
+
+from nexus_api_client import rest
+from nexus_api_client.api_client import ApiClient
+from nexus_api_client.configuration import Configuration
+
+from .instrumentation import TimedHTTPConnectionPool, TimedHTTPSConnectionPool
+
+DEFAULT_KEEP_ALIVE_IDLE = 60
+
+
+class PoolStats(NamedTuple):
+    # what the pool is for - its NXRM, and the user (not the credentials)
+    key: str
+    # the host a pool of its `PoolManager` connects to
+    host: str
+    maxsize: int
+    # connections taken from the pool and not yet given back
+    in_use: int
+    # open connections waiting in the pool
+    idle: int
+    requests: int
+    # connections opened - fewer than requests, as they are reused
+    connections: int
+    # requests that found every connection in use
+    saturated: int
+    # seconds requests waited for a connection
+    wait: float
+
+    @property
+    def saturation(self) -> float:
+        return self.in_use / self.maxsize if self.maxsize else 0.0
+
+
+class _Counted:
+    """Counts, for `PoolRegistry.stats()`, the requests that found the pool saturated, and how long they waited."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.saturated = 0
+        self.wait = 0.0
+        # requests holding or waiting for a connection
+        self._demand = 0
+        self._counts_lock = threading.Lock()
+
+    def _get_conn(self, timeout: Optional[float] = None) -> Any:
+        with self._counts_lock:
+            self.saturated += self._demand >= self.pool.maxsize if self.pool is not None else 0
+            self._demand += 1
+        started = time.perf_counter()
+        try:
+            return super()._get_conn(timeout)
+        except BaseException:
+            with self._counts_lock:
+                self._demand -= 1
+            raise
+        finally:
+            with self._counts_lock:
+                self.wait += time.perf_counter() - started
+
+    def _put_conn(self, conn: Any) -> None:
+        # every connection got is put back - None, if it was closed
+        with self._counts_lock:
+            self._demand = max(0, self._demand - 1)
+        super()._put_conn(conn)
+
+
+class CountedHTTPConnectionPool(_Counted, TimedHTTPConnectionPool):
+    pass
+
+
+class CountedHTTPSConnectionPool(_Counted, TimedHTTPSConnectionPool):
+    pass
+
+
+def _keep_alive_options(idle: Optional[int]) -> List[Tuple[int, int, int]]:
+    options = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    # Linux, and macOS (which calls it TCP_KEEPALIVE)
+    keep_idle = getattr(socket, 'TCP_KEEPIDLE', getattr(socket, 'TCP_KEEPALIVE', None))
+    if idle is not None and keep_idle is not None:
+        options.append((socket.IPPROTO_TCP, keep_idle, idle))
+        if hasattr(socket, 'TCP_KEEPINTVL'):
+            options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, idle))
+    return options
+
+
+def _frozen(value: Any) -> Any:
+    if isinstance(value, dict):
+        return tuple(sorted((k, _frozen(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_frozen(v) for v in value)
+    return value if value is None or isinstance(value, (str, bytes, int, float, bool)) else repr(value)
+
+
+class PoolRegistry:
+    """A `PoolManager` per NXRM, credentials and connection settings, with pools of `maxsize` connections a host."""
+
+    def __init__(self, maxsize: Optional[int] = None, *, block: bool = False, keep_alive: bool = True,
+                 keep_alive_idle: Optional[int] = DEFAULT_KEEP_ALIVE_IDLE) -> None:
+        if maxsize is not None and maxsize < 1:
+            raise ValueError('maxsize must be >= 1')
+        self.maxsize = maxsize
+        self.block = block
+        self.keep_alive = keep_alive
+        self.keep_alive_idle = keep_alive_idle
+        self._managers: Dict[Tuple, Tuple[str, urllib3.PoolManager]] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, configuration: Configuration, respect_retry_after: bool) -> Tuple:
+        # a digest of the credentials, so they are not kept around any longer than the configuration keeps them
+        credentials = hashlib.sha256(repr(_frozen((
+            configuration.username, configuration.password, getattr(configuration, 'api_key', None),
+            getattr(configuration, 'access_token', None),
+        ))).encode('utf-8')).hexdigest()
+        parts = urlsplit(configuration.host)
+        return _frozen((
+            parts.scheme, parts.netloc, credentials, configuration.verify_ssl, configuration.ssl_ca_cert,
+            configuration.ca_cert_data, configuration.cert_file, configuration.key_file, configuration.assert_hostname,
+            configuration.tls_server_name, configuration.proxy, configuration.proxy_headers,
+            configuration.socket_options, configuration.retries, respect_retry_after,
+            configuration.connection_pool_maxsize if self.maxsize is None else self.maxsize,
+        ))
+
+    def _create(self, configuration: Configuration, respect_retry_after: bool) -> urllib3.PoolManager:
+        # the generated client's own way of making one, so it has every setting it would have
+        manager = rest.RESTClientObject(configuration).pool_manager
+        options = manager.connection_pool_kw
+        if self.maxsize is not None:
+            options['maxsize'] = self.maxsize
+        options['block'] = self.block
+        if self.keep_alive:
+            socket_options = options.get('socket_options', HTTPConnection.default_socket_options)
+            options['socket_options'] = list(socket_options or []) + _keep_alive_options(self.keep_alive_idle)
+        if not respect_retry_after:
+            options['retries'] = urllib3.Retry.from_int(options.get('retries')).new(respect_retry_after_header=False)
+        manager.pool_classes_by_scheme = {'http': CountedHTTPConnectionPool, 'https': CountedHTTPSConnectionPool}
+        return manager
+
+    def pool_manager(self, configuration: Configuration, *, respect_retry_after: bool = True) -> urllib3.PoolManager:
+        """The `PoolManager` for clients with `configuration` - made the first time it is asked for. Without
+        `respect_retry_after`, its pools leave waiting for a `Retry-After` to a `retry.RetryPolicy`."""
+        key = self._key(configuration, respect_retry_after)
+        with self._lock:
+            if key not in self._managers:
+                parts = urlsplit(configuration.host)
+                user = f' as {configuration.username}' if configuration.username else ''
+                self._managers[key] = (f'{parts.scheme}://{parts.netloc}{user}',
+                                       self._create(configuration, respect_retry_after))
+            return self._managers[key][1]
+
+    def stats(self) -> List[PoolStats]:
+        """How full each pool is now, and the requests it has had."""
+        with self._lock:
+            managers = list(self._managers.values())
+        stats = []
+        for key, manager in managers:
+            for pool_key in manager.pools.keys():
+                pool = manager.pools.get(pool_key)
+                if pool is None or pool.pool is None:
+                    continue
+                queued = list(pool.pool.queue)
+                stats.append(PoolStats(
+                    key, f'{pool.scheme}://{pool.host}:{pool.port}', pool.pool.maxsize,
+                    max(0, pool.pool.maxsize - len(queued)), sum(1 for c in queued if c is not None),
+                    pool.num_requests, pool.num_connections, getattr(pool, 'saturated', 0),
+                    getattr(pool, 'wait', 0.0),
+                ))
+        return stats
+
+    def clear(self) -> None:
+        """Close every pool. Clients still using them get new ones, no longer shared with clients made from now on."""
+        with self._lock:
+            managers = list(self._managers.values())
+            self._managers.clear()
+        for _, manager in managers:
+            manager.clear()
+
+
+# the registry for the whole process
+SHARED_POOLS = PoolRegistry()
+
+
+def share_pools(api_client: ApiClient, registry: Optional[PoolRegistry] = None) -> ApiClient:
+    """Have `api_client` use the pools of `registry` (by default `SHARED_POOLS`) rather than its own."""
+    registry = SHARED_POOLS if registry is None else registry
+    retry = getattr(api_client, 'retry', None)
+    api_client.rest_client.pool_manager = registry.pool_manager(api_client.configuration,
+                                                                respect_retry_after=retry is None)
+    return api_client
@@ -0,0 +1,304 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Make NXRM's repositories match a desired state, creating and updating only those that differ.
+
+    desired = [
+        {'format': 'maven', 'type': 'hosted', 'name': 'maven-releases', 'online': True,
+         'storage': {'blobStoreName': 'default', 'strictContentTypeValidation': True, 'writePolicy': 'ALLOW_ONCE'},
+         'maven': {'versionPolicy': 'RELEASE', 'layoutPolicy': 'STRICT'}},
+        {'format': 'maven', 'type': 'group', 'name': 'maven-public', 'online': True,
+         'storage': {'blobStoreName': 'default', 'strictContentTypeValidation': True},
+         'group': {'memberNames': ['maven-releases', 'maven-central']}},
+        ...
+    ]
+    for result in provision_repositories(desired, api_client, workers=16):
+        print(result.change.action, result.change.name, result.error or '')
+
+Each repository is what its `create{Format}{Type}Repository` takes (as JSON), plus its `format` (the one in the
+operation's path - `maven`, not `maven2` - though NXRM's names are understood too) and `type`. The current state is one
+GET /v1/repositories and, for the repositories in `desired` that exist, their `get{Format}{Type}Repository`s, made
+`workers` at a time. Only what `desired` says is compared - anything it leaves out, or sets to null, is NXRM's to
+default - and a repository is updated only if something differs.
+
+A GET does not return a repository as it was created: it adds what NXRM fills in (`url`, nulls for what was left
+out), renames some of it (`routingRule` is `routingRuleName`) and never returns secrets (`password`, ...). So both
+sides are compared as the model the generated `get{Format}{Type}Repository` returns has them - only its keys, and
+empty lists and objects the same as null. Where the spec only says that is an `AbstractApiRepository` (name, format,
+type, online and url), NXRM still returns the whole repository, and the create request's keys are compared instead.
+
+Changes are applied `workers` at a time, but a group only once every member it has in `desired` is done (and not if
+any of them failed).
+"""
+import importlib
+import inspect
+import time
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Type, get_args
+
+from pydantic import BaseModel
+
+from nexus_api_client.api_client import ApiClient
+
+from ._concurrency import bounded_map
+from ._http import raise_for_status
+from .operations import Operation, find_operation
+from .raw import call_raw
+
+LIST_REPOSITORIES = 'getAllRepositories'
+REPOSITORIES_PATH = '/v1/repositories'
+# NXRM's names for formats whose operations use another
+FORMAT_ALIASES = {'maven2': 'maven'}
+# never returned by NXRM, so cannot be compared
+WRITE_ONLY_KEYS = frozenset({'password', 'bearerToken', 'keypair', 'passphrase'})
+# what the create and update requests call what a GET returns as another
+RENAMED_KEYS = {'routingRule': 'routingRuleName'}
+# the model of a GET the spec says nothing more of
+UNDOCUMENTED_MODEL = 'AbstractApiRepository'
+
+CREATE = 'create'
+UPDATE = 'update'
+UNCHANGED = 'unchanged'
+
+
+class RepositoryChange(NamedTuple):
+    """What has to be done to one repository in the desired state."""
+    action: str
+    name: str
+    format: str
+    type: str
+    desired: Mapping[str, Any]
+    # dotted paths of what differs, for an update
+    differences: Tuple[str, ...] = ()
+
+    @property
+    def members(self) -> Tuple[str, ...]:
+        """The repositories in a group."""
+        return tuple((self.desired.get('group') or {}).get('memberNames') or ())
+
+
+class ProvisionResult(NamedTuple):
+    change: RepositoryChange
+    # HTTP status, if a request was made and NXRM responded
+    status: Optional[int]
+    elapsed: float
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _format(repository_format: str) -> str:
+    return FORMAT_ALIASES.get(repository_format, repository_format)
+
+
+def repository_operation(method: str, repository_format: str, repository_type: str,
+                         name: Optional[str] = None) -> Operation:
+    """The `create...`, `get...` or `update...Repository` operation for a format and type."""
+    path = f'{REPOSITORIES_PATH}/{_format(repository_format)}/{repository_type}'
+    operation = find_operation(method, path if name is None else f'{path}/{name}')
+    if operation is None:
+        raise ValueError(f'No {method} {path}{"" if name is None else "/{repositoryName}"} in this client - is '
+                         f'{repository_format} {repository_type} a format and type of repository?')
+    return operation
+
+
+def _model_of(annotation: Any) -> Optional[Type[BaseModel]]:
+    """The model `annotation` is, or is an `Optional` or `List` of."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for argument in get_args(annotation):
+        model = _model_of(argument)
+        if model is not None:
+            return model
+    return None
+
+
+@lru_cache(maxsize=None)
+def _shape(model: Type[BaseModel]) -> Dict[str, Any]:
+    """JSON key -> the shape of its value, if that is a model too (otherwise None), of `model`."""
+    shape = {}
+    for name, info in model.model_fields.items():
+        nested = _model_of(info.annotation)
+        shape[info.alias or name] = _shape(nested) if nested is not None else None
+    return shape
+
+
+def _signature(operation: Operation) -> inspect.Signature:
+    api = getattr(importlib.import_module(operation.api_module), operation.api_class)
+    return inspect.signature(getattr(api, operation.method_name))
+
+
+@lru_cache(maxsize=None)
+def repository_shape(repository_format: str, repository_type: str) -> Dict[str, Any]:
+    """The keys (nested, as `_shape()` gives them) of a repository of a format and type that can be compared: those
+    of the model its GET returns - or of its create request, if the spec says no more of that than
+    `AbstractApiRepository`."""
+    get = repository_operation('GET', repository_format, repository_type, 'name')
+    model = _model_of(_signature(get).return_annotation)
+    if model is None or model.__name__ == UNDOCUMENTED_MODEL:
+        create = _signature(repository_operation('POST', repository_format, repository_type))
+        model = next(m for m in (_model_of(p.annotation) for p in create.parameters.values()) if m is not None)
+    return _shape(model)
+
+
+def normalise(value: Any, shape: Optional[Mapping[str, Any]]) -> Any:
+    """`value` (a repository's JSON, or part of it) with only the keys `shape` has, named as a GET returns them."""
+    if shape is None:
+        return value
+    if isinstance(value, list):
+        return [normalise(item, shape) for item in value]
+    if not isinstance(value, Mapping):
+        return value
+    normalised = {}
+    for key, item in value.items():
+        key = key if key in shape else RENAMED_KEYS.get(key, key)
+        if key in shape and key not in WRITE_ONLY_KEYS:
+            normalised[key] = normalise(item, shape[key])
+    return normalised
+
+
+def _empty(value: Any) -> bool:
+    return value is None or (isinstance(value, (Mapping, list)) and not value)
+
+
+def differences(desired: Any, current: Any, path: str = '') -> List[str]:
+    """Dotted paths of everything in `desired` that is not the same in `current` - null in `desired` being NXRM's
+    default, whatever that is, and an empty list or object the same as null."""
+    if isinstance(desired, Mapping) and isinstance(current, Mapping):
+        found = []
+        for key, value in desired.items():
+            if key in WRITE_ONLY_KEYS or value is None:
+                continue
+            found += differences(value, current.get(key), f'{path}.{key}' if path else key)
+        return found
+    if isinstance(desired, Mapping) and current is None:
+        return differences(desired, {}, path)
+    return [] if desired == current or (_empty(desired) and _empty(current)) else [path]
+
+
+def plan_repositories(desired: Iterable[Mapping[str, Any]], api_client: Optional[ApiClient] = None, *,
+                      workers: int = 8) -> List[RepositoryChange]:
+    """What has to change for NXRM's repositories to be as `desired` - one change for each, in `desired`'s order."""
+    api_client = api_client or ApiClient.get_default()
+    desired = list(desired)
+    names = [repository['name'] for repository in desired]
+    repeated = sorted({name for name in names if names.count(name) > 1})
+    if repeated:
+        raise ValueError(f'Repositories named more than once: {", ".join(repeated)}')
+    for repository in desired:
+        # fails now, rather than half way through applying
+        repository_operation('POST', repository['format'], repository['type'])
+    existing = {r['name']: r for r in call_raw(LIST_REPOSITORIES, api_client) or []}
+
+    def current(repository: Mapping[str, Any]) -> Tuple[Mapping[str, Any], Any]:
+        found = existing[repository['name']]
+        if (_format(found['format']), found['type']) != (_format(repository['format']), repository['type']):
+            raise ValueError(f'{repository["name"]} is a {found["format"]} {found["type"]} repository, not '
+                             f'{repository["format"]} {repository["type"]} - it would have to be deleted first')
+        operation = repository_operation('GET', found['format'], found['type'], repository['name'])
+        return repository, call_raw(operation.operation_id, api_client, repository_name=repository['name'])
+
+    found = {r['name']: state for r, state in bounded_map(
+        current, (r for r in desired if r['name'] in existing), workers, 'provision'
+    )}
+    changes = []
+    for repository in desired:
+        name, repository_format, repository_type = repository['name'], repository['format'], repository['type']
+        if name not in found:
+            changes.append(RepositoryChange(CREATE, name, repository_format, repository_type, repository))
+            continue
+        shape = repository_shape(repository_format, repository_type)
+        body = {k: v for k, v in repository.items() if k not in ('format', 'type')}
+        changed = tuple(differences(normalise(body, shape), normalise(found[name], shape)))
+        changes.append(RepositoryChange(UPDATE if changed else UNCHANGED, name, repository_format, repository_type,
+                                        repository, changed))
+    return changes
+
+
+def _waves(changes: List[RepositoryChange]) -> List[List[RepositoryChange]]:
+    """`changes` in the order they can be made: each group after every member it has in `changes`."""
+    by_name = {c.name: c for c in changes}
+    depths: Dict[str, int] = {}
+
+    def depth(change: RepositoryChange, seen: Tuple[str, ...] = ()) -> int:
+        if change.name in seen:
+            raise ValueError(f'Groups contain each other: {" -> ".join(seen + (change.name,))}')
+        if change.name not in depths:
+            members = [by_name[m] for m in change.members if m in by_name]
+            depths[change.name] = 1 + max((depth(m, seen + (change.name,)) for m in members), default=-1)
+        return depths[change.name]
+
+    waves: List[List[RepositoryChange]] = []
+    for change in changes:
+        level = depth(change)
+        waves.extend([] for _ in range(level + 1 - len(waves)))
+        waves[level].append(change)
+    return waves
+
+
+def _apply(change: RepositoryChange, api_client: ApiClient, _request_timeout: Any) -> ProvisionResult:
+    started = time.monotonic()
+    try:
+        if change.action == CREATE:
+            operation = repository_operation('POST', change.format, change.type)
+        else:
+            operation = repository_operation('PUT', change.format, change.type, change.name)
+        method, url, headers, body, _ = api_client.param_serialize(
+            method=operation.method, resource_path=operation.path, path_params={'repositoryName': change.name},
+            header_params={'Content-Type': 'application/json', 'Accept': 'application/json'},
+            body={k: v for k, v in change.desired.items() if k not in ('format', 'type')},
+            auth_settings=list(api_client.configuration.auth_settings())
+        )
+        response = api_client.call_api(method, url, headers, body, _request_timeout=_request_timeout)
+        response.read()
+        raise_for_status(response)
+        return ProvisionResult(change, response.status, time.monotonic() - started)
+    except Exception as e:
+        return ProvisionResult(change, getattr(e, 'status', None), time.monotonic() - started, e)
+
+
+def apply_repositories(changes: Iterable[RepositoryChange], api_client: Optional[ApiClient] = None, *,
+                       workers: int = 8, _request_timeout: Any = None) -> Iterator[ProvisionResult]:
+    """Make the creates and updates in `changes`, up to `workers` at a time (groups after their members), yielding a
+    result for each - unchanged repositories included - as it completes. Failures are returned, not raised."""
+    api_client = api_client or ApiClient.get_default()
+    failed = set()
+    for wave in _waves(list(changes)):
+        pending = []
+        for change in wave:
+            if change.action == UNCHANGED:
+                yield ProvisionResult(change, None, 0.0)
+            elif failed.intersection(change.members):
+                failed.add(change.name)
+                yield ProvisionResult(change, None, 0.0, RuntimeError(
+                    f'Not {change.action}d, as {", ".join(sorted(failed.intersection(change.members)))} failed'
+                ))
+            else:
+                pending.append(change)
+        for result in bounded_map(lambda c: _apply(c, api_client, _request_timeout), pending, workers, 'provision'):
+            if not result.ok:
+                failed.add(result.change.name)
+            yield result
+
+
+def provision_repositories(desired: Iterable[Mapping[str, Any]], api_client: Optional[ApiClient] = None, *,
+                           workers: int = 8, _request_timeout: Any = None) -> Iterator[ProvisionResult]:
+    """`plan_repositories()` then `apply_repositories()`."""
+    api_client = api_client or ApiClient.get_default()
+    return apply_repositories(plan_repositories(desired, api_client, workers=workers), api_client, workers=workers,
+                              _request_timeout=_request_timeout)
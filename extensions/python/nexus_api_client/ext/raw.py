@@ -0,0 +1,188 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Responses without the models: decoded JSON as plain dicts, or as `View`s of them.
+
+    for asset in paginate_list_assets(api_client, repository='maven-releases', raw='view'):
+        print(asset.path, asset.last_modified)    # a datetime - validated now, as it is read
+
+    page = call_raw('listAssets', api_client, repository='maven-releases')    # a dict, straight from the JSON
+
+The generated client builds and validates a model for every object in a response, which for a page of 1000 assets
+costs far more than requesting it. `raw='dict'` skips that altogether (decoding with orjson, if it is installed);
+`raw='view'` wraps each object in a `View`, which has the model's attributes but converts and validates a field only
+when it is first read - fields that are never read cost nothing. `View.to_model()` builds the model after all.
+
+Pass `raw` per call (`call_raw()`, the `paginate_...()`s) or per client (`ext.client.NexusApiClient(raw=...)`).
+"""
+import json
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel, TypeAdapter
+
+from nexus_api_client import models
+from nexus_api_client.api_client import ApiClient
+
+from ._http import raise_for_status
+from .operations import get_operation
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+RAW_DICT = 'dict'
+RAW_VIEW = 'view'
+RAW_MODES = (RAW_DICT, RAW_VIEW)
+
+_LIST_TYPE = re.compile(r'List\[(\w+)\]')
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON - with orjson, if it is installed."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def dumps(value: Any) -> bytes:
+    """Encode JSON, compactly - with orjson, if it is installed."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def check_raw(raw: Optional[str]) -> Optional[str]:
+    if raw is not None and raw not in RAW_MODES:
+        raise ValueError(f'raw must be one of {", ".join(RAW_MODES)} (or None), not {raw!r}')
+    return raw
+
+
+class _Field(NamedTuple):
+    key: str
+    convert: Callable[[Any], Any]
+
+
+def _is_model(annotation: Any) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+def _converter(annotation: Any) -> Callable[[Any], Any]:
+    """JSON value -> what the model's field would hold, except that models are `View`s too."""
+    arguments = get_args(annotation)
+    if get_origin(annotation) is Union and type(None) in arguments:
+        others = [a for a in arguments if a is not type(None)]
+        if len(others) == 1:
+            # None needs no validating when the field is Optional
+            return _converter(others[0])
+    if _is_model(annotation):
+        return lambda value: View(value, annotation)
+    if get_origin(annotation) is list and arguments and _is_model(arguments[0]):
+        return lambda value: [View(item, arguments[0]) for item in value]
+    return TypeAdapter(annotation).validate_python
+
+
+@lru_cache(maxsize=None)
+def _fields(model: Type[BaseModel]) -> Dict[str, _Field]:
+    return {name: _Field(info.alias or name, _converter(info.annotation)) for name, info in model.model_fields.items()}
+
+
+class View:
+    """A decoded JSON object, read through the attributes of the model it would have been deserialized to.
+
+    Each field is converted (`datetime`s, nested `View`s, ...) and validated the first time it is read - an invalid
+    value raises pydantic's `ValidationError` then, rather than when the response arrived.
+    """
+    __slots__ = ('_data', '_model', '_values')
+
+    def __init__(self, data: Dict[str, Any], model: Type[BaseModel]) -> None:
+        self._data = data
+        self._model = model
+        self._values: Dict[str, Any] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+        field = _fields(self._model).get(name)
+        if field is None:
+            raise AttributeError(f'{self._model.__name__} has no field {name!r}')
+        value = self._data.get(field.key)
+        if value is not None:
+            value = field.convert(value)
+        self._values[name] = value
+        return value
+
+    def __dir__(self) -> list:
+        return sorted(set(super().__dir__()) | set(_fields(self._model)))
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, View):
+            return self._model is other._model and self._data == other._data
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f'View[{self._model.__name__}]({self._data!r})'
+
+    @property
+    def model(self) -> Type[BaseModel]:
+        return self._model
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The JSON object, as decoded."""
+        return self._data
+
+    def to_model(self) -> BaseModel:
+        """The model, built (and wholly validated) as the generated client would have."""
+        return self._model.from_dict(self._data)
+
+
+def _model(response_type: Optional[str]) -> Optional[Tuple[Type[BaseModel], bool]]:
+    """(model, whether the response is a list of them) for a generated response type - if it is a model."""
+    if not response_type:
+        return None
+    match = _LIST_TYPE.fullmatch(response_type)
+    model = getattr(models, match.group(1) if match else response_type, None)
+    return (model, match is not None) if _is_model(model) else None
+
+
+def is_model_response(response_type: Optional[str]) -> bool:
+    return _model(response_type) is not None
+
+
+def decode(data: Union[bytes, str], response_type: Optional[str], raw: str) -> Any:
+    """A JSON response body of `response_type` (e.g. `PageAssetXO`, `List[RepositoryXO]`), as `raw` asks."""
+    value = loads(data) if data else None
+    model = _model(response_type) if raw == RAW_VIEW and value is not None else None
+    if model is None:
+        return value
+    model, many = model
+    return [View(item, model) for item in value] if many else View(value, model)
+
+
+def call_raw(operation_id: str, api_client: Optional[ApiClient] = None, *, raw: str = RAW_DICT,
+             **kwargs: Any) -> Any:
+    """Call an operation with `kwargs` (as its generated method takes them), returning its response decoded as `raw`
+    asks rather than as models. Errors are raised as the generated method would."""
+    check_raw(raw)
+    operation = get_operation(operation_id)
+    method = getattr(operation.api(api_client), f'{operation.method_name}_without_preload_content')
+    response = method(**kwargs)
+    try:
+        raise_for_status(response)
+        return decode(response.data, operation.response_type, raw)
+    finally:
+        response.release_conn()
@@ -0,0 +1,138 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Make requests again when NXRM is too busy (429, 502, 503, 504) or they fail to connect or time out.
+
+    api_client = NexusApiClient(configuration, retry=RetryPolicy(max_attempts=5, operations=('createComponents',)))
+
+Attempts are spaced by "full jitter" exponential backoff - a random delay of up to `backoff * 2 ** retry`, at most
+`max_backoff` - so that many clients turned away at once do not all come back at once; a `Retry-After` from NXRM is
+waited for instead (and a request told to wait more than `max_retry_after` is not made again).
+
+Only idempotent requests - of operations the spec marks `x-idempotent`, or with a method in `methods` (GET, HEAD,
+OPTIONS, PUT, DELETE) if they are of none - are retried, as NXRM may have done what any other was for before failing,
+unless its operationId matches one of `operations`. When every attempt fails, the last response is returned (and so
+raised by the generated client) or the last error raised, as without retries.
+"""
+import email.utils
+import random
+import time
+from fnmatch import fnmatchcase
+from typing import Any, Callable, Iterable, Optional
+
+import urllib3
+
+from nexus_api_client import rest
+
+from .limiter import OVERLOAD_STATUSES, AdaptiveLimiter
+from .operations import Operation
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+# failures of the connection or of the request rather than responses (SSL errors are ApiExceptions, and not retried)
+RETRY_ERRORS = (urllib3.exceptions.MaxRetryError, urllib3.exceptions.TimeoutError, urllib3.exceptions.ProtocolError,
+                urllib3.exceptions.NewConnectionError)
+
+
+class RetryPolicy:
+    """When, and after how long, to make a request again - up to `max_attempts` requests in all."""
+
+    def __init__(self, max_attempts: int = 4, *, backoff: float = 0.5, max_backoff: float = 30.0,
+                 max_retry_after: float = 120.0, statuses: Iterable[int] = RETRY_STATUSES,
+                 methods: Iterable[str] = IDEMPOTENT_METHODS, operations: Iterable[str] = (),
+                 sleep: Callable[[float], None] = time.sleep,
+                 random: Callable[[], float] = random.random) -> None:
+        if max_attempts < 1:
+            raise ValueError('max_attempts must be >= 1')
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(m.upper() for m in methods)
+        # operationIds (or fnmatch patterns of them) retried whatever their method
+        self.operations = tuple(operations)
+        self.sleep = sleep
+        self.random = random
+
+    def allows(self, method: str, operation: Optional[Operation]) -> bool:
+        """Whether requests of `operation` (or, if None, this method) may be made again."""
+        if operation is None:
+            return method.upper() in self.methods
+        return operation.idempotent or any(fnmatchcase(operation.operation_id, p) for p in self.operations)
+
+    def delay(self, retry: int, response: Optional[rest.RESTResponse] = None) -> Optional[float]:
+        """Seconds to wait before retry number `retry` (0 for the first), or None not to make it at all."""
+        retry_after = retry_after_seconds(response.getheader('Retry-After')) if response is not None else None
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_retry_after else None
+        return self.random() * min(self.max_backoff, self.backoff * 2 ** retry)
+
+
+def leave_retries_to_policy(pool_manager: Any) -> None:
+    """Stop the pools `pool_manager` creates from now on waiting for a `Retry-After` themselves (urllib3 does, for 413,
+    429 and 503, by default) - it is a `RetryPolicy`'s to wait for, or not. Retries of connections are still theirs."""
+    retries = urllib3.Retry.from_int(pool_manager.connection_pool_kw.get('retries'))
+    pool_manager.connection_pool_kw['retries'] = retries.new(respect_retry_after_header=False)
+
+
+def retry_after_seconds(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """A `Retry-After` - seconds, or an HTTP date - as seconds from `now`."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    return max(0.0, when.timestamp() - (time.time() if now is None else now))
+
+
+def call_with_retries(attempt: Callable[[int], rest.RESTResponse], method: str, operation: Optional[Operation],
+                      policy: Optional[RetryPolicy] = None,
+                      limiter: Optional[AdaptiveLimiter] = None) -> rest.RESTResponse:
+    """`attempt(number)` - a request - made until `policy` says to stop, each under a permit of `limiter`."""
+    attempts = policy.max_attempts if policy is not None and policy.allows(method, operation) else 1
+    key = operation.operation_id if operation is not None else None
+    number = 0
+    while True:
+        last = number == attempts - 1
+        permit = limiter.acquire() if limiter is not None else None
+        try:
+            response = attempt(number)
+        except RETRY_ERRORS:
+            if permit is not None:
+                limiter.release(permit, key, overloaded=True)
+            if last:
+                raise
+            delay = policy.delay(number)
+        except BaseException:
+            if permit is not None:
+                limiter.release(permit, key)
+            raise
+        else:
+            if permit is not None:
+                limiter.release(permit, key, overloaded=response.status in OVERLOAD_STATUSES)
+            if last or response.status not in policy.statuses:
+                return response
+            delay = policy.delay(number, response)
+            if delay is None:
+                return response
+            # done with, so its connection goes back to the pool
+            response.read()
+        policy.sleep(delay)
+        number += 1
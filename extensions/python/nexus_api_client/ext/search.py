@@ -0,0 +1,186 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Run one search as many, each paged on its own connection, merging their results as they arrive.
+
+    shards = repository_shards(api_client, format='maven2')
+    for component in search_sharded(shards, api_client, workers=8, format='maven2', q='log4j'):
+        ...
+
+A search is paged by `continuationToken`, each page needing the one before - however large, it is a request at a
+time. Split into shards, each adding filters of its own to the query so that together they cover it, the shards are
+searched `workers` at a time, and their items yielded in whatever order their pages arrive:
+
+    repository_shards()    - one per repository (`GET /v1/repositories`), largest first; groups are left out, as
+                             everything in them is in their members, and a search without a repository covers those
+    prefix_shards()        - one per prefix of a field, e.g. `group` `org.a*`, `org.b*`, ... - which only covers the
+                             search if every value starts with one of them
+    combine_shards()       - every combination of shards of other fields
+
+With `dedupe`, an item (by its `id`) that more than one shard found is only yielded the first time - at the cost of
+keeping every id seen. Errors from any shard are raised from the iteration, and stop the others.
+"""
+import threading
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
+from queue import Empty, Full, Queue
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set
+
+from nexus_api_client.api_client import ApiClient
+
+from .pagination import Paginator, paginate
+from .raw import call_raw
+
+SEARCH = 'listSearch'
+SEARCH_ASSETS = 'listSearchAssets'
+LIST_REPOSITORIES = 'getAllRepositories'
+# what a search without a repository covers
+SEARCHED_TYPES = ('hosted', 'proxy')
+
+# how often a blocked shard/consumer checks whether the other side has gone away
+_POLL_INTERVAL = 0.1
+
+
+class Shard(NamedTuple):
+    """Filters (as the generated search methods take them) selecting part of a search's results."""
+    name: str
+    filters: Dict[str, str]
+
+
+def repository_shards(api_client: Optional[ApiClient] = None, *, format: Optional[str] = None,
+                      types: Sequence[str] = SEARCHED_TYPES) -> List[Shard]:
+    """A shard per repository of one of `types` (and of `format`, if given) - the largest first, so they are not
+    what the search is left waiting for at the end."""
+    repositories = [r for r in call_raw(LIST_REPOSITORIES, api_client) or []
+                    if r.get('type') in types and (format is None or r.get('format') == format)]
+    repositories.sort(key=lambda r: -(r.get('size') or 0))
+    return [Shard(r['name'], {'repository': r['name']}) for r in repositories]
+
+
+def prefix_shards(field: str, prefixes: Iterable[str]) -> List[Shard]:
+    """A shard per prefix of `field` (`group`, `name`, ...), searched for with a trailing wildcard."""
+    return [Shard(f'{field}={prefix}*', {field: f'{prefix}*'}) for prefix in prefixes]
+
+
+def combine_shards(*shards: Sequence[Shard]) -> List[Shard]:
+    """A shard for each combination of one shard from each of `shards` - which must filter different fields."""
+    combined = []
+    for parts in product(*shards):
+        filters: Dict[str, str] = {}
+        for part in parts:
+            if filters.keys() & part.filters.keys():
+                raise ValueError(f'shards {", ".join(p.name for p in parts)} filter the same field')
+            filters.update(part.filters)
+        combined.append(Shard(' '.join(p.name for p in parts), filters))
+    return combined
+
+
+class _Done:
+    pass
+
+
+class _Failed:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+def _merged_pages(paginators: Sequence[Paginator], workers: int) -> Iterator[Any]:
+    """The pages of every paginator, `workers` paginators at a time, as they arrive."""
+    buffer: Queue = Queue(maxsize=workers)
+    stopped = threading.Event()
+
+    def put(item: Any) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except Full:
+                pass
+        return False
+
+    def produce(paginator: Paginator) -> None:
+        try:
+            for page in paginator.pages():
+                if not put(page):
+                    return
+        except BaseException as e:
+            put(_Failed(e))
+            return
+        put(_Done())
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='nexus-api-client-search')
+    try:
+        for paginator in paginators:
+            executor.submit(produce, paginator)
+        remaining = len(paginators)
+        while remaining:
+            try:
+                item = buffer.get(timeout=_POLL_INTERVAL)
+            except Empty:
+                continue
+            if isinstance(item, _Done):
+                remaining -= 1
+            elif isinstance(item, _Failed):
+                raise item.error
+            else:
+                yield item
+    finally:
+        # shards still searching stop after their current request, those not yet started never do
+        stopped.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _id(item: Any) -> Any:
+    if isinstance(item, Mapping):
+        return item.get('id')
+    return getattr(item, 'id', None)
+
+
+def search_sharded(shards: Sequence[Shard], api_client: Optional[ApiClient] = None, *, operation_id: str = SEARCH,
+                   workers: int = 4, prefetch: int = 0, raw: Optional[str] = None, dedupe: bool = False,
+                   **query: Any) -> Iterator[Any]:
+    """Every item a paged search (`operation_id`) called with `query` finds, searched shard by shard, `workers`
+    shards at a time (each with `prefetch` pages requested ahead), as `raw` asks - see `pagination.paginate()`."""
+    if workers < 1:
+        raise ValueError('workers must be >= 1')
+    for shard in shards:
+        if shard.filters.keys() & query.keys():
+            raise ValueError(f'shard {shard.name} filters what the query does: '
+                             f'{", ".join(sorted(shard.filters.keys() & query.keys()))}')
+    api_client = api_client or ApiClient.get_default()
+    paginators = [paginate(operation_id, api_client, prefetch=prefetch, raw=raw, **query, **shard.filters)
+                  for shard in shards]
+    return _items(paginators, workers, dedupe)
+
+
+def _items(paginators: Sequence[Paginator], workers: int, dedupe: bool) -> Iterator[Any]:
+    seen: Set[Any] = set()
+    # all the paginators are of one operation, so any knows where the items of its pages are
+    for page in _merged_pages(paginators, workers):
+        for item in paginators[0].items(page):
+            if dedupe:
+                key = _id(item)
+                if key is not None:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+            yield item
+
+
+def search_assets_sharded(shards: Sequence[Shard], api_client: Optional[ApiClient] = None, *, workers: int = 4,
+                          **kwargs: Any) -> Iterator[Any]:
+    """`search_sharded()` of assets (`GET /v1/search/assets`) rather than components."""
+    return search_sharded(shards, api_client, operation_id=SEARCH_ASSETS, workers=workers, **kwargs)
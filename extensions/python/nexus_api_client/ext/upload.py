@@ -0,0 +1,159 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Upload many components (POST /v1/components) concurrently, streaming each file from disk.
+
+    uploads = (ComponentUpload('maven-releases', files={'maven2.asset1': path},
+                               fields={'maven2.generate-pom': 'true', ...}) for path in jars)
+    for result in upload_components(uploads, api_client, workers=8):
+        if not result.ok:
+            print(result.upload.files, result.status, result.error)
+
+The generated `ComponentsApi.create_components()` reads every file into memory before sending it; here a request body is
+the multipart framing plus the files, read `chunk_size` bytes at a time while it is sent (with a `Content-Length`, so
+NXRM sees an ordinary upload). At most `workers` uploads are in flight, and only that many more are taken from
+`uploads` ahead of them - so it can be a generator over any number of components.
+
+Through a `client.NexusApiClient`, uploads are under its `limiter` as any other request is, and made again as its
+`retry` policy says - if its `operations` include `createComponents`, as a POST is otherwise never retried.
+"""
+import mimetypes
+import os
+import time
+from typing import Any, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+from urllib3.fields import RequestField
+from urllib3.filepost import choose_boundary
+
+from nexus_api_client.api_client import ApiClient
+
+from ._concurrency import bounded_map
+from ._http import raise_for_status, send, urllib3_timeout
+from .operations import get_operation
+
+CREATE_COMPONENTS = 'createComponents'
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+FileSource = Union[str, 'os.PathLike[str]', Tuple[str, Union[str, 'os.PathLike[str]']]]
+
+
+class ComponentUpload(NamedTuple):
+    """One component: the `files` (by field, e.g. `maven2.asset1`; a path, or a `(filename, path)` pair) and the other
+    form `fields` (e.g. `maven2.groupId`) to upload to `repository`."""
+    repository: str
+    files: Mapping[str, FileSource]
+    fields: Optional[Mapping[str, str]] = None
+
+
+class UploadResult(NamedTuple):
+    upload: ComponentUpload
+    # HTTP status, if NXRM responded
+    status: Optional[int]
+    # bytes in the request body
+    size: int
+    elapsed: float
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class MultipartBody:
+    """A multipart/form-data body whose files are read from disk as it is sent - each iteration starts from the
+    beginning again, so urllib3 can retry it."""
+
+    def __init__(self, fields: Mapping[str, str], files: Mapping[str, FileSource],
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        self.boundary = choose_boundary()
+        self.chunk_size = chunk_size
+        # framing (bytes) and file paths, in the order they are sent
+        self._parts: List[Union[bytes, str]] = []
+        for name, value in fields.items():
+            self._parts.append(self._part_header(RequestField(name, value)) + value.encode('utf-8') + b'\r\n')
+        for name, source in files.items():
+            filename, path = source if isinstance(source, tuple) else (os.path.basename(source), source)
+            field = RequestField(name, b'', filename=filename)
+            content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            self._parts.append(self._part_header(field, content_type))
+            self._parts.append(os.fspath(path))
+            self._parts.append(b'\r\n')
+        self._parts.append(f'--{self.boundary}--\r\n'.encode('latin-1'))
+
+    def _part_header(self, field: RequestField, content_type: Optional[str] = None) -> bytes:
+        field.make_multipart(content_type=content_type)
+        return f'--{self.boundary}\r\n{field.render_headers()}'.encode('utf-8')
+
+    @property
+    def content_type(self) -> str:
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    def __len__(self) -> int:
+        return sum(os.path.getsize(p) if isinstance(p, str) else len(p) for p in self._parts)
+
+    def __iter__(self) -> Iterator[bytes]:
+        for part in self._parts:
+            if isinstance(part, bytes):
+                yield part
+                continue
+            with open(part, 'rb') as f:
+                while True:
+                    chunk = f.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+
+
+def _check(upload: ComponentUpload) -> None:
+    operation = get_operation(CREATE_COMPONENTS)
+    unknown = [name for name in (upload.fields or {}) if name not in operation.form_fields]
+    unknown += [name for name in upload.files if name not in operation.file_fields]
+    if unknown:
+        raise ValueError(f'Not a field of POST {operation.path}: {", ".join(sorted(unknown))}')
+
+
+def upload_component(upload: ComponentUpload, api_client: Optional[ApiClient] = None,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE, _request_timeout: Any = None) -> UploadResult:
+    """Upload one component, streaming its files. Failures (including `ApiException`s) are returned, not raised."""
+    api_client = api_client or ApiClient.get_default()
+    started = time.monotonic()
+    body = None
+    try:
+        _check(upload)
+        operation = get_operation(CREATE_COMPONENTS)
+        body = MultipartBody(upload.fields or {}, upload.files, chunk_size)
+        method, url, headers, _, _ = api_client.param_serialize(
+            method=operation.method, resource_path=operation.path, query_params=[('repository', upload.repository)],
+            header_params={'Content-Type': body.content_type, 'Content-Length': str(len(body))},
+            # every operation uses the document's security - the generated methods list the same
+            auth_settings=list(api_client.configuration.auth_settings())
+        )
+        response = send(api_client, method, operation, lambda: api_client.rest_client.pool_manager.request(
+            method, url, body=body, headers=headers, timeout=urllib3_timeout(_request_timeout)
+        ))
+        raise_for_status(response)
+        return UploadResult(upload, response.status, len(body), time.monotonic() - started)
+    except Exception as e:
+        return UploadResult(upload, getattr(e, 'status', None), len(body) if body is not None else 0,
+                            time.monotonic() - started, e)
+
+
+def upload_components(uploads: Iterable[ComponentUpload], api_client: Optional[ApiClient] = None, *,
+                      workers: int = 4, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      _request_timeout: Any = None) -> Iterator[UploadResult]:
+    """Upload every component in `uploads`, up to `workers` at a time, yielding a result for each as it completes."""
+    api_client = api_client or ApiClient.get_default()
+    return bounded_map(lambda upload: upload_component(upload, api_client, chunk_size, _request_timeout), uploads,
+                       workers, 'upload')
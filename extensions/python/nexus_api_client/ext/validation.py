@@ -0,0 +1,459 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Check NXRM's responses against the (patched) spec the client was generated from - live, or recorded.
+
+    validator = ResponseValidator(sample=0.05)    # 5% of responses, each logged if it does not match
+    api_client = NexusApiClient(configuration, validator=validator)
+    ...
+    print(validator.stats())
+
+    python -m nexus_api_client.ext.validation recorded/*.json    # {method, path, statusCode, responseAsJson}
+
+A response matches if its JSON body is valid against the schema of its status - a success must be documented (NXRM
+documents many only as `default`, which is taken to be the success); an error need only match if it is. Each schema
+is compiled, the first time it is needed, into nested checks - one per (operationId, status), sharing one per
+component schema - so checking a response is a single walk over its JSON.
+
+What is checked is what the generated models would reject: types, `required`, `enum`, `nullable`, lengths, `pattern`,
+bounds and `allOf`/`oneOf`/`anyOf` (any one matching). As in the models, a property that is not required may be null,
+and properties the schema does not mention are allowed unless `additionalProperties` is false. Formats are not
+checked. A response is only checked once its body has been read, so streamed downloads are never checked.
+"""
+import argparse
+import json
+import logging
+import random
+import re
+import sys
+import threading
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Union
+
+from nexus_api_client import rest
+
+from .operations import Operation, find_operation
+from .raw import loads
+
+logger = logging.getLogger(__name__)
+
+# violations reported per response, at most
+MAX_VIOLATIONS = 20
+# a JSON type -> what it decodes to (bool is an int too, so is excluded from integers and numbers separately)
+JSON_TYPES = {'string': str, 'boolean': bool, 'array': list, 'object': dict, 'integer': int, 'number': (int, float)}
+
+
+class Violation(NamedTuple):
+    # JSON Pointer into the response body ('' for the body, or the status)
+    pointer: str
+    message: str
+
+    def __str__(self) -> str:
+        return f'{self.pointer or "/"}: {self.message}'
+
+
+class ValidationResult(NamedTuple):
+    operation_id: Optional[str]
+    status: int
+    violations: List[Violation]
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations
+
+    def __str__(self) -> str:
+        return (f'{self.operation_id or "(unknown operation)"} {self.status}: '
+                + ('valid' if self.ok else '; '.join(str(v) for v in self.violations)))
+
+
+class ValidatorStats(NamedTuple):
+    checked: int
+    invalid: int
+    # responses not sampled
+    skipped: int
+    # operationId -> invalid responses
+    invalid_by_operation: Dict[Optional[str], int]
+
+
+Check = Callable[[Any, str, List[Violation]], None]
+
+
+def _type_name(value: Any) -> str:
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, (int, float)):
+        return 'number'
+    return {str: 'string', list: 'array', dict: 'object'}.get(type(value), type(value).__name__)
+
+
+def _escape(key: str) -> str:
+    return key.replace('~', '~0').replace('/', '~1')
+
+
+def _leaf(schema: Any) -> Optional[tuple]:
+    """(type, Python type) of a schema that only has a type."""
+    if isinstance(schema, dict) and schema.keys() == {'type'} and schema['type'] in JSON_TYPES:
+        return schema['type'], JSON_TYPES[schema['type']]
+    return None
+
+
+def _valid(_value: Any, _pointer: str, _violations: List[Violation]) -> None:
+    pass
+
+
+class SchemaCompiler:
+    """Compiles schemas (as `generate-extensions.py` writes them to `_schemas.py`) to checks - each component schema
+    once, however many schemas reference it."""
+
+    def __init__(self, schemas: Dict[str, Any]) -> None:
+        self.schemas = schemas
+        self._components: Dict[str, Check] = {}
+        # reentrant, as compiling a component compiles those it references
+        self._lock = threading.RLock()
+
+    def component(self, name: str) -> Check:
+        check = self._components.get(name)
+        if check is None:
+            with self._lock:
+                check = self._components.get(name)
+                if check is None:
+                    # a schema that references itself (however indirectly) reaches this while it is being compiled
+                    compiled: List[Check] = []
+                    self._components[name] = lambda v, p, out: compiled[0](v, p, out)
+                    compiled.append(self.compile(self.schemas.get(name) or {}))
+                    check = self._components[name] = compiled[0]
+        return check
+
+    def compile(self, schema: Optional[Dict[str, Any]]) -> Check:
+        if not schema:
+            return _valid
+        if '$ref' in schema:
+            return self.component(schema['$ref'])
+        checks: List[Check] = []
+        for keyword in ('allOf', 'oneOf', 'anyOf'):
+            if keyword in schema:
+                checks.append(self._any_of(schema[keyword]) if keyword != 'allOf' else self._all_of(schema[keyword]))
+        json_type = schema.get('type')
+        if 'enum' in schema:
+            checks.append(self._enum(schema['enum']))
+        if any(k in schema for k in ('minLength', 'maxLength', 'pattern')):
+            checks.append(self._string(schema))
+        if 'minimum' in schema or 'maximum' in schema:
+            checks.append(self._bounds(schema))
+        if any(k in schema for k in ('items', 'minItems', 'maxItems')):
+            checks.append(self._array(schema))
+        if 'properties' in schema or 'required' in schema or 'additionalProperties' in schema:
+            checks.append(self._object(schema))
+        nullable = schema.get('nullable') in (True, 'true')
+        python_type = JSON_TYPES.get(json_type)
+
+        def check(value: Any, pointer: str, violations: List[Violation]) -> None:
+            if value is None:
+                if not nullable and (json_type is not None or checks):
+                    violations.append(Violation(pointer, f'expected {json_type or "a value"}, got null'))
+                return
+            if python_type is not None and (not isinstance(value, python_type) or
+                                            value.__class__ is bool and json_type != 'boolean'):
+                violations.append(Violation(pointer, f'expected {json_type}, got {_type_name(value)}'))
+                return
+            for c in checks:
+                c(value, pointer, violations)
+
+        return check
+
+    def _all_of(self, schemas: Sequence[Dict[str, Any]]) -> Check:
+        checks = [self.compile(s) for s in schemas]
+
+        def check(value: Any, pointer: str, violations: List[Violation]) -> None:
+            for c in checks:
+                c(value, pointer, violations)
+
+        return check
+
+    def _any_of(self, schemas: Sequence[Dict[str, Any]]) -> Check:
+        checks = [self.compile(s) for s in schemas]
+
+        def check(value: Any, pointer: str, violations: List[Violation]) -> None:
+            for c in checks:
+                attempt: List[Violation] = []
+                c(value, pointer, attempt)
+                if not attempt:
+                    return
+            violations.append(Violation(pointer, f'matches none of {len(checks)} schemas'))
+
+        return check
+
+    @staticmethod
+    def _enum(values: Sequence[Any]) -> Check:
+        allowed = set(v for v in values if v is not None)
+
+        def check(value: Any, pointer: str, violations: List[Violation]) -> None:
+            if isinstance(value, (str, int, float, bool)) and value not in allowed:
+                violations.append(Violation(pointer, f'{value!r} is not one of {sorted(allowed, key=str)}'))
+
+        return check
+
+    @staticmethod
+    def _string(schema: Dict[str, Any]) -> Check:
+        min_length, max_length = schema.get('minLength'), schema.get('maxLength')
+        pattern = re.compile(schema['pattern']) if 'pattern' in schema else None
+
+        def check(value: Any, pointer: str, violations: List[Violation]) -> None:
+            if not isinstance(value, str):
+                return
+            if min_length is not None and len(value) < min_length:
+                violations.append(Violation(pointer, f'shorter than {min_length}'))
+            if max_length is not None and len(value) > max_length:
+                violations.append(Violation(pointer, f'longer than {max_length}'))
+            if pattern is not None and not pattern.match(value):
+                violations.append(Violation(pointer, f'{value!r} does not match {pattern.pattern!r}'))
+
+        return check
+
+    @staticmethod
+    def _bounds(schema: Dict[str, Any]) -> Check:
+        minimum, maximum = schema.get('minimum'), schema.get('maximum')
+
+        def check(value: Any, pointer: str, violations: List[Violation]) -> None:
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                return
+            if minimum is not None and value < minimum:
+                violations.append(Violation(pointer, f'{value} is less than {minimum}'))
+            if maximum is not None and value > maximum:
+                violations.append(Violation(pointer, f'{value} is more than {maximum}'))
+
+        return check
+
+    def _array(self, schema: Dict[str, Any]) -> Check:
+        items = self.compile(schema.get('items'))
+        min_items, max_items = schema.get('minItems'), schema.get('maxItems')
+
+        def check(value: Any, pointer: str, violations: List[Violation]) -> None:
+            if not isinstance(value, list):
+                return
+            if min_items is not None and len(value) < min_items:
+                violations.append(Violation(pointer, f'fewer than {min_items} items'))
+            if max_items is not None and len(value) > max_items:
+                violations.append(Violation(pointer, f'more than {max_items} items'))
+            if items is not _valid:
+                for i, item in enumerate(value):
+                    items(item, f'{pointer}/{i}', violations)
+                    if len(violations) >= MAX_VIOLATIONS:
+                        return
+
+        return check
+
+    def _object(self, schema: Dict[str, Any]) -> Check:
+        # properties that only have a type (most of them) are checked here, without a call (or a pointer) each
+        leaves = {name: _leaf(s) for name, s in (schema.get('properties') or {}).items() if _leaf(s) is not None}
+        properties = {name: (self.compile(s), _escape(name)) for name, s in (schema.get('properties') or {}).items()
+                      if name not in leaves}
+        required = list(schema.get('required') or ())
+        additional = schema.get('additionalProperties')
+        extra_leaf = _leaf(additional)
+        extra = self.compile(additional) if isinstance(additional, dict) and extra_leaf is None else None
+
+        def check(value: Any, pointer: str, violations: List[Violation]) -> None:
+            if not isinstance(value, dict):
+                return
+            for name in required:
+                if value.get(name) is None:
+                    violations.append(Violation(f'{pointer}/{_escape(name)}',
+                                                'is required' if name not in value else 'is required, got null'))
+            for name, item in value.items():
+                # as in the models, only what is required must not be null
+                if item is None:
+                    continue
+                leaf = leaves.get(name)
+                if leaf is not None:
+                    if not isinstance(item, leaf[1]) or item.__class__ is bool and leaf[0] != 'boolean':
+                        violations.append(Violation(f'{pointer}/{_escape(name)}',
+                                                    f'expected {leaf[0]}, got {_type_name(item)}'))
+                    continue
+                known = properties.get(name)
+                if known is not None:
+                    known[0](item, f'{pointer}/{known[1]}', violations)
+                elif additional is False:
+                    violations.append(Violation(f'{pointer}/{_escape(name)}', 'is not allowed'))
+                elif extra_leaf is not None:
+                    if not isinstance(item, extra_leaf[1]) or item.__class__ is bool and extra_leaf[0] != 'boolean':
+                        violations.append(Violation(f'{pointer}/{_escape(name)}',
+                                                    f'expected {extra_leaf[0]}, got {_type_name(item)}'))
+                elif extra is not None:
+                    extra(item, f'{pointer}/{_escape(name)}', violations)
+            del violations[MAX_VIOLATIONS:]
+
+        return check
+
+
+class ResponseValidator:
+    """Checks responses against the spec - each response of a `sample` (0-1) of them, at random - and reports those
+    that do not match to `on_invalid` (by default, a warning logged), or raises `ResponseValidationError` if `strict`.
+    Thread-safe - share one between clients."""
+
+    def __init__(self, sample: float = 1.0, *, on_invalid: Optional[Callable[[ValidationResult], Any]] = None,
+                 strict: bool = False, random: Callable[[], float] = random.random) -> None:
+        if not 0 <= sample <= 1:
+            raise ValueError('sample must be between 0 and 1')
+        from ._schemas import RESPONSES, SCHEMAS
+
+        self.sample = sample
+        self.on_invalid = on_invalid
+        self.strict = strict
+        self.random = random
+        self.responses: Dict[str, Dict[str, Any]] = RESPONSES
+        self.compiler = SchemaCompiler(SCHEMAS)
+        # (operationId, status) -> check of the body, or None if the status is not documented
+        self._checks: Dict[tuple, Optional[Check]] = {}
+        self._lock = threading.Lock()
+        self._checked = self._invalid = self._skipped = 0
+        self._invalid_by_operation: Dict[Optional[str], int] = {}
+
+    def _check(self, operation_id: str, status: int) -> Optional[Check]:
+        key = (operation_id, status)
+        if key not in self._checks:
+            responses = self.responses.get(operation_id, {})
+            code = str(status)
+            if code in responses:
+                check: Optional[Check] = self.compiler.compile(responses[code])
+            elif f'{code[0]}XX' in responses:
+                check = self.compiler.compile(responses[f'{code[0]}XX'])
+            elif not 200 <= status <= 299:
+                # an error NXRM does not document is raised by the generated client all the same
+                check = _valid
+            elif 'default' in responses:
+                check = self.compiler.compile(responses['default'])
+            else:
+                check = None
+            self._checks[key] = check
+        return self._checks[key]
+
+    def validate(self, operation_id: Optional[str], status: int, body: Union[bytes, str, None, Any],
+                 decoded: bool = False) -> ValidationResult:
+        """Whether a response of `operation_id` with `status` and `body` (JSON - or, if `decoded`, what it decodes
+        to) matches the spec. Responses of no known operation always do."""
+        if operation_id is None or operation_id not in self.responses:
+            return ValidationResult(operation_id, status, [])
+        check = self._check(operation_id, status)
+        if check is None:
+            return ValidationResult(operation_id, status, [Violation('', f'status {status} is not documented')])
+        violations: List[Violation] = []
+        if check is not _valid:
+            if not decoded:
+                if not body:
+                    return ValidationResult(operation_id, status, [Violation('', 'expected a JSON body, got none')])
+                try:
+                    body = loads(body)
+                except ValueError as e:
+                    return ValidationResult(operation_id, status, [Violation('', f'is not JSON: {e}')])
+            check(body, '', violations)
+        return ValidationResult(operation_id, status, violations[:MAX_VIOLATIONS])
+
+    def report(self, result: ValidationResult) -> None:
+        with self._lock:
+            self._checked += 1
+            if not result.ok:
+                self._invalid += 1
+                self._invalid_by_operation[result.operation_id] = \
+                    self._invalid_by_operation.get(result.operation_id, 0) + 1
+        if result.ok:
+            return
+        if self.on_invalid is not None:
+            self.on_invalid(result)
+        else:
+            logger.warning('Response does not match the spec: %s', result)
+        if self.strict:
+            raise ResponseValidationError(result)
+
+    def wrap(self, operation: Optional[Operation], response: rest.RESTResponse) -> rest.RESTResponse:
+        """`response`, checked once its body is read - if it is one of the sample."""
+        if operation is None or (self.sample < 1 and self.random() >= self.sample):
+            with self._lock:
+                self._skipped += 1
+            return response
+        return ValidatedResponse(response, operation.operation_id, self)
+
+    def stats(self) -> ValidatorStats:
+        with self._lock:
+            return ValidatorStats(self._checked, self._invalid, self._skipped, dict(self._invalid_by_operation))
+
+
+class ResponseValidationError(Exception):
+
+    def __init__(self, result: ValidationResult) -> None:
+        super().__init__(str(result))
+        self.result = result
+
+
+class ValidatedResponse(rest.RESTResponse):
+    """A `rest.RESTResponse` checked by a `ResponseValidator` when its body is first read."""
+
+    def __init__(self, response: rest.RESTResponse, operation_id: str, validator: ResponseValidator) -> None:
+        super().__init__(response.response)
+        self._inner = response
+        self._operation_id = operation_id
+        self._validator = validator
+
+    def read(self):
+        if self.data is None:
+            self.data = self._inner.read()
+            self._validator.report(self._validator.validate(self._operation_id, self.status, self.data))
+        return self.data
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+def validate_recorded(records: Iterable[Dict[str, Any]], validator: Optional[ResponseValidator] = None,
+                      base_path: str = '/service/rest') -> List[ValidationResult]:
+    """Check recorded responses - each a `method`, `path` (from `base_path`, or below it), `statusCode` and
+    `responseAsJson` (the JSON, as text), as Postman sends them to openapi-request-response-validation."""
+    validator = validator or ResponseValidator()
+    results = []
+    for record in records:
+        path = record['path'].split('?', 1)[0]
+        if base_path and path.startswith(base_path):
+            path = path[len(base_path):]
+        operation = find_operation(record['method'].upper(), path)
+        body = record.get('responseAsJson')
+        results.append(validator.validate(operation.operation_id if operation is not None else None,
+                                          int(record['statusCode']), body,
+                                          decoded=not isinstance(body, (str, bytes, type(None)))))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Check recorded NXRM responses against the spec the client was '
+                                                 'generated from.')
+    parser.add_argument('files', metavar='FILE', nargs='+',
+                        help='JSON files, each a recorded response (or a list of them): `method`, `path`, '
+                             '`statusCode` and `responseAsJson`')
+    parser.add_argument('--base-path', default='/service/rest',
+                        help='Where the REST API is, to strip from recorded paths (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    invalid = 0
+    for name in args.files:
+        with open(name, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        for result in validate_recorded(records if isinstance(records, list) else [records], base_path=args.base_path):
+            invalid += not result.ok
+            print(f'{name}: {result}')
+    return 1 if invalid else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
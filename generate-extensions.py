@@ -0,0 +1,103 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import argparse
+import os.path
+import shutil
+import sys
+from typing import Any, Callable
+
+import yaml
+
+from nxrm_spec.extensions import PythonExtensions, python_lazy_init, unpaged
+from nxrm_spec.serialize import load_spec, output_path, write_if_changed
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+EXTENSIONS_DIR = os.path.join(ROOT_DIR, 'extensions')
+# the generated `__init__.py`s that import every API and model
+LAZY_INITS = ('__init__.py', os.path.join('api', '__init__.py'), os.path.join('models', '__init__.py'))
+
+
+def generate_python(spec: dict[str, Any], config: dict[str, Any], output_dir: str) -> list[str]:
+    package = config['additionalProperties']['packageName']
+    extensions = PythonExtensions(spec, package, asyncio=config['additionalProperties'].get('library') == 'asyncio')
+    ext_dir = os.path.join(output_dir, package, 'ext')
+    sources = [('_operations.py', extensions.render_operations()), ('paginators.py', extensions.render_paginators())]
+    if not extensions.asyncio:
+        sources.append(('_schemas.py', extensions.render_schemas()))
+    for name, content in sources:
+        if write_if_changed(os.path.join(ext_dir, name), content):
+            print(f'     Wrote {os.path.relpath(os.path.join(ext_dir, name))}')
+    for init in LAZY_INITS:
+        path = os.path.join(output_dir, package, init)
+        with open(path, 'r', encoding='utf-8') as f:
+            content = python_lazy_init(f.read(), package)
+        if content is not None:
+            write_if_changed(path, content)
+            print(f'     Made {os.path.relpath(path)} import lazily')
+    return extensions.check(os.path.join(output_dir, package))
+
+
+# language (batch config and directory under `extensions/`) -> generator of the sources that depend on the spec
+LANGUAGES: dict[str, Callable[[dict[str, Any], dict[str, Any], str], list[str]]] = {
+    'python': generate_python,
+    'python-asyncio': generate_python,
+}
+
+parser = argparse.ArgumentParser(
+    description='Add our hand-written extensions (`extensions/LANGUAGE`), and the code generated for them from the '
+                'spec, to a client openapi-generator has generated from a batch config (`LANGUAGE.yaml`).'
+)
+parser.add_argument('languages', metavar='LANGUAGE', nargs='*',
+                    help=f'Client(s) to extend (default: all of {", ".join(LANGUAGES)})')
+parser.add_argument('--spec', metavar='FILE', default=output_path('yaml'),
+                    help='The spec the client was generated from (default: %(default)s)')
+parser.add_argument('--output-dir', metavar='DIR',
+                    help='Where the client was generated, if not the `outputDir` in its batch config (relative to '
+                         'this repository, as in CI)')
+args = parser.parse_args()
+
+languages = args.languages or list(LANGUAGES)
+unknown = [language for language in languages if language not in LANGUAGES]
+if unknown:
+    parser.error(f'no extensions for {", ".join(unknown)} - choose from {", ".join(LANGUAGES)}')
+if args.output_dir and len(languages) > 1:
+    parser.error('--output-dir can only be used with a single LANGUAGE')
+
+print(f'Loading {os.path.relpath(args.spec)}...')
+spec = load_spec(args.spec)
+for operation in unpaged(spec):
+    print(f'   {operation.operation_id} takes a continuationToken, but the spec does not describe its pages - '
+          f'no paginator')
+
+problems = []
+for language in languages:
+    with open(os.path.join(ROOT_DIR, f'{language}.yaml'), 'r') as f:
+        config = yaml.safe_load(f)
+    output_dir = args.output_dir or os.path.join(ROOT_DIR, config['outputDir'].replace('/local/', '', 1))
+    if not os.path.isdir(output_dir):
+        print(f'{os.path.relpath(output_dir)} does not exist - generate the {language} client first')
+        sys.exit(1)
+
+    print(f'Extending the {language} client in {os.path.relpath(output_dir)}...')
+    shutil.copytree(os.path.join(EXTENSIONS_DIR, language), output_dir, dirs_exist_ok=True)
+    problems += [f'{language}: {p}' for p in LANGUAGES[language](spec, config, output_dir)]
+    print('     Done')
+
+if problems:
+    print('The generated client does not match what the extensions expect:')
+    for problem in problems:
+        print(f'   {problem}')
+    sys.exit(1)
@@ -0,0 +1,189 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Vendor extensions telling clients how each operation behaves, run by `update-spec.py` once the spec is patched:
+
+    x-paginated:   {tokenParameter: continuationToken, tokenField: continuationToken, itemsField: items}
+    x-idempotent:  true
+    x-cacheable:   {ttl: 60}
+    x-invalidates: [Repository Management, 'Security management: privileges']
+
+- `x-paginated` - the operation takes a `continuationToken` query parameter and returns an object with the next one
+  and a single array of items
+- `x-idempotent` - making the request twice does no more than making it once: GET, HEAD, OPTIONS, PUT and DELETE
+  (it is left out, rather than false, on anything else)
+- `x-cacheable` - a GET of configuration (not paged, and with a JSON response) that can be reused for `ttl` seconds
+- `x-invalidates` - on anything else, the resource families (tags) whose cached responses it may make stale: its own,
+  and those of the GETs below the collection it changes
+
+Each is derived from the method, the path and the response schema, then `ANNOTATION_OVERRIDES` are applied - for what
+NXRM's spec cannot tell us (runtime state that looks like configuration, undocumented responses, side effects).
+"""
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from typing import Any
+
+from .diff import HTTP_METHODS
+
+PAGINATED = 'x-paginated'
+IDEMPOTENT = 'x-idempotent'
+CACHEABLE = 'x-cacheable'
+INVALIDATES = 'x-invalidates'
+EXTENSIONS = (PAGINATED, IDEMPOTENT, CACHEABLE, INVALIDATES)
+
+CONTINUATION_TOKEN = 'continuationToken'
+IDEMPOTENT_METHODS = frozenset({'get', 'head', 'options', 'put', 'delete'})
+SAFE_METHODS = frozenset({'get', 'head', 'options'})
+# seconds a cacheable response is good for, unless overridden
+DEFAULT_TTL = 60
+SCHEMA_REF_PREFIX = '#/components/schemas/'
+
+PRIVILEGES = 'Security management: privileges'
+
+# operationId (or `fnmatch` pattern) -> extensions to set on it (None removes one), applied in order after derivation
+ANNOTATION_OVERRIDES: dict[str, dict[str, Any]] = {
+    # runtime state rather than configuration - it changes without anything being changed through the API
+    'listStatus*': {CACHEABLE: None},
+    'getStatusCheck': {CACHEABLE: None},
+    'listSystem*': {CACHEABLE: None},
+    'listTasks': {CACHEABLE: None},
+    'getTasks': {CACHEABLE: None},
+    'getBlobstoresQuotaStatus': {CACHEABLE: None},
+    'listMonthlyMetrics': {CACHEABLE: None},
+    'listUsageHistory': {CACHEABLE: None},
+    'listMaliciousRisk*': {CACHEABLE: None},
+    'listSecurityIpAllowlistCurrentIp': {CACHEABLE: None},
+    'listSecurityUserTokens*': {CACHEABLE: None},
+    'getSecurityUsersUserToken': {CACHEABLE: None},
+    'listIqAudit': {CACHEABLE: None},
+    'getIqAudit': {CACHEABLE: None},
+    # content, not configuration - and searches are answered from an index that lags behind it
+    'getAssets': {CACHEABLE: None},
+    'getComponents': {CACHEABLE: None},
+    'getTags': {CACHEABLE: None},
+    'listSearch*': {CACHEABLE: None},
+    'get{repositoryname}BrowseRepository': {CACHEABLE: None},
+    # the certificate of a remote host, fetched on each request
+    'listSecuritySsl': {CACHEABLE: None},
+    # read-mostly configuration whose successful response NXRM does not document
+    'listSecurityRoles': {CACHEABLE: {'ttl': DEFAULT_TTL}},
+    'getSecurityRoles': {CACHEABLE: {'ttl': DEFAULT_TTL}},
+    'listRoutingRules': {CACHEABLE: {'ttl': DEFAULT_TTL}},
+    'getRoutingRules': {CACHEABLE: {'ttl': DEFAULT_TTL}},
+    'listSecurityRealms*': {CACHEABLE: {'ttl': DEFAULT_TTL}},
+    # NXRM creates (and deletes) the `nx-repository-...` privileges of each repository along with it
+    'create[A-Z]*Repository': {INVALIDATES: ['Repository Management', PRIVILEGES]},
+    'deleteRepositories': {INVALIDATES: ['Repository Management', PRIVILEGES]},
+    # a POST, but emptying a proxy's caches twice leaves them as empty as once
+    'create{repositoryname}Invalidate-cacheRepository': {IDEMPOTENT: True},
+}
+
+
+@dataclass
+class AnnotationReport:
+    # extension -> operations now carrying it
+    counts: dict[str, int] = field(default_factory=dict)
+    # override patterns that matched no operation (NXRM renamed or dropped them)
+    unused_overrides: list[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return ', '.join(f'{self.counts.get(e, 0)} {e}' for e in EXTENSIONS)
+
+
+def _schema(spec: dict[str, Any], schema: dict[str, Any] | None) -> dict[str, Any] | None:
+    ref = (schema or {}).get('$ref', '')
+    if ref.startswith(SCHEMA_REF_PREFIX):
+        return spec.get('components', {}).get('schemas', {}).get(ref[len(SCHEMA_REF_PREFIX):])
+    return schema
+
+
+def response_schema(operation: dict[str, Any]) -> dict[str, Any] | None:
+    """The JSON schema of a successful response - NXRM documents many only as `default`."""
+    responses = operation.get('responses', {})
+    for code in ('200', '201', 'default'):
+        media = responses.get(code, {}).get('content', {}).get('application/json')
+        if media is not None and media.get('schema'):
+            return media['schema']
+    return None
+
+
+def pagination(spec: dict[str, Any], parameters: list[dict[str, Any]],
+               schema: dict[str, Any] | None) -> dict[str, str] | None:
+    """`x-paginated` for an operation taking `parameters` and returning `schema`, if it is paged."""
+    if not any(p.get('name') == CONTINUATION_TOKEN and p.get('in') == 'query' for p in parameters):
+        return None
+    properties = (_schema(spec, schema) or {}).get('properties', {})
+    arrays = [k for k, v in properties.items() if v.get('type') == 'array']
+    if CONTINUATION_TOKEN not in properties or len(arrays) != 1:
+        return None
+    return {'tokenParameter': CONTINUATION_TOKEN, 'tokenField': CONTINUATION_TOKEN, 'itemsField': arrays[0]}
+
+
+def _collection(path: str) -> str:
+    """The collection a path is in: everything before its first parameter (`/v1/security/users/{userId}` is in
+    `/v1/security/users`)."""
+    return path.split('/{', 1)[0].rstrip('/')
+
+
+def _tag(operation: dict[str, Any]) -> str:
+    return (operation.get('tags') or ['default'])[0]
+
+
+def annotate_spec(spec: dict[str, Any],
+                  overrides: dict[str, dict[str, Any]] | None = None) -> AnnotationReport:
+    """Set (or replace) the extensions on every operation in `spec`, in place."""
+    overrides = ANNOTATION_OVERRIDES if overrides is None else overrides
+    operations = [(path, method, operation, path_item.get('parameters', []) + operation.get('parameters', []))
+                  for path, path_item in spec.get('paths', {}).items()
+                  for method, operation in path_item.items()
+                  if method in HTTP_METHODS and isinstance(operation, dict)]
+    # the families of the GETs in each collection (and in those below it)
+    readers: dict[str, set[str]] = {}
+    for path, method, operation, _ in operations:
+        if method == 'get':
+            readers.setdefault(_collection(path), set()).add(_tag(operation))
+
+    used: set[str] = set()
+    report = AnnotationReport()
+    for path, method, operation, parameters in operations:
+        for extension in EXTENSIONS:
+            operation.pop(extension, None)
+        schema = response_schema(operation)
+        paged = pagination(spec, parameters, schema)
+        if paged is not None:
+            operation[PAGINATED] = paged
+        if method in IDEMPOTENT_METHODS:
+            operation[IDEMPOTENT] = True
+        if method == 'get' and paged is None and schema is not None:
+            operation[CACHEABLE] = {'ttl': DEFAULT_TTL}
+        if method not in SAFE_METHODS:
+            collection = _collection(path)
+            families = {tag for c, tags in readers.items() if c == collection or c.startswith(f'{collection}/')
+                        for tag in tags}
+            operation[INVALIDATES] = [_tag(operation)] + sorted(families - {_tag(operation)})
+
+        for pattern, extensions in overrides.items():
+            if 'operationId' in operation and fnmatchcase(operation['operationId'], pattern):
+                used.add(pattern)
+                for extension, value in extensions.items():
+                    if value is None:
+                        operation.pop(extension, None)
+                    else:
+                        operation[extension] = value
+        for extension in EXTENSIONS:
+            if operation.get(extension):
+                report.counts[extension] = report.counts.get(extension, 0) + 1
+    report.unused_overrides = [pattern for pattern in overrides if pattern not in used]
+    return report
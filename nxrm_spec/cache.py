@@ -0,0 +1,148 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Content-addressed cache for spec refreshes.
+
+Entries are keyed by hashes of their inputs, so a refresh against an unchanged server (or a second server running the
+same version) reuses earlier work:
+
+- `swagger`:   the Swagger 2.0 document, keyed by its own hash (lets a `304 Not Modified` fetch be served locally)
+- `converted`: the OpenAPI 3 conversion, keyed by swagger hash + converter hash
+- `patched`:   the patched (and annotated) spec, keyed by converted key + patch set hash + NXRM version
+- `output`:    each serialized output file, keyed by patched key + serializer hash + format
+"""
+import glob
+import hashlib
+import json
+import os
+import os.path
+import tempfile
+from typing import Any, Iterable
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(PACKAGE_DIR), '.spec-cache')
+DEFAULT_MAX_ENTRIES = 20
+
+# Modules whose behaviour determines each stage's output - editing one invalidates that stage's entries
+CONVERTER_SOURCES = ('convert.py',)
+PATCH_SOURCES = ('annotate.py', 'paths.py', 'patches.py', 'patch_table.py', 'pointer.py')
+SERIALIZER_SOURCES = ('serialize.py',)
+
+
+def _sha256(*parts: bytes) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(len(part).to_bytes(8, 'big'))
+        h.update(part)
+    return h.hexdigest()
+
+
+def document_hash(document: Any) -> str:
+    """Hash of a JSON document that ignores key order and whitespace."""
+    return _sha256(json.dumps(document, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8'))
+
+
+def files_hash(paths: Iterable[str]) -> str:
+    contents = []
+    for path in sorted(paths):
+        with open(path, 'rb') as f:
+            contents.extend((os.path.basename(path).encode('utf-8'), f.read()))
+    return _sha256(*contents)
+
+
+def converter_hash(remote: bool = False) -> str:
+    if remote:
+        return 'remote'
+    return files_hash(os.path.join(PACKAGE_DIR, s) for s in CONVERTER_SOURCES)
+
+
+def patch_set_hash(table: list[dict[str, Any]], snippets_dir: str) -> str:
+    """Hash of everything that decides what patching does: the table itself, the snippets it may load and the code
+    that applies it (which includes the generators)."""
+    return _sha256(
+        document_hash(table).encode('utf-8'),
+        files_hash(glob.glob(os.path.join(snippets_dir, '*.json'))).encode('utf-8'),
+        files_hash(os.path.join(PACKAGE_DIR, s) for s in PATCH_SOURCES).encode('utf-8'),
+    )
+
+
+def serializer_hash() -> str:
+    return files_hash(os.path.join(PACKAGE_DIR, s) for s in SERIALIZER_SOURCES)
+
+
+def combine(*keys: str) -> str:
+    return _sha256(*(k.encode('utf-8') for k in keys))
+
+
+class SpecCache:
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.directory = directory
+        self.max_entries = max_entries
+
+    def _path(self, kind: str, key: str, extension: str) -> str:
+        return os.path.join(self.directory, kind, f'{key}.{extension}')
+
+    def _read(self, path: str) -> bytes | None:
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        # Touch so pruning keeps recently used entries
+        os.utime(path)
+        return data
+
+    def _write(self, path: str, data: bytes) -> None:
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._prune(directory)
+
+    def _prune(self, directory: str) -> None:
+        entries = [e for e in os.scandir(directory) if e.is_file() and not e.name.startswith('.tmp-')]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+        for e in entries[self.max_entries:]:
+            os.unlink(e.path)
+
+    def get_json(self, kind: str, key: str) -> Any | None:
+        data = self._read(self._path(kind, key, 'json'))
+        return None if data is None else json.loads(data)
+
+    def put_json(self, kind: str, key: str, value: Any) -> None:
+        self._write(self._path(kind, key, 'json'), json.dumps(value, separators=(',', ':')).encode('utf-8'))
+
+    def get_text(self, kind: str, key: str, extension: str = 'yaml') -> str | None:
+        data = self._read(self._path(kind, key, extension))
+        return None if data is None else data.decode('utf-8')
+
+    def put_text(self, kind: str, key: str, value: str, extension: str = 'yaml') -> None:
+        self._write(self._path(kind, key, extension), value.encode('utf-8'))
+
+    def get_fetch_metadata(self, url: str) -> dict[str, Any] | None:
+        """What we know about the last successful fetch of `url` - used to make the next fetch conditional."""
+        return self.get_json('fetch', _sha256(url.encode('utf-8')))
+
+    def put_fetch_metadata(self, url: str, metadata: dict[str, Any]) -> None:
+        self.put_json('fetch', _sha256(url.encode('utf-8')), metadata)
@@ -0,0 +1,314 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Local Swagger 2.0 -> OpenAPI 3.0 conversion.
+
+This mirrors what https://converter.swagger.io produces for the Swagger 2.0 constructs that Sonatype Nexus Repository
+actually emits, so a spec refresh no longer depends on (or waits on) a public service.
+"""
+import copy
+from typing import Any
+
+OPENAPI_VERSION = '3.0.1'
+REMOTE_CONVERTER_URL = 'https://converter.swagger.io/api/convert'
+
+DEFAULT_MEDIA_TYPE = '*/*'
+FORM_MEDIA_TYPES = ('multipart/form-data', 'application/x-www-form-urlencoded')
+HTTP_METHODS = ('get', 'put', 'post', 'delete', 'options', 'head', 'patch')
+
+# Keys that live on a Swagger 2.0 non-body parameter but belong in the OpenAPI 3 `schema` of that parameter
+PARAMETER_SCHEMA_KEYS = (
+    'type', 'format', 'items', 'default', 'enum', 'maximum', 'exclusiveMaximum', 'minimum', 'exclusiveMinimum',
+    'maxLength', 'minLength', 'pattern', 'maxItems', 'minItems', 'uniqueItems', 'multipleOf'
+)
+PARAMETER_KEYS = ('description', 'in', 'name', 'required', 'allowEmptyValue', 'deprecated')
+
+# `collectionFormat` -> (style, explode) for query parameters; anything else (including no `collectionFormat`, which
+# is how NXRM describes scalar parameters) falls back to the OpenAPI 3 defaults of `form` + `explode: true`
+QUERY_COLLECTION_FORMATS: dict[str, tuple[str, bool]] = {
+    'csv': ('form', False),
+    'multi': ('form', True),
+    'ssv': ('spaceDelimited', False),
+    'pipes': ('pipeDelimited', False),
+}
+
+
+def convert_ref(ref: str) -> str:
+    for old, new in (('#/definitions/', '#/components/schemas/'),
+                     ('#/parameters/', '#/components/parameters/'),
+                     ('#/responses/', '#/components/responses/')):
+        if ref.startswith(old):
+            return new + ref[len(old):]
+    return ref
+
+
+def convert_schema(schema: Any) -> Any:
+    """Convert a Swagger 2.0 Schema Object (recursively) to its OpenAPI 3.0 equivalent."""
+    if isinstance(schema, list):
+        return [convert_schema(s) for s in schema]
+    if not isinstance(schema, dict):
+        return schema
+
+    converted: dict[str, Any] = {}
+    for key, value in schema.items():
+        if key == '$ref' and isinstance(value, str):
+            converted[key] = convert_ref(value)
+        elif key == 'x-nullable':
+            converted['nullable'] = value
+        elif key == 'discriminator' and isinstance(value, str):
+            converted[key] = {'propertyName': value}
+        elif key == 'properties' and isinstance(value, dict):
+            converted[key] = {name: convert_schema(s) for name, s in value.items()}
+        elif key in ('items', 'additionalProperties', 'not', 'allOf', 'anyOf', 'oneOf'):
+            converted[key] = convert_schema(value)
+        elif key == 'collectionFormat':
+            continue
+        else:
+            converted[key] = copy.deepcopy(value)
+
+    if converted.get('type') == 'file':
+        converted['type'] = 'string'
+        converted['format'] = 'binary'
+    return converted
+
+
+def _extensions(source: dict[str, Any]) -> dict[str, Any]:
+    return {k: copy.deepcopy(v) for k, v in source.items() if k.startswith('x-')}
+
+
+def _parameter_schema(parameter: dict[str, Any]) -> dict[str, Any]:
+    return convert_schema({k: parameter[k] for k in PARAMETER_SCHEMA_KEYS if k in parameter})
+
+
+def _parameter_style(parameter: dict[str, Any]) -> tuple[str, bool]:
+    location = parameter.get('in')
+    if location in ('path', 'header'):
+        return 'simple', False
+    return QUERY_COLLECTION_FORMATS.get(parameter.get('collectionFormat', ''), ('form', True))
+
+
+def convert_parameter(parameter: dict[str, Any]) -> dict[str, Any]:
+    """Convert a Swagger 2.0 path/query/header parameter."""
+    if '$ref' in parameter:
+        return {'$ref': convert_ref(parameter['$ref'])}
+
+    converted = {k: copy.deepcopy(parameter[k]) for k in PARAMETER_KEYS if k in parameter}
+    if 'x-example' in parameter:
+        converted['example'] = copy.deepcopy(parameter['x-example'])
+    converted['schema'] = _parameter_schema(parameter)
+    converted['style'], converted['explode'] = _parameter_style(parameter)
+    converted.update({k: v for k, v in _extensions(parameter).items() if k != 'x-example'})
+    return converted
+
+
+def _body_request_body(parameter: dict[str, Any], consumes: list[str]) -> dict[str, Any]:
+    schema = convert_schema(parameter.get('schema', {}))
+    request_body: dict[str, Any] = {
+        'content': {media_type: ({'schema': copy.deepcopy(schema)} if schema else {}) for media_type in consumes}
+    }
+    if parameter.get('description'):
+        request_body['description'] = parameter['description']
+    if parameter.get('required'):
+        request_body['required'] = True
+    return request_body
+
+
+def _form_request_body(parameters: list[dict[str, Any]], consumes: list[str]) -> dict[str, Any]:
+    properties: dict[str, Any] = {}
+    required: list[str] = []
+    for parameter in parameters:
+        prop = _parameter_schema(parameter)
+        if parameter.get('description'):
+            prop['description'] = parameter['description']
+        properties[parameter['name']] = prop
+        if parameter.get('required'):
+            required.append(parameter['name'])
+
+    schema: dict[str, Any] = {'type': 'object', 'properties': properties}
+    if required:
+        schema['required'] = required
+
+    media_types = [m for m in consumes if m in FORM_MEDIA_TYPES]
+    if not media_types:
+        has_file = any(p.get('type') == 'file' for p in parameters)
+        media_types = ['multipart/form-data' if has_file else 'application/x-www-form-urlencoded']
+    return {'content': {media_type: {'schema': copy.deepcopy(schema)} for media_type in media_types}}
+
+
+def convert_response(response: dict[str, Any], produces: list[str]) -> dict[str, Any]:
+    if '$ref' in response:
+        return {'$ref': convert_ref(response['$ref'])}
+
+    converted: dict[str, Any] = {'description': response.get('description', '')}
+    if 'schema' in response:
+        schema = convert_schema(response['schema'])
+        examples: dict[str, Any] = response.get('examples', {})
+        content: dict[str, Any] = {}
+        for media_type in produces:
+            media: dict[str, Any] = {'schema': copy.deepcopy(schema)} if schema else {}
+            if media_type in examples:
+                media['example'] = copy.deepcopy(examples[media_type])
+            content[media_type] = media
+        converted['content'] = content
+    if 'headers' in response:
+        converted['headers'] = {
+            name: {
+                **({'description': header['description']} if 'description' in header else {}),
+                'schema': _parameter_schema(header)
+            } for name, header in response['headers'].items()
+        }
+    converted.update(_extensions(response))
+    return converted
+
+
+class SwaggerConverter:
+    """Converts one Swagger 2.0 document. Construct once per document - global `parameters` are needed to resolve
+    `$ref`s to body/formData parameters, which become part of `requestBody` rather than `parameters`."""
+
+    def __init__(self, swagger: dict[str, Any]) -> None:
+        self.swagger = swagger
+        self.consumes: list[str] = swagger.get('consumes', [])
+        self.produces: list[str] = swagger.get('produces', [])
+        self.global_parameters: dict[str, Any] = swagger.get('parameters', {})
+
+    def _resolve_parameter(self, parameter: dict[str, Any]) -> dict[str, Any]:
+        ref = parameter.get('$ref', '')
+        if ref.startswith('#/parameters/'):
+            resolved = self.global_parameters.get(ref[len('#/parameters/'):], {})
+            if resolved.get('in') in ('body', 'formData'):
+                return resolved
+        return parameter
+
+    def convert_operation(self, operation: dict[str, Any], path_parameters: list[dict[str, Any]]) -> dict[str, Any]:
+        consumes = operation.get('consumes', self.consumes) or [DEFAULT_MEDIA_TYPE]
+        produces = operation.get('produces', self.produces) or [DEFAULT_MEDIA_TYPE]
+
+        converted: dict[str, Any] = {}
+        for key in ('tags', 'summary', 'description', 'externalDocs', 'operationId'):
+            if key in operation:
+                converted[key] = copy.deepcopy(operation[key])
+
+        parameters: list[dict[str, Any]] = []
+        body: dict[str, Any] | None = None
+        form: list[dict[str, Any]] = []
+        # Operation level parameters override path level ones with the same name + location
+        declared = {(p.get('name'), p.get('in')) for p in operation.get('parameters', [])}
+        inherited = [p for p in path_parameters if (p.get('name'), p.get('in')) not in declared]
+        for parameter in inherited + operation.get('parameters', []):
+            parameter = self._resolve_parameter(parameter)
+            if parameter.get('in') == 'body':
+                body = parameter
+            elif parameter.get('in') == 'formData':
+                form.append(parameter)
+            else:
+                parameters.append(convert_parameter(parameter))
+
+        if parameters:
+            converted['parameters'] = parameters
+        if body is not None:
+            converted['requestBody'] = _body_request_body(body, consumes)
+        elif form:
+            converted['requestBody'] = _form_request_body(form, consumes)
+
+        converted['responses'] = {
+            str(code): convert_response(response, produces)
+            for code, response in operation.get('responses', {}).items()
+        }
+        for key in ('deprecated', 'security'):
+            if key in operation:
+                converted[key] = copy.deepcopy(operation[key])
+        converted.update(_extensions(operation))
+        return converted
+
+    def convert_paths(self) -> dict[str, Any]:
+        paths: dict[str, Any] = {}
+        for path, path_item in self.swagger.get('paths', {}).items():
+            path_parameters: list[dict[str, Any]] = path_item.get('parameters', [])
+            converted: dict[str, Any] = {}
+            for method, operation in path_item.items():
+                if method in HTTP_METHODS:
+                    converted[method] = self.convert_operation(operation, path_parameters)
+            converted.update(_extensions(path_item))
+            paths[path] = converted
+        return paths
+
+    def convert_security_schemes(self) -> dict[str, Any]:
+        schemes: dict[str, Any] = {}
+        for name, definition in self.swagger.get('securityDefinitions', {}).items():
+            scheme_type = definition.get('type')
+            if scheme_type == 'basic':
+                scheme: dict[str, Any] = {'type': 'http', 'scheme': 'basic'}
+            elif scheme_type == 'apiKey':
+                scheme = {'type': 'apiKey', 'name': definition.get('name'), 'in': definition.get('in')}
+            elif scheme_type == 'oauth2':
+                flow_name = {'accessCode': 'authorizationCode', 'application': 'clientCredentials'}.get(
+                    definition.get('flow', ''), definition.get('flow', 'implicit'))
+                flow = {k: definition[k] for k in ('authorizationUrl', 'tokenUrl') if k in definition}
+                flow['scopes'] = copy.deepcopy(definition.get('scopes', {}))
+                scheme = {'type': 'oauth2', 'flows': {flow_name: flow}}
+            else:
+                continue
+            if 'description' in definition:
+                scheme['description'] = definition['description']
+            schemes[name] = scheme
+        return schemes
+
+    def convert_servers(self) -> list[dict[str, str]]:
+        base_path: str = self.swagger.get('basePath', '/')
+        host = self.swagger.get('host')
+        if not host:
+            return [{'url': base_path}]
+        return [{'url': f'{scheme}://{host}{base_path}'} for scheme in self.swagger.get('schemes', ['http'])]
+
+    def convert(self) -> dict[str, Any]:
+        openapi: dict[str, Any] = {
+            'openapi': OPENAPI_VERSION,
+            'info': copy.deepcopy(self.swagger.get('info', {})),
+            'servers': self.convert_servers(),
+        }
+        for key in ('tags', 'externalDocs', 'security'):
+            if key in self.swagger:
+                openapi[key] = copy.deepcopy(self.swagger[key])
+        openapi['paths'] = self.convert_paths()
+
+        components: dict[str, Any] = {}
+        if self.swagger.get('definitions'):
+            components['schemas'] = {
+                name: convert_schema(schema) for name, schema in self.swagger['definitions'].items()
+            }
+        global_parameters = {
+            name: convert_parameter(p) for name, p in self.global_parameters.items()
+            if p.get('in') not in ('body', 'formData')
+        }
+        if global_parameters:
+            components['parameters'] = global_parameters
+        if self.swagger.get('responses'):
+            components['responses'] = {
+                name: convert_response(r, self.produces or [DEFAULT_MEDIA_TYPE])
+                for name, r in self.swagger['responses'].items()
+            }
+        security_schemes = self.convert_security_schemes()
+        if security_schemes:
+            components['securitySchemes'] = security_schemes
+        if components:
+            openapi['components'] = components
+
+        openapi.update(_extensions(self.swagger))
+        return openapi
+
+
+def convert_swagger(swagger: dict[str, Any]) -> dict[str, Any]:
+    """Convert a Swagger 2.0 document to OpenAPI 3.0 without leaving the process."""
+    return SwaggerConverter(swagger).convert()
@@ -0,0 +1,318 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Structural diff of two specifications, and the generated client files it affects.
+
+Operations are indexed by `operationId` and components (schemas) by name, so moving things around in the document is
+not a change. Every operation and component gets a local hash (with each `$ref` kept as the reference string) and a
+deep hash covering the local hashes of everything it transitively references - so a change to a nested schema shows
+up against every operation and model that uses it, with `via` naming the schema(s) that actually changed.
+
+The affected files are derived from our openapi-generator batch configs (`python.yaml`, `go.yaml`, ...) using the
+generators' own file naming rules. Changes that only touch `info` (e.g. the NXRM version) are reported under `global`
+but do not mark any files - they only change the header comment of each generated file.
+
+Can also be run directly to compare two spec files:
+
+    python -m nxrm_spec.diff old/openapi.yaml spec/openapi.yaml
+"""
+import argparse
+import hashlib
+import json
+import os.path
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+import yaml
+
+from .naming import api_class_name, model_name, underscore
+from .pointer import unescape
+from .serialize import load_spec
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BATCH_CONFIGS = ('go.yaml', 'java-webclient.yaml', 'python.yaml', 'python-asyncio.yaml', 'typescript.yaml')
+HTTP_METHODS = ('get', 'put', 'post', 'delete', 'options', 'head', 'patch', 'trace')
+COMPONENT_REF_PREFIX = '#/components/'
+
+
+def _hash(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')) \
+        .hexdigest()
+
+
+def _iter_refs(node: Any) -> Iterator[str]:
+    if isinstance(node, dict):
+        ref = node.get('$ref')
+        if isinstance(ref, str) and ref.startswith(COMPONENT_REF_PREFIX):
+            yield '/'.join(unescape(t) for t in ref[len(COMPONENT_REF_PREFIX):].split('/')[:2])
+        for value in node.values():
+            yield from _iter_refs(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _iter_refs(value)
+
+
+@dataclass
+class Entry:
+    key: str
+    value: Any
+    local_hash: str
+    refs: set[str]
+    method: str = ''
+    path: str = ''
+    tags: list[str] = field(default_factory=list)
+
+
+class SpecIndex:
+    """Operations by operationId and components by `<kind>/<name>`, each with local hash and direct references."""
+
+    def __init__(self, document: dict[str, Any]) -> None:
+        self.document = document
+        self.operations: dict[str, Entry] = {}
+        self.components: dict[str, Entry] = {}
+        for path, path_item in (document.get('paths') or {}).items():
+            shared_parameters = path_item.get('parameters', [])
+            for method in HTTP_METHODS:
+                operation = path_item.get(method)
+                if not isinstance(operation, dict):
+                    continue
+                key = operation.get('operationId') or f'{method.upper()} {path}'
+                value = {'method': method, 'path': path, 'parameters': shared_parameters, 'operation': operation}
+                self.operations[key] = Entry(key, value, _hash(value), set(_iter_refs(value)), method, path,
+                                             operation.get('tags') or ['default'])
+        for kind, components in (document.get('components') or {}).items():
+            for name, value in (components or {}).items():
+                key = f'{kind}/{name}'
+                self.components[key] = Entry(key, value, _hash(value), set(_iter_refs(value)))
+        self._closures: dict[str, set[str]] = {}
+
+    def closure(self, entry: Entry) -> set[str]:
+        """Every component `entry` references, directly or transitively (cycles are fine)."""
+        if entry.key in self._closures:
+            return self._closures[entry.key]
+        seen: set[str] = set()
+        pending = list(entry.refs)
+        while pending:
+            ref = pending.pop()
+            if ref in seen:
+                continue
+            seen.add(ref)
+            if ref in self.components:
+                pending.extend(self.components[ref].refs)
+        self._closures[entry.key] = seen
+        return seen
+
+    def deep_hash(self, entry: Entry) -> str:
+        """Merkle-style hash of `entry` and everything it references."""
+        referenced = sorted(
+            (ref, self.components[ref].local_hash if ref in self.components else None) for ref in self.closure(entry)
+        )
+        return _hash([entry.local_hash, referenced])
+
+    def global_value(self) -> dict[str, Any]:
+        return {k: v for k, v in self.document.items() if k not in ('paths', 'components')}
+
+
+def _changes(old: SpecIndex, new: SpecIndex, old_entries: dict[str, Entry], new_entries: dict[str, Entry],
+             changed_components: set[str]) -> tuple[list[str], list[str], list[dict[str, Any]]]:
+    added = sorted(set(new_entries) - set(old_entries))
+    removed = sorted(set(old_entries) - set(new_entries))
+    changed = []
+    for key in sorted(set(old_entries) & set(new_entries)):
+        o, n = old_entries[key], new_entries[key]
+        if o.local_hash == n.local_hash and old.deep_hash(o) == new.deep_hash(n):
+            continue
+        via = sorted((new.closure(n) | old.closure(o)) & changed_components)
+        changed.append({'key': key, 'direct': o.local_hash != n.local_hash, 'via': via})
+    return added, removed, changed
+
+
+class FileLayout:
+    """Where one of our batch configs puts the files for an API (tag) or model."""
+
+    def __init__(self, name: str, config: dict[str, Any]) -> None:
+        self.name = name
+        self.generator = config['generatorName']
+        self.output_dir = config['outputDir'].replace('/local/', '', 1)
+        self.properties = config.get('additionalProperties', {})
+
+    def _out(self, *paths: str) -> list[str]:
+        return [f'{self.output_dir}/{p}' for p in paths]
+
+    def api_files(self, tag: str) -> list[str]:
+        cls = api_class_name(tag)
+        if self.generator == 'python':
+            package = self.properties.get('packageName', 'openapi_client')
+            return self._out(f'{package}/api/{underscore(cls)}.py', f'docs/{cls}.md', f'test/test_{underscore(cls)}.py')
+        if self.generator == 'go':
+            base = underscore(cls[:-3])
+            return self._out(f'api_{base}.go', f'docs/{cls[:-3]}API.md', f'test/api_{base}_test.go')
+        if self.generator == 'typescript-fetch':
+            return self._out(f'src/apis/{cls}.ts')
+        if self.generator == 'java':
+            package = self.properties.get('apiPackage', 'org.openapitools.client.api').replace('.', '/')
+            return self._out(f'src/main/java/{package}/{cls}.java', f'docs/{cls}.md',
+                             f'src/test/java/{package}/{cls}Test.java')
+        return []
+
+    def model_files(self, name: str) -> list[str]:
+        model = model_name(name)
+        if self.generator == 'python':
+            package = self.properties.get('packageName', 'openapi_client')
+            return self._out(f'{package}/models/{underscore(model)}.py', f'docs/{model}.md',
+                             f'test/test_{underscore(model)}.py')
+        if self.generator == 'go':
+            return self._out(f'model_{underscore(model)}.go', f'docs/{model}.md')
+        if self.generator == 'typescript-fetch':
+            return self._out(f'src/models/{model}.ts')
+        if self.generator == 'java':
+            package = self.properties.get('modelPackage', 'org.openapitools.client.model').replace('.', '/')
+            return self._out(f'src/main/java/{package}/{model}.java', f'docs/{model}.md',
+                             f'src/test/java/{package}/{model}Test.java')
+        return []
+
+    def index_files(self) -> list[str]:
+        """Files listing every API and model - touched whenever one is added or removed."""
+        if self.generator == 'python':
+            package = self.properties.get('packageName', 'openapi_client')
+            return self._out('README.md', f'{package}/__init__.py', f'{package}/api/__init__.py',
+                             f'{package}/models/__init__.py')
+        if self.generator == 'go':
+            return self._out('README.md', 'client.go', 'api/openapi.yaml')
+        if self.generator == 'typescript-fetch':
+            return self._out('src/apis/index.ts', 'src/models/index.ts')
+        if self.generator == 'java':
+            return self._out('README.md', 'api/openapi.yaml')
+        return []
+
+    def support_files(self) -> list[str]:
+        """Files generated from the document-level settings (servers, security schemes)."""
+        if self.generator == 'python':
+            package = self.properties.get('packageName', 'openapi_client')
+            return self._out(f'{package}/configuration.py', f'{package}/api_client.py', 'README.md')
+        if self.generator == 'go':
+            return self._out('configuration.go', 'client.go', 'README.md', 'api/openapi.yaml')
+        if self.generator == 'typescript-fetch':
+            return self._out('src/runtime.ts')
+        if self.generator == 'java':
+            invoker = self.properties.get('invokerPackage', 'org.openapitools.client').replace('.', '/')
+            return self._out(f'src/main/java/{invoker}/ApiClient.java', 'README.md', 'api/openapi.yaml')
+        return []
+
+
+def load_layouts(root_dir: str = ROOT_DIR, configs: tuple[str, ...] = BATCH_CONFIGS) -> list[FileLayout]:
+    layouts = []
+    for config_file in configs:
+        with open(os.path.join(root_dir, config_file), 'r') as f:
+            layouts.append(FileLayout(os.path.splitext(config_file)[0], yaml.safe_load(f)))
+    return layouts
+
+
+def diff_specs(old_document: dict[str, Any], new_document: dict[str, Any],
+               layouts: list[FileLayout] | None = None) -> dict[str, Any]:
+    """Compare two specs - returns a JSON-serialisable report of changed operations, models and affected files."""
+    old, new = SpecIndex(old_document), SpecIndex(new_document)
+
+    changed_components = {k for k in set(old.components) | set(new.components)
+                          if k not in old.components or k not in new.components
+                          or old.components[k].local_hash != new.components[k].local_hash}
+    ops_added, ops_removed, ops_changed = _changes(old, new, old.operations, new.operations, changed_components)
+    models_added, models_removed, models_changed = _changes(old, new, old.components, new.components,
+                                                            changed_components)
+
+    old_global, new_global = old.global_value(), new.global_value()
+    global_changes = sorted(k for k in set(old_global) | set(new_global) if old_global.get(k) != new_global.get(k))
+    for kind in sorted(set(old_document.get('components') or {}) | set(new_document.get('components') or {})):
+        if kind != 'schemas' and any(k.startswith(f'{kind}/') for k in changed_components):
+            global_changes.append(f'components/{kind}')
+
+    def operation_summary(key: str, index: SpecIndex) -> dict[str, Any]:
+        entry = index.operations[key]
+        return {'operationId': key, 'method': entry.method.upper(), 'path': entry.path, 'tags': entry.tags}
+
+    report = {
+        'operations': {
+            'added': [operation_summary(k, new) for k in ops_added],
+            'removed': [operation_summary(k, old) for k in ops_removed],
+            'changed': [operation_summary(c['key'], new) | {'direct': c['direct'], 'via': c['via']}
+                        for c in ops_changed],
+        },
+        'models': {
+            'added': [k.split('/', 1)[1] for k in models_added if k.startswith('schemas/')],
+            'removed': [k.split('/', 1)[1] for k in models_removed if k.startswith('schemas/')],
+            'changed': [{'name': c['key'].split('/', 1)[1], 'direct': c['direct'], 'via': c['via']}
+                        for c in models_changed if c['key'].startswith('schemas/')],
+        },
+        'global': global_changes,
+        'files': {},
+    }
+
+    # Tags whose API files change: any tag of an added, removed or changed operation (on either side)
+    tags = set()
+    for key in ops_added + [c['key'] for c in ops_changed]:
+        tags.update(new.operations[key].tags)
+    for key in ops_removed + [c['key'] for c in ops_changed]:
+        tags.update(old.operations[key].tags)
+    models = {k.split('/', 1)[1] for k in models_added + models_removed + [c['key'] for c in models_changed]
+              if k.startswith('schemas/')}
+    structural = bool(ops_added or ops_removed or models_added or models_removed)
+    support = any(g not in ('info', 'openapi') for g in global_changes)
+
+    for layout in layouts if layouts is not None else load_layouts():
+        files = set()
+        for tag in tags:
+            files.update(layout.api_files(tag))
+        for model in models:
+            files.update(layout.model_files(model))
+        if structural:
+            files.update(layout.index_files())
+        if support:
+            files.update(layout.support_files())
+        report['files'][layout.name] = sorted(files)
+    return report
+
+
+def summarise(report: dict[str, Any]) -> Iterator[str]:
+    for section in ('operations', 'models'):
+        counts = ', '.join(f'{len(report[section][k])} {k}' for k in ('added', 'removed', 'changed'))
+        yield f'{section.capitalize()}: {counts}'
+    if report['global']:
+        yield f'Global: {", ".join(report["global"])}'
+    for language, files in report['files'].items():
+        yield f'{language}: {len(files)} affected file(s)'
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Structural diff of two OpenAPI specifications, as JSON.')
+    parser.add_argument('old_spec', help='The spec to compare from')
+    parser.add_argument('new_spec', help='The spec to compare to')
+    parser.add_argument('-o', '--output', metavar='FILE', help='Write the report to FILE instead of stdout')
+    args = parser.parse_args(argv)
+
+    report = diff_specs(load_spec(args.old_spec), load_spec(args.new_spec))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        for line in summarise(report):
+            print(line)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
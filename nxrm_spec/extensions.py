@@ -0,0 +1,450 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""What `generate-extensions.py` needs from the spec: every operation, where openapi-generator put it, and how it
+pages - plus the sources generated from that for each client's extensions (see `extensions/`)."""
+import ast
+import os.path
+import pprint
+import textwrap
+from dataclasses import dataclass, field
+from typing import Any
+
+from . import annotate
+from .diff import HTTP_METHODS
+from .naming import api_class_name, model_name, python_attribute_name, python_method_name, python_module_name
+
+CONTINUATION_TOKEN = 'continuationToken'
+SCHEMA_REF_PREFIX = '#/components/schemas/'
+
+LICENSE_HEADER = '''#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Generated by generate-extensions.py from spec/openapi.yaml - do not edit.
+#
+'''
+
+PYTHON_TYPES = {'string': 'str', 'integer': 'int', 'number': 'float', 'boolean': 'bool'}
+# the keywords the Python client's `ext.validation` checks - descriptions, examples and the rest are left out of the
+# schemas generated for it
+VALIDATION_KEYWORDS = frozenset({
+    '$ref', 'type', 'nullable', 'enum', 'properties', 'required', 'additionalProperties', 'items', 'allOf', 'oneOf',
+    'anyOf', 'minLength', 'maxLength', 'pattern', 'minimum', 'maximum', 'minItems', 'maxItems',
+})
+
+
+@dataclass
+class Parameter:
+    name: str
+    location: str
+    required: bool
+    schema: dict[str, Any]
+
+
+@dataclass
+class Pagination:
+    # the array of items in each page, and the schema of one item (None if it is not a component)
+    items_property: str
+    item_schema: str | None
+
+
+@dataclass
+class Operation:
+    operation_id: str
+    method: str
+    path: str
+    tag: str
+    parameters: list[Parameter] = field(default_factory=list)
+    # the success response's schema - or, if it is an array, its items' - when that is a component
+    response_schema: str | None = None
+    response_array: bool = False
+    pagination: Pagination | None = None
+    # multipart/form-data field name -> whether it is a file
+    form_fields: dict[str, bool] = field(default_factory=dict)
+    # from the spec's annotations (see `annotate.py`): whether it can be retried, how long its responses can be
+    # cached for, and the families (tags) whose cached responses it makes stale
+    idempotent: bool = False
+    cache_ttl: float | None = None
+    invalidates: list[str] = field(default_factory=list)
+
+    @property
+    def api_class(self) -> str:
+        return api_class_name(self.tag)
+
+
+def _schema_name(schema: dict[str, Any] | None) -> str | None:
+    ref = (schema or {}).get('$ref', '')
+    return ref[len(SCHEMA_REF_PREFIX):] if ref.startswith(SCHEMA_REF_PREFIX) else None
+
+
+def _success_schema(operation: dict[str, Any]) -> dict[str, Any] | None:
+    for code in ('200', '201'):
+        content = operation.get('responses', {}).get(code, {}).get('content', {})
+        media = content.get('application/json') or next(iter(content.values()), None)
+        if media is not None:
+            return media.get('schema')
+    return None
+
+
+def _pagination(spec: dict[str, Any], operation: dict[str, Any], parameters: list[dict[str, Any]],
+                schema: dict[str, Any] | None) -> Pagination | None:
+    """How an operation pages, from its `x-paginated` - or, in a spec that has not been annotated, as that would
+    be derived."""
+    paginated = operation.get(annotate.PAGINATED) or annotate.pagination(spec, parameters, schema)
+    if paginated is None:
+        return None
+    name = _schema_name(schema)
+    if name is not None:
+        schema = spec.get('components', {}).get('schemas', {}).get(name)
+    items = (schema or {}).get('properties', {}).get(paginated['itemsField'], {})
+    return Pagination(paginated['itemsField'], _schema_name(items.get('items')))
+
+
+def _form_fields(operation: dict[str, Any]) -> dict[str, bool]:
+    media = operation.get('requestBody', {}).get('content', {}).get('multipart/form-data', {})
+    return {name: prop.get('format') == 'binary'
+            for name, prop in media.get('schema', {}).get('properties', {}).items()}
+
+
+def operations(spec: dict[str, Any]) -> list[Operation]:
+    result = []
+    for path, path_item in spec.get('paths', {}).items():
+        for method, operation in path_item.items():
+            if method not in HTTP_METHODS or 'operationId' not in operation:
+                continue
+            specified = path_item.get('parameters', []) + operation.get('parameters', [])
+            parameters = [Parameter(p['name'], p['in'], p.get('required', False), p.get('schema', {}))
+                          for p in specified]
+            schema = _success_schema(operation)
+            array = (schema or {}).get('type') == 'array'
+            result.append(Operation(
+                operation_id=operation['operationId'], method=method.upper(), path=path,
+                tag=(operation.get('tags') or ['default'])[0], parameters=parameters,
+                response_schema=_schema_name(schema.get('items') if array else schema), response_array=array,
+                pagination=_pagination(spec, operation, specified, schema), form_fields=_form_fields(operation),
+                idempotent=operation.get(annotate.IDEMPOTENT, method in annotate.IDEMPOTENT_METHODS),
+                cache_ttl=(operation.get(annotate.CACHEABLE) or {}).get('ttl'),
+                invalidates=list(operation.get(annotate.INVALIDATES, []))
+            ))
+    return sorted(result, key=lambda o: o.operation_id)
+
+
+def validation_schema(schema: Any) -> Any:
+    """`schema` with only the `VALIDATION_KEYWORDS`, in its subschemas too - and with `$ref`s as just the name of the
+    component schema."""
+    if not isinstance(schema, dict):
+        return schema
+    result: dict[str, Any] = {}
+    for key, value in schema.items():
+        if key not in VALIDATION_KEYWORDS:
+            continue
+        if key == '$ref':
+            value = _schema_name(schema)
+        elif key == 'properties':
+            value = {name: validation_schema(v) for name, v in value.items()}
+        elif key in ('items', 'additionalProperties'):
+            value = validation_schema(value)
+        elif key in ('allOf', 'oneOf', 'anyOf'):
+            value = [validation_schema(v) for v in value]
+        result[key] = value
+    return result
+
+
+def _schema_refs(node: Any) -> set[str]:
+    """The component schemas a `validation_schema()` references."""
+    if isinstance(node, dict):
+        refs = {n for k, v in node.items() if k != '$ref' for n in _schema_refs(v)}
+        return refs | {node['$ref']} if isinstance(node.get('$ref'), str) else refs
+    if isinstance(node, list):
+        return {n for v in node for n in _schema_refs(v)}
+    return set()
+
+
+def response_schemas(spec: dict[str, Any]) -> tuple[dict[str, dict[str, Any]], dict[str, Any]]:
+    """The `application/json` schema of every documented response (None for those without one), by operationId and
+    status (or `default`), and every component schema they reference - all with only the `VALIDATION_KEYWORDS`."""
+    responses: dict[str, dict[str, Any]] = {}
+    for path_item in spec.get('paths', {}).values():
+        for method, operation in path_item.items():
+            if method not in HTTP_METHODS or 'operationId' not in operation:
+                continue
+            responses[operation['operationId']] = {
+                status: validation_schema(response.get('content', {}).get('application/json', {}).get('schema'))
+                for status, response in sorted(operation.get('responses', {}).items())
+            }
+    components = spec.get('components', {}).get('schemas', {})
+    schemas: dict[str, Any] = {}
+    pending = _schema_refs(responses)
+    while pending:
+        name = pending.pop()
+        if name not in schemas and name in components:
+            schemas[name] = validation_schema(components[name])
+            pending |= _schema_refs(schemas[name]) - set(schemas)
+    return dict(sorted(responses.items())), dict(sorted(schemas.items()))
+
+
+def unpaged(spec: dict[str, Any]) -> list[Operation]:
+    """Operations taking a `continuationToken` whose response does not say what a page looks like."""
+    return [o for o in operations(spec) if o.pagination is None
+            and any(p.name == CONTINUATION_TOKEN and p.location == 'query' for p in o.parameters)]
+
+
+def _tuple_argument(name: str, values: list[str], indent: str = '        ') -> list[str]:
+    items = textwrap.wrap(' '.join(f'{v!r},' for v in values), width=120 - len(indent) - 4,
+                          break_long_words=False, break_on_hyphens=False)
+    return [f'{indent}{name}=(', *(f'{indent}    {line}' for line in items), f'{indent}),']
+
+
+def _dict_literal(name: str, values: dict[str, Any]) -> list[str]:
+    lines = [f'{name} = {{']
+    for key, value in values.items():
+        prefix = f'    {key!r}: '
+        literal = pprint.pformat(value, width=120 - len(prefix) - 1, sort_dicts=False)
+        lines.append(prefix + literal.replace('\n', '\n' + ' ' * len(prefix)) + ',')
+    return lines + ['}']
+
+
+LAZY_INIT_MARKER = '# Imported on first use (PEP 562) - rewritten by generate-extensions.py, so do not edit.'
+
+LAZY_INIT = '''
+import importlib
+from typing import TYPE_CHECKING
+
+# name -> (module, attribute)
+_LAZY_NAMES = {{
+{names}
+}}
+
+if TYPE_CHECKING:
+{imports}
+
+
+def __getattr__(name):
+    if name.startswith('__'):
+        raise AttributeError(f'module {{__name__!r}} has no attribute {{name!r}}')
+    if name in _LAZY_NAMES:
+        module, attribute = _LAZY_NAMES[name]
+        value = getattr(importlib.import_module(module), attribute)
+    else:
+        # submodules, which importing everything used to have imported as a side effect
+        try:
+            value = importlib.import_module(f'{{__name__}}.{{name}}')
+        except ModuleNotFoundError as e:
+            if e.name != f'{{__name__}}.{{name}}':
+                raise
+            raise AttributeError(f'module {{__name__!r}} has no attribute {{name!r}}') from None
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_NAMES))
+'''
+
+
+def python_lazy_init(source: str, package: str) -> str | None:
+    """`source` (a generated `__init__.py`) with its imports from `package` deferred until each name is first used -
+    or None if it has been rewritten already.
+
+    Importing every API and model up front is most of the cost of importing the client; this way a script only
+    pays for what it uses, and `from package import Name` (and `*`, via `__all__`) work as they did.
+    """
+    if LAZY_INIT_MARKER in source:
+        return None
+    tree = ast.parse(source)
+    lines = source.splitlines()
+    names: dict[str, tuple[str, str]] = {}
+    imports: list[str] = []
+    kept: list[str] = []
+    first_import = None
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.level == 0 and (node.module or '').startswith(package):
+            first_import = first_import or node.lineno
+            imports.append(ast.get_source_segment(source, node))
+            for alias in node.names:
+                names[alias.asname or alias.name] = (node.module, alias.name)
+        elif first_import is not None:
+            kept.append(ast.get_source_segment(source, node))
+    if first_import is None:
+        return None
+    header = '\n'.join(lines[:first_import - 1]).rstrip()
+    if not any(isinstance(n, ast.Assign) and any(getattr(t, 'id', None) == '__all__' for t in n.targets)
+               for n in tree.body):
+        header += '\n\n__all__ = [\n' + ''.join(f'    {name!r},\n' for name in names) + ']'
+    lazy = LAZY_INIT.format(
+        names='\n'.join(f'    {name!r}: ({module!r}, {attribute!r}),' for name, (module, attribute) in names.items()),
+        imports='\n'.join(f'    {line}' for line in imports)
+    )
+    return '\n'.join([header, '', LAZY_INIT_MARKER, *kept]) + '\n' + lazy
+
+
+class PythonExtensions:
+    """Sources generated for the `python` generator's clients (see `extensions/python` and
+    `extensions/python-asyncio`)."""
+
+    def __init__(self, spec: dict[str, Any], package: str, asyncio: bool = False) -> None:
+        self.package = package
+        self.asyncio = asyncio
+        self.paginator = 'AsyncPaginator' if asyncio else 'Paginator'
+        self.operations = operations(spec)
+        self.responses, self.schemas = response_schemas(spec)
+
+    def api_module(self, operation: Operation) -> str:
+        return f'{self.package}.api.{python_module_name(operation.api_class)}'
+
+    @staticmethod
+    def response_type(operation: Operation) -> str | None:
+        """The response type of `operation`, as the generated client names it (e.g. `List[RepositoryXO]`)."""
+        if operation.response_schema is None:
+            return None
+        model = model_name(operation.response_schema)
+        return f'List[{model}]' if operation.response_array else model
+
+    @staticmethod
+    def annotation(schema: dict[str, Any]) -> str:
+        if schema.get('type') == 'array':
+            return f'List[{PythonExtensions.annotation(schema.get("items", {}))}]'
+        return PYTHON_TYPES.get(schema.get('type', ''), 'Any')
+
+    def render_operations(self) -> str:
+        lines = [LICENSE_HEADER, 'from .operations import Operation, Pagination', '', 'OPERATIONS = {']
+        for o in self.operations:
+            lines.append(f'    {o.operation_id!r}: Operation(')
+            lines.append(f'        {o.operation_id!r}, {o.method!r}, {o.path!r},')
+            lines.append(f'        {self.api_module(o)!r},')
+            lines.append(f'        {o.api_class!r}, {python_method_name(o.operation_id)!r},')
+            if o.pagination is not None:
+                token, items = CONTINUATION_TOKEN, o.pagination.items_property
+                lines.append(f'        Pagination({python_attribute_name(token)!r}, {python_attribute_name(token)!r}, '
+                             f'{token!r}, {python_attribute_name(items)!r}, {items!r}),')
+            if o.form_fields:
+                lines += _tuple_argument('form_fields', list(o.form_fields))
+                lines += _tuple_argument('file_fields', [k for k, v in o.form_fields.items() if v])
+            if o.response_schema is not None:
+                lines.append(f'        response_type={self.response_type(o)!r},')
+            if o.idempotent:
+                lines.append('        idempotent=True,')
+            if o.cache_ttl is not None:
+                lines.append(f'        cache_ttl={o.cache_ttl!r},')
+            if o.invalidates:
+                lines += _tuple_argument('invalidates', sorted({api_class_name(tag) for tag in o.invalidates}))
+            lines.append('    ),')
+        lines.append('}')
+        return '\n'.join(lines) + '\n'
+
+    def render_schemas(self) -> str:
+        lines = [
+            LICENSE_HEADER.rstrip('\n'),
+            '"""The response schemas `validation` checks against: by operationId and status, and the component schemas',
+            'they reference (a `$ref` is the name of one) - with only the keywords it checks."""',
+            '',
+            '# operationId -> status (or \'default\') -> the `application/json` schema, or None',
+            *_dict_literal('RESPONSES', self.responses),
+            '',
+            '# name -> schema',
+            *_dict_literal('SCHEMAS', self.schemas),
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def render_paginators(self) -> str:
+        paged = [o for o in self.operations if o.pagination is not None]
+        models = sorted({o.pagination.item_schema for o in paged if o.pagination.item_schema})
+        lines = [
+            LICENSE_HEADER.rstrip('\n'),
+            '"""A `paginate_...()` for every operation paged by `continuationToken` - each returns '
+            f'{"an" if self.asyncio else "a"} `{self.paginator}`, which',
+            f'lazily yields the items of every page{" to `async for`" if self.asyncio else ""} (see `pagination`)."""',
+            '',
+            'from typing import Any, List, Optional',
+            '',
+            f'from {self.package}.api_client import ApiClient',
+        ]
+        lines += [f'from {self.package}.models.{python_module_name(model_name(m))} import {model_name(m)}'
+                  for m in models]
+        lines += ['', f'from .pagination import {self.paginator}, paginate', '']
+        for o in paged:
+            method = python_method_name(o.operation_id)
+            item = model_name(o.pagination.item_schema) if o.pagination.item_schema else 'Any'
+            arguments = [p for p in o.parameters if p.name != CONTINUATION_TOKEN]
+            lines += ['', f'def paginate_{method}(', '    api_client: Optional[ApiClient] = None,', '    *,']
+            for p in sorted(arguments, key=lambda p: not p.required):
+                annotation = self.annotation(p.schema)
+                if p.required:
+                    lines.append(f'    {python_attribute_name(p.name)}: {annotation},')
+                else:
+                    lines.append(f'    {python_attribute_name(p.name)}: Optional[{annotation}] = None,')
+            lines += [
+                '    continuation_token: Optional[str] = None,',
+                '    prefetch: int = 0,',
+                '    raw: Optional[str] = None,',
+                '    **kwargs: Any',
+                f') -> {self.paginator}[{item}]:',
+                f'    """Every item from `{o.api_class}.{method}` ({o.method} {o.path}).',
+                '',
+                '    The next page is requested when the last is used up - or, with `prefetch`, up to that many pages are',
+                '    kept requested ahead. With `raw=\'dict\'` or `raw=\'view\'` items are plain dicts or `View`s of them',
+                '    (see `raw`), not models.',
+                '    """',
+                '    return paginate(',
+                f'        {o.operation_id!r}, api_client, prefetch=prefetch, raw=raw,',
+                '        continuation_token=continuation_token,',
+            ]
+            lines += [f'        {python_attribute_name(p.name)}={python_attribute_name(p.name)},' for p in arguments]
+            lines += ['        **kwargs', '    )']
+            lines.append('')
+        return '\n'.join(lines).rstrip('\n') + '\n'
+
+    def check(self, package_dir: str) -> list[str]:
+        """Problems with what we expect openapi-generator to have generated (class, method and argument names)."""
+        problems = []
+        methods: dict[str, dict[str, set[str]]] = {}
+        for o in self.operations:
+            module = python_module_name(o.api_class)
+            if module not in methods:
+                methods[module] = {}
+                source = os.path.join(package_dir, 'api', f'{module}.py')
+                if os.path.exists(source):
+                    with open(source, 'r') as f:
+                        for node in ast.parse(f.read()).body:
+                            if isinstance(node, ast.ClassDef) and node.name == o.api_class:
+                                methods[module] = {n.name: {a.arg for a in n.args.args + n.args.kwonlyargs}
+                                                   for n in node.body
+                                                   if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))}
+            method = python_method_name(o.operation_id)
+            if method not in methods[module]:
+                problems.append(f'{o.operation_id}: no {o.api_class}.{method}() in {self.package}/api/{module}.py')
+                continue
+            for p in o.parameters:
+                if python_attribute_name(p.name) not in methods[module][method]:
+                    problems.append(f'{o.operation_id}: {o.api_class}.{method}() has no argument '
+                                    f'{python_attribute_name(p.name)} (for {p.name})')
+            if o.response_schema is not None:
+                model_module = python_module_name(model_name(o.response_schema))
+                if not os.path.exists(os.path.join(package_dir, 'models', f'{model_module}.py')):
+                    problems.append(f'{o.operation_id}: no {self.package}/models/{model_module}.py '
+                                    f'(for {o.response_schema})')
+        return problems
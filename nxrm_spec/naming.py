@@ -0,0 +1,60 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""The names openapi-generator gives to what it generates from our spec (see `DefaultCodegen.sanitizeName`,
+`camelize` and `underscore`), so our tooling can refer to generated files, classes and methods."""
+import re
+
+
+def sanitize_name(name: str) -> str:
+    name = re.sub(r'[\[\]().\-\s]', '_', name)
+    return re.sub(r'\W', '', name)
+
+
+def camelize(name: str) -> str:
+    return ''.join(part[:1].upper() + part[1:] for part in re.split(r'[_\s]+', name) if part)
+
+
+def underscore(name: str) -> str:
+    name = re.sub(r'([A-Z]+)([A-Z][a-z])', r'\1_\2', name)
+    name = re.sub(r'([a-z\d])([A-Z])', r'\1_\2', name)
+    return name.replace('-', '_').lower()
+
+
+def api_class_name(tag: str) -> str:
+    """The `...Api` class openapi-generator emits for the operations in `tag`."""
+    tag = camelize(sanitize_name(tag))
+    if tag[:1].isdigit():
+        tag = f'Class{tag}'
+    return f'{tag}Api'
+
+
+def model_name(schema_name: str) -> str:
+    return camelize(sanitize_name(schema_name))
+
+
+def python_method_name(operation_id: str) -> str:
+    """The method the `python` generator emits for an operation."""
+    return underscore(sanitize_name(operation_id))
+
+
+def python_module_name(class_name: str) -> str:
+    """The module (in `api/` or `models/`) the `python` generator puts a class in."""
+    return underscore(class_name)
+
+
+def python_attribute_name(property_name: str) -> str:
+    """The attribute of a generated `python` (pydantic) model for a schema property."""
+    return underscore(sanitize_name(property_name))
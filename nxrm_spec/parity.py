@@ -0,0 +1,39 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Structural comparison of two specification documents, used to check a locally produced spec against the committed
+`spec/openapi.yaml`."""
+from typing import Any, Iterator
+
+from .pointer import escape
+
+
+def iter_differences(expected: Any, actual: Any, pointer: str = '') -> Iterator[str]:
+    """Yield a human-readable description (prefixed with its JSON Pointer) of every difference between two
+    documents."""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in sorted(set(expected) | set(actual), key=str):
+            child = f'{pointer}/{escape(str(key))}'
+            if key not in actual:
+                yield f'{child}: missing'
+            elif key not in expected:
+                yield f'{child}: unexpected'
+            else:
+                yield from iter_differences(expected[key], actual[key], child)
+    elif isinstance(expected, list) and isinstance(actual, list) and len(expected) == len(actual):
+        for i, (e, a) in enumerate(zip(expected, actual)):
+            yield from iter_differences(e, a, f'{pointer}/{i}')
+    elif expected != actual:
+        yield f'{pointer or "/"}: expected {expected!r}, got {actual!r}'
@@ -0,0 +1,554 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""The patches we apply to the OpenAPI spec as converted from NXRM's Swagger 2.0 document.
+
+Groups are applied in order - later groups may rely on earlier ones (e.g. a response being recreated by `ensure`
+before its schema is `set`). See `patches.py` for the available operations.
+"""
+from typing import Any, Iterator
+
+from .patches import SpecIndex
+from .pointer import pointer
+
+
+def ensure_response(path: str, method: str, code: str, description: str) -> dict[str, Any]:
+    """NXRM has, on occasion, dropped a response entirely from the generated Swagger doc.
+    Recreate it (matching the last known-good spec) before patching its content. The skeleton
+    includes an empty `application/json` schema so patches that only target a nested key
+    (e.g. `.../content/application~1json/schema/$ref`) have something to patch."""
+    return {
+        'op': 'ensure',
+        'target': pointer('paths', path, method, 'responses', code),
+        'value': {
+            'description': description,
+            'content': {
+                'application/json': {
+                    'schema': {}
+                }
+            }
+        }
+    }
+
+
+def response_content(path: str, method: str, code: str, value: dict[str, Any]) -> dict[str, Any]:
+    """Replace the entire `content` of a response with just an `application/json` schema."""
+    return {
+        'op': 'set',
+        'target': pointer('paths', path, method, 'responses', code, 'content'),
+        'value': {'application/json': {'schema': value}}
+    }
+
+
+def response_media(path: str, method: str, code: str, value: dict[str, Any]) -> dict[str, Any]:
+    """Replace the `application/json` media type of a response."""
+    return {
+        'op': 'set',
+        'target': pointer('paths', path, method, 'responses', code, 'content', 'application/json'),
+        'value': {'schema': value}
+    }
+
+
+def schema(name: str, value: dict[str, Any]) -> dict[str, Any]:
+    return {'op': 'set', 'target': pointer('components', 'schemas', name), 'value': value}
+
+
+def schema_property(name: str, prop: str, value: dict[str, Any]) -> dict[str, Any]:
+    return {'op': 'set', 'target': pointer('components', 'schemas', name, 'properties', prop), 'value': value}
+
+
+def operation_id(path: str, method: str, value: str) -> dict[str, Any]:
+    return {'op': 'set', 'target': pointer('paths', path, method, 'operationId'), 'value': value}
+
+
+def ref(name: str) -> dict[str, str]:
+    return {'$ref': f'#/components/schemas/{name}'}
+
+
+def api_repository_schema(name: str, request_schema: str, repository_format: str, repository_type: str,
+                          routing_rule: bool = False) -> dict[str, Any]:
+    """A `*ApiRepository` response schema: the `*RepositoryApiRequest` plus the `format`, `type` and `url` that NXRM
+    returns but does not document."""
+    properties: dict[str, Any] = {
+        'format': {'type': 'string', 'default': repository_format},
+        'type': {'type': 'string', 'default': repository_type},
+        'url': {'type': 'string'},
+    }
+    if routing_rule:
+        properties['routingRuleName'] = {
+            'description': 'The name of the routing rule assigned to this repository',
+            'type': 'string'
+        }
+    return schema(name, {
+        'allOf': [
+            ref(request_schema),
+            {
+                'type': 'object',
+                'required': ['format', 'type', 'url'],
+                'properties': properties
+            }
+        ]
+    })
+
+
+def spec_info(nxrm_version: str) -> dict[str, Any]:
+    """Our `info` block, replacing NXRM's, for the spec of NXRM `nxrm_version`."""
+    return {
+        'title': 'Sonatype Nexus Repository Manager',
+        # 'summary': 'Public REST API for Sonatype Nexus Repository',
+        'description': 'This documents the available APIs into [Sonatype Nexus Repository Manager]'
+                       '(https://www.sonatype.com/products/sonatype-nexus-repository) as of version ' + nxrm_version +
+                       '.',
+        'contact': {
+            'name': 'Sonatype Community Maintainers',
+            'url': 'https://github.com/sonatype-nexus-community'
+        },
+        'license': {
+            'name': 'Apache-2.0',
+            'url': 'http://www.apache.org/licenses/LICENSE-2.0.html'
+        },
+        'version': nxrm_version
+    }
+
+
+# GET /v1/repositories/<format>/<type>/{repositoryName} responses NXRM gets wrong (or drops entirely), and the schema
+# each should return. Supporting another format is an entry here - an `*ApiRepository` NXRM does not define (or
+# leaves `url` out of) is built from the `*RepositoryApiRequest` by `api_repository_schemas`.
+REPOSITORY_RESPONSE_SCHEMAS: dict[tuple[str, str], str] = {
+    ('alpine', 'group'): 'AlpineGroupApiRepository',
+    ('alpine', 'hosted'): 'AlpineHostedApiRepository',
+    ('alpine', 'proxy'): 'AlpineProxyApiRepository',
+    ('conan', 'group'): 'SimpleApiGroupDeployRepository',
+    ('conan', 'proxy'): 'ConanProxyApiRepository',
+    # Resolved in NXRM 3.85 - `PypiGroupRepositoryApiRequest` missing `group`
+    ('pypi', 'group'): 'SimpleApiGroupDeployRepository',
+    ('pypi', 'proxy'): 'PyPiProxyApiRepository',
+    ('raw', 'group'): 'RawGroupApiRepository',
+    ('raw', 'hosted'): 'RawHostedApiRepository',
+    ('raw', 'proxy'): 'RawProxyApiRepository',
+    ('swift', 'proxy'): 'SwiftProxyApiRepository',
+    ('terraform', 'hosted'): 'TerraformHostedRepositoryApiRequest',
+    ('terraform', 'proxy'): 'TerraformProxyApiRepository',
+    ('yum', 'group'): 'YumGroupApiRepository',
+    ('yum', 'proxy'): 'YumProxyApiRepository',
+}
+
+# GET operations paginated by `continuationToken` whose page schema NXRM leaves out of the `200` response - some are
+# only documented as `default`, which the generators ignore (so e.g. the Python `list_search()` returned nothing)
+PAGINATED_RESPONSE_SCHEMAS: dict[str, str] = {
+    '/v1/assets': 'PageAssetXO',
+    '/v1/components': 'PageComponentXO',
+    '/v1/search': 'PageComponentXO',
+    '/v1/search/assets': 'PageAssetXO',
+    '/v1/tags': 'PageTagXO',
+}
+
+# (format, type) whose `*ApiRepository` schema NXRM gets wrong beyond leaving out `format`, `type` and `url`, so is
+# rebuilt from the `*RepositoryApiRequest` even if it documents them
+REBUILT_API_REPOSITORIES: frozenset[tuple[str, str]] = frozenset({
+    ('pypi', 'proxy'),
+    ('raw', 'group'),
+    ('raw', 'hosted'),
+    ('raw', 'proxy'),
+})
+
+
+def repository_operation_ids(index: SpecIndex) -> Iterator[dict[str, Any]]:
+    """Pin/Fix OperationIDs for all /v1/repositories/[FORMAT]/[TYPE]"""
+    verbs = {'get': 'get', 'post': 'create', 'put': 'update'}
+    for repository_format, repository_type, _, path in index.paths.iter_repositories():
+        for method in index.document['paths'][path]:
+            if method in verbs:
+                yield operation_id(
+                    path, method,
+                    f'{verbs[method]}{repository_format.capitalize()}{repository_type.capitalize()}Repository'
+                )
+
+
+def privilege_operation_ids(index: SpecIndex) -> Iterator[dict[str, Any]]:
+    """Pin/Fix OperationIDs for all /v1/security/privileges/[TYPE]"""
+    verbs = {'post': 'create', 'put': 'update'}
+    for privilege_type, _, path in index.paths.iter_privileges():
+        for method in index.document['paths'][path]:
+            if method in verbs:
+                yield operation_id(path, method, f'{verbs[method]}{privilege_type.capitalize()}Privilege')
+
+
+def privilege_create_responses(index: SpecIndex) -> Iterator[dict[str, Any]]:
+    for _, has_name, path in index.paths.iter_privileges():
+        if not has_name and 'post' in index.document['paths'][path]:
+            yield {'op': 'set', 'target': pointer('paths', path, 'post', 'responses', '201'),
+                   'value': {'content': {}, 'description': 'Success'}}
+
+
+def privilege_update_responses(index: SpecIndex) -> Iterator[dict[str, Any]]:
+    for _, has_name, path in index.paths.iter_privileges():
+        if has_name and 'put' in index.document['paths'][path]:
+            yield {'op': 'set', 'target': pointer('paths', path, 'put', 'responses', '204'),
+                   'value': {'content': {}, 'description': 'Success'}}
+
+
+def api_repository_schemas(index: SpecIndex) -> Iterator[dict[str, Any]]:
+    """The `*ApiRepository` schema of each GET /v1/repositories/[FORMAT]/[TYPE]/{repositoryName} that NXRM does not
+    define, or defines without the `format`, `type` and `url` it returns (or in `REBUILT_API_REPOSITORIES`)."""
+    schemas = index.document.get('components', {}).get('schemas', {})
+    request_schemas = {name.lower(): name for name in schemas if name.endswith('RepositoryApiRequest')}
+    for repository_format, repository_type, has_name, path in index.paths.iter_repositories():
+        operation = index.document['paths'][path].get('get')
+        if not has_name or operation is None:
+            continue
+        name = REPOSITORY_RESPONSE_SCHEMAS.get((repository_format, repository_type))
+        if name is None:
+            media = operation.get('responses', {}).get('200', {}).get('content', {}).get('application/json', {})
+            name = media.get('schema', {}).get('$ref', '').rpartition('/')[2]
+        if not name.endswith('ApiRepository'):
+            continue
+        documented = 'url' in schemas.get(name, {}).get('properties', {})
+        if documented and (repository_format, repository_type) not in REBUILT_API_REPOSITORIES:
+            continue
+        prefix = f'{repository_format}{repository_type}'.lower()
+        request_schema = request_schemas.get(f'{prefix}repositoryapirequest')
+        if request_schema is not None:
+            yield api_repository_schema(name, request_schema, repository_format, repository_type,
+                                        routing_rule=repository_type == 'proxy')
+
+
+def repository_response_schemas(index: SpecIndex) -> Iterator[dict[str, Any]]:
+    for (repository_format, repository_type), schema_name in REPOSITORY_RESPONSE_SCHEMAS.items():
+        path = index.paths.repository(repository_format, repository_type)
+        yield ensure_response(path, 'get', '200', 'successful operation')
+        yield response_media(path, 'get', '200', ref(schema_name))
+
+
+def repository_response_descriptions(index: SpecIndex) -> Iterator[dict[str, Any]]:
+    """NXRM has, on occasion, dropped `description` from the `200` response of repository-format GET
+    endpoints across many/all formats (not just the ones patched by name). OpenAPI Generator
+    requires it, so backfill it wherever it's missing rather than special-casing every format."""
+    for _, _, _, path in index.paths.iter_repositories():
+        operation = index.document['paths'][path].get('get', {})
+        if '200' in operation.get('responses', {}):
+            yield {
+                'op': 'ensure',
+                'target': pointer('paths', path, 'get', 'responses', '200', 'description'),
+                'value': 'successful operation'
+            }
+
+
+GENERATORS = {
+    'repository-operation-ids': repository_operation_ids,
+    'privilege-operation-ids': privilege_operation_ids,
+    'privilege-create-responses': privilege_create_responses,
+    'privilege-update-responses': privilege_update_responses,
+    'api-repository-schemas': api_repository_schemas,
+    'repository-response-schemas': repository_response_schemas,
+    'repository-response-descriptions': repository_response_descriptions,
+}
+
+PATCH_TABLE: list[dict[str, Any]] = [
+    {
+        'description': 'Adding `securitySchemes`',
+        'patches': [
+            {'op': 'ensure', 'target': '/components/securitySchemes', 'value': {
+                'BasicAuth': {
+                    'type': 'http',
+                    'scheme': 'basic'
+                }
+            }},
+            {'op': 'ensure', 'target': '/security', 'value': [
+                {
+                    'BasicAuth': []
+                }
+            ]},
+        ]
+    },
+    {
+        'description': 'Fixing and pinning OperationID for for GET /v1/repositories',
+        'patches': [operation_id('/v1/repositories', 'get', 'getAllRepositories')]
+    },
+    {
+        'description': 'Fixing and pinning OperationIDs for /v1/repositories/* paths',
+        'generate': 'repository-operation-ids'
+    },
+    {
+        'description': 'Fixing and pinning OperationIDs for /v1/security/privileges/* paths',
+        'generate': 'privilege-operation-ids'
+    },
+    {
+        'description': 'Correcting Response Schema for GET Privileges Operations',
+        'patches': [
+            {'op': 'set', 'target': '/components/schemas/ApiPrivilegeRequest', 'snippet': 'ApiPrivilegeRequest.json'},
+            operation_id('/v1/security/privileges', 'get', 'getAllPrivileges'),
+            ensure_response('/v1/security/privileges', 'get', '200', 'successful operation'),
+            response_content('/v1/security/privileges', 'get', '200', {
+                'type': 'array',
+                'items': ref('ApiPrivilegeRequest')
+            }),
+            ensure_response('/v1/security/privileges/{privilegeName}', 'get', '200', 'successful operation'),
+            response_content('/v1/security/privileges/{privilegeName}', 'get', '200', ref('ApiPrivilegeRequest')),
+        ]
+    },
+    # Resolved in NXRM 3.86 - Repository schemas missing `format`, `type` and `url`
+    {
+        'description': 'Fixing schemas `StorageAttributes` and `HttpClientConnectionAuthenticationAttributes`',
+        'patches': [
+            # Missing Write Policy
+            schema_property('StorageAttributes', 'writePolicy', {
+                'description': 'Controls if deployments of and updates to assets are allowed',
+                'enum': ['allow', 'allow_once', 'deny'],
+                'example': 'allow_once',
+                'type': 'string'
+            }),
+            schema_property('HttpClientConnectionAuthenticationAttributes', 'preemptive', {
+                'description': 'Whether to use pre-emptive authentication. Use with caution. Defaults to false.',
+                'example': 'false',
+                'type': 'boolean'
+            }),
+        ]
+    },
+    {
+        'description': 'Overriding operation IDs',
+        'patches': [
+            operation_id('/v1/blobstores/s3', 'post', 'CreateS3BlobStore'),
+            operation_id('/v1/blobstores/s3/{name}', 'get', 'GetS3BlobStore'),
+            operation_id('/v1/blobstores/s3/{name}', 'put', 'UpdateS3BlobStore'),
+            # `/v1/plan` and `/v1/plan/{planId}` reuse the same operationId for delete/put - disambiguate
+            # the bulk (no id) operations, matching their "all"/"execute" semantics from `summary`.
+            operation_id('/v1/plan', 'delete', 'deleteAllPlans'),
+            operation_id('/v1/plan', 'put', 'executeAllPlans'),
+            operation_id('/v1/plan/{planId}', 'put', 'executePlan'),
+        ]
+    },
+    {
+        'description': 'Fixing /security/ldap/* response schemas',
+        'patches': [
+            ensure_response('/v1/security/ldap', 'get', '200', 'LDAP server list returned'),
+            response_content('/v1/security/ldap', 'get', '200', {
+                'type': 'array',
+                'items': ref('ReadLdapServerXo')
+            }),
+            ensure_response('/v1/security/ldap/{name}', 'get', '200', 'LDAP server returned'),
+            response_content('/v1/security/ldap/{name}', 'get', '200', ref('ReadLdapServerXo')),
+        ]
+    },
+    {
+        'description': 'Fixing Create/Update Schema required objects for /security/ldap/*',
+        'patches': [
+            # `groupType` no longer needs removing from `CreateLdapServerXo` as of 3.90.1
+            {'op': 'copy', 'from': '/components/schemas/CreateLdapServerXo/required',
+             'target': '/components/schemas/ReadLdapServerXo/required'},
+            {'op': 'copy', 'from': '/components/schemas/CreateLdapServerXo/required',
+             'target': '/components/schemas/UpdateLdapServerXo/required'},
+        ]
+    },
+    # Not required from NXRM 3.85.0 onwards - response schema for IQ Connection
+    {
+        'description': 'Adding missing 201 empty responses',
+        'generate': 'privilege-create-responses'
+    },
+    {
+        'description': 'Adding missing 204 empty responses',
+        'generate': 'privilege-update-responses',
+        'patches': [
+            {'op': 'set', 'target': pointer('paths', p, m, 'responses', '204'),
+             'value': {'content': {}, 'description': 'Success'}}
+            for p, m in [
+                ('/v1/security/roles/{id}', 'delete'),
+                ('/v1/security/users/{userId}', 'put'),
+                ('/v1/security/users/{userId}/change-password', 'put'),
+            ]
+        ]
+    },
+    {
+        'description': 'Correcting schema InputStream',
+        'patches': [schema('InputStream', {'type': 'string', 'format': 'binary'})]
+    },
+    {
+        'description': 'Correcting response schema for GET /v1/repositories/docker/hosted/{name}',
+        'patches': [schema_property('DockerHostedApiRepository', 'storage', ref('DockerHostedStorageAttributes'))]
+    },
+    {
+        'description': 'Correcting Schema CargoGroupApiRepository',
+        'patches': [schema_property('CargoGroupApiRepository', 'group', ref('GroupAttributes'))]
+    },
+    {
+        'description': 'Injecting requestBody schema for PUT /v1/tasks/{taskId}',
+        'patches': [
+            {'op': 'set', 'target': pointer('paths', '/v1/tasks/{taskId}', 'put', 'requestBody', 'content',
+                                            'application/json', 'schema'),
+             'value': {
+                 'properties': {
+                     'alertEmail': {
+                         'description': 'e-mail for task notifications.',
+                         'type': 'string'
+                     },
+                     'enabled': {
+                         'description': 'Indicates if the task would be enabled.',
+                         'type': 'boolean'
+                     },
+                     'frequency': ref('FrequencyXO'),
+                     'name': {
+                         'description': 'The name of the task template.',
+                         'type': 'string'
+                     },
+                     'notificationCondition': {
+                         'description': 'Condition required to notify a task execution.',
+                         'enum': ['FAILURE', 'SUCCESS_FAILURE'],
+                         'type': 'string'
+                     },
+                     'properties': {
+                         'additionalProperties': {
+                             'type': 'string'
+                         },
+                         'description': 'Additional properties for the task',
+                         'type': 'object'
+                     },
+                     'type': {
+                         'description': 'The type of task to be created.',
+                         'type': 'string'
+                     }
+                 },
+                 'required': [
+                     'enabled', 'frequency', 'name', 'notificationCondition'
+                 ]
+             }},
+        ]
+    },
+    {
+        'description': 'Injecting Response Schema for POST /v1/tasks',
+        'patches': [
+            {'op': 'set', 'target': pointer('paths', '/v1/tasks', 'post', 'responses'), 'value': {
+                '201': {
+                    'content': {
+                        'application/json': {
+                            'schema': {
+                                'properties': {
+                                    'id': {
+                                        'description': 'Task ID',
+                                        'format': 'uuid',
+                                        'type': 'string'
+                                    }
+                                },
+                                'required': ['id']
+                            }
+                        }
+                    },
+                    'description': 'Task created successfully'
+                }
+            }},
+        ]
+    },
+    {
+        'description': 'Adding missing `tags` field for schema `ComponentXO`',
+        'patches': [schema_property('ComponentXO', 'tags', {'items': {'type': 'string'}, 'type': 'array'})]
+    },
+    {
+        'description': 'Correct `attributes` field for schema `TagXO`',
+        'patches': [schema_property('TagXO', 'attributes', {'additionalProperties': {}, 'type': 'object'})]
+    },
+    {
+        'description': 'Patching schema `HttpSettingsXo`',
+        'patches': [
+            {'op': 'merge', 'target': '/components/schemas/HttpSettingsXo/properties/nonProxyHosts',
+             'value': {'nullable': 'true'}},
+            {'op': 'merge', 'target': '/components/schemas/HttpSettingsXo/properties/userAgent',
+             'value': {'nullable': 'true'}},
+            {'op': 'merge', 'target': '/components/schemas/ProxySettingsXo', 'value': {'nullable': 'true'}},
+        ]
+    },
+    {
+        'description': 'Inject response schema for POST /v1/iq/verify-connection and set OperationId',
+        'patches': [
+            operation_id('/v1/iq/verify-connection', 'post', 'verifyIqConnection'),
+            ensure_response('/v1/iq/verify-connection', 'post', '200',
+                            'Connection verification complete, check response body for result'),
+            response_content('/v1/iq/verify-connection', 'post', '200', ref('IqConnectionVerificationXo')),
+        ]
+    },
+    {
+        'description': 'Complete type for `terraform.uploadType` for POST /v1/components',
+        'patches': [
+            # NXRM has, on occasion, dropped the entire multipart `requestBody` for this operation from the
+            # generated Swagger doc. Re-create it (as seen in NXRM 3.93) before patching `terraform.uploadType`.
+            {'op': 'ensure', 'target': pointer('paths', '/v1/components', 'post', 'requestBody'),
+             'snippet': 'ComponentsUploadRequestBody.json'},
+            {'op': 'set', 'target': pointer('paths', '/v1/components', 'post', 'requestBody', 'content',
+                                            'multipart/form-data', 'schema', 'properties', 'terraform.uploadType'),
+             'value': {
+                 'description': 'terraform Upload Type',
+                 'enum': ['module', 'provider'],
+                 'type': 'string'
+             }},
+        ]
+    },
+    {
+        'description': 'Correct response schema for POST /v1/tasks',
+        'patches': [
+            response_media('/v1/tasks', 'post', '201', ref('TaskXO')),
+        ]
+    },
+    {
+        'description': 'Fix `TerraformHostedRepositoryApiRequest` schema (missing fields)',
+        'patches': [
+            {'op': 'merge', 'target': '/components/schemas/TerraformHostedRepositoryApiRequest/properties', 'value': {
+                'format': {
+                    'type': 'string',
+                    'default': 'terraform'
+                },
+                'type': {
+                    'type': 'string',
+                    'default': 'hosted'
+                },
+                'url': {
+                    'type': 'string'
+                },
+                'component': ref('ComponentAttributes')
+            }},
+        ]
+    },
+    # Updates for NXRM 3.92.x
+    {
+        'description': 'Correct invalid schema name "Licensed Solution"',
+        'patches': [
+            # A no-op once NXRM emits a validly-named schema (e.g. `LicensedSolutionXO`) - in which case the existing
+            # $ref is correct and must be left alone, as it would point at a component that does not exist.
+            {'op': 'rename', 'from': '/components/schemas/Licensed Solution',
+             'target': '/components/schemas/LicensedSolution',
+             'refs': ['/components/schemas/IqConnectionXo/properties/licensedSolutions/items']},
+        ]
+    },
+    {
+        'description': 'Patch TerraformProxyApiRepository schema - now missing `terraform` item',
+        'patches': [schema_property('TerraformProxyApiRepository', 'terraform', ref('TerraformAttributes'))]
+    },
+    {
+        'description': 'Adding `200` page responses for operations paginated by `continuationToken`',
+        'patches': [p for path, schema_name in PAGINATED_RESPONSE_SCHEMAS.items() for p in (
+            ensure_response(path, 'get', '200', 'successful operation'),
+            response_media(path, 'get', '200', ref(schema_name)),
+        )]
+    },
+    {
+        'description': 'Building `*ApiRepository` schemas from their `*RepositoryApiRequest`',
+        'generate': 'api-repository-schemas'
+    },
+    {
+        'description': 'Correcting response schemas for GET /v1/repositories/[FORMAT]/[TYPE]/{repositoryName}',
+        'generate': 'repository-response-schemas'
+    },
+    {
+        'description': 'Backfilling missing `200` response descriptions for /v1/repositories/* GET endpoints',
+        'generate': 'repository-response-descriptions'
+    },
+]
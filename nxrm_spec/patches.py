@@ -0,0 +1,215 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Declarative patch engine.
+
+A patch is a plain `dict` with an `op` and a JSON Pointer `target`:
+
+    {'op': 'set', 'target': '/components/schemas/InputStream', 'value': {...}}
+
+Supported operations:
+
+- `set`:    replace (or add) the value at `target`
+- `merge`:  shallow-merge `value` into the object at `target`
+- `ensure`: add `value` at `target` only if nothing is there yet
+- `copy`:   set `target` to a copy of the value at `from`
+- `rename`: move the value at `from` to `target` (a no-op when `from` is already gone), then point every `$ref` at the
+            pointers listed in `refs` to the new location
+
+Instead of `value`, a patch may name a JSON file in `snippets/` via `snippet`.
+
+Patches are organised in groups (see `patch_table.py`). A group either lists its `patches`, or names a `generate`
+function which produces its patches from the `SpecIndex` - used for the rules that apply across many paths.
+"""
+import copy
+import json
+import os.path
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator
+
+from .paths import PathIndex
+from .pointer import PointerError, PointerIndex, escape
+
+SNIPPETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'snippets')
+
+APPLIED = 'applied'
+NO_OP = 'no-op'
+FAILED = 'failed'
+
+
+class PatchError(Exception):
+    pass
+
+
+class SpecIndex(PointerIndex):
+    """A `PointerIndex` over an OpenAPI document that also lists every operation and indexes the repository and
+    privilege paths (see `paths.py`), built with one pass over `paths`."""
+
+    def __init__(self, document: dict[str, Any]) -> None:
+        super().__init__(document)
+        self.operations: list[tuple[str, str, dict[str, Any]]] = []
+        self.paths = PathIndex.build(document.get('paths', {}))
+        for path, path_item in document.get('paths', {}).items():
+            for method, operation in path_item.items():
+                if isinstance(operation, dict):
+                    self.operations.append((path, str(method).lower(), operation))
+
+
+@dataclass
+class PatchResult:
+    group: str
+    patch: dict[str, Any]
+    status: str
+    reason: str = ''
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'group': self.group,
+            'op': self.patch.get('op'),
+            'target': self.patch.get('target'),
+            'status': self.status,
+            'reason': self.reason,
+        }
+
+
+@dataclass
+class PatchReport:
+    results: list[PatchResult] = field(default_factory=list)
+
+    def _with_status(self, status: str) -> list[PatchResult]:
+        return [r for r in self.results if r.status == status]
+
+    @property
+    def applied(self) -> list[PatchResult]:
+        return self._with_status(APPLIED)
+
+    @property
+    def no_ops(self) -> list[PatchResult]:
+        return self._with_status(NO_OP)
+
+    @property
+    def failed(self) -> list[PatchResult]:
+        return self._with_status(FAILED)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'applied': len(self.applied),
+            'no-op': len(self.no_ops),
+            'failed': len(self.failed),
+            'results': [r.to_dict() for r in self.results],
+        }
+
+
+class PatchEngine:
+
+    def __init__(self, document: dict[str, Any], generators: dict[str, Callable[[SpecIndex], Iterable[dict[str, Any]]]],
+                 snippets_dir: str = SNIPPETS_DIR) -> None:
+        self.index = SpecIndex(document)
+        self.generators = generators
+        self.snippets_dir = snippets_dir
+        self._snippets: dict[str, Any] = {}
+
+    def _value(self, patch: dict[str, Any]) -> Any:
+        if 'snippet' in patch:
+            name = patch['snippet']
+            if name not in self._snippets:
+                with open(os.path.join(self.snippets_dir, name), 'r') as snippet_file:
+                    self._snippets[name] = json.load(snippet_file)
+            return copy.deepcopy(self._snippets[name])
+        if 'value' not in patch:
+            raise PatchError('patch has neither `value` nor `snippet`')
+        return copy.deepcopy(patch['value'])
+
+    def _set(self, patch: dict[str, Any]) -> str:
+        value = self._value(patch)
+        target = patch['target']
+        if self.index.contains(target) and self.index.get(target) == value:
+            return NO_OP
+        self.index.set(target, value)
+        return APPLIED
+
+    def _merge(self, patch: dict[str, Any]) -> str:
+        node = self.index.get(patch['target'])
+        value = self._value(patch)
+        if not isinstance(node, dict) or not isinstance(value, dict):
+            raise PatchError('`merge` requires an object at both `target` and `value`')
+        if all(k in node and node[k] == v for k, v in value.items()):
+            return NO_OP
+        for k, v in value.items():
+            self.index.set(f'{patch["target"]}/{escape(k)}', v)
+        return APPLIED
+
+    def _ensure(self, patch: dict[str, Any]) -> str:
+        if self.index.contains(patch['target']):
+            return NO_OP
+        self.index.set(patch['target'], self._value(patch))
+        return APPLIED
+
+    def _copy(self, patch: dict[str, Any]) -> str:
+        return self._set({'target': patch['target'], 'value': self.index.get(patch['from'])})
+
+    def _rename(self, patch: dict[str, Any]) -> str:
+        if not self.index.contains(patch['from']):
+            return NO_OP
+        if self.index.contains(patch['target']):
+            raise PatchError(f'{patch["target"]} already exists')
+        self.index.set(patch['target'], self.index.remove(patch['from']))
+        for ref in patch.get('refs', []):
+            self.index.set(f'{ref}/$ref', f'#{patch["target"]}')
+        return APPLIED
+
+    OPERATIONS = {'set': _set, 'merge': _merge, 'ensure': _ensure, 'copy': _copy, 'rename': _rename}
+
+    def apply_patch(self, patch: dict[str, Any]) -> tuple[str, str]:
+        operation = self.OPERATIONS.get(patch.get('op', ''))
+        if operation is None:
+            return FAILED, f'unknown op {patch.get("op")!r}'
+        try:
+            return operation(self, patch), ''
+        except (PointerError, PatchError) as e:
+            return FAILED, str(e.args[0] if e.args else e)
+
+    def group_patches(self, group: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        if 'generate' in group:
+            yield from self.generators[group['generate']](self.index)
+        yield from group.get('patches', [])
+
+    def apply_group(self, group: dict[str, Any], report: PatchReport) -> list[PatchResult]:
+        results = []
+        for patch in self.group_patches(group):
+            status, reason = self.apply_patch(patch)
+            results.append(PatchResult(group=group['description'], patch=patch, status=status, reason=reason))
+        report.results.extend(results)
+        return results
+
+
+def apply_patches(document: dict[str, Any], table: list[dict[str, Any]],
+                  generators: dict[str, Callable[[SpecIndex], Iterable[dict[str, Any]]]],
+                  verbose: bool = True) -> PatchReport:
+    """Apply every group in `table` to `document` (in place) and report what happened to each patch."""
+    engine = PatchEngine(document, generators)
+    report = PatchReport()
+    for group in table:
+        if verbose:
+            print(f'{group["description"]}...')
+        results = engine.apply_group(group, report)
+        if verbose:
+            applied = sum(1 for r in results if r.status == APPLIED)
+            no_op = sum(1 for r in results if r.status == NO_OP)
+            print(f'     Applied {applied}, no-op {no_op}')
+            for r in results:
+                if r.status == FAILED:
+                    print(f'     FAILED {r.patch.get("op")} {r.patch.get("target")}: {r.reason}')
+    return report
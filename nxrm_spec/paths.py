@@ -0,0 +1,76 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Index of the repository and privilege paths, parsed once.
+
+    /v1/repositories/maven/proxy                     -> repositories[('maven', 'proxy', False)]
+    /v1/repositories/maven/proxy/{repositoryName}    -> repositories[('maven', 'proxy', True)]
+    /v1/security/privileges/script                   -> privileges[('script', False)]
+    /v1/security/privileges/script/{privilegeName}   -> privileges[('script', True)]
+
+Paths below `/v1/repositories/{repositoryName}/` are indexed the same way, with `{repositoryName}` as their format
+(e.g. `('{repositoryName}', 'browse', False)`) - the operationIds pinned from that have been published as-is.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+REPOSITORIES_PREFIX = '/v1/repositories/'
+PRIVILEGES_PREFIX = '/v1/security/privileges/'
+
+
+def _is_parameter(segment: str) -> bool:
+    return segment.startswith('{') and segment.endswith('}')
+
+
+@dataclass
+class PathIndex:
+    # (format, type, has-name-param) -> path
+    repositories: dict[tuple[str, str, bool], str] = field(default_factory=dict)
+    # (privilege type, has-name-param) -> path
+    privileges: dict[tuple[str, bool], str] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, paths: dict[str, Any]) -> 'PathIndex':
+        index = cls()
+        for path in paths:
+            if path.startswith(REPOSITORIES_PREFIX):
+                parts = path[len(REPOSITORIES_PREFIX):].split('/')
+                if len(parts) == 2 or (len(parts) == 3 and _is_parameter(parts[2])):
+                    index.repositories[(parts[0], parts[1], len(parts) == 3)] = path
+            elif path.startswith(PRIVILEGES_PREFIX):
+                parts = path[len(PRIVILEGES_PREFIX):].split('/')
+                if _is_parameter(parts[0]):
+                    continue
+                if len(parts) == 1 or (len(parts) == 2 and _is_parameter(parts[1])):
+                    index.privileges[(parts[0], len(parts) == 2)] = path
+        return index
+
+    def repository(self, repository_format: str, repository_type: str, has_name: bool = True) -> str:
+        """The path for a format/type - or, if NXRM no longer serves it, where it would be (so patches against it
+        are reported as failed rather than silently skipped)."""
+        path = self.repositories.get((repository_format, repository_type, has_name))
+        if path is None:
+            path = f'{REPOSITORIES_PREFIX}{repository_format}/{repository_type}'
+            if has_name:
+                path += '/{repositoryName}'
+        return path
+
+    def iter_repositories(self) -> Iterator[tuple[str, str, bool, str]]:
+        for (repository_format, repository_type, has_name), path in self.repositories.items():
+            yield repository_format, repository_type, has_name, path
+
+    def iter_privileges(self) -> Iterator[tuple[str, bool, str]]:
+        for (privilege_type, has_name), path in self.privileges.items():
+            yield privilege_type, has_name, path
@@ -0,0 +1,110 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""JSON Pointer (RFC 6901) helpers."""
+from typing import Any
+
+
+class PointerError(KeyError):
+    pass
+
+
+def escape(token: str) -> str:
+    return token.replace('~', '~0').replace('/', '~1')
+
+
+def unescape(token: str) -> str:
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def pointer(*tokens: str) -> str:
+    """Build a JSON Pointer from unescaped tokens - e.g. `pointer('paths', '/v1/tasks', 'post')`."""
+    return ''.join(f'/{escape(str(t))}' for t in tokens)
+
+
+def split(ptr: str) -> tuple[str, str]:
+    """Split a pointer into its parent pointer and (unescaped) last token."""
+    if not ptr.startswith('/'):
+        raise PointerError(f'Invalid JSON Pointer: {ptr!r}')
+    parent, _, token = ptr.rpartition('/')
+    return parent, unescape(token)
+
+
+def _child(node: Any, token: str, ptr: str) -> Any:
+    if isinstance(node, dict):
+        if token in node:
+            return node[token]
+    elif isinstance(node, list) and token.isdigit() and int(token) < len(node):
+        return node[int(token)]
+    raise PointerError(f'{ptr} does not exist')
+
+
+class PointerIndex:
+    """Resolves JSON Pointers against one document.
+
+    Every container visited is memoised by its pointer, so the many patches that share a prefix (e.g. everything under
+    `/paths/~1v1~1repositories~1raw~1hosted~1{repositoryName}/get/responses`) only walk the document once. Mutations
+    must go through this class so the memo is kept consistent.
+    """
+
+    def __init__(self, document: Any) -> None:
+        self.document = document
+        self._nodes: dict[str, Any] = {'': document}
+
+    def get(self, ptr: str) -> Any:
+        if ptr in self._nodes:
+            return self._nodes[ptr]
+        parent, token = split(ptr)
+        node = _child(self.get(parent), token, ptr)
+        if isinstance(node, (dict, list)):
+            self._nodes[ptr] = node
+        return node
+
+    def contains(self, ptr: str) -> bool:
+        try:
+            self.get(ptr)
+            return True
+        except PointerError:
+            return False
+
+    def _forget(self, ptr: str) -> None:
+        prefix = f'{ptr}/'
+        for cached in [p for p in self._nodes if p == ptr or p.startswith(prefix)]:
+            del self._nodes[cached]
+
+    def set(self, ptr: str, value: Any) -> None:
+        parent_ptr, token = split(ptr)
+        parent = self.get(parent_ptr)
+        if isinstance(parent, dict):
+            parent[token] = value
+        elif isinstance(parent, list) and token.isdigit() and int(token) < len(parent):
+            parent[int(token)] = value
+        else:
+            raise PointerError(f'{parent_ptr} cannot hold {token!r}')
+        self._forget(ptr)
+
+    def remove(self, ptr: str) -> Any:
+        parent_ptr, token = split(ptr)
+        parent = self.get(parent_ptr)
+        value = _child(parent, token, ptr)
+        if isinstance(parent, dict):
+            del parent[token]
+        else:
+            del parent[int(token)]
+            # Indices after this one have shifted - forget everything below the list
+            self._forget(parent_ptr)
+            self._nodes[parent_ptr] = parent
+        self._forget(ptr)
+        return value
@@ -0,0 +1,102 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Deterministic serialization of the patched specification.
+
+Every format sorts keys and never emits YAML anchors/aliases, so the same document always produces the same bytes and
+a refresh only shows real changes in its diff:
+
+- `yaml`:    `spec/openapi.yaml` - the input to openapi-generator (see `common.yaml`)
+- `json`:    `spec/openapi.json` - indented JSON for tools that do not read YAML
+- `compact`: `spec/openapi.min.json` - minified JSON; the cheapest form to load (no YAML parse at all)
+"""
+import json
+import os
+import os.path
+import tempfile
+from typing import Any, Callable
+
+import yaml
+
+try:
+    from yaml import CDumper as _BaseDumper, CLoader as _Loader
+except ImportError:
+    from yaml import Dumper as _BaseDumper, Loader as _Loader
+
+SPEC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'spec')
+
+
+class SpecDumper(_BaseDumper):
+    """The C emitter where available, without anchors/aliases for values that happen to be shared in memory."""
+
+    def ignore_aliases(self, data: Any) -> bool:
+        return True
+
+
+def to_yaml(document: Any) -> str:
+    return yaml.dump(document, Dumper=SpecDumper, sort_keys=True, allow_unicode=False)
+
+
+def to_json(document: Any) -> str:
+    return json.dumps(document, indent=2, sort_keys=True) + '\n'
+
+
+def to_compact_json(document: Any) -> str:
+    return json.dumps(document, sort_keys=True, separators=(',', ':'))
+
+
+FORMATS: dict[str, tuple[str, Callable[[Any], str]]] = {
+    'yaml': ('openapi.yaml', to_yaml),
+    'json': ('openapi.json', to_json),
+    'compact': ('openapi.min.json', to_compact_json),
+}
+
+
+def output_path(format: str, spec_dir: str = SPEC_DIR) -> str:
+    return os.path.join(spec_dir, FORMATS[format][0])
+
+
+def serialize(document: Any, format: str) -> str:
+    return FORMATS[format][1](document)
+
+
+def write_if_changed(path: str, content: str) -> bool:
+    """Atomically replace `path` with `content` unless it already holds exactly that. Returns whether it was written."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        # mkstemp creates files readable only by their owner
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return True
+
+
+def load_spec(path: str) -> Any:
+    """Load a spec written by any of `FORMATS` - JSON is parsed as JSON, everything else as YAML."""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.json'):
+            return json.load(f)
+        return yaml.load(f, Loader=_Loader)
@@ -0,0 +1,191 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""A reduced spec with only some operations - and only the components they need - for a slim client:
+
+    python -m nxrm_spec.subset --tag Search --tag assets --tag components -o spec/openapi.search.yaml
+
+Operations are selected by tag (case-insensitively), by operationId and by path - both `fnmatch` patterns, such as
+`get*Repository` and `/v1/security/*`. What is kept of `components` is the transitive closure of everything those
+operations reference (`$ref`s and discriminator mappings, and the security schemes they require); every other path,
+component and tag is dropped.
+"""
+import argparse
+import copy
+import sys
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from typing import Any, Iterable, Iterator
+
+from .diff import HTTP_METHODS
+from .pointer import unescape
+from .serialize import FORMATS, load_spec, output_path, serialize, write_if_changed
+
+COMPONENT_REF_PREFIX = '#/components/'
+
+
+@dataclass
+class SubsetReport:
+    operations: int
+    total_operations: int
+    # `<kind>/<name>`
+    components: int
+    total_components: int
+    # selectors that matched no operation
+    unmatched: list[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (f'{self.operations} of {self.total_operations} operations, '
+                f'{self.components} of {self.total_components} components')
+
+
+def _component(ref: str) -> str | None:
+    if not ref.startswith(COMPONENT_REF_PREFIX):
+        return None
+    return '/'.join(unescape(t) for t in ref[len(COMPONENT_REF_PREFIX):].split('/')[:2])
+
+
+def _iter_refs(node: Any) -> Iterator[str]:
+    """The components `node` references, as `<kind>/<name>`."""
+    if isinstance(node, dict):
+        refs = [node.get('$ref')]
+        mapping = node.get('discriminator', {}).get('mapping') if isinstance(node.get('discriminator'), dict) else None
+        refs += list((mapping or {}).values())
+        for ref in refs:
+            component = _component(ref) if isinstance(ref, str) else None
+            if component is not None:
+                yield component
+        for value in node.values():
+            yield from _iter_refs(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _iter_refs(value)
+
+
+def _security_schemes(requirements: Iterable[dict[str, Any]] | None) -> Iterator[str]:
+    for requirement in requirements or ():
+        for name in requirement:
+            yield f'securitySchemes/{name}'
+
+
+def subset_spec(document: dict[str, Any], tags: Iterable[str] = (), operation_ids: Iterable[str] = (),
+                paths: Iterable[str] = ()) -> tuple[dict[str, Any], SubsetReport]:
+    """A copy of `document` with only the operations matching any of `tags`, `operation_ids` or `paths`."""
+    tags, operation_ids, paths = list(tags), list(operation_ids), list(paths)
+    matched: set[str] = set()
+    total = 0
+    result_paths: dict[str, Any] = {}
+    pending: list[str] = list(_security_schemes(document.get('security')))
+    for path, path_item in (document.get('paths') or {}).items():
+        kept: dict[str, Any] = {}
+        for method in HTTP_METHODS:
+            operation = path_item.get(method)
+            if not isinstance(operation, dict):
+                continue
+            total += 1
+            operation_tags = {t.lower() for t in operation.get('tags') or []}
+            selectors = [f'tag {t}' for t in tags if t.lower() in operation_tags]
+            selectors += [f'operationId {p}' for p in operation_ids if fnmatchcase(operation.get('operationId', ''), p)]
+            selectors += [f'path {p}' for p in paths if fnmatchcase(path, p)]
+            if selectors:
+                matched.update(selectors)
+                kept[method] = operation
+                pending += _iter_refs(operation)
+                pending += _security_schemes(operation.get('security'))
+        if kept:
+            shared = {k: v for k, v in path_item.items() if k not in HTTP_METHODS}
+            pending += _iter_refs(shared)
+            result_paths[path] = {**shared, **kept}
+
+    components = document.get('components') or {}
+    reachable: set[str] = set()
+    while pending:
+        key = pending.pop()
+        if key in reachable:
+            continue
+        reachable.add(key)
+        kind, _, name = key.partition('/')
+        if name in (components.get(kind) or {}):
+            pending += _iter_refs(components[kind][name])
+
+    result = {k: copy.deepcopy(v) for k, v in document.items() if k not in ('paths', 'components', 'tags')}
+    result['paths'] = copy.deepcopy(result_paths)
+    result['components'] = {
+        kind: {name: copy.deepcopy(value) for name, value in values.items() if f'{kind}/{name}' in reachable}
+        for kind, values in components.items()
+    }
+    result['components'] = {kind: values for kind, values in result['components'].items() if values}
+    used_tags = {t for path_item in result_paths.values() for method in HTTP_METHODS
+                 for t in (path_item.get(method) or {}).get('tags') or []}
+    if 'tags' in document:
+        result['tags'] = [copy.deepcopy(t) for t in document['tags'] if t.get('name') in used_tags]
+
+    selectors = [f'tag {t}' for t in tags] + [f'operationId {p}' for p in operation_ids] + [f'path {p}' for p in paths]
+    return result, SubsetReport(
+        operations=sum(1 for path_item in result_paths.values() for method in HTTP_METHODS if method in path_item),
+        total_operations=total,
+        components=sum(len(values) for values in result['components'].values()),
+        total_components=sum(len(values or {}) for values in components.values()),
+        unmatched=[s for s in selectors if s not in matched],
+    )
+
+
+def format_for(path: str) -> str:
+    """The serialization (see `serialize.FORMATS`) a spec written to `path` should have."""
+    for name, (filename, _) in sorted(FORMATS.items(), key=lambda f: -len(f[1][0])):
+        if path.endswith(f'.{filename.partition(".")[2]}'):
+            return name
+    return 'yaml'
+
+
+def write_subset(document: dict[str, Any], output: str, tags: Iterable[str] = (), operation_ids: Iterable[str] = (),
+                 paths: Iterable[str] = ()) -> SubsetReport:
+    """Write the subset of `document` to `output` (in the format its extension says), unless nothing was selected
+    by one of the selectors - so a typo never silently produces a client without what it was for."""
+    subset, report = subset_spec(document, tags, operation_ids, paths)
+    if not report.unmatched and report.operations:
+        write_if_changed(output, serialize(subset, format_for(output)))
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Write a reduced OpenAPI specification with only the selected '
+                                                 'operations and the components they reference.')
+    parser.add_argument('--spec', metavar='FILE', default=output_path('yaml'),
+                        help='The spec to reduce (default: %(default)s)')
+    parser.add_argument('--tag', dest='tags', metavar='TAG', action='append', default=[],
+                        help='Keep the operations with this tag - may be repeated')
+    parser.add_argument('--operation', dest='operation_ids', metavar='PATTERN', action='append', default=[],
+                        help='Keep the operations whose operationId matches this `fnmatch` pattern - may be repeated')
+    parser.add_argument('--path', dest='paths', metavar='PATTERN', action='append', default=[],
+                        help='Keep the operations whose path matches this `fnmatch` pattern - may be repeated')
+    parser.add_argument('-o', '--output', metavar='FILE', required=True,
+                        help='Where to write the reduced spec - `.json` for JSON, `.min.json` for minified JSON, '
+                             'anything else for YAML')
+    args = parser.parse_args(argv)
+    if not (args.tags or args.operation_ids or args.paths):
+        parser.error('select operations with at least one --tag, --operation or --path')
+
+    report = write_subset(load_spec(args.spec), args.output, args.tags, args.operation_ids, args.paths)
+    for selector in report.unmatched:
+        print(f'No operation matches {selector}')
+    if report.unmatched or not report.operations:
+        return 1
+    print(f'Wrote {args.output}: {report.summary()}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
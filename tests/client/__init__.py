@@ -0,0 +1,33 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""The generated client these tests run against: the one `NEXUS_API_CLIENT_LANGUAGE`'s batch config generates (`python`
+by default), in its `outputDir` or `NEXUS_API_CLIENT_DIR`, extended by `generate-extensions.py` - tests of a client
+that is not there are skipped.
+
+    NEXUS_API_CLIENT_DIR=out/python python -m pytest tests/client
+"""
+import os
+import os.path
+import sys
+
+from benchmarks.import_time import client
+
+LANGUAGE = os.environ.get('NEXUS_API_CLIENT_LANGUAGE', 'python')
+CLIENT_DIR, PACKAGE = client(LANGUAGE, os.environ.get('NEXUS_API_CLIENT_DIR'))
+GENERATED = os.path.isdir(os.path.join(CLIENT_DIR, PACKAGE))
+
+if GENERATED:
+    sys.path.insert(0, CLIENT_DIR)
@@ -0,0 +1,45 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""A mock NXRM (`benchmarks/mock_server.py`) for the client to talk to - paged operations answer `PAGES` pages of
+`PAGE_SIZE` items."""
+import threading
+
+import pytest
+
+from benchmarks.mock_server import MockNexus, serve
+from nxrm_spec.serialize import load_spec, output_path
+
+PAGE_SIZE = 50
+PAGES = 3
+
+
+@pytest.fixture(scope='session')
+def mock_nexus():
+    mock = MockNexus(load_spec(output_path('yaml')), page_size=PAGE_SIZE, pages=PAGES)
+    server = serve(mock)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    mock.url = f'http://127.0.0.1:{server.server_address[1]}{mock.base_path}'
+    yield mock
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def configuration(mock_nexus):
+    from nexus_api_client.configuration import Configuration
+
+    return Configuration(host=mock_nexus.url, username='admin', password='admin123')
@@ -0,0 +1,114 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip('nexus_api_client.ext.download')
+
+from nexus_api_client.api_client import ApiClient  # noqa: E402
+from nexus_api_client.configuration import Configuration  # noqa: E402
+from nexus_api_client.ext.download import (  # noqa: E402
+    AssetDownload, ChecksumMismatch, download_asset, download_assets, same_origin
+)
+
+CONTENT = b'0123456789' * 1000
+
+
+@pytest.fixture(scope='module')
+def files():
+    """Serves `CONTENT` at any path (honouring a `Range`), recording the headers of each request."""
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(dict(self.headers))
+            start = int(self.headers['Range'][len('bytes='):-1]) if 'Range' in self.headers else 0
+            self.send_response(206 if start else 200)
+            self.send_header('Content-Length', str(len(CONTENT) - start))
+            self.end_headers()
+            self.wfile.write(CONTENT[start:])
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address[1], requests
+    server.shutdown()
+    server.server_close()
+
+
+def api_client(port):
+    return ApiClient(Configuration(host=f'http://127.0.0.1:{port}/service/rest', username='admin',
+                                   password='admin123'))
+
+
+def asset(url, **checksum):
+    return {'downloadUrl': url, 'checksum': checksum or {'sha1': hashlib.sha1(CONTENT).hexdigest()}}
+
+
+def test_same_origin():
+    host = 'https://nexus.example.com/service/rest'
+    assert same_origin('https://nexus.example.com/repository/maven-releases/a.jar', host)
+    assert same_origin('https://NEXUS.example.com:443/repository/a.jar', host)
+    assert not same_origin('http://nexus.example.com/repository/a.jar', host)
+    assert not same_origin('https://nexus.example.com:8443/repository/a.jar', host)
+    assert not same_origin('https://cdn.example.com/repository/a.jar', host)
+    assert not same_origin('https://nexus.example.com.evil.test/a.jar', host)
+    assert not same_origin('/repository/a.jar', host)
+
+
+def test_credentials_only_go_to_nxrm(files, tmp_path):
+    port, requests = files
+    client = api_client(port)
+    own = download_asset(AssetDownload(asset(f'http://127.0.0.1:{port}/repository/a.jar'), str(tmp_path / 'a')),
+                         client)
+    other = download_asset(AssetDownload(asset(f'http://localhost:{port}/repository/b.jar'), str(tmp_path / 'b')),
+                           client)
+    assert own.ok and other.ok
+    assert requests[-2]['Authorization'].startswith('Basic ')
+    assert 'Authorization' not in requests[-1]
+    assert requests[-1]['User-Agent'] == client.user_agent
+
+
+def test_downloads(files, tmp_path):
+    port, _ = files
+    url = f'http://127.0.0.1:{port}/repository/a.jar'
+    downloads = [AssetDownload(asset(url), str(tmp_path / f'{i}.jar')) for i in range(3)]
+    results = list(download_assets(downloads, api_client(port), workers=3, chunk_size=1000))
+    assert all(r.ok and r.size == len(CONTENT) and r.algorithm == 'sha1' for r in results)
+    assert all((tmp_path / f'{i}.jar').read_bytes() == CONTENT for i in range(3))
+
+
+def test_resumes(files, tmp_path):
+    port, requests = files
+    (tmp_path / 'a.jar.part').write_bytes(CONTENT[:4000])
+    result = download_asset(AssetDownload(asset(f'http://127.0.0.1:{port}/a.jar'), str(tmp_path / 'a.jar')),
+                            api_client(port))
+    assert result.ok and result.resumed_from == 4000 and result.status == 206
+    assert requests[-1]['Range'] == 'bytes=4000-'
+    assert (tmp_path / 'a.jar').read_bytes() == CONTENT
+
+
+def test_checksum_mismatch(files, tmp_path):
+    port, _ = files
+    result = download_asset(AssetDownload(asset(f'http://127.0.0.1:{port}/a.jar', md5='0' * 32),
+                                          str(tmp_path / 'a.jar')), api_client(port))
+    assert isinstance(result.error, ChecksumMismatch) and result.algorithm is None
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,84 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import gzip
+import json
+
+import pytest
+
+pytest.importorskip('nexus_api_client.ext.export')
+
+from nexus_api_client.api_client import ApiClient  # noqa: E402
+from nexus_api_client.configuration import Configuration  # noqa: E402
+from nexus_api_client.ext.export import (  # noqa: E402
+    ASSET_COLUMNS, COMPONENT_COLUMNS, export_assets, export_components, export_repository, flatten
+)
+
+from .conftest import PAGE_SIZE, PAGES  # noqa: E402
+
+COMPONENT = {'id': 'c1', 'repository': 'npm-proxy', 'name': 'left-pad', 'tags': ['a'],
+             'assets': [{'id': 'a1', 'path': 'left-pad/-/left-pad-1.0.tgz', 'checksum': {'sha1': 'x'}},
+                        {'id': 'a2', 'path': 'left-pad'}]}
+
+
+def test_flatten():
+    assert flatten(COMPONENT, ('name', 'version', 'tags', 'assets.path', 'assets.checksum.sha1', 'name.first')) == {
+        'name': 'left-pad', 'version': None, 'tags': ['a'], 'assets.path': ['left-pad/-/left-pad-1.0.tgz', 'left-pad'],
+        'assets.checksum.sha1': ['x', None], 'name.first': None,
+    }
+
+
+def read_ndjson(path):
+    with (gzip.open(path) if str(path).endswith('.gz') else open(path, 'rb')) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_export_assets(configuration, tmp_path):
+    results = list(export_assets(['maven-releases', 'npm-proxy'], str(tmp_path / '{repository}.ndjson.gz'),
+                                 ApiClient(configuration), workers=2))
+    assert sorted(r.repository for r in results) == ['maven-releases', 'npm-proxy']
+    assert all(r.ok and r.records == PAGE_SIZE * PAGES for r in results)
+    records = read_ndjson(tmp_path / 'maven-releases.ndjson.gz')
+    assert len(records) == PAGE_SIZE * PAGES
+    assert list(records[0]) == list(ASSET_COLUMNS)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['maven-releases.ndjson.gz', 'npm-proxy.ndjson.gz']
+
+
+def test_export_components_to_parquet(configuration, tmp_path):
+    pyarrow = pytest.importorskip('pyarrow')
+    parquet = pytest.importorskip('pyarrow.parquet')
+    path = tmp_path / 'components.parquet'
+    [result] = export_components(['maven-releases'], str(path), ApiClient(configuration), row_group_size=60)
+    assert result.ok and result.records == PAGE_SIZE * PAGES
+    table = parquet.read_table(path)
+    assert table.column_names == list(COMPONENT_COLUMNS) and table.num_rows == PAGE_SIZE * PAGES
+    assert parquet.ParquetFile(path).num_row_groups == 3
+    assert pyarrow.types.is_list(table.schema.field('assets.path').type)
+    assert pyarrow.types.is_string(table.schema.field('id').type)
+
+
+def test_failed_exports_leave_no_file(tmp_path):
+    api_client = ApiClient(Configuration(host='http://127.0.0.1:9/service/rest', retries=0))
+    result = export_repository('listAssets', 'maven-releases', str(tmp_path / 'assets.ndjson'), api_client,
+                               columns=ASSET_COLUMNS)
+    assert not result.ok and result.records == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_arguments(tmp_path):
+    with pytest.raises(ValueError, match='placeholder'):
+        export_assets(['a', 'b'], str(tmp_path / 'assets.ndjson'))
+    with pytest.raises(ValueError, match='format must be one of'):
+        export_repository('listAssets', 'a', str(tmp_path / 'assets.csv'), columns=ASSET_COLUMNS, format='csv')
@@ -0,0 +1,77 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""`import nexus_api_client` stays lazy - it imports none of the APIs and models until they are used, so it takes a few
+milliseconds (within `NEXUS_API_CLIENT_IMPORT_BUDGET` seconds) rather than seconds."""
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.import_time import time_import
+
+from . import CLIENT_DIR, GENERATED, PACKAGE
+
+pytestmark = pytest.mark.skipif(not GENERATED, reason=f'no generated client in {CLIENT_DIR}')
+
+# seconds `import nexus_api_client` may take - it takes a few milliseconds, and all of a second importing everything
+IMPORT_BUDGET = float(os.environ.get('NEXUS_API_CLIENT_IMPORT_BUDGET', '0.5'))
+
+LOADED = '''
+import sys
+{statement}
+print('\\n'.join(sorted(m for m in sys.modules if m.startswith(('{package}.api.', '{package}.models.')))))
+'''
+
+
+def loaded(statement: str) -> set[str]:
+    """The API and model modules importing `statement`, in a fresh interpreter, loads."""
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [CLIENT_DIR, os.environ.get('PYTHONPATH')])))
+    output = subprocess.run([sys.executable, '-c', LOADED.format(statement=statement, package=PACKAGE)],
+                            env=environment, cwd=CLIENT_DIR, check=True, capture_output=True, text=True).stdout
+    return set(output.split())
+
+
+def test_import_loads_no_api_or_model():
+    assert loaded(f'import {PACKAGE}') == set()
+
+
+def test_import_within_budget():
+    # the first writes the bytecode
+    time_import(CLIENT_DIR, f'import {PACKAGE}')
+    assert min(time_import(CLIENT_DIR, f'import {PACKAGE}') for _ in range(3)) < IMPORT_BUDGET
+
+
+def imported_models(module: str) -> set[str]:
+    """The model modules `module` imports, and those they import in turn."""
+    models: set[str] = set()
+    pending = [module]
+    while pending:
+        with open(os.path.join(CLIENT_DIR, *pending.pop().split('.')) + '.py', 'r', encoding='utf-8') as f:
+            imported = re.findall(rf'^from ({re.escape(PACKAGE)}\.models\.\w+) import', f.read(), re.MULTILINE)
+        pending += [m for m in imported if m not in models]
+        models.update(imported)
+    return models
+
+
+def test_one_api_loads_only_its_models():
+    api = f'{PACKAGE}.api.assets_api'
+    assert loaded(f'from {PACKAGE} import ApiClient, Configuration, AssetsApi') == {api} | imported_models(api)
+
+
+def test_extensions_load_no_api_or_model():
+    assert loaded(f'import {PACKAGE}.ext.client') == set()
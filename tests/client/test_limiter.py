@@ -0,0 +1,113 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('nexus_api_client.ext.limiter')
+
+from nexus_api_client.ext.limiter import AdaptiveLimiter, Permit  # noqa: E402
+
+
+def taking(limiter, seconds, generation=None, saturated=True):
+    """A permit as if acquired `seconds` ago - the latency its release will see."""
+    permit = limiter.acquire()
+    return permit._replace(started=permit.started - seconds, saturated=saturated,
+                           generation=permit.generation if generation is None else generation)
+
+
+def test_additive_increase():
+    limiter = AdaptiveLimiter(initial=2, max_limit=3)
+    limiter.release(taking(limiter, 0.1), 'op')
+    assert limiter.limit == 2.5
+    for _ in range(10):
+        limiter.release(taking(limiter, 0.1), 'op')
+    assert limiter.limit == 3
+    stats = limiter.stats()
+    assert stats.in_flight == 0 and stats.decreases == 0 and stats.increases == 3
+
+
+def test_no_increase_when_the_limit_is_not_what_limits():
+    limiter = AdaptiveLimiter(initial=8)
+    limiter.release(taking(limiter, 0.1, saturated=False), 'op')
+    assert limiter.limit == 8
+    # 1 of 8 in flight is not half of the limit
+    assert not limiter.acquire().saturated
+
+
+def test_multiplicative_decrease_once_per_generation():
+    limiter = AdaptiveLimiter(initial=10, decrease=0.5)
+    permits = [limiter.acquire() for _ in range(3)]
+    for permit in permits:
+        limiter.release(permit, 'op', overloaded=True)
+    assert limiter.limit == 5
+    # acquired after the decrease, so decreases again
+    limiter.release(limiter.acquire(), 'op', overloaded=True)
+    assert limiter.limit == 2.5
+    assert limiter.stats().decreases == 2
+
+
+def test_decrease_is_bounded():
+    limiter = AdaptiveLimiter(initial=2, min_limit=1.5, decrease=0.5)
+    limiter.release(limiter.acquire(), overloaded=True)
+    assert limiter.limit == 1.5
+
+
+def test_slow_responses_decrease():
+    limiter = AdaptiveLimiter(initial=10, decrease=0.5, latency_tolerance=2.0)
+    limiter.release(taking(limiter, 1.0), 'op')
+    limit = limiter.limit
+    limiter.release(taking(limiter, 1.9), 'op')
+    assert limiter.limit > limit
+    limiter.release(taking(limiter, 2.5), 'op')
+    assert limiter.limit == pytest.approx(limit * 0.5, rel=0.05)
+    # the usual latency is per operation
+    limiter.release(taking(limiter, 2.5), 'other')
+    assert limiter.stats().decreases == 1
+
+
+def test_usual_latency_rises_slowly():
+    limiter = AdaptiveLimiter(initial=10, latency_tolerance=2.0, smoothing=0.5)
+    limiter.release(taking(limiter, 1.0), 'op')
+    # overloaded responses say nothing of the usual latency
+    limiter.release(taking(limiter, 10.0), 'op', overloaded=True)
+    decreases = limiter.stats().decreases
+    # 1.5 moves it to 1.25, not 1.5 - so 2.6 is slow
+    limiter.release(taking(limiter, 1.5), 'op')
+    assert limiter.stats().decreases == decreases
+    limiter.release(taking(limiter, 2.6), 'op')
+    assert limiter.stats().decreases == decreases + 1
+
+
+def test_acquire_waits_for_a_permit():
+    limiter = AdaptiveLimiter(initial=1, max_limit=1)
+    permit = limiter.acquire()
+    with pytest.raises(TimeoutError):
+        limiter.acquire(timeout=0.05)
+    threading.Timer(0.1, limiter.release, (permit,)).start()
+    started = time.monotonic()
+    limiter.release(limiter.acquire(timeout=5))
+    assert time.monotonic() - started >= 0.05
+    assert limiter.stats().waited >= 0.05
+
+
+def test_bounds():
+    for kwargs in ({'initial': 0.5, 'min_limit': 0.5}, {'initial': 4, 'min_limit': 8}, {'initial': 8, 'max_limit': 4},
+                   {'decrease': 1}):
+        with pytest.raises(ValueError):
+            AdaptiveLimiter(**kwargs)
+    assert isinstance(AdaptiveLimiter().acquire(), Permit)
@@ -0,0 +1,116 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('nexus_api_client.ext.pagination')
+
+from nexus_api_client.api_client import ApiClient  # noqa: E402
+from nexus_api_client.ext.operations import Pagination  # noqa: E402
+from nexus_api_client.ext.pagination import Paginator, paginate  # noqa: E402
+from nexus_api_client.ext.paginators import paginate_list_assets  # noqa: E402
+from nexus_api_client.models.asset_xo import AssetXO  # noqa: E402
+
+from .conftest import PAGE_SIZE, PAGES  # noqa: E402
+
+PAGINATION = Pagination('continuation_token', 'continuation_token', 'continuationToken', 'items', 'items')
+
+
+def pages_of(*pages):
+    """A fetch answering `pages` (lists of items) in turn - and the tokens it was called with."""
+    tokens = []
+
+    def fetch(token):
+        tokens.append(token)
+        index = int(token) if token else 0
+        if isinstance(pages[index], BaseException):
+            raise pages[index]
+        return {'items': pages[index], 'continuationToken': str(index + 1) if index + 1 < len(pages) else None}
+
+    return fetch, tokens
+
+
+@pytest.mark.parametrize('prefetch', [0, 2])
+def test_follows_the_token(prefetch):
+    fetch, tokens = pages_of([1, 2], [], [3])
+    paginator = Paginator(fetch, PAGINATION, prefetch=prefetch)
+    assert tokens == []
+    assert list(paginator) == [1, 2, 3]
+    assert tokens == [None, '1', '2']
+    # each iteration starts again
+    assert list(paginator) == [1, 2, 3]
+
+
+def test_starts_from_a_token():
+    fetch, tokens = pages_of([1], [2], [3])
+    assert list(Paginator(fetch, PAGINATION, continuation_token='1')) == [2, 3]
+    assert tokens == ['1', '2']
+
+
+@pytest.mark.parametrize('prefetch', [0, 1])
+def test_errors_are_raised_in_page_order(prefetch):
+    fetch, _ = pages_of([1], ValueError('page 2'), [3])
+    items = []
+    with pytest.raises(ValueError, match='page 2'):
+        for item in Paginator(fetch, PAGINATION, prefetch=prefetch):
+            items.append(item)
+    assert items == [1]
+
+
+def test_prefetch_stops_when_the_consumer_does():
+    fetched = []
+
+    def fetch(token):
+        fetched.append(token)
+        return {'items': [int(token or 0)], 'continuationToken': str(int(token or 0) + 1)}
+
+    pages = Paginator(fetch, PAGINATION, prefetch=2).pages()
+    assert next(pages)['items'] == [0]
+    pages.close()
+    time.sleep(0.3)
+    stopped_at = len(fetched)
+    time.sleep(0.3)
+    # the buffer and the request in flight at most
+    assert len(fetched) == stopped_at <= 4
+    assert not any(t.name == 'nexus-api-client-paginator' for t in threading.enumerate())
+
+
+def test_negative_prefetch():
+    with pytest.raises(ValueError):
+        Paginator(lambda token: None, PAGINATION, prefetch=-1)
+
+
+def test_not_paged():
+    with pytest.raises(ValueError, match='getAllRepositories is not paged'):
+        paginate('getAllRepositories')
+
+
+@pytest.mark.parametrize('prefetch', [0, 2])
+def test_paginate_against_nxrm(configuration, mock_nexus, prefetch):
+    api_client = ApiClient(configuration)
+    requests = mock_nexus.requests
+    assets = list(paginate_list_assets(api_client, repository='maven-releases', prefetch=prefetch))
+    assert len(assets) == PAGE_SIZE * PAGES
+    assert all(isinstance(a, AssetXO) for a in assets)
+    assert mock_nexus.requests - requests == PAGES
+
+
+def test_paginate_raw(configuration):
+    pages = list(paginate('listAssets', ApiClient(configuration), raw='dict', repository='maven-releases').pages())
+    assert [len(p['items']) for p in pages] == [PAGE_SIZE] * PAGES
+    assert [p['continuationToken'] for p in pages] == [str(i) for i in range(1, PAGES)] + [None]
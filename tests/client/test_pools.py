@@ -0,0 +1,93 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import threading
+
+import pytest
+
+pytest.importorskip('nexus_api_client.ext.pools')
+
+from nexus_api_client.api.assets_api import AssetsApi  # noqa: E402
+from nexus_api_client.api_client import ApiClient  # noqa: E402
+from nexus_api_client.configuration import Configuration  # noqa: E402
+from nexus_api_client.ext.client import NexusApiClient  # noqa: E402
+from nexus_api_client.ext.pools import PoolRegistry, share_pools  # noqa: E402
+from nexus_api_client.ext.retry import RetryPolicy  # noqa: E402
+
+
+def configuration(host='http://nexus:8081/service/rest', username='admin', **kwargs):
+    return Configuration(host=host, username=username, password='admin123', **kwargs)
+
+
+def test_one_pool_manager_per_nxrm_user_and_settings():
+    registry = PoolRegistry()
+    manager = registry.pool_manager(configuration())
+    # another configuration, and another path, of the same NXRM
+    assert registry.pool_manager(configuration('http://nexus:8081/other')) is manager
+    assert registry.pool_manager(configuration(username='deployer')) is not manager
+    assert registry.pool_manager(configuration('https://nexus:8081/service/rest')) is not manager
+    assert registry.pool_manager(configuration(retries=5)) is not manager
+    assert registry.pool_manager(configuration(), respect_retry_after=False) is not manager
+
+
+def test_clients_share_pools():
+    registry = PoolRegistry(maxsize=3, block=True)
+    first, second = ApiClient(configuration()), ApiClient(configuration())
+    share_pools(first, registry)
+    share_pools(second, registry)
+    assert first.rest_client.pool_manager is second.rest_client.pool_manager
+    options = first.rest_client.pool_manager.connection_pool_kw
+    assert options['maxsize'] == 3 and options['block'] is True
+    # a retry policy waits for Retry-Afters itself
+    retried = NexusApiClient(configuration(), retry=RetryPolicy(), pools=registry)
+    assert retried.rest_client.pool_manager is not first.rest_client.pool_manager
+    assert retried.rest_client.pool_manager.connection_pool_kw['retries'].respect_retry_after_header is False
+    with pytest.raises(ValueError):
+        PoolRegistry(maxsize=0)
+
+
+def test_connections_are_reused(mock_nexus):
+    registry = PoolRegistry(maxsize=2)
+    config = configuration(mock_nexus.url)
+    for _ in range(3):
+        AssetsApi(NexusApiClient(config, pools=registry)).list_assets(repository='maven-releases')
+    [stats] = registry.stats()
+    assert stats.key.endswith(' as admin') and stats.host.startswith('http://127.0.0.1:')
+    assert stats.requests == 3 and stats.connections == 1
+    assert stats.in_use == 0 and stats.idle == 1 and stats.saturation == 0
+
+
+def test_saturation(mock_nexus, monkeypatch):
+    # long enough that the requests overlap
+    monkeypatch.setattr(mock_nexus, 'latency', 0.05)
+    registry = PoolRegistry(maxsize=1, block=True)
+    api = AssetsApi(NexusApiClient(configuration(mock_nexus.url), pools=registry))
+    threads = [threading.Thread(target=api.list_assets, kwargs={'repository': 'maven-releases'}) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    [stats] = registry.stats()
+    assert stats.requests == 4 and stats.connections == 1
+    assert stats.saturated >= 1 and stats.wait > 0
+
+
+def test_clear(mock_nexus):
+    registry = PoolRegistry()
+    config = configuration(mock_nexus.url)
+    manager = registry.pool_manager(config)
+    registry.clear()
+    assert registry.stats() == []
+    assert registry.pool_manager(config) is not manager
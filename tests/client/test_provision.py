@@ -0,0 +1,147 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import copy
+
+import pytest
+
+pytest.importorskip('nexus_api_client.ext.provision')
+
+from nexus_api_client.api_client import ApiClient  # noqa: E402
+from nexus_api_client.ext import provision  # noqa: E402
+from nexus_api_client.ext.provision import (  # noqa: E402
+    CREATE, UNCHANGED, UPDATE, differences, normalise, plan_repositories, provision_repositories, repository_shape
+)
+
+DESIRED = [
+    {'format': 'maven2', 'type': 'hosted', 'name': 'maven-releases', 'online': True,
+     'storage': {'blobStoreName': 'default', 'strictContentTypeValidation': True, 'writePolicy': 'ALLOW_ONCE'},
+     'cleanup': {'policyNames': []}, 'component': None,
+     'maven': {'versionPolicy': 'RELEASE', 'layoutPolicy': 'STRICT'}},
+    {'format': 'npm', 'type': 'proxy', 'name': 'npm-proxy', 'online': True, 'routingRule': 'npm-only',
+     'storage': {'blobStoreName': 'default', 'strictContentTypeValidation': True},
+     'proxy': {'remoteUrl': 'https://registry.npmjs.org', 'contentMaxAge': 1440, 'metadataMaxAge': 1440},
+     'negativeCache': {'enabled': True, 'timeToLive': 1440},
+     'httpClient': {'blocked': False, 'autoBlock': True,
+                    'authentication': {'type': 'username', 'username': 'npm', 'password': 's3cret'}}},
+    {'format': 'maven', 'type': 'group', 'name': 'maven-public', 'online': True,
+     'storage': {'blobStoreName': 'default', 'strictContentTypeValidation': True},
+     'group': {'memberNames': ['maven-releases']}},
+]
+
+# as NXRM returns them
+CURRENT = {
+    'maven-releases': {
+        'name': 'maven-releases', 'format': 'maven2', 'type': 'hosted', 'online': True,
+        'url': 'http://nexus:8081/repository/maven-releases',
+        'storage': {'blobStoreName': 'default', 'strictContentTypeValidation': True, 'writePolicy': 'ALLOW_ONCE'},
+        'cleanup': None, 'component': {'proprietaryComponents': False},
+        'maven': {'versionPolicy': 'RELEASE', 'layoutPolicy': 'STRICT', 'contentDisposition': 'INLINE'},
+    },
+    'npm-proxy': {
+        'name': 'npm-proxy', 'format': 'npm', 'type': 'proxy', 'online': True,
+        'url': 'http://nexus:8081/repository/npm-proxy', 'routingRuleName': 'npm-only',
+        'storage': {'blobStoreName': 'default', 'strictContentTypeValidation': True, 'writePolicy': 'ALLOW'},
+        'cleanup': None, 'replication': None, 'firewall': None,
+        'proxy': {'remoteUrl': 'https://registry.npmjs.org', 'contentMaxAge': 1440, 'metadataMaxAge': 1440},
+        'negativeCache': {'enabled': True, 'timeToLive': 1440},
+        'httpClient': {'blocked': False, 'autoBlock': True, 'connection': None,
+                       'authentication': {'type': 'username', 'username': 'npm', 'ntlmHost': None,
+                                          'ntlmDomain': None, 'preemptive': False}},
+        'npm': {'removeQuarantined': False},
+    },
+    'maven-public': {
+        'name': 'maven-public', 'format': 'maven2', 'type': 'group', 'online': True,
+        'url': 'http://nexus:8081/repository/maven-public',
+        'storage': {'blobStoreName': 'default', 'strictContentTypeValidation': True},
+        'group': {'memberNames': ['maven-releases']},
+    },
+}
+
+
+class OfflineClient(ApiClient):
+    """Fails any request that is not a `call_raw()`."""
+
+    def call_api(self, *args, **kwargs):
+        raise AssertionError('a change was applied')
+
+
+@pytest.fixture
+def nexus(monkeypatch):
+    """NXRM with `current` repositories, for `provision`'s `call_raw()`s - which are recorded in `calls`."""
+    state = {'current': copy.deepcopy(CURRENT), 'calls': []}
+
+    def call_raw(operation_id, api_client=None, repository_name=None, **kwargs):
+        state['calls'].append(operation_id)
+        if operation_id == provision.LIST_REPOSITORIES:
+            return [{k: r[k] for k in ('name', 'format', 'type')} for r in state['current'].values()]
+        return state['current'][repository_name]
+
+    monkeypatch.setattr(provision, 'call_raw', call_raw)
+    return state
+
+
+def test_matching_state_makes_no_changes(nexus):
+    changes = plan_repositories(DESIRED, OfflineClient())
+    assert [(c.action, c.differences) for c in changes] == [(UNCHANGED, ())] * 3
+    assert sorted(nexus['calls']) == ['getAllRepositories', 'getMavenGroupRepository', 'getMavenHostedRepository',
+                                      'getNpmProxyRepository']
+    nexus['calls'].clear()
+    results = list(provision_repositories(DESIRED, OfflineClient()))
+    assert [(r.change.action, r.status, r.ok) for r in results] == [(UNCHANGED, None, True)] * 3
+    # nothing but the planning's GETs
+    assert len(nexus['calls']) == 4
+
+
+def test_differences_are_found(nexus):
+    desired = copy.deepcopy(DESIRED)
+    desired[0]['storage']['writePolicy'] = 'DENY'
+    desired[0]['cleanup']['policyNames'] = ['weekly']
+    desired[1]['routingRule'] = 'other'
+    desired[2]['group']['memberNames'] = []
+    changes = plan_repositories(desired + [{**desired[0], 'name': 'maven-snapshots'}], OfflineClient())
+    assert [(c.action, c.differences) for c in changes] == [
+        (UPDATE, ('storage.writePolicy', 'cleanup.policyNames')),
+        (UPDATE, ('routingRuleName',)),
+        (UPDATE, ('group.memberNames',)),
+        (CREATE, ()),
+    ]
+
+
+def test_repository_shape():
+    # the GET's model
+    shape = repository_shape('npm', 'proxy')
+    assert 'routingRuleName' in shape and 'routingRule' not in shape and 'url' in shape
+    # the spec says only AbstractApiRepository of a Maven hosted repository's GET, so the create request's keys
+    shape = repository_shape('maven2', 'hosted')
+    assert shape['storage'] == {'blobStoreName': None, 'strictContentTypeValidation': None, 'writePolicy': None}
+    assert 'url' not in shape
+
+
+def test_normalise():
+    shape = {'name': None, 'routingRuleName': None, 'httpClient': {'authentication': {'password': None, 'type': None}}}
+    assert normalise({'name': 'a', 'routingRule': 'r', 'extra': 1,
+                      'httpClient': {'authentication': {'password': 'p', 'type': 'username'}}}, shape) == {
+        'name': 'a', 'routingRuleName': 'r', 'httpClient': {'authentication': {'type': 'username'}}
+    }
+    assert normalise([{'name': 'a', 'b': 1}], shape) == [{'name': 'a'}]
+    assert normalise('a', shape) == 'a'
+
+
+def test_differences():
+    assert differences({'a': None, 'b': [], 'c': {'d': {}}}, {'b': None}) == []
+    assert differences({'a': {'b': 1}}, {'a': None}) == ['a.b']
+    assert differences({'a': [1]}, {'a': [1, 2]}) == ['a']
+    assert differences({'a': []}, {'a': [1]}) == ['a']
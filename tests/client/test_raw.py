@@ -0,0 +1,94 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip('nexus_api_client.ext.raw')
+
+from pydantic import ValidationError  # noqa: E402
+
+from nexus_api_client.api.assets_api import AssetsApi  # noqa: E402
+from nexus_api_client.ext.client import NexusApiClient  # noqa: E402
+from nexus_api_client.ext.raw import View, call_raw, check_raw, decode  # noqa: E402
+from nexus_api_client.models.asset_xo import AssetXO  # noqa: E402
+from nexus_api_client.models.page_asset_xo import PageAssetXO  # noqa: E402
+
+from .conftest import PAGE_SIZE  # noqa: E402
+
+ASSET = {'id': 'a1', 'path': 'org/example/1.0/example-1.0.jar', 'repository': 'maven-releases',
+         'lastModified': '2024-05-01T12:00:00Z', 'checksum': {'sha1': 'da39a3ee'}}
+
+
+def test_check_raw():
+    assert check_raw(None) is None
+    assert check_raw('view') == 'view'
+    with pytest.raises(ValueError, match='raw must be one of dict, view'):
+        check_raw('models')
+
+
+def test_decode():
+    data = b'{"items": [{"path": "a"}], "continuationToken": null}'
+    assert decode(data, 'PageAssetXO', 'dict') == {'items': [{'path': 'a'}], 'continuationToken': None}
+    assert decode(b'', 'PageAssetXO', 'view') is None
+    # only models are viewed
+    assert decode(b'["a"]', 'List[str]', 'view') == ['a']
+    views = decode(b'[{"path": "a"}, {"path": "b"}]', 'List[AssetXO]', 'view')
+    assert [v.path for v in views] == ['a', 'b']
+
+
+def test_view_converts_fields_as_they_are_read():
+    view = View(dict(ASSET), AssetXO)
+    assert view.path == ASSET['path']
+    assert view.last_modified == datetime.fromisoformat('2024-05-01T12:00:00+00:00')
+    assert view.checksum == {'sha1': 'da39a3ee'}
+    assert view.blob_created is None
+    assert 'last_modified' in dir(view)
+    with pytest.raises(AttributeError, match="AssetXO has no field 'lastModified'"):
+        view.lastModified
+    assert view.to_dict() is view._data
+    assert view.to_model() == AssetXO.from_dict(ASSET)
+    assert view == View(dict(ASSET), AssetXO)
+
+
+def test_view_validates_lazily():
+    view = View({**ASSET, 'lastModified': 'yesterday'}, AssetXO)
+    assert view.path == ASSET['path']
+    with pytest.raises(ValidationError):
+        view.last_modified
+
+
+def test_nested_views():
+    page = View({'items': [ASSET], 'continuationToken': 'x'}, PageAssetXO)
+    assert page.continuation_token == 'x'
+    assert page.items == [View(ASSET, AssetXO)]
+
+
+@pytest.mark.parametrize('raw', ['dict', 'view'])
+def test_call_raw(configuration, raw):
+    page = call_raw('listAssets', NexusApiClient(configuration), raw=raw, repository='maven-releases')
+    items = page['items'] if raw == 'dict' else page.items
+    assert len(items) == PAGE_SIZE
+    if raw == 'view':
+        assert isinstance(page, View) and page.model is PageAssetXO
+        assert all(isinstance(item.path, str) for item in items)
+
+
+@pytest.mark.parametrize('raw, page_type', [(None, PageAssetXO), ('dict', dict), ('view', View)])
+def test_client_raw(configuration, raw, page_type):
+    page = AssetsApi(NexusApiClient(configuration, raw=raw)).list_assets(repository='maven-releases')
+    assert isinstance(page, page_type)
+    assert len(page['items'] if raw == 'dict' else page.items) == PAGE_SIZE
@@ -0,0 +1,199 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import io
+
+import pytest
+
+pytest.importorskip('nexus_api_client.ext.cache')
+
+import urllib3  # noqa: E402
+
+from nexus_api_client import rest  # noqa: E402
+from nexus_api_client.api.repository_management_api import RepositoryManagementApi  # noqa: E402
+from nexus_api_client.ext.cache import CacheStats, ResponseCache  # noqa: E402
+from nexus_api_client.ext.client import NexusApiClient  # noqa: E402
+from nexus_api_client.ext.operations import get_operation  # noqa: E402
+
+GET = get_operation('getMavenHostedRepository')
+CREATE = get_operation('createMavenHostedRepository')
+LIST = get_operation('listAssets')
+URL = 'http://nexus/service/rest/v1/repositories/maven/hosted/maven-releases'
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Nexus:
+    """Answers with `body` and its `etag` - 304 when the request already has it."""
+
+    def __init__(self, body=b'{"name": "maven-releases"}', etag='"v1"', status=200):
+        self.body = body
+        self.etag = etag
+        self.status = status
+        self.requests = []
+
+    def send(self, headers):
+        self.requests.append(dict(headers))
+        if self.etag is not None and headers.get('If-None-Match') == self.etag:
+            status, body = 304, b''
+        else:
+            status, body = self.status, self.body
+        headers = {'ETag': self.etag} if self.etag is not None else {}
+        return rest.RESTResponse(urllib3.HTTPResponse(body=io.BytesIO(body), headers=headers, status=status,
+                                                      preload_content=False))
+
+
+def get(cache, nexus, operation=GET, url=URL, headers=None):
+    response = cache.request(operation, 'GET', url, headers or {}, nexus.send)
+    return response.status, response.read()
+
+
+def test_hit_until_the_ttl_runs_out():
+    clock, nexus = Clock(), Nexus()
+    cache = ResponseCache(clock=clock)
+    assert get(cache, nexus) == (200, nexus.body)
+    clock.now = GET.cache_ttl - 1
+    assert get(cache, nexus) == (200, nexus.body)
+    assert len(nexus.requests) == 1
+    assert cache.stats() == CacheStats(hits=1, misses=1, revalidations=0, evictions=0, invalidations=0)
+
+
+def test_revalidates_with_the_etag():
+    clock, nexus = Clock(), Nexus()
+    cache = ResponseCache(clock=clock)
+    get(cache, nexus)
+    clock.now = GET.cache_ttl + 1
+    # a 304 answers with the cached body, for another TTL
+    assert get(cache, nexus) == (200, nexus.body)
+    assert nexus.requests[-1] == {'If-None-Match': '"v1"'}
+    clock.now += GET.cache_ttl - 1
+    assert get(cache, nexus) == (200, nexus.body)
+    assert len(nexus.requests) == 2
+    assert cache.stats().revalidations == 1
+
+    # a changed resource is sent again, and replaces the cached one
+    nexus.body, nexus.etag = b'{"name": "maven-releases", "online": false}', '"v2"'
+    clock.now += GET.cache_ttl
+    assert get(cache, nexus) == (200, nexus.body)
+    assert nexus.requests[-1] == {'If-None-Match': '"v1"'}
+    assert cache.stats().revalidations == 1
+
+
+def test_without_an_etag_expired_responses_are_requested_again():
+    clock, nexus = Clock(), Nexus(etag=None)
+    cache = ResponseCache(clock=clock)
+    get(cache, nexus)
+    clock.now = GET.cache_ttl + 1
+    get(cache, nexus)
+    assert nexus.requests == [{}, {}]
+
+
+def test_changes_invalidate_their_families():
+    nexus = Nexus()
+    cache = ResponseCache(default_ttl=60)
+    get(cache, nexus)
+    get(cache, nexus, LIST, 'http://nexus/service/rest/v1/assets')
+    assert len(cache) == 2
+    response = cache.request(CREATE, 'POST', 'http://nexus/service/rest/v1/repositories/maven/hosted', {},
+                             Nexus(status=201).send)
+    assert response.status == 201
+    # the assets were not in the families createMavenHostedRepository invalidates
+    assert len(cache) == 1
+    assert cache.stats().invalidations == 1
+    get(cache, nexus)
+    assert len(nexus.requests) == 3
+
+
+def test_failed_changes_invalidate_too():
+    cache = ResponseCache()
+    get(cache, Nexus())
+
+    def fail(headers):
+        raise urllib3.exceptions.ProtocolError('connection reset')
+
+    with pytest.raises(urllib3.exceptions.ProtocolError):
+        cache.request(CREATE, 'POST', URL, {}, fail)
+    assert len(cache) == 0
+
+
+def test_invalidated_while_requested():
+    cache = ResponseCache()
+    nexus = Nexus()
+    send = nexus.send
+
+    def racing(headers):
+        cache.invalidate('RepositoryManagementApi')
+        return send(headers)
+
+    nexus.send = racing
+    get(cache, nexus)
+    assert len(cache) == 0
+
+
+def test_not_kept():
+    nexus = Nexus()
+    cache = ResponseCache({'getMavenHostedRepository': 0})
+    get(cache, nexus)
+    get(cache, nexus)
+    # no TTL, nor a default
+    get(cache, nexus, LIST, 'http://nexus/service/rest/v1/assets')
+    # errors
+    get(ResponseCache(), Nexus(status=404))
+    assert len(nexus.requests) == 3 and len(cache) == 0
+
+
+def test_varies_by_authorization():
+    nexus = Nexus()
+    cache = ResponseCache()
+    get(cache, nexus, headers={'Authorization': 'Basic YQ=='})
+    get(cache, nexus, headers={'Authorization': 'Basic Yg=='})
+    assert len(nexus.requests) == 2
+
+
+def test_evicts_the_least_recently_used():
+    nexus = Nexus()
+    cache = ResponseCache(max_entries=2)
+    for name in ('a', 'b', 'a', 'c'):
+        get(cache, nexus, url=f'{URL}/{name}')
+    get(cache, nexus, url=f'{URL}/a')
+    assert len(nexus.requests) == 3
+    assert cache.stats().evictions == 1
+    with pytest.raises(ValueError):
+        ResponseCache(max_entries=0)
+
+
+def test_ttl_patterns():
+    cache = ResponseCache({'get*Repository': 5, 'getMavenHostedRepository': 10}, default_ttl=1)
+    assert cache.ttl(GET) == 10
+    assert cache.ttl(get_operation('getNpmHostedRepository')) == 5
+    assert cache.ttl(LIST) == 1
+    assert cache.ttl(None) is None
+
+
+def test_client_against_nxrm(configuration, mock_nexus):
+    api = RepositoryManagementApi(NexusApiClient(configuration, cache=ResponseCache()))
+    requests = mock_nexus.requests
+    first = api.get_maven_hosted_repository('maven-releases')
+    assert api.get_maven_hosted_repository('maven-releases') == first
+    assert mock_nexus.requests - requests == 1
+    api.delete_repositories('maven-releases')
+    api.get_maven_hosted_repository('maven-releases')
+    assert mock_nexus.requests - requests == 3
@@ -0,0 +1,157 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import io
+import time
+from email.utils import formatdate
+
+import pytest
+
+pytest.importorskip('nexus_api_client.ext.retry')
+
+import urllib3  # noqa: E402
+
+from nexus_api_client import rest  # noqa: E402
+from nexus_api_client.ext.client import NexusApiClient  # noqa: E402
+from nexus_api_client.ext.limiter import AdaptiveLimiter  # noqa: E402
+from nexus_api_client.ext.operations import get_operation  # noqa: E402
+from nexus_api_client.ext.retry import RetryPolicy, call_with_retries, retry_after_seconds  # noqa: E402
+from nexus_api_client.ext.upload import ComponentUpload, upload_components  # noqa: E402
+
+LIST = get_operation('listAssets')
+CREATE = get_operation('createComponents')
+
+
+def response(status=200, headers=None):
+    return rest.RESTResponse(urllib3.HTTPResponse(body=io.BytesIO(b'{}'), headers=headers or {}, status=status,
+                                                  preload_content=False))
+
+
+def policy(max_attempts=4, **kwargs):
+    sleeps = []
+    return RetryPolicy(max_attempts, sleep=sleeps.append, random=lambda: 1.0, **kwargs), sleeps
+
+
+def attempts(*outcomes):
+    """An attempt answering (or raising) `outcomes` in turn - and the numbers it was made with."""
+    numbers = []
+
+    def attempt(number):
+        numbers.append(number)
+        outcome = outcomes[number]
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return response(*outcome) if isinstance(outcome, tuple) else response(outcome)
+
+    return attempt, numbers
+
+
+def test_full_jitter_backoff():
+    retry = RetryPolicy(backoff=0.5, max_backoff=3.0, random=lambda: 1.0)
+    assert [retry.delay(n) for n in range(5)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+    retry.random = lambda: 0.25
+    assert retry.delay(2) == 0.5
+    with pytest.raises(ValueError):
+        RetryPolicy(0)
+
+
+def test_retry_after():
+    retry = RetryPolicy(max_retry_after=60)
+    assert retry.delay(3, response(503, {'Retry-After': '7'})) == 7.0
+    # too long to wait for
+    assert retry.delay(0, response(503, {'Retry-After': '61'})) is None
+    # not understood - backoff, then
+    assert retry.delay(0, response(503, {'Retry-After': 'soon'})) <= retry.backoff
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds(None) is None
+    assert retry_after_seconds(' 120 ') == 120.0
+    now = time.time()
+    assert retry_after_seconds(formatdate(now + 30, usegmt=True), now) == pytest.approx(30, abs=1)
+    assert retry_after_seconds(formatdate(now - 30, usegmt=True), now) == 0.0
+    assert retry_after_seconds('next tuesday') is None
+
+
+def test_allows():
+    retry = RetryPolicy(operations=('create*',))
+    assert retry.allows('GET', LIST)
+    assert retry.allows('POST', CREATE)
+    assert not RetryPolicy().allows('POST', CREATE)
+    assert RetryPolicy().allows('put', None)
+    assert not RetryPolicy().allows('POST', None)
+
+
+def test_retries_until_a_success():
+    retry, sleeps = policy()
+    attempt, numbers = attempts(503, (429, {'Retry-After': '2'}), urllib3.exceptions.ProtocolError('reset'), 200)
+    assert call_with_retries(attempt, 'GET', LIST, retry).status == 200
+    assert numbers == [0, 1, 2, 3]
+    assert sleeps == [0.5, 2.0, 2.0]
+
+
+def test_the_last_failure_is_returned_or_raised():
+    retry, sleeps = policy(max_attempts=2)
+    attempt, numbers = attempts(503, 502)
+    assert call_with_retries(attempt, 'GET', LIST, retry).status == 502
+    attempt, numbers = attempts(503, urllib3.exceptions.ReadTimeoutError(None, '/', 'timed out'))
+    with pytest.raises(urllib3.exceptions.TimeoutError):
+        call_with_retries(attempt, 'GET', LIST, retry)
+    assert numbers == [0, 1]
+
+
+def test_what_is_not_retried():
+    retry, sleeps = policy()
+    # not idempotent
+    attempt, numbers = attempts(503, 200)
+    assert call_with_retries(attempt, 'POST', CREATE, retry).status == 503
+    # not a status to retry
+    attempt, numbers = attempts(500, 200)
+    assert call_with_retries(attempt, 'GET', LIST, retry).status == 500
+    # nor any other error
+    attempt, numbers = attempts(ValueError('bug'), 200)
+    with pytest.raises(ValueError):
+        call_with_retries(attempt, 'GET', LIST, retry)
+    # told to wait too long
+    attempt, numbers = attempts((503, {'Retry-After': '3600'}), 200)
+    assert call_with_retries(attempt, 'GET', LIST, retry).status == 503
+    assert sleeps == []
+
+
+def test_each_attempt_is_under_a_permit():
+    limiter = AdaptiveLimiter(initial=4)
+    retry, _ = policy()
+    in_flight = []
+
+    def attempt(number):
+        in_flight.append(limiter.stats().in_flight)
+        return response(503 if number == 0 else 200)
+
+    assert call_with_retries(attempt, 'GET', LIST, retry, limiter).status == 200
+    assert in_flight == [1, 1]
+    stats = limiter.stats()
+    assert stats.in_flight == 0 and stats.decreases == 1
+
+
+def test_uploads_are_under_the_limiter(configuration, mock_nexus, tmp_path):
+    path = tmp_path / 'example-1.0.jar'
+    path.write_bytes(b'jar')
+    limiter = AdaptiveLimiter(initial=2)
+    api_client = NexusApiClient(configuration, retry=RetryPolicy(operations=('createComponents',)), limiter=limiter)
+    requests = mock_nexus.requests
+    uploads = [ComponentUpload('maven-releases', {'maven2.asset1': str(path)}) for _ in range(4)]
+    assert all(r.ok for r in upload_components(uploads, api_client, workers=4))
+    assert mock_nexus.requests - requests == 4
+    assert limiter.stats().in_flight == 0 and limiter.stats().increases > 0
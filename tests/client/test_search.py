@@ -0,0 +1,90 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import pytest
+
+pytest.importorskip('nexus_api_client.ext.search')
+
+import urllib3  # noqa: E402
+
+from nexus_api_client.api_client import ApiClient  # noqa: E402
+from nexus_api_client.configuration import Configuration  # noqa: E402
+from nexus_api_client.ext.search import (  # noqa: E402
+    Shard, combine_shards, prefix_shards, repository_shards, search_assets_sharded, search_sharded
+)
+
+from .conftest import PAGE_SIZE, PAGES  # noqa: E402
+
+
+def test_prefix_shards():
+    assert prefix_shards('group', ['org.a', 'org.b']) == [
+        Shard('group=org.a*', {'group': 'org.a*'}), Shard('group=org.b*', {'group': 'org.b*'})
+    ]
+
+
+def test_combine_shards():
+    shards = combine_shards(prefix_shards('group', 'ab'), [Shard('r1', {'repository': 'r1'})])
+    assert shards == [Shard('group=a* r1', {'group': 'a*', 'repository': 'r1'}),
+                      Shard('group=b* r1', {'group': 'b*', 'repository': 'r1'})]
+    with pytest.raises(ValueError, match='filter the same field'):
+        combine_shards(prefix_shards('group', 'a'), prefix_shards('group', 'b'))
+
+
+def test_arguments():
+    with pytest.raises(ValueError, match='workers must be >= 1'):
+        search_sharded([], workers=0)
+    with pytest.raises(ValueError, match='shard group=a\\* filters what the query does: group'):
+        search_sharded(prefix_shards('group', 'a'), group='b')
+
+
+def test_repository_shards(configuration):
+    api_client = ApiClient(configuration)
+    # the mock's one repository is of type 'type', and format 'format'
+    assert repository_shards(api_client) == []
+    assert repository_shards(api_client, types=('type',)) == [Shard('name', {'repository': 'name'})]
+    assert repository_shards(api_client, types=('type',), format='maven2') == []
+
+
+@pytest.mark.parametrize('workers, prefetch', [(1, 0), (3, 1)])
+def test_sharded_search(configuration, mock_nexus, workers, prefetch):
+    shards = prefix_shards('group', ['org.a', 'org.b', 'org.c'])
+    requests = mock_nexus.requests
+    items = list(search_sharded(shards, ApiClient(configuration), workers=workers, prefetch=prefetch, raw='dict',
+                                format='maven2'))
+    assert len(items) == len(shards) * PAGE_SIZE * PAGES
+    assert mock_nexus.requests - requests == len(shards) * PAGES
+
+
+def test_dedupe(configuration):
+    # every item the mock answers with has the same id
+    shards = prefix_shards('name', 'ab')
+    assert len(list(search_assets_sharded(shards, ApiClient(configuration), dedupe=True))) == 1
+    assert len(list(search_assets_sharded(shards, ApiClient(configuration), raw='dict', dedupe=True))) == 1
+
+
+def test_stopping_early(configuration, mock_nexus):
+    shards = prefix_shards('group', 'abcdefgh')
+    requests = mock_nexus.requests
+    items = search_sharded(shards, ApiClient(configuration), workers=2, raw='dict')
+    assert next(items)['id']
+    items.close()
+    # shards not yet started are never searched
+    assert mock_nexus.requests - requests < len(shards) * PAGES
+
+
+def test_errors_are_raised():
+    api_client = ApiClient(Configuration(host='http://127.0.0.1:9/service/rest', retries=0))
+    with pytest.raises(urllib3.exceptions.MaxRetryError):
+        list(search_sharded(prefix_shards('group', 'ab'), api_client, raw='dict'))
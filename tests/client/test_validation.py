@@ -0,0 +1,120 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import pytest
+
+pytest.importorskip('nexus_api_client.ext.validation')
+
+from nexus_api_client.api.assets_api import AssetsApi  # noqa: E402
+from nexus_api_client.ext.client import NexusApiClient  # noqa: E402
+from nexus_api_client.ext.validation import (  # noqa: E402
+    MAX_VIOLATIONS, ResponseValidationError, ResponseValidator, SchemaCompiler, Violation, validate_recorded
+)
+
+SCHEMAS = {
+    # a tree: a node and its children
+    'Node': {'type': 'object', 'required': ['name'],
+             'properties': {'name': {'type': 'string'}, 'children': {'type': 'array', 'items': {'$ref': 'Node'}}}},
+    # each referencing the other
+    'Folder': {'type': 'object', 'properties': {'files': {'type': 'array', 'items': {'$ref': 'File'}}}},
+    'File': {'type': 'object', 'required': ['size'],
+             'properties': {'size': {'type': 'integer', 'minimum': 0}, 'parent': {'$ref': 'Folder'}}},
+    # recursing through allOf, with a property of its own
+    'Tagged': {'allOf': [{'$ref': 'Node'}, {'type': 'object', 'properties': {'tag': {'$ref': 'Tagged'}}}]},
+}
+
+
+def violations(check, value):
+    found = []
+    check(value, '', found)
+    return found
+
+
+@pytest.fixture
+def compiler():
+    return SchemaCompiler(SCHEMAS)
+
+
+def test_self_reference(compiler):
+    node = compiler.component('Node')
+    tree = {'name': 'root', 'children': [{'name': 'a', 'children': [{'name': 'b', 'children': []}]}, {'name': 'c'}]}
+    assert violations(node, tree) == []
+    tree['children'][0]['children'][0]['children'] = [{'children': []}, {'name': 1}]
+    assert violations(node, tree) == [
+        Violation('/children/0/children/0/children/0/name', 'is required'),
+        Violation('/children/0/children/0/children/1/name', 'expected string, got number'),
+    ]
+    # compiled once, however deep
+    assert compiler.component('Node') is node
+
+
+def test_mutual_references(compiler):
+    folder = compiler.compile({'$ref': 'Folder'})
+    value = {'files': [{'size': 1, 'parent': {'files': [{'size': -1}, {'parent': None}]}}]}
+    assert violations(folder, value) == [
+        Violation('/files/0/parent/files/0/size', '-1 is less than 0'),
+        Violation('/files/0/parent/files/1/size', 'is required'),
+    ]
+    assert compiler.component('File') is compiler.component('File')
+
+
+def test_recursion_through_all_of(compiler):
+    tagged = compiler.component('Tagged')
+    assert violations(tagged, {'name': 'a', 'tag': {'name': 'b', 'tag': {'name': 'c'}}}) == []
+    assert violations(tagged, {'name': 'a', 'tag': {'tag': {'name': 'c', 'tag': {'name': 3}}}}) == [
+        Violation('/tag/name', 'is required'),
+        Violation('/tag/tag/tag/name', 'expected string, got number'),
+    ]
+
+
+def test_violations_are_capped(compiler):
+    value = {'name': 'root', 'children': [{'name': i} for i in range(MAX_VIOLATIONS * 2)]}
+    assert len(violations(compiler.component('Node'), value)) == MAX_VIOLATIONS
+
+
+def test_keywords(compiler):
+    check = compiler.compile({
+        'type': 'object', 'additionalProperties': False,
+        'properties': {'format': {'type': 'string', 'enum': ['maven2', 'npm']},
+                       'name': {'type': 'string', 'pattern': '^[a-z]+$', 'maxLength': 5},
+                       'online': {'type': 'boolean'},
+                       'size': {'oneOf': [{'type': 'integer'}, {'type': 'string'}]}}
+    })
+    assert violations(check, {'format': 'npm', 'name': 'abc', 'online': True, 'size': '1', 'extra': None}) == []
+    assert [v.pointer for v in violations(check, {
+        'format': 'pypi', 'name': 'ABCDEF', 'online': 1, 'size': 1.5, 'extra': 1
+    })] == ['/format', '/name', '/name', '/online', '/size', '/extra']
+    assert violations(check, None) == [Violation('', 'expected object, got null')]
+    assert violations(compiler.compile(None), None) == []
+
+
+def test_validator():
+    validator = ResponseValidator()
+    assert validator.validate('listAssets', 200, b'{"items": [], "continuationToken": null}').ok
+    assert not validator.validate('listAssets', 200, b'{"items": {}}').ok
+    assert validator.validate('listAssets', 200, b'').violations == [Violation('', 'expected a JSON body, got none')]
+    assert validator.validate('listAssets', 404, b'Not found').ok
+    assert validator.validate(None, 200, b'?').ok
+    results = list(validate_recorded([{'method': 'GET', 'path': '/service/rest/v1/assets', 'statusCode': 200,
+                                        'responseAsJson': {'items': 'none'}}], validator))
+    assert [str(v) for r in results for v in r.violations] == ['/items: expected array, got string']
+
+
+def test_strict_against_nxrm(configuration):
+    validator = ResponseValidator(strict=True)
+    AssetsApi(NexusApiClient(configuration, validator=validator)).list_assets(repository='maven-releases')
+    assert validator.stats().checked == 1 and validator.stats().invalid == 0
+    with pytest.raises(ResponseValidationError, match='listAssets 200: /items: expected array, got object'):
+        validator.report(validator.validate('listAssets', 200, b'{"items": {}}'))
@@ -0,0 +1,135 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from nxrm_spec.annotate import (CACHEABLE, DEFAULT_TTL, IDEMPOTENT, INVALIDATES, PAGINATED, annotate_spec,
+                                response_schema)
+from nxrm_spec.serialize import load_spec, output_path
+
+TOKEN = {'name': 'continuationToken', 'in': 'query', 'schema': {'type': 'string'}}
+
+
+def json_response(schema):
+    return {'200': {'content': {'application/json': {'schema': schema}}}}
+
+
+def spec():
+    return {
+        'paths': {
+            '/v1/assets': {
+                'get': {'operationId': 'getAssets', 'tags': ['assets'], 'parameters': [TOKEN],
+                        'responses': json_response({'$ref': '#/components/schemas/PageAssetXO'})},
+            },
+            '/v1/assets/{id}': {
+                'get': {'operationId': 'getAsset', 'tags': ['assets'],
+                        'responses': json_response({'$ref': '#/components/schemas/AssetXO'})},
+                'delete': {'operationId': 'deleteAsset', 'tags': ['assets']},
+            },
+            '/v1/security/users': {
+                'get': {'operationId': 'getUsers', 'tags': ['users'],
+                        'responses': {'default': {'content': {'application/json': {'schema': {'type': 'array'}}}}}},
+                'post': {'operationId': 'createUser', 'tags': ['users']},
+            },
+            '/v1/security/users/{userId}/change-password': {
+                'put': {'operationId': 'changePassword', 'tags': ['passwords']},
+            },
+            '/v1/security/users/{userId}/roles': {
+                'get': {'operationId': 'getUserRoles', 'tags': ['roles'], 'responses': json_response({})},
+                'patch': {'operationId': 'patchUserRoles', 'tags': ['roles']},
+            },
+        },
+        'components': {'schemas': {
+            'PageAssetXO': {'properties': {'items': {'type': 'array'}, 'continuationToken': {'type': 'string'}}},
+            'AssetXO': {'properties': {'id': {'type': 'string'}}},
+        }},
+    }
+
+
+def operations(document):
+    return {o['operationId']: o for path_item in document['paths'].values() for o in path_item.values()}
+
+
+def extensions(operation):
+    return {k: v for k, v in operation.items() if k.startswith('x-')}
+
+
+def test_annotations():
+    document = spec()
+    report = annotate_spec(document, overrides={})
+    annotated = {key: extensions(o) for key, o in operations(document).items()}
+    assert annotated == {
+        'getAssets': {PAGINATED: {'tokenParameter': 'continuationToken', 'tokenField': 'continuationToken',
+                                  'itemsField': 'items'}, IDEMPOTENT: True},
+        'getAsset': {IDEMPOTENT: True, CACHEABLE: {'ttl': DEFAULT_TTL}},
+        'deleteAsset': {IDEMPOTENT: True, INVALIDATES: ['assets']},
+        # documented only as `default`
+        'getUsers': {IDEMPOTENT: True, CACHEABLE: {'ttl': DEFAULT_TTL}},
+        # not idempotent - left out rather than false; and what it changes is read below its collection too
+        'createUser': {INVALIDATES: ['users', 'roles']},
+        'changePassword': {IDEMPOTENT: True, INVALIDATES: ['passwords', 'roles', 'users']},
+        # no schema to its response
+        'getUserRoles': {IDEMPOTENT: True},
+        'patchUserRoles': {INVALIDATES: ['roles', 'users']},
+    }
+    assert report.counts == {PAGINATED: 1, IDEMPOTENT: 6, CACHEABLE: 2, INVALIDATES: 4}
+    assert report.summary() == '1 x-paginated, 6 x-idempotent, 2 x-cacheable, 4 x-invalidates'
+
+
+def test_not_paginated_without_one_array_and_a_token():
+    document = spec()
+    del document['components']['schemas']['PageAssetXO']['properties']['continuationToken']
+    annotate_spec(document, overrides={})
+    assert PAGINATED not in operations(document)['getAssets']
+
+    document = spec()
+    document['components']['schemas']['PageAssetXO']['properties']['more'] = {'type': 'array'}
+    annotate_spec(document, overrides={})
+    assert PAGINATED not in operations(document)['getAssets']
+
+
+def test_overrides():
+    document = spec()
+    report = annotate_spec(document, overrides={
+        'get*s': {CACHEABLE: None},
+        'createUser': {IDEMPOTENT: True, INVALIDATES: ['users']},
+        'getRenamed': {CACHEABLE: None},
+    })
+    annotated = operations(document)
+    assert CACHEABLE not in annotated['getUsers']
+    assert annotated['getAsset'][CACHEABLE] == {'ttl': DEFAULT_TTL}
+    assert extensions(annotated['createUser']) == {IDEMPOTENT: True, INVALIDATES: ['users']}
+    assert report.unused_overrides == ['getRenamed']
+
+
+def test_annotating_again_replaces_earlier_annotations():
+    document = spec()
+    annotate_spec(document, overrides={'createUser': {IDEMPOTENT: True}})
+    annotate_spec(document, overrides={})
+    assert IDEMPOTENT not in operations(document)['createUser']
+
+
+def test_response_schema():
+    assert response_schema({'responses': json_response({'type': 'string'})}) == {'type': 'string'}
+    assert response_schema({'responses': {'201': {'content': {'application/json': {'schema': {'type': 'object'}}}},
+                                          '200': {'content': {'*/*': {'schema': {'type': 'string'}}}}}}) == {
+        'type': 'object'}
+    assert response_schema({'responses': {'204': {}}}) is None
+
+
+def test_every_override_matches_the_committed_spec():
+    document = load_spec(output_path('yaml'))
+    assert annotate_spec(document).unused_overrides == []
+    # left out, rather than false, on what is not idempotent
+    assert not any(isinstance(o, dict) and o.get(IDEMPOTENT) is False
+                   for path_item in document['paths'].values() for o in path_item.values())
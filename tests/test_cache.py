@@ -0,0 +1,122 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import os
+import os.path
+import shutil
+
+import pytest
+
+from nxrm_spec import cache
+from nxrm_spec.cache import (PATCH_SOURCES, SpecCache, combine, converter_hash, document_hash, files_hash,
+                             patch_set_hash)
+
+
+def test_document_hash_ignores_key_order():
+    assert document_hash({'a': 1, 'b': [1, 2]}) == document_hash({'b': [1, 2], 'a': 1})
+    assert document_hash({'a': 1, 'b': [1, 2]}) != document_hash({'a': 1, 'b': [2, 1]})
+    assert document_hash({'a': 1}) != document_hash({'a': '1'})
+
+
+def test_combine_is_order_and_boundary_sensitive():
+    assert combine('a', 'b') != combine('b', 'a')
+    assert combine('ab', 'c') != combine('a', 'bc')
+
+
+def test_files_hash_covers_names_and_contents(tmp_path):
+    (tmp_path / 'a.json').write_text('1')
+    (tmp_path / 'b.json').write_text('2')
+    paths = [str(tmp_path / 'a.json'), str(tmp_path / 'b.json')]
+    before = files_hash(paths)
+    assert files_hash(reversed(paths)) == before
+    (tmp_path / 'b.json').write_text('3')
+    assert files_hash(paths) != before
+    os.rename(tmp_path / 'b.json', tmp_path / 'c.json')
+    assert files_hash([str(tmp_path / 'a.json'), str(tmp_path / 'c.json')]) != before
+
+
+def test_patch_sources_exist():
+    for source in PATCH_SOURCES + cache.CONVERTER_SOURCES + cache.SERIALIZER_SOURCES:
+        assert os.path.isfile(os.path.join(cache.PACKAGE_DIR, source)), source
+
+
+def test_patch_set_hash_changes_with_table_snippets_and_code(tmp_path, monkeypatch):
+    snippets = tmp_path / 'snippets'
+    snippets.mkdir()
+    (snippets / 'A.json').write_text('{}')
+    table = [{'description': 'Group', 'patches': [{'op': 'set', 'target': '/a', 'value': 1}]}]
+    before = patch_set_hash(table, str(snippets))
+    assert patch_set_hash([dict(table[0])], str(snippets)) == before
+
+    changed = [{'description': 'Group', 'patches': [{'op': 'set', 'target': '/a', 'value': 2}]}]
+    assert patch_set_hash(changed, str(snippets)) != before
+
+    (snippets / 'A.json').write_text('{"type": "object"}')
+    after_snippet = patch_set_hash(table, str(snippets))
+    assert after_snippet != before
+
+    # editing the code that applies the patches invalidates them too
+    package = tmp_path / 'nxrm_spec'
+    shutil.copytree(cache.PACKAGE_DIR, package, ignore=shutil.ignore_patterns('__pycache__'))
+    monkeypatch.setattr(cache, 'PACKAGE_DIR', str(package))
+    assert patch_set_hash(table, str(snippets)) == after_snippet
+    with open(package / 'patch_table.py', 'a') as f:
+        f.write('\n# changed\n')
+    assert patch_set_hash(table, str(snippets)) != after_snippet
+
+
+def test_converter_hash():
+    assert converter_hash(remote=True) == 'remote'
+    assert converter_hash() == converter_hash() != 'remote'
+
+
+def test_get_and_put(tmp_path):
+    spec_cache = SpecCache(str(tmp_path))
+    assert spec_cache.get_json('converted', 'key') is None
+    spec_cache.put_json('converted', 'key', {'openapi': '3.0.1'})
+    assert spec_cache.get_json('converted', 'key') == {'openapi': '3.0.1'}
+    assert spec_cache.get_json('patched', 'key') is None
+
+    assert spec_cache.get_text('output', 'key', 'json') is None
+    spec_cache.put_text('output', 'key', 'openapi: 3.0.1\n')
+    assert spec_cache.get_text('output', 'key') == 'openapi: 3.0.1\n'
+    assert spec_cache.get_text('output', 'key', 'json') is None
+
+
+def test_fetch_metadata_by_url(tmp_path):
+    spec_cache = SpecCache(str(tmp_path))
+    spec_cache.put_fetch_metadata('http://a/swagger.json', {'etag': '"1"'})
+    assert spec_cache.get_fetch_metadata('http://a/swagger.json') == {'etag': '"1"'}
+    assert spec_cache.get_fetch_metadata('http://b/swagger.json') is None
+
+
+def test_prune_keeps_the_most_recently_used(tmp_path):
+    spec_cache = SpecCache(str(tmp_path), max_entries=2)
+    for i, key in enumerate(('a', 'b')):
+        spec_cache.put_json('swagger', key, i)
+        os.utime(tmp_path / 'swagger' / f'{key}.json', (1000 + i, 1000 + i))
+    # reading `a` makes it the most recently used, so `b` goes
+    assert spec_cache.get_json('swagger', 'a') == 0
+    spec_cache.put_json('swagger', 'c', 2)
+    assert sorted(os.listdir(tmp_path / 'swagger')) == ['a.json', 'c.json']
+    assert spec_cache.get_json('swagger', 'b') is None
+
+
+def test_failed_write_leaves_nothing_behind(tmp_path):
+    spec_cache = SpecCache(str(tmp_path))
+    spec_cache.put_json('swagger', 'a', 1)
+    with pytest.raises(TypeError):
+        spec_cache._write(str(tmp_path / 'swagger' / 'b.json'), None)
+    assert os.listdir(tmp_path / 'swagger') == ['a.json']
@@ -0,0 +1,154 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import copy
+import json
+
+from nxrm_spec.diff import FileLayout, SpecIndex, diff_specs, main, summarise
+
+PYTHON = FileLayout('python', {'generatorName': 'python', 'outputDir': '/local/out/python',
+                               'additionalProperties': {'packageName': 'nexus_api_client'}})
+
+
+def ref(name):
+    return {'$ref': f'#/components/schemas/{name}'}
+
+
+def spec():
+    return {
+        'openapi': '3.0.1',
+        'info': {'version': '3.80.0'},
+        'paths': {
+            '/v1/tasks': {
+                'get': {'operationId': 'getTasks', 'tags': ['Tasks'],
+                        'responses': {'200': {'content': {'application/json': {'schema': ref('PageTaskXO')}}}}},
+                'post': {'operationId': 'createTask', 'tags': ['Tasks'], 'responses': {'204': {}}},
+            },
+            '/v1/nodes': {
+                'get': {'responses': {'200': {'content': {'application/json': {'schema': ref('Node')}}}}},
+            },
+        },
+        'components': {
+            'schemas': {
+                'PageTaskXO': {'properties': {'items': {'type': 'array', 'items': ref('TaskXO')}}},
+                'TaskXO': {'properties': {'id': {'type': 'string'}}},
+                'Node': {'properties': {'children': {'type': 'array', 'items': ref('Node')}}},
+            },
+            'securitySchemes': {'BasicAuth': {'type': 'http', 'scheme': 'basic'}},
+        },
+    }
+
+
+def diff(old, new):
+    return diff_specs(old, new, [PYTHON])
+
+
+def test_no_changes():
+    report = diff(spec(), spec())
+    assert report['operations'] == {'added': [], 'removed': [], 'changed': []}
+    assert report['models'] == {'added': [], 'removed': [], 'changed': []}
+    assert report['global'] == []
+    assert report['files'] == {'python': []}
+
+
+def test_moving_things_around_is_not_a_change():
+    new = spec()
+    new['paths'] = dict(reversed(list(new['paths'].items())))
+    new['components']['schemas'] = dict(reversed(list(new['components']['schemas'].items())))
+    assert diff(spec(), new)['files'] == {'python': []}
+
+
+def test_nested_change_shows_against_everything_using_it():
+    new = spec()
+    new['components']['schemas']['TaskXO']['properties']['name'] = {'type': 'string'}
+    report = diff(spec(), new)
+    assert report['operations']['changed'] == [
+        {'operationId': 'getTasks', 'method': 'GET', 'path': '/v1/tasks', 'tags': ['Tasks'], 'direct': False,
+         'via': ['schemas/TaskXO']},
+    ]
+    assert report['models']['changed'] == [
+        {'name': 'PageTaskXO', 'direct': False, 'via': ['schemas/TaskXO']},
+        {'name': 'TaskXO', 'direct': True, 'via': []},
+    ]
+    assert report['files']['python'] == [
+        'out/python/docs/PageTaskXO.md', 'out/python/docs/TaskXO.md', 'out/python/docs/TasksApi.md',
+        'out/python/nexus_api_client/api/tasks_api.py', 'out/python/nexus_api_client/models/page_task_xo.py',
+        'out/python/nexus_api_client/models/task_xo.py', 'out/python/test/test_page_task_xo.py',
+        'out/python/test/test_task_xo.py', 'out/python/test/test_tasks_api.py',
+    ]
+
+
+def test_recursive_schema():
+    index = SpecIndex(spec())
+    assert index.closure(index.components['schemas/Node']) == {'schemas/Node'}
+    new = spec()
+    new['components']['schemas']['Node']['properties']['name'] = {'type': 'string'}
+    report = diff(spec(), new)
+    assert report['operations']['changed'] == [
+        {'operationId': 'GET /v1/nodes', 'method': 'GET', 'path': '/v1/nodes', 'tags': ['default'], 'direct': False,
+         'via': ['schemas/Node']},
+    ]
+
+
+def test_added_and_removed():
+    new = spec()
+    del new['paths']['/v1/tasks']['post']
+    new['paths']['/v1/tasks/{id}'] = {'delete': {'operationId': 'deleteTask', 'tags': ['Tasks']}}
+    new['components']['schemas']['TaskRequest'] = {'properties': {'name': {'type': 'string'}}}
+    report = diff(spec(), new)
+    assert [o['operationId'] for o in report['operations']['added']] == ['deleteTask']
+    assert [o['operationId'] for o in report['operations']['removed']] == ['createTask']
+    assert report['models'] == {'added': ['TaskRequest'], 'removed': [], 'changed': []}
+    # adding or removing anything changes the files listing everything
+    assert 'out/python/nexus_api_client/models/__init__.py' in report['files']['python']
+    assert 'out/python/nexus_api_client/models/task_request.py' in report['files']['python']
+
+
+def test_global_changes():
+    new = spec()
+    new['info']['version'] = '3.81.0'
+    report = diff(spec(), new)
+    assert report['global'] == ['info']
+    # only the header comment of each file changes
+    assert report['files'] == {'python': []}
+
+    new['components']['securitySchemes']['BasicAuth']['scheme'] = 'bearer'
+    report = diff(spec(), new)
+    assert report['global'] == ['info', 'components/securitySchemes']
+    assert 'out/python/nexus_api_client/configuration.py' in report['files']['python']
+
+
+def test_summarise():
+    new = spec()
+    new['components']['schemas']['TaskXO']['properties']['name'] = {'type': 'string'}
+    new['info']['version'] = '3.81.0'
+    assert list(summarise(diff(spec(), new))) == [
+        'Operations: 0 added, 0 removed, 1 changed',
+        'Models: 0 added, 0 removed, 2 changed',
+        'Global: info',
+        'python: 9 affected file(s)',
+    ]
+
+
+def test_main(tmp_path, capsys):
+    old, new = spec(), copy.deepcopy(spec())
+    new['components']['schemas']['TaskXO']['properties']['name'] = {'type': 'string'}
+    (tmp_path / 'old.json').write_text(json.dumps(old))
+    (tmp_path / 'new.json').write_text(json.dumps(new))
+    assert main([str(tmp_path / 'old.json'), str(tmp_path / 'new.json'), '-o', str(tmp_path / 'report.json')]) == 0
+    report = json.loads((tmp_path / 'report.json').read_text())
+    assert [m['name'] for m in report['models']['changed']] == ['PageTaskXO', 'TaskXO']
+    assert set(report['files']) == {'go', 'java-webclient', 'python', 'python-asyncio', 'typescript'}
+    assert 'Models: 0 added, 0 removed, 2 changed' in capsys.readouterr().out
@@ -0,0 +1,52 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""The spec `update-spec.py` produces - converted locally, patched and annotated - is the committed one."""
+import yaml
+
+from benchmarks.swagger_fixture import reconstruct_swagger
+from nxrm_spec.annotate import annotate_spec
+from nxrm_spec.convert import convert_swagger
+from nxrm_spec.parity import iter_differences
+from nxrm_spec.patch_table import GENERATORS, PATCH_TABLE, spec_info
+from nxrm_spec.patches import apply_patches
+from nxrm_spec.serialize import load_spec, output_path, to_yaml
+
+
+def test_pipeline_reproduces_committed_spec():
+    committed = load_spec(output_path('yaml'))
+    swagger = reconstruct_swagger(committed)
+
+    spec = convert_swagger(swagger)
+    spec['info'] = spec_info(swagger['info']['version'])
+    report = apply_patches(spec, PATCH_TABLE, GENERATORS)
+    annotate_spec(spec)
+
+    assert not report.failed
+    # through YAML, as `update-spec.py --check` compares exactly what it would write
+    assert list(iter_differences(committed, yaml.safe_load(to_yaml(spec)))) == []
+
+
+def test_iter_differences():
+    expected = {'a': 1, 'b': {'c/d': [1, 2]}, 'e': [1]}
+    actual = {'a': 2, 'b': {'c/d': [1, 3]}, 'f': None, 'e': [1, 2]}
+    assert list(iter_differences(expected, actual)) == [
+        '/a: expected 1, got 2',
+        '/b/c~1d/1: expected 2, got 3',
+        '/e: expected [1], got [1, 2]',
+        '/f: unexpected',
+    ]
+    assert list(iter_differences({'a': 1}, {})) == ['/a: missing']
+    assert list(iter_differences(expected, expected)) == []
@@ -0,0 +1,172 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import json
+
+import pytest
+
+from nxrm_spec.patches import APPLIED, FAILED, NO_OP, PatchEngine, SpecIndex, apply_patches
+
+
+def spec():
+    return {
+        'paths': {
+            '/v1/tasks': {
+                'get': {'operationId': 'getTasks', 'responses': {'200': {'description': 'OK'}}},
+                'post': {'responses': {}},
+            },
+        },
+        'components': {
+            'schemas': {
+                'Task': {'type': 'object', 'properties': {'id': {'type': 'string'}}},
+                'Old': {'type': 'string'},
+                'User': {'properties': {'source': {'$ref': '#/components/schemas/Old'}}},
+            },
+        },
+    }
+
+
+def apply(document, patch, generators=None, snippets_dir=None):
+    engine = PatchEngine(document, generators or {}, **({'snippets_dir': snippets_dir} if snippets_dir else {}))
+    return engine.apply_patch(patch)
+
+
+def test_set():
+    document = spec()
+    patch = {'op': 'set', 'target': '/components/schemas/Task/properties/id/format', 'value': 'uuid'}
+    assert apply(document, patch) == (APPLIED, '')
+    assert document['components']['schemas']['Task']['properties']['id'] == {'type': 'string', 'format': 'uuid'}
+    assert apply(document, patch) == (NO_OP, '')
+
+
+def test_set_copies_its_value():
+    document = spec()
+    patch = {'op': 'set', 'target': '/components/schemas/New', 'value': {'type': 'object'}}
+    apply(document, patch)
+    document['components']['schemas']['New']['type'] = 'string'
+    assert patch['value'] == {'type': 'object'}
+
+
+def test_merge():
+    document = spec()
+    patch = {'op': 'merge', 'target': '/components/schemas/Task', 'value': {'required': ['id'], 'type': 'object'}}
+    assert apply(document, patch) == (APPLIED, '')
+    assert document['components']['schemas']['Task']['required'] == ['id']
+    assert 'properties' in document['components']['schemas']['Task']
+    assert apply(document, patch) == (NO_OP, '')
+
+
+def test_merge_needs_objects():
+    status, reason = apply(spec(), {'op': 'merge', 'target': '/components/schemas/Old/type', 'value': {'a': 1}})
+    assert status == FAILED
+    assert 'requires an object' in reason
+
+
+def test_ensure():
+    document = spec()
+    patch = {'op': 'ensure', 'target': '/paths/~1v1~1tasks/post/responses/204', 'value': {'description': 'Done'}}
+    assert apply(document, patch) == (APPLIED, '')
+    assert apply(document, dict(patch, value={'description': 'Other'})) == (NO_OP, '')
+    assert document['paths']['/v1/tasks']['post']['responses']['204'] == {'description': 'Done'}
+
+
+def test_copy():
+    document = spec()
+    patch = {'op': 'copy', 'from': '/components/schemas/Task', 'target': '/components/schemas/TaskXO'}
+    assert apply(document, patch) == (APPLIED, '')
+    assert document['components']['schemas']['TaskXO'] == document['components']['schemas']['Task']
+    assert document['components']['schemas']['TaskXO'] is not document['components']['schemas']['Task']
+    assert apply(document, patch) == (NO_OP, '')
+
+
+def test_rename_points_refs_at_the_new_name():
+    document = spec()
+    patch = {'op': 'rename', 'from': '/components/schemas/Old', 'target': '/components/schemas/New',
+             'refs': ['/components/schemas/User/properties/source']}
+    assert apply(document, patch) == (APPLIED, '')
+    schemas = document['components']['schemas']
+    assert 'Old' not in schemas
+    assert schemas['New'] == {'type': 'string'}
+    assert schemas['User']['properties']['source'] == {'$ref': '#/components/schemas/New'}
+    # already renamed
+    assert apply(document, patch) == (NO_OP, '')
+
+
+def test_rename_onto_an_existing_value_fails():
+    status, reason = apply(spec(), {'op': 'rename', 'from': '/components/schemas/Old',
+                                    'target': '/components/schemas/Task'})
+    assert status == FAILED
+    assert reason == '/components/schemas/Task already exists'
+
+
+@pytest.mark.parametrize('patch, reason', [
+    ({'op': 'move', 'target': '/a'}, "unknown op 'move'"),
+    ({'op': 'set', 'target': '/components/schemas/Task'}, 'patch has neither `value` nor `snippet`'),
+    ({'op': 'set', 'target': '/nothing/here', 'value': 1}, '/nothing does not exist'),
+    ({'op': 'merge', 'target': '/components/schemas/Missing', 'value': {}},
+     '/components/schemas/Missing does not exist'),
+    ({'op': 'copy', 'from': '/components/schemas/Missing', 'target': '/components/schemas/X'},
+     '/components/schemas/Missing does not exist'),
+    ({'op': 'set', 'target': 'components', 'value': 1}, "Invalid JSON Pointer: 'components'"),
+])
+def test_failures_are_reported_not_raised(patch, reason):
+    assert apply(spec(), patch) == (FAILED, reason)
+
+
+def test_snippet(tmp_path):
+    (tmp_path / 'Task.json').write_text(json.dumps({'type': 'object', 'title': 'Task'}))
+    document = spec()
+    assert apply(document, {'op': 'set', 'target': '/components/schemas/Task', 'snippet': 'Task.json'},
+                 snippets_dir=str(tmp_path)) == (APPLIED, '')
+    assert document['components']['schemas']['Task'] == {'type': 'object', 'title': 'Task'}
+
+
+def test_spec_index_lists_operations():
+    index = SpecIndex(spec())
+    assert [(path, method) for path, method, _ in index.operations] == [('/v1/tasks', 'get'), ('/v1/tasks', 'post')]
+
+
+def test_apply_patches_reports_every_patch_by_group():
+    def operation_ids(index):
+        for path, method, operation in index.operations:
+            if 'operationId' not in operation:
+                yield {'op': 'set', 'target': f'/paths/{path.replace("/", "~1")}/{method}/operationId',
+                       'value': f'{method}Tasks'}
+
+    table = [
+        {'description': 'Schemas', 'patches': [
+            {'op': 'merge', 'target': '/components/schemas/Task', 'value': {'type': 'object'}},
+            {'op': 'set', 'target': '/components/schemas/Missing/type', 'value': 'string'},
+        ]},
+        {'description': 'Operation ids', 'generate': 'operation_ids'},
+    ]
+    document = spec()
+    report = apply_patches(document, table, {'operation_ids': operation_ids}, verbose=False)
+    assert [(r.group, r.status) for r in report.results] == [
+        ('Schemas', NO_OP), ('Schemas', FAILED), ('Operation ids', APPLIED),
+    ]
+    assert document['paths']['/v1/tasks']['post']['operationId'] == 'postTasks'
+    assert report.to_dict() == {
+        'applied': 1,
+        'no-op': 1,
+        'failed': 1,
+        'results': [
+            {'group': 'Schemas', 'op': 'merge', 'target': '/components/schemas/Task', 'status': NO_OP, 'reason': ''},
+            {'group': 'Schemas', 'op': 'set', 'target': '/components/schemas/Missing/type', 'status': FAILED,
+             'reason': '/components/schemas/Missing does not exist'},
+            {'group': 'Operation ids', 'op': 'set', 'target': '/paths/~1v1~1tasks/post/operationId',
+             'status': APPLIED, 'reason': ''},
+        ],
+    }
@@ -0,0 +1,98 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from nxrm_spec.patch_table import privilege_create_responses, repository_operation_ids, repository_response_descriptions
+from nxrm_spec.patches import SpecIndex
+from nxrm_spec.paths import PathIndex
+
+PATHS = [
+    '/v1/repositories',
+    '/v1/repositories/{repositoryName}',
+    '/v1/repositories/maven/proxy',
+    '/v1/repositories/maven/proxy/{repositoryName}',
+    '/v1/repositories/maven/proxy/{repositoryName}/extra',
+    '/v1/repositories/{repositoryName}/invalidate-cache',
+    '/v1/repositories/raw/hosted/{repositoryName}',
+    '/v1/security/privileges',
+    '/v1/security/privileges/{privilegeName}',
+    '/v1/security/privileges/script',
+    '/v1/security/privileges/script/{privilegeName}',
+    '/v1/security/privileges/script/{privilegeName}/extra',
+    '/v1/tasks',
+]
+
+
+def test_build():
+    index = PathIndex.build({path: {} for path in PATHS})
+    assert index.repositories == {
+        ('maven', 'proxy', False): '/v1/repositories/maven/proxy',
+        ('maven', 'proxy', True): '/v1/repositories/maven/proxy/{repositoryName}',
+        ('{repositoryName}', 'invalidate-cache', False): '/v1/repositories/{repositoryName}/invalidate-cache',
+        ('raw', 'hosted', True): '/v1/repositories/raw/hosted/{repositoryName}',
+    }
+    assert index.privileges == {
+        ('script', False): '/v1/security/privileges/script',
+        ('script', True): '/v1/security/privileges/script/{privilegeName}',
+    }
+
+
+def test_repository_path_even_if_not_served():
+    index = PathIndex.build({path: {} for path in PATHS})
+    assert index.repository('maven', 'proxy') == '/v1/repositories/maven/proxy/{repositoryName}'
+    assert index.repository('maven', 'proxy', has_name=False) == '/v1/repositories/maven/proxy'
+    assert index.repository('npm', 'group') == '/v1/repositories/npm/group/{repositoryName}'
+    assert index.repository('npm', 'group', has_name=False) == '/v1/repositories/npm/group'
+
+
+def test_iter():
+    index = PathIndex.build({path: {} for path in PATHS})
+    assert ('raw', 'hosted', True, '/v1/repositories/raw/hosted/{repositoryName}') in index.iter_repositories()
+    assert list(index.iter_privileges()) == [
+        ('script', False, '/v1/security/privileges/script'),
+        ('script', True, '/v1/security/privileges/script/{privilegeName}'),
+    ]
+
+
+def spec():
+    return {'paths': {
+        '/v1/repositories/maven/proxy': {'post': {'operationId': 'createRepository'}},
+        '/v1/repositories/maven/proxy/{repositoryName}': {
+            'get': {'responses': {'200': {'content': {}}}},
+            'put': {},
+        },
+        '/v1/repositories/raw/hosted/{repositoryName}': {
+            'get': {'responses': {'200': {'description': 'OK'}}},
+            'delete': {},
+        },
+        '/v1/security/privileges/script': {'post': {}},
+        '/v1/security/privileges/script/{privilegeName}': {'put': {}},
+    }}
+
+
+def test_patches_from_the_index():
+    index = SpecIndex(spec())
+    assert [(p['target'], p['value']) for p in repository_operation_ids(index)] == [
+        ('/paths/~1v1~1repositories~1maven~1proxy/post/operationId', 'createMavenProxyRepository'),
+        ('/paths/~1v1~1repositories~1maven~1proxy~1{repositoryName}/get/operationId', 'getMavenProxyRepository'),
+        ('/paths/~1v1~1repositories~1maven~1proxy~1{repositoryName}/put/operationId', 'updateMavenProxyRepository'),
+        ('/paths/~1v1~1repositories~1raw~1hosted~1{repositoryName}/get/operationId', 'getRawHostedRepository'),
+    ]
+    assert [p['target'] for p in privilege_create_responses(index)] == [
+        '/paths/~1v1~1security~1privileges~1script/post/responses/201',
+    ]
+    assert [p['target'] for p in repository_response_descriptions(index)] == [
+        '/paths/~1v1~1repositories~1maven~1proxy~1{repositoryName}/get/responses/200/description',
+        '/paths/~1v1~1repositories~1raw~1hosted~1{repositoryName}/get/responses/200/description',
+    ]
@@ -0,0 +1,73 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import pytest
+
+from nxrm_spec.pointer import PointerError, PointerIndex, escape, pointer, split, unescape
+
+
+def test_escape_round_trip():
+    assert escape('a/b~c') == 'a~1b~0c'
+    assert unescape('a~1b~0c') == 'a/b~c'
+    # `~01` is an escaped `~` followed by `1`, not an escaped `/`
+    assert unescape('~01') == '~1'
+
+
+def test_pointer_and_split():
+    ptr = pointer('paths', '/v1/tasks', 'post')
+    assert ptr == '/paths/~1v1~1tasks/post'
+    assert split(ptr) == ('/paths/~1v1~1tasks', 'post')
+    assert split('/paths/~1v1~1tasks') == ('/paths', '/v1/tasks')
+    with pytest.raises(PointerError):
+        split('paths')
+
+
+def test_get():
+    index = PointerIndex({'a': {'b/c': [1, {'d': 2}]}})
+    assert index.get('') == {'a': {'b/c': [1, {'d': 2}]}}
+    assert index.get('/a/b~1c/1/d') == 2
+    assert index.contains('/a/b~1c/0')
+    assert not index.contains('/a/b~1c/2')
+    assert not index.contains('/a/b~1c/x')
+    assert not index.contains('/a/b~1c/0/d')
+    with pytest.raises(PointerError, match='/a/e does not exist'):
+        index.get('/a/e')
+
+
+def test_set_is_seen_through_the_memo():
+    index = PointerIndex({'a': {'b': {'c': 1}}})
+    assert index.get('/a/b/c') == 1
+    index.set('/a/b', {'c': 2})
+    assert index.get('/a/b/c') == 2
+    index.set('/a/e', [0])
+    index.set('/a/e/0', 1)
+    assert index.document == {'a': {'b': {'c': 2}, 'e': [1]}}
+    with pytest.raises(PointerError):
+        index.set('/a/e/1', 2)
+    with pytest.raises(PointerError):
+        index.set('/a/missing/x', 1)
+
+
+def test_remove_from_list_shifts_the_memo():
+    index = PointerIndex({'items': [{'name': 'a'}, {'name': 'b'}, {'name': 'c'}]})
+    assert index.get('/items/1/name') == 'b'
+    assert index.get('/items/2/name') == 'c'
+    assert index.remove('/items/1') == {'name': 'b'}
+    assert index.get('/items/1/name') == 'c'
+    assert not index.contains('/items/2')
+    assert index.remove('/items/0/name') == 'a'
+    assert index.document == {'items': [{}, {'name': 'c'}]}
+    with pytest.raises(PointerError):
+        index.remove('/items/5')
@@ -0,0 +1,114 @@
+#
+# Copyright 2019-Present Sonatype Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import json
+
+from nxrm_spec.serialize import load_spec
+from nxrm_spec.subset import format_for, main, subset_spec, write_subset
+
+
+def ref(name, kind='schemas'):
+    return {'$ref': f'#/components/{kind}/{name}'}
+
+
+def spec():
+    return {
+        'openapi': '3.0.1',
+        'security': [{'BasicAuth': []}],
+        'tags': [{'name': 'Search'}, {'name': 'Tasks'}],
+        'paths': {
+            '/v1/search': {
+                'parameters': [ref('Repository', 'parameters')],
+                'get': {'operationId': 'search', 'tags': ['Search'],
+                        'responses': {'200': {'content': {'application/json': {'schema': ref('PageComponentXO')}}}}},
+            },
+            '/v1/tasks': {
+                'get': {'operationId': 'getTasks', 'tags': ['Tasks'], 'security': [{'ApiKey': []}],
+                        'responses': {'200': {'content': {'application/json': {'schema': ref('TaskXO')}}}}},
+            },
+        },
+        'components': {
+            'schemas': {
+                'PageComponentXO': {'properties': {'items': {'type': 'array', 'items': ref('ComponentXO')}}},
+                'ComponentXO': {'properties': {'assets': {'type': 'array', 'items': ref('AssetXO')}},
+                                'discriminator': {'propertyName': 'format',
+                                                  'mapping': {'maven2': '#/components/schemas/MavenComponentXO'}}},
+                'MavenComponentXO': {'allOf': [ref('ComponentXO')]},
+                'AssetXO': {'properties': {'parent': ref('AssetXO')}},
+                'TaskXO': {'properties': {'id': {'type': 'string'}}},
+            },
+            'parameters': {'Repository': {'name': 'repository', 'in': 'query'}},
+            'securitySchemes': {'BasicAuth': {'type': 'http'}, 'ApiKey': {'type': 'apiKey'}},
+        },
+    }
+
+
+def test_closure_of_refs_mappings_and_security():
+    subset, report = subset_spec(spec(), tags=['search'])
+    assert list(subset['paths']) == ['/v1/search']
+    # the path's shared parameters are kept with it
+    assert subset['paths']['/v1/search']['parameters'] == [ref('Repository', 'parameters')]
+    assert subset['components'] == {
+        'schemas': {name: spec()['components']['schemas'][name]
+                    for name in ('PageComponentXO', 'ComponentXO', 'MavenComponentXO', 'AssetXO')},
+        'parameters': {'Repository': {'name': 'repository', 'in': 'query'}},
+        'securitySchemes': {'BasicAuth': {'type': 'http'}},
+    }
+    assert subset['tags'] == [{'name': 'Search'}]
+    assert subset['security'] == [{'BasicAuth': []}]
+    assert report.summary() == '1 of 2 operations, 6 of 8 components'
+    assert report.unmatched == []
+
+
+def test_operation_security_and_patterns():
+    subset, report = subset_spec(spec(), operation_ids=['get*'], paths=['/v1/nothing/*'])
+    assert list(subset['paths']) == ['/v1/tasks']
+    assert subset['components'] == {
+        'schemas': {'TaskXO': {'properties': {'id': {'type': 'string'}}}},
+        'securitySchemes': {'BasicAuth': {'type': 'http'}, 'ApiKey': {'type': 'apiKey'}},
+    }
+    assert report.unmatched == ['path /v1/nothing/*']
+
+
+def test_subset_is_a_copy():
+    document = spec()
+    subset, _ = subset_spec(document, paths=['/v1/*'])
+    subset['components']['schemas']['TaskXO']['properties'].clear()
+    assert document['components']['schemas']['TaskXO']['properties'] == {'id': {'type': 'string'}}
+
+
+def test_format_for():
+    assert format_for('spec/openapi.search.yaml') == 'yaml'
+    assert format_for('spec/openapi.search.json') == 'json'
+    assert format_for('spec/openapi.search.min.json') == 'compact'
+    assert format_for('subset') == 'yaml'
+
+
+def test_nothing_is_written_when_a_selector_matches_nothing(tmp_path):
+    output = tmp_path / 'subset.json'
+    report = write_subset(spec(), str(output), tags=['Search', 'Typo'])
+    assert report.unmatched == ['tag Typo']
+    assert not output.exists()
+    write_subset(spec(), str(output), tags=['Search'])
+    assert list(json.loads(output.read_text())['paths']) == ['/v1/search']
+
+
+def test_main(tmp_path, capsys):
+    (tmp_path / 'openapi.json').write_text(json.dumps(spec()))
+    output = tmp_path / 'subset.yaml'
+    assert main(['--spec', str(tmp_path / 'openapi.json'), '--tag', 'Tasks', '-o', str(output)]) == 0
+    assert list(load_spec(str(output))['paths']) == ['/v1/tasks']
+    assert main(['--spec', str(tmp_path / 'openapi.json'), '--operation', 'missing', '-o', str(output)]) == 1
+    assert 'No operation matches operationId missing' in capsys.readouterr().out
@@ -13,844 +13,213 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import argparse
 import json
 import os.path
 import sys
 
 import requests
-from yaml import dump as yaml_dump
+from yaml import load as yaml_load
 
 try:
-    from yaml import CLoader as Loader, CDumper as Dumper
+    from yaml import CLoader as Loader
 except ImportError:
-    from yaml import Loader, Dumper
-
-if len(sys.argv) != 2:
-    print(f'Usage: {sys.argv[0]} <REPO_SERVER_URL>')
-    sys.exit(0)
-
-NXRM_SERVER_URL = sys.argv[1]
+    from yaml import Loader
+
+from nxrm_spec.annotate import annotate_spec
+from nxrm_spec.cache import (DEFAULT_CACHE_DIR, SpecCache, combine, converter_hash, document_hash, patch_set_hash,
+                             serializer_hash)
+from nxrm_spec.convert import REMOTE_CONVERTER_URL, convert_swagger
+from nxrm_spec.diff import diff_specs, summarise
+from nxrm_spec.parity import iter_differences
+from nxrm_spec.patch_table import GENERATORS, PATCH_TABLE, spec_info
+from nxrm_spec.patches import SNIPPETS_DIR, apply_patches
+from nxrm_spec.serialize import FORMATS, load_spec, output_path, serialize, to_yaml, write_if_changed
+from nxrm_spec.subset import write_subset
+
+parser = argparse.ArgumentParser(
+    description='Obtain the OpenAPI Specification from a Sonatype Nexus Repository server, apply our patches and '
+                'write the result to `spec/openapi.yaml`.'
+)
+parser.add_argument('server_url', metavar='REPO_SERVER_URL', nargs='?',
+                    help='Base URL of a running Sonatype Nexus Repository server')
+parser.add_argument('--swagger-file', metavar='FILE',
+                    help='Use a previously downloaded `swagger.json` instead of fetching it from REPO_SERVER_URL')
+parser.add_argument('--nxrm-version', metavar='VERSION',
+                    help='NXRM version to record in `info` (defaults to the `Server` header, or the version in '
+                         '--swagger-file)')
+parser.add_argument('--remote-converter', action='store_true',
+                    help=f'Convert Swagger 2.0 to OpenAPI 3 using {REMOTE_CONVERTER_URL} rather than locally')
+parser.add_argument('--patch-report', metavar='FILE',
+                    help='Write a JSON report of which patches applied, were no-ops or failed to FILE')
+parser.add_argument('--cache-dir', metavar='DIR', default=DEFAULT_CACHE_DIR,
+                    help='Where to cache fetched, converted and patched specs (default: %(default)s)')
+parser.add_argument('--no-cache', action='store_true',
+                    help='Always fetch, convert and patch from scratch, and leave the cache untouched')
+parser.add_argument('--format', dest='formats', action='append', choices=list(FORMATS),
+                    help='Output format(s) to write to `spec/` - `yaml` (openapi.yaml), `json` (openapi.json) and/or '
+                         '`compact` (openapi.min.json). May be repeated (default: yaml)')
+parser.add_argument('--diff', metavar='FILE',
+                    help='Write a JSON report of the operations, models and generated files that differ from the '
+                         'committed `spec/openapi.yaml` to FILE')
+parser.add_argument('--check', action='store_true',
+                    help='Do not write `spec/openapi.yaml` - exit non-zero if the result differs from it instead')
+parser.add_argument('--subset-tag', metavar='TAG', action='append', default=[],
+                    help='Select, for a reduced spec (see --subset-output), the operations with this tag - may be '
+                         'repeated')
+parser.add_argument('--subset-operation', metavar='PATTERN', action='append', default=[],
+                    help='Select the operations whose operationId matches this `fnmatch` pattern - may be repeated')
+parser.add_argument('--subset-path', metavar='PATTERN', action='append', default=[],
+                    help='Select the operations whose path matches this `fnmatch` pattern - may be repeated')
+parser.add_argument('--subset-output', metavar='FILE',
+                    help='Where to write the reduced spec, with only the selected operations and the components they '
+                         'reference (`.json` for JSON, `.min.json` for minified JSON, anything else for YAML)')
+args = parser.parse_args()
+
+if args.server_url is None and args.swagger_file is None:
+    parser.error('one of REPO_SERVER_URL or --swagger-file is required')
+SUBSET_SELECTORS = args.subset_tag or args.subset_operation or args.subset_path
+if bool(SUBSET_SELECTORS) != bool(args.subset_output):
+    parser.error('--subset-output and at least one --subset-tag, --subset-operation or --subset-path go together')
+
+NXRM_SERVER_URL = args.server_url
 NXRM_SPEC_PATH = '/service/rest/swagger.json'
+OUTPUT_SPEC_FILE = output_path('yaml')
+OUTPUT_FORMATS = args.formats or ['yaml']
 
 
 def parse_version_from_server_header(header: str) -> str:
     return header.split('/')[1].split(' ')[0]
 
 
-def ensure_response(path: str, method: str, code: str, description: str) -> None:
-    """NXRM has, on occasion, dropped a response entirely from the generated Swagger doc.
-    Recreate it (matching the last known-good spec) before patching its content. The skeleton
-    includes an empty `application/json` schema so call sites that only patch a nested key
-    (e.g. `...['content']['application/json']['schema']['$ref'] = ...`) have something to patch."""
-    json_spec['paths'][path][method]['responses'].setdefault(code, {
-        'description': description,
-        'content': {
-            'application/json': {
-                'schema': {}
-            }
-        }
-    })
-
-
-json_spec_response_v2 = requests.get(f'{NXRM_SERVER_URL}{NXRM_SPEC_PATH}')
-NXRM_VERSION = parse_version_from_server_header(json_spec_response_v2.headers.get('Server', ''))
-json_spec_v2 = json_spec_response_v2.json()
-
-# We need to convert from Swagger 2.0 to OpenAPI 3
-json_spec_response = requests.post('https://converter.swagger.io/api/convert', json=json_spec_v2)
-json_spec = json_spec_response.json()
-
-# Align OpenAPI Spec Version to 3.1.0
-# json_spec['openapi'] = '3.1.0'
-
-# Update OpenAPI Info Block
-print('Updating `info`')
-json_spec['info'] = {
-    'title': 'Sonatype Nexus Repository Manager',
-    # 'summary': 'Public REST API for Sonatype Nexus Repository',
-    'description': 'This documents the available APIs into [Sonatype Nexus Repository Manager]'
-                   '(https://www.sonatype.com/products/sonatype-nexus-repository) as of version ' + NXRM_VERSION + '.',
-    'contact': {
-        'name': 'Sonatype Community Maintainers',
-        'url': 'https://github.com/sonatype-nexus-community'
-    },
-    'license': {
-        'name': 'Apache-2.0',
-        'url': 'http://www.apache.org/licenses/LICENSE-2.0.html'
-    },
-    'version': NXRM_VERSION
-}
-
-# Add `securitySchemes` under `components`
-if 'components' in json_spec and 'securitySchemes' not in json_spec['components']:
-    print('Adding `securitySchemes`...')
-    json_spec['components']['securitySchemes'] = {
-        'BasicAuth': {
-            'type': 'http',
-            'scheme': 'basic'
-        }
-    }
-if 'security' not in json_spec:
-    json_spec['security'] = [
-        {
-            'BasicAuth': []
-        }
-    ]
-
-# Pin/Fix OperationID for GET /v1/repositories
-print('Fixing and pinning OperationID for for GET /v1/repositories')
-json_spec['paths']['/v1/repositories']['get']['operationId'] = 'getAllRepositories'
-
-# Pin/Fix OperationIDs for all /v1/repositories/[FORMAT]/[TYPE]
-print('Fixing and pinning OperationIDs for /v1/repositories/* paths...')
-i = 0
-for path in json_spec['paths']:
-    if str(path).startswith('/v1/repositories/'):
-        path_parts = str(path).split('/')
-        if len(path_parts) > 4:
-            format = path_parts[3]
-            type = path_parts[4]
-            for method in json_spec['paths'][path]:
-                if str(method).lower() == 'get':
-                    json_spec['paths'][path]['get'][
-                        'operationId'] = f'get{format.capitalize()}{type.capitalize()}Repository'
-                    i = i + 1
-                if str(method).lower() == 'post':
-                    json_spec['paths'][path]['post'][
-                        'operationId'] = f'create{format.capitalize()}{type.capitalize()}Repository'
-                    i = i + 1
-                if str(method).lower() == 'put':
-                    json_spec['paths'][path]['put'][
-                        'operationId'] = f'update{format.capitalize()}{type.capitalize()}Repository'
-                    i = i + 1
-print(f'   Fixed {i} Repository Operations')
-
-# Pin/Fix OperationIDs for all /v1/security/privileges/[TYPE]
-print('Fixing and pinning OperationIDs for /v1/security/privileges/* paths...')
-i = 0
-for path in json_spec['paths']:
-    if str(path).startswith('/v1/security/privileges/'):
-        path_parts = str(path).split('/')
-        if len(path_parts) > 4:
-            t = path_parts[4]
-            for method in json_spec['paths'][path]:
-                if str(method).lower() == 'post':
-                    json_spec['paths'][path]['post']['operationId'] = f'create{t.capitalize()}Privilege'
-                    i = i + 1
-                if str(method).lower() == 'put':
-                    json_spec['paths'][path]['put']['operationId'] = f'update{t.capitalize()}Privilege'
-                    i = i + 1
-print(f'   Fixed {i} Privilege Operations')
-
-print('Correcting Response Schema for GET Privileges Operations...')
-with open(os.path.join(os.path.dirname(__file__), "snippets", "ApiPrivilegeRequest.json"), 'r') as o:
-    json_spec['components']['schemas']['ApiPrivilegeRequest'] = json.load(o)
-
-json_spec['paths']['/v1/security/privileges']['get']['operationId'] = 'getAllPrivileges'
-ensure_response('/v1/security/privileges', 'get', '200', 'successful operation')
-json_spec['paths']['/v1/security/privileges']['get']['responses']['200']['content'] = {
-    'application/json': {
-        'schema': {
-            'type': 'array',
-            'items': {
-                '$ref': '#/components/schemas/ApiPrivilegeRequest'
-            }
-        }
-    }
-}
-ensure_response('/v1/security/privileges/{privilegeName}', 'get', '200', 'successful operation')
-json_spec['paths']['/v1/security/privileges/{privilegeName}']['get']['responses']['200']['content'] = {
-    'application/json': {
-        'schema': {
-            '$ref': '#/components/schemas/ApiPrivilegeRequest'
-        }
-    }
-}
-
-print('     Done')
-
-# Resolved in NXRM 3.86
-# Fix Schemas relating to Repositories that are missing `format`, `type` and `url`
-# repository_schemas_to_fix: list[dict[str, str]] = [
-#     {'s': 'AptHostedApiRepository', 't': 'hosted', 'f': 'apt'},
-#     {'s': 'AptProxyApiRepository', 't': 'proxy', 'f': 'apt'},
-#     {'s': 'CargoGroupApiRepository', 't': 'group', 'f': 'cargo'},
-#     {'s': 'CargoProxyApiRepository', 't': 'proxy', 'f': 'cargo'},
-#     {'s': 'DockerGroupApiRepository', 't': 'group', 'f': 'docker'},
-#     {'s': 'DockerHostedApiRepository', 't': 'hosted', 'f': 'docker'},
-#     {'s': 'DockerProxyApiRepository', 't': 'proxy', 'f': 'docker'},
-#     {'s': 'MavenHostedApiRepository', 't': 'hosted', 'f': 'maven2'},
-#     {'s': 'MavenProxyApiRepository', 't': 'proxy', 'f': 'maven2'},
-#     {'s': 'NugetProxyApiRepository', 't': 'proxy', 'f': 'nuget'},
-#     {'s': 'SimpleApiGroupRepository', 't': 'group', 'f': None},
-#     {'s': 'SimpleApiHostedRepository', 't': 'hosted', 'f': None},
-#     {'s': 'NpmProxyApiRepository', 't': 'proxy', 'f': 'npm'},
-#     {'s': 'SimpleApiGroupDeployRepository', 't': 'group', 'f': None},
-#     {'s': 'SimpleApiProxyRepository', 't': 'proxy', 'f': None},
-#     {'s': 'YumHostedApiRepository', 't': 'hosted', 'f': 'yum'}
-# ]
-# print('Fixing Repository Schemas...')
-# for v in repository_schemas_to_fix:
-#     json_spec['components']['schemas'][v['s']]['properties']['format'] = {
-#         'type': 'string',
-#     }
-#     if v['f'] is not None:
-#         json_spec['components']['schemas'][v['s']]['properties']['format']['default'] = v['f']
-#     json_spec['components']['schemas'][v['s']]['properties']['type'] = {
-#         'type': 'string',
-#         'default': v['t']
-#     }
-#     json_spec['components']['schemas'][v['s']]['properties']['url'] = {
-#         'type': 'string'
-#     }
-#     print(f'   Fixed `{v['s']}`')
-
-# Fix Schema `StorageAttributes` - missing Write Policy
-json_spec['components']['schemas']['StorageAttributes']['properties']['writePolicy'] = {
-    'description': 'Controls if deployments of and updates to assets are allowed',
-    'enum': ['allow', 'allow_once', 'deny'],
-    'example': 'allow_once',
-    'type': 'string'
-}
-
-# Update schema `HttpClientConnectionAuthenticationAttributes` to also include `preemptive`
-json_spec['components']['schemas']['HttpClientConnectionAuthenticationAttributes']['properties']['preemptive'] = {
-    'description': 'Whether to use pre-emptive authentication. Use with caution. Defaults to false.',
-    'example': 'false',
-    'type': 'boolean'
-}
-
-# Fix OperationID for some requests
-operations_to_fix = [
-    {'path': '/v1/blobstores/s3', 'method': 'post', 'operation_id': 'CreateS3BlobStore'},
-    {'path': '/v1/blobstores/s3/{name}', 'method': 'get', 'operation_id': 'GetS3BlobStore'},
-    {'path': '/v1/blobstores/s3/{name}', 'method': 'put', 'operation_id': 'UpdateS3BlobStore'},
-    # `/v1/plan` and `/v1/plan/{planId}` reuse the same operationId for delete/put - disambiguate
-    # the bulk (no id) operations, matching their "all"/"execute" semantics from `summary`.
-    {'path': '/v1/plan', 'method': 'delete', 'operation_id': 'deleteAllPlans'},
-    {'path': '/v1/plan', 'method': 'put', 'operation_id': 'executeAllPlans'},
-    {'path': '/v1/plan/{planId}', 'method': 'put', 'operation_id': 'executePlan'},
-]
-i = 0
-print('Overriding operation IDs...')
-for o in operations_to_fix:
-    print(f'    Setting OperationID to {o['operation_id']} for {o['method']}:{o['path']}')
-    json_spec['paths'][o['path']][o['method']]['operationId'] = o['operation_id']
-    i = i + 1
-print(f'Overwrote {i} Operation IDs')
-
-# Add Response Schema /system/ldap/* PATHS
-print('Fixing /security/ldap/* response schemas...')
-ensure_response('/v1/security/ldap', 'get', '200', 'LDAP server list returned')
-json_spec['paths']['/v1/security/ldap']['get']['responses']['200']['content'] = {
-    'application/json': {
-        'schema': {
-            'type': 'array',
-            'items': {
-                '$ref': '#/components/schemas/ReadLdapServerXo'
-            }
-        }
-    }
-}
-ensure_response('/v1/security/ldap/{name}', 'get', '200', 'LDAP server returned')
-json_spec['paths']['/v1/security/ldap/{name}']['get']['responses']['200']['content'] = {
-    'application/json': {
-        'schema': {
-            '$ref': '#/components/schemas/ReadLdapServerXo'
-        }
-    }
-}
-print('Fixing Create/Update Schema required objects for /security/ldap/*')
-temp_required: list[str] = json_spec['components']['schemas']['CreateLdapServerXo']['required']
-# temp_required.remove('groupType') Removed for 3.90.1
-json_spec['components']['schemas']['CreateLdapServerXo']['required'] = temp_required
-json_spec['components']['schemas']['ReadLdapServerXo']['required'] = temp_required
-json_spec['components']['schemas']['UpdateLdapServerXo']['required'] = temp_required
-print('Done')
-
-# Not required from NXRM 3.85.0 onwards
-# print('Fixing response schema for IQ Connection...')
-# json_spec['paths']['/v1/iq']['get']['responses']['200']['content'] = {
-#     'application/json': {
-#         'schema': {
-#             '$ref': '#/components/schemas/IqConnectionXo'
-#         }
-#     }
-# }
-# print('     Done')
-
-print('Adding missing 201 empty responses...')
-paths_missing_201: dict[str, list[str]] = {
-    '/v1/security/privileges/application': ['post'],
-    '/v1/security/privileges/repository-admin': ['post'],
-    '/v1/security/privileges/repository-content-selector': ['post'],
-    '/v1/security/privileges/repository-view': ['post'],
-    '/v1/security/privileges/script': ['post'],
-    '/v1/security/privileges/wildcard': ['post'],
-}
-for p, ms in paths_missing_201.items():
-    for m in ms:
-        json_spec['paths'][p][m]['responses'].update({'201': {'content': {}, 'description': 'Success'}})
-print('     Done')
-
-print('Adding missing 204 empty responses...')
-paths_missing_204: dict[str, list[str]] = {
-    '/v1/security/privileges/application/{privilegeName}': ['put'],
-    '/v1/security/privileges/repository-admin/{privilegeName}': ['put'],
-    '/v1/security/privileges/repository-content-selector/{privilegeName}': ['put'],
-    '/v1/security/privileges/repository-view/{privilegeName}': ['put'],
-    '/v1/security/privileges/script/{privilegeName}': ['put'],
-    '/v1/security/privileges/wildcard/{privilegeName}': ['put'],
-    '/v1/security/roles/{id}': ['delete'],
-    '/v1/security/users/{userId}': ['put'],
-    '/v1/security/users/{userId}/change-password': ['put']
-}
-for p, ms in paths_missing_204.items():
-    for m in ms:
-        json_spec['paths'][p][m]['responses'].update({'204': {'content': {}, 'description': 'Success'}})
-print('     Done')
-
-print('Correcting schema InputStream...')
-json_spec['components']['schemas']['InputStream'] = {
-    'type': 'string',
-    'format': 'binary'
-}
-print('     Done')
-
-print('Correcting response schema for GET /v1/repositories/docker/hosted/{name}...')
-json_spec['components']['schemas']['DockerHostedApiRepository']['properties']['storage'] = {
-    '$ref': '#/components/schemas/DockerHostedStorageAttributes'
-}
-print('     Done')
-
-print('Correcting response schema for GET /v1/repositories/pypi/proxy/{name}...')
-json_spec['components']['schemas'].update({
-    'PyPiProxyApiRepository': {
-        'properties': {
-            'cleanup': {'$ref': '#/components/schemas/CleanupPolicyAttributes'},
-            'format': {'type': 'string', 'default': 'pypi'},
-            'httpClient': {'$ref': '#/components/schemas/HttpClientAttributes'},
-            'name': {
-                'description': 'A unique identifier for this repository',
-                'pattern': '^[a-zA-Z0-9\\-]{1}[a-zA-Z0-9_\\-\\.]*$',
-                'type': 'string',
-            },
-            'negativeCache': {'$ref': '#/components/schemas/NegativeCacheAttributes'},
-            'online': {
-                'description': 'Whether this repository accepts incoming requests',
-                'type': 'boolean',
-            },
-            'proxy': {'$ref': '#/components/schemas/ProxyAttributes'},
-            'pypi': {'$ref': '#/components/schemas/PyPiProxyAttributes'},
-            'replication': {'$ref': '#/components/schemas/ReplicationAttributes'},
-            'routingRuleName': {'type': 'string'},
-            'storage': {'$ref': '#/components/schemas/StorageAttributes'},
-            'type': {'type': 'string', 'default': 'proxy'},
-            'url': {'type': 'string'},
-        },
-        'required': [
-            'format', 'httpClient', 'name', 'negativeCache', 'online', 'proxy', 'pypi', 'storage', 'type', 'url'
-        ]
-    }
-})
-ensure_response('/v1/repositories/pypi/proxy/{repositoryName}', 'get', '200', 'successful operation')
-json_spec['paths']['/v1/repositories/pypi/proxy/{repositoryName}']['get']['responses']['200']['content'][('application'
-                                                                                                          '/json')][
-    'schema']['$ref'] = '#/components/schemas/PyPiProxyApiRepository'
-print('     Done')
-
-print('Correcting response schema for GET /v1/repositories/{format}/{group}/{name} where writable member...')
-paths_to_fix_writable_member = [
-    '/v1/repositories/pypi/group/{repositoryName}'
-]
-for p in paths_to_fix_writable_member:
-    ensure_response(p, 'get', '200', 'successful operation')
-    json_spec['paths'][p]['get']['responses']['200']['content']['application/json']['schema'] = {
-        '$ref': '#/components/schemas/SimpleApiGroupDeployRepository'
-    }
-# Resolved in NXRM 3.85
-# json_spec['components']['schemas']['PypiGroupRepositoryApiRequest']['properties']['group'] = {
-#     '$ref': '#/components/schemas/GroupDeployAttributes'
-# }
-print('     Done')
+cache = None if args.no_cache else SpecCache(args.cache_dir)
+nxrm_spec_url = f'{NXRM_SERVER_URL}{NXRM_SPEC_PATH}'
 
-print('Correcting response schema for GET /v1/repositories/raw/*/{name}...')
-json_spec['components']['schemas'].update({
-    'RawGroupApiRepository': {
-        'properties': {
-            'format': {'type': 'string', 'default': 'raw'},
-            'group': {'$ref': '#/components/schemas/GroupAttributes'},
-            'name': {
-                'description': 'A unique identifier for this repository',
-                'pattern': '^[a-zA-Z0-9\\-]{1}[a-zA-Z0-9_\\-\\.]*$',
-                'type': 'string',
-            },
-            'online': {
-                'description': 'Whether this repository accepts incoming requests',
-                'type': 'boolean',
-            },
-            'raw': {'$ref': '#/components/schemas/RawAttributes'},
-            'storage': {'$ref': '#/components/schemas/StorageAttributes'},
-            'type': {'type': 'string', 'default': 'group'},
-            'url': {'type': 'string'},
-        },
-        'required': [
-            'format', 'group', 'name', 'online', 'raw', 'storage', 'type', 'url'
-        ]
-    }
-})
-ensure_response('/v1/repositories/raw/group/{repositoryName}', 'get', '200', 'successful operation')
-json_spec['paths']['/v1/repositories/raw/group/{repositoryName}']['get']['responses']['200']['content'][('application'
-                                                                                                         '/json')][
-    'schema']['$ref'] = '#/components/schemas/RawGroupApiRepository'
-json_spec['components']['schemas'].update({
-    'RawHostedApiRepository': {
-        'properties': {
-            'cleanup': {'$ref': '#/components/schemas/CleanupPolicyAttributes'},
-            'component': {'$ref': '#/components/schemas/ComponentAttributes'},
-            'format': {'type': 'string', 'default': 'raw'},
-            'name': {
-                'description': 'A unique identifier for this repository',
-                'pattern': '^[a-zA-Z0-9\\-]{1}[a-zA-Z0-9_\\-\\.]*$',
-                'type': 'string',
-            },
-            'online': {
-                'description': 'Whether this repository accepts incoming requests',
-                'type': 'boolean',
-            },
-            'raw': {'$ref': '#/components/schemas/RawAttributes'},
-            'storage': {'$ref': '#/components/schemas/HostedStorageAttributes'},
-            'type': {'type': 'string', 'default': 'hosted'},
-            'url': {'type': 'string'},
-        },
-        'required': [
-            'format', 'name', 'online', 'raw', 'storage', 'type', 'url'
-        ]
-    }
-})
-ensure_response('/v1/repositories/raw/hosted/{repositoryName}', 'get', '200', 'successful operation')
-json_spec['paths']['/v1/repositories/raw/hosted/{repositoryName}']['get']['responses']['200']['content'][('application'
-                                                                                                          '/json')][
-    'schema']['$ref'] = '#/components/schemas/RawHostedApiRepository'
-json_spec['components']['schemas'].update({
-    'RawProxyApiRepository': {
-        'properties': {
-            'cleanup': {'$ref': '#/components/schemas/CleanupPolicyAttributes'},
-            'format': {'type': 'string', 'default': 'pypi'},
-            'httpClient': {'$ref': '#/components/schemas/HttpClientAttributes'},
-            'name': {
-                'description': 'A unique identifier for this repository',
-                'pattern': '^[a-zA-Z0-9\\-]{1}[a-zA-Z0-9_\\-\\.]*$',
-                'type': 'string',
-            },
-            'negativeCache': {'$ref': '#/components/schemas/NegativeCacheAttributes'},
-            'online': {
-                'description': 'Whether this repository accepts incoming requests',
-                'type': 'boolean',
-            },
-            'proxy': {'$ref': '#/components/schemas/ProxyAttributes'},
-            'raw': {'$ref': '#/components/schemas/RawAttributes'},
-            'replication': {'$ref': '#/components/schemas/ReplicationAttributes'},
-            'routingRuleName': {'type': 'string'},
-            'storage': {'$ref': '#/components/schemas/StorageAttributes'},
-            'type': {'type': 'string', 'default': 'raw'},
-            'url': {'type': 'string'},
-        },
-        'required': [
-            'format', 'httpClient', 'name', 'negativeCache', 'online', 'proxy', 'raw', 'storage', 'type', 'url'
-        ]
-    }
-})
-ensure_response('/v1/repositories/raw/proxy/{repositoryName}', 'get', '200', 'successful operation')
-json_spec['paths']['/v1/repositories/raw/proxy/{repositoryName}']['get']['responses']['200']['content'][('application'
-                                                                                                         '/json')][
-    'schema']['$ref'] = '#/components/schemas/RawProxyApiRepository'
-print('     Done')
-
-print('Correcting Schema CargoGroupApiRepository...')
-json_spec['components']['schemas']['CargoGroupApiRepository']['properties']['group'] = {
-    '$ref': '#/components/schemas/GroupAttributes'
-}
-print('     Done')
-
-print('Correcting response schema for GET /v1/repositories/conan/group/{repositoryName}...')
-ensure_response('/v1/repositories/conan/group/{repositoryName}', 'get', '200', 'successful operation')
-json_spec['paths']['/v1/repositories/conan/group/{repositoryName}']['get']['responses']['200']['content'][('application'
-                                                                                                           '/json')][
-    'schema']['$ref'] = '#/components/schemas/SimpleApiGroupDeployRepository'
-print('     Done')
-
-print('Injecting requestBody schema for PUT /v1/tasks/{taskId}...')
-json_spec['paths']['/v1/tasks/{taskId}']['put']['requestBody']['content']['application/json']['schema'] = {
-    'properties': {
-        'alertEmail': {
-            'description': 'e-mail for task notifications.',
-            'type': 'string'
-        },
-        'enabled': {
-            'description': 'Indicates if the task would be enabled.',
-            'type': 'boolean'
-        },
-        'frequency': {
-            '$ref': '#/components/schemas/FrequencyXO'
-        },
-        'name': {
-            'description': 'The name of the task template.',
-            'type': 'string'
-        },
-        'notificationCondition': {
-            'description': 'Condition required to notify a task execution.',
-            'enum': ['FAILURE', 'SUCCESS_FAILURE'],
-            'type': 'string'
-        },
-        'properties': {
-            'additionalProperties': {
-                'type': 'string'
-            },
-            'description': 'Additional properties for the task',
-            'type': 'object'
-        },
-        'type': {
-            'description': 'The type of task to be created.',
-            'type': 'string'
-        }
-    },
-    'required': [
-        'enabled', 'frequency', 'name', 'notificationCondition'
-    ]
-}
-print('     Done')
-
-print('Injecting Response Schema for POST /v1/tasks...')
-json_spec['paths']['/v1/tasks']['post']['responses'] = {
-    '201': {
-        'content': {
-            'application/json': {
-                'schema': {
-                    'properties': {
-                        'id': {
-                            'description': 'Task ID',
-                            'format': 'uuid',
-                            'type': 'string'
-                        }
-                    },
-                    'required': ['id']
-                }
-            }
-        },
-        'description': 'Task created successfully'
-    }
-}
-print('     Done')
-
-print('Adding missing `tags` field for schema `ComponentXO`...')
-json_spec['components']['schemas']['ComponentXO']['properties']['tags'] = {
-    'items': {
-        'type': 'string'
-    },
-    'type': 'array'
-}
-print('     Done')
-
-print('Correct `attributes` field for schema `TagXO`...')
-json_spec['components']['schemas']['TagXO']['properties']['attributes'] = {
-    'additionalProperties': {},
-    'type': 'object'
-}
-print('     Done')
-
-print('Correct response schema for `GET /v1/repositories/conan/proxy/{repositoryName}`...')
-json_spec['components']['schemas'].update({
-    'ConanProxyApiRepository': {
-        'allOf': [
-            {
-                '$ref': '#/components/schemas/ConanProxyRepositoryApiRequest'
-            },
-            {
-                'type': 'object',
-                'required': ['format', 'type', 'url'],
-                'properties': {
-                    'format': {'type': 'string', 'default': 'conan'},
-                    'type': {'type': 'string', 'default': 'proxy'},
-                    'url': {'type': 'string'},
-                    'routingRuleName': {
-                        'description': 'The name of the routing rule assigned to this repository',
-                        'type': 'string'
-                    }
-                }
-            }
-        ]
-    }
-})
-ensure_response('/v1/repositories/conan/proxy/{repositoryName}', 'get', '200', 'successful operation')
-json_spec['paths']['/v1/repositories/conan/proxy/{repositoryName}']['get']['responses']['200']['content'][
-    'application/json']['schema'] = {
-    '$ref': '#/components/schemas/ConanProxyApiRepository'
-}
-print('     Done')
-
-print('Patching schema `HttpSettingsXo`...')
-json_spec['components']['schemas']['HttpSettingsXo']['properties']['nonProxyHosts'].update({'nullable': 'true'})
-json_spec['components']['schemas']['HttpSettingsXo']['properties']['userAgent'].update({'nullable': 'true'})
-json_spec['components']['schemas']['ProxySettingsXo'].update({'nullable': 'true'})
-print('     Done')
-
-print('Inject response schema for POST /v1/iq/verify-connection and set OperationId')
-json_spec['paths']['/v1/iq/verify-connection']['post']['operationId'] = 'verifyIqConnection'
-ensure_response('/v1/iq/verify-connection', 'post', '200',
-                 'Connection verification complete, check response body for result')
-json_spec['paths']['/v1/iq/verify-connection']['post']['responses']['200']['content'] = {
-    'application/json': {
-        'schema': {
-            '$ref': '#/components/schemas/IqConnectionVerificationXo'
-        }
-    }
-}
-print('     Done')
-
-print('Inject response schema for GET /v1/repositories/terraform/proxy/{repositoryName}')
-ensure_response('/v1/repositories/terraform/proxy/{repositoryName}', 'get', '200', 'successful operation')
-json_spec['paths']['/v1/repositories/terraform/proxy/{repositoryName}']['get']['responses']['200']['content'] = {
-    'application/json': {
-        'schema': {
-            '$ref': '#/components/schemas/TerraformProxyApiRepository'
-        }
-    }
-}
-print('     Done')
-
-print('Complete type for `terraform.uploadType` for POST /v1/components')
-# NXRM has, on occasion, dropped the entire multipart `requestBody` for this operation from the
-# generated Swagger doc. Re-create it (as seen in NXRM 3.93) before patching `terraform.uploadType`.
-if 'requestBody' not in json_spec['paths']['/v1/components']['post']:
-    with open(os.path.join(os.path.dirname(__file__), "snippets", "ComponentsUploadRequestBody.json"), 'r') as o:
-        json_spec['paths']['/v1/components']['post']['requestBody'] = json.load(o)
-json_spec['paths']['/v1/components']['post']['requestBody']['content']['multipart/form-data']['schema']['properties'][
-    'terraform.uploadType'] = {
-    'description': 'terraform Upload Type',
-    'enum': ['module', 'provider'],
-    'type': 'string'
-}
-print('     Done')
-
-print('Correct response schema for POST /v1/tasks')
-json_spec['paths']['/v1/tasks']['post']['responses']['201']['content']['application/json'] = {
-    'schema': {
-        '$ref': '#/components/schemas/TaskXO'
-    }
-}
-print('     Done')
-
-print('Fix `TerraformHostedRepositoryApiRequest` schema (missing fields)')
-json_spec['components']['schemas']['TerraformHostedRepositoryApiRequest']['properties'].update({
-    'format': {
-        'type': 'string',
-        'default': 'terraform'
-    },
-    'type': {
-        'type': 'string',
-        'default': 'hosted'
-    },
-    'url': {
-        'type': 'string'
-    },
-    'component': {
-        '$ref': '#/components/schemas/ComponentAttributes'
-    }
-})
-print('     Done')
-
-print('Correct response schema for GET /v1/repositories/terraform/hosted/{repositoryName')
-ensure_response('/v1/repositories/terraform/hosted/{repositoryName}', 'get', '200', 'successful operation')
-json_spec['paths']['/v1/repositories/terraform/hosted/{repositoryName}']['get']['responses']['200']['content'][
-    'application/json'] = {
-    'schema': {
-        '$ref': '#/components/schemas/TerraformHostedRepositoryApiRequest'
-    }
-}
-print('     Done')
-
-print('Correct response schema for GET /v1/repositories/swift/proxy/{repositoryName}')
-ensure_response('/v1/repositories/swift/proxy/{repositoryName}', 'get', '200', 'successful operation')
-json_spec['paths']['/v1/repositories/swift/proxy/{repositoryName}']['get']['responses']['200']['content'][
-    'application/json'] = {
-    'schema': {
-        '$ref': '#/components/schemas/SwiftProxyApiRepository'
-    }
-}
-print('     Done')
-
-# Updates for NXRM 3.92.x
-print('Correct invalid schema name "Licensed Solution"...')
-if 'Licensed Solution' in json_spec['components']['schemas']:
-    json_spec['components']['schemas']['LicensedSolution'] = json_spec['components']['schemas']['Licensed Solution']
-    del json_spec['components']['schemas']['Licensed Solution']
-    # Only repoint the ref when we actually performed the rename above - otherwise NXRM is already
-    # emitting a validly-named schema (e.g. `LicensedSolutionXO`) and the existing $ref is correct;
-    # forcibly overwriting it here would point at a component that no longer exists.
-    json_spec['components']['schemas']['IqConnectionXo']['properties']['licensedSolutions']['items'][
-        '$ref'] = '#/components/schemas/LicensedSolution'
-    print('     Done')
+if args.swagger_file:
+    print(f'Reading Swagger 2.0 spec from {args.swagger_file}...')
+    with open(args.swagger_file, 'r') as swagger_file:
+        json_spec_v2 = json.load(swagger_file)
+    NXRM_VERSION = args.nxrm_version or json_spec_v2.get('info', {}).get('version', '')
 else:
-    # Resolved upstream - NXRM no longer emits the schema under the invalid, space-containing name.
-    print('     Skipped - schema name already correct')
-
-# Patch TerraformProxyApiRepository schema - now missing `terraform` item
-json_spec['components']['schemas']['TerraformProxyApiRepository']['properties']['terraform'] = {
-    '$ref': '#/components/schemas/TerraformAttributes'
-}
-
-print('Correct response schema for GET /v1/repositories/yum/proxy/{repositoryName}...')
-json_spec['components']['schemas'].update({
-    'YumProxyApiRepository': {
-        'allOf': [
-            {
-                '$ref': '#/components/schemas/YumProxyRepositoryApiRequest'
-            },
-            {
-                'type': 'object',
-                'required': ['format', 'type', 'url'],
-                'properties': {
-                    'format': {'type': 'string', 'default': 'yum'},
-                    'type': {'type': 'string', 'default': 'proxy'},
-                    'url': {'type': 'string'},
-                    'routingRuleName': {
-                        'description': 'The name of the routing rule assigned to this repository',
-                        'type': 'string'
-                    }
-                }
-            }
-        ]
-    }
-})
-ensure_response('/v1/repositories/yum/proxy/{repositoryName}', 'get', '200', 'successful operation')
-json_spec['paths']['/v1/repositories/yum/proxy/{repositoryName}']['get']['responses']['200']['content'][
-    'application/json']['schema'] = {
-    '$ref': '#/components/schemas/YumProxyApiRepository'
-}
-print('     Done')
-
-print('Correct response schema for GET /v1/repositories/yum/group/{repositoryName}...')
-json_spec['components']['schemas'].update({
-    'YumGroupApiRepository': {
-        'allOf': [
-            {
-                '$ref': '#/components/schemas/YumGroupRepositoryApiRequest'
-            },
-            {
-                'type': 'object',
-                'required': ['format', 'type', 'url'],
-                'properties': {
-                    'format': {'type': 'string', 'default': 'yum'},
-                    'type': {'type': 'string', 'default': 'group'},
-                    'url': {'type': 'string'}
-                }
-            }
-        ]
-    }
-})
-ensure_response('/v1/repositories/yum/group/{repositoryName}', 'get', '200', 'successful operation')
-json_spec['paths']['/v1/repositories/yum/group/{repositoryName}']['get']['responses']['200']['content'][
-    'application/json']['schema'] = {
-    '$ref': '#/components/schemas/YumGroupApiRepository'
-}
-print('     Done')
-
-print('Correct response schema for GET /v1/repositories/alpine/hosted/{repositoryName}...')
-json_spec['components']['schemas'].update({
-    'AlpineHostedApiRepository': {
-        'allOf': [
-            {
-                '$ref': '#/components/schemas/AlpineHostedRepositoryApiRequest'
-            },
-            {
-                'type': 'object',
-                'required': ['format', 'type', 'url'],
-                'properties': {
-                    'format': {'type': 'string', 'default': 'alpine'},
-                    'type': {'type': 'string', 'default': 'hosted'},
-                    'url': {'type': 'string'},
-                }
-            }
-        ]
-    }
-})
-ensure_response('/v1/repositories/alpine/hosted/{repositoryName}', 'get', '200', 'successful operation')
-json_spec['paths']['/v1/repositories/alpine/hosted/{repositoryName}']['get']['responses']['200']['content'][
-    'application/json']['schema'] = {
-    '$ref': '#/components/schemas/AlpineHostedApiRepository'
-}
-print('     Done')
-
-print('Correct response schema for GET /v1/repositories/alpine/proxy/{repositoryName}...')
-json_spec['components']['schemas'].update({
-    'AlpineProxyApiRepository': {
-        'allOf': [
-            {
-                '$ref': '#/components/schemas/AlpineProxyRepositoryApiRequest'
-            },
-            {
-                'type': 'object',
-                'required': ['format', 'type', 'url'],
-                'properties': {
-                    'format': {'type': 'string', 'default': 'alpine'},
-                    'type': {'type': 'string', 'default': 'proxy'},
-                    'url': {'type': 'string'},
-                    'routingRuleName': {
-                        'description': 'The name of the routing rule assigned to this repository',
-                        'type': 'string'
-                    }
-                }
-            }
-        ]
-    }
-})
-ensure_response('/v1/repositories/alpine/proxy/{repositoryName}', 'get', '200', 'successful operation')
-json_spec['paths']['/v1/repositories/alpine/proxy/{repositoryName}']['get']['responses']['200']['content'][
-    'application/json']['schema'] = {
-    '$ref': '#/components/schemas/AlpineProxyApiRepository'
-}
-print('     Done')
-
-print('Correct response schema for GET /v1/repositories/alpine/group/{repositoryName}...')
-json_spec['components']['schemas'].update({
-    'AlpineGroupApiRepository': {
-        'allOf': [
-            {
-                '$ref': '#/components/schemas/AlpineGroupRepositoryApiRequest'
-            },
-            {
-                'type': 'object',
-                'required': ['format', 'type', 'url'],
-                'properties': {
-                    'format': {'type': 'string', 'default': 'alpine'},
-                    'type': {'type': 'string', 'default': 'group'},
-                    'url': {'type': 'string'},
-                }
-            }
-        ]
-    }
-})
-ensure_response('/v1/repositories/alpine/group/{repositoryName}', 'get', '200', 'successful operation')
-json_spec['paths']['/v1/repositories/alpine/group/{repositoryName}']['get']['responses']['200']['content'][
-    'application/json']['schema'] = {
-    '$ref': '#/components/schemas/AlpineGroupApiRepository'
-}
-print('     Done')
-
-# NXRM has, on occasion, dropped `description` from the `200` response of repository-format GET
-# endpoints across many/all formats (not just the ones patched by name above). OpenAPI Generator
-# requires it, so backfill it wherever it's missing rather than special-casing every format.
-print('Backfilling missing `200` response descriptions for /v1/repositories/* GET endpoints...')
-i = 0
-for path in json_spec['paths']:
-    if str(path).startswith('/v1/repositories/'):
-        get_op = json_spec['paths'][path].get('get')
-        if get_op and '200' in get_op.get('responses', {}) and 'description' not in get_op['responses']['200']:
-            get_op['responses']['200']['description'] = 'successful operation'
-            i = i + 1
-print(f'   Fixed {i} missing response descriptions')
-
+    # Make the request conditional if the server has given us validators before
+    fetch_metadata = cache.get_fetch_metadata(nxrm_spec_url) if cache else None
+    request_headers = {}
+    if fetch_metadata and fetch_metadata.get('etag'):
+        request_headers['If-None-Match'] = fetch_metadata['etag']
+    if fetch_metadata and fetch_metadata.get('last_modified'):
+        request_headers['If-Modified-Since'] = fetch_metadata['last_modified']
+    json_spec_response_v2 = requests.get(nxrm_spec_url, headers=request_headers)
+    json_spec_v2 = None
+    if json_spec_response_v2.status_code == 304 and fetch_metadata:
+        json_spec_v2 = cache.get_json('swagger', fetch_metadata['swagger_hash'])
+        server_header = fetch_metadata.get('server', '')
+    if json_spec_v2 is None:
+        if request_headers:
+            json_spec_response_v2 = requests.get(nxrm_spec_url)
+        json_spec_response_v2.raise_for_status()
+        json_spec_v2 = json_spec_response_v2.json()
+        server_header = json_spec_response_v2.headers.get('Server', '')
+        if cache:
+            swagger_hash = document_hash(json_spec_v2)
+            cache.put_json('swagger', swagger_hash, json_spec_v2)
+            cache.put_fetch_metadata(nxrm_spec_url, {
+                'etag': json_spec_response_v2.headers.get('ETag'),
+                'last_modified': json_spec_response_v2.headers.get('Last-Modified'),
+                'server': server_header,
+                'swagger_hash': swagger_hash,
+            })
+    else:
+        print('Swagger 2.0 spec not modified since last fetch')
+    NXRM_VERSION = args.nxrm_version or parse_version_from_server_header(server_header)
+
+converted_key = combine(document_hash(json_spec_v2), converter_hash(args.remote_converter))
+patched_key = combine(converted_key, patch_set_hash(PATCH_TABLE, SNIPPETS_DIR), NXRM_VERSION)
+
+# A patch report needs the patches to actually run
+json_spec = cache.get_json('patched', patched_key) if cache and not args.patch_report else None
+if json_spec is not None:
+    print('Swagger 2.0 spec and patches unchanged - using cached patched spec')
+else:
+    json_spec = cache.get_json('converted', converted_key) if cache else None
+    if json_spec is not None:
+        print('Swagger 2.0 spec unchanged - using cached OpenAPI 3 conversion')
+    elif args.remote_converter:
+        # We need to convert from Swagger 2.0 to OpenAPI 3
+        print(f'Converting Swagger 2.0 -> OpenAPI 3 using {REMOTE_CONVERTER_URL}...')
+        json_spec_response = requests.post(REMOTE_CONVERTER_URL, json=json_spec_v2)
+        json_spec_response.raise_for_status()
+        json_spec = json_spec_response.json()
+    else:
+        print('Converting Swagger 2.0 -> OpenAPI 3...')
+        json_spec = convert_swagger(json_spec_v2)
+    if cache:
+        cache.put_json('converted', converted_key, json_spec)
+
+    # Align OpenAPI Spec Version to 3.1.0
+    # json_spec['openapi'] = '3.1.0'
+
+    # Update OpenAPI Info Block
+    print('Updating `info`')
+    json_spec['info'] = spec_info(NXRM_VERSION)
+
+    report = apply_patches(json_spec, PATCH_TABLE, GENERATORS)
+    print(f'Patches: {len(report.applied)} applied, {len(report.no_ops)} no-op, {len(report.failed)} failed')
+    if args.patch_report:
+        with open(args.patch_report, 'w') as patch_report_file:
+            json.dump(report.to_dict(), patch_report_file, indent=2)
+    if report.failed:
+        for r in report.failed:
+            print(f'   FAILED [{r.group}] {r.patch.get("op")} {r.patch.get("target")}: {r.reason}')
+        sys.exit(1)
+
+    annotations = annotate_spec(json_spec)
+    print(f'Annotations: {annotations.summary()}')
+    for pattern in annotations.unused_overrides:
+        print(f'   Override for {pattern} matches no operation')
+    if cache:
+        cache.put_json('patched', patched_key, json_spec)
+
+if args.diff:
+    print(f'Comparing with {OUTPUT_SPEC_FILE}...')
+    diff_report = diff_specs(load_spec(OUTPUT_SPEC_FILE), json_spec)
+    with open(args.diff, 'w') as diff_file:
+        json.dump(diff_report, diff_file, indent=2)
+    for line in summarise(diff_report):
+        print(f'     {line}')
+
+if args.check:
+    print(f'Checking result against {OUTPUT_SPEC_FILE}...')
+    committed_spec = load_spec(OUTPUT_SPEC_FILE)
+    # Round-trip through YAML so we compare exactly what would have been written
+    differences = list(iter_differences(committed_spec, yaml_load(to_yaml(json_spec), Loader=Loader)))
+    for d in differences[:50]:
+        print(f'   {d}')
+    if differences:
+        print(f'   {len(differences)} difference(s) found')
+        sys.exit(1)
+    print('     No differences')
+    sys.exit(0)
 
-with open('./spec/openapi.yaml', 'w') as output_yaml_specfile:
-    output_yaml_specfile.write(yaml_dump(json_spec))
+output_key = combine(patched_key, serializer_hash())
+for output_format in OUTPUT_FORMATS:
+    extension = FORMATS[output_format][0].partition('.')[2]
+    output = cache.get_text('output', f'{output_key}-{output_format}', extension) if cache else None
+    if output is None:
+        output = serialize(json_spec, output_format)
+        if cache:
+            cache.put_text('output', f'{output_key}-{output_format}', output, extension)
+    output_file = os.path.relpath(output_path(output_format))
+    if write_if_changed(output_file, output):
+        print(f'Wrote {output_file}')
+    else:
+        print(f'{output_file} is already up to date')
+
+if args.subset_output:
+    print(f'Writing subset to {args.subset_output}...')
+    subset_report = write_subset(json_spec, args.subset_output, args.subset_tag, args.subset_operation,
+                                 args.subset_path)
+    for selector in subset_report.unmatched:
+        print(f'   No operation matches {selector}')
+    if subset_report.unmatched or not subset_report.operations:
+        sys.exit(1)
+    print(f'     {subset_report.summary()}')